@@ -1,13 +1,28 @@
 import tkinter as tk
 from tkinter import ttk, Canvas, messagebox
-from collections import deque
 import threading
 import time
 from system_monitor import SystemMonitor
+from virtual_list import VirtualProcessList
+from process_index import ProcessFilter, ProcessIndex
+from process_table import format_process_row
+from process_tree import ProcessTree, format_tree_row
+from snapshot import ProcessTable
+from chart import LineChart
+from details_panel import DetailsPanel
+from timeseries import TimeSeriesStore
 import ctypes
 import os
 
 class PerformanceTab(tk.Frame):
+    CHART_COLORS = {
+        'cpu': '#3794ff',
+        'memory': '#ff4a4a',
+        'disk': '#4aff4a',
+        'network': '#ffd700',
+        'gpu': '#00FFFF'
+    }
+
     def __init__(self, parent, system_monitor=None):
         super().__init__(parent)
         self.system_monitor = system_monitor  
@@ -18,14 +33,14 @@ class PerformanceTab(tk.Frame):
         self.init_ui()
         
     def init_data(self):
-        self.values = {
-            'cpu': deque(maxlen=60),
-            'memory': deque(maxlen=60),
-            'disk': deque(maxlen=60),
-            'network': deque(maxlen=60),
-            'gpu' : deque(maxlen=60)
-        }
+        # История берётся из монитора (копится в фоне); без монитора ведём свою
+        monitor_history = getattr(self.system_monitor, 'history', None)
+        self._owns_history = monitor_history is None
+        self.history = TimeSeriesStore() if monitor_history is None else monitor_history
+        self.chart_seconds = 60
         self.current_metric = 'cpu'
+        # Ряды, которые сейчас на графике: выбранная метрика и наложенные (правый клик)
+        self.chart_metrics = ['cpu']
         self._prev_values = {}
         self._last_update = 0
         self._update_interval = 0.5
@@ -63,6 +78,7 @@ class PerformanceTab(tk.Frame):
             btn.bind("<Leave>", lambda e, b=btn: b.config(bg='#2d2d2d'))
             btn.bind("<Button-1>", lambda e, b=btn, c=color: b.config(bg=c))
             btn.bind("<Button-1>", lambda e, b=btn, c=color: b.config(bg=self.dark_color(c)))
+            btn.bind("<Button-3>", lambda e, m=metric: self.toggle_overlay(m))
             btn.grid(row=i, column=0, sticky='ew', padx=4, pady=4, ipadx=60, ipady=6)
         
         # Правая панель с графиком и деталями
@@ -76,6 +92,9 @@ class PerformanceTab(tk.Frame):
         
         self.canvas = tk.Canvas(right_panel, bg='#1e1e1e', highlightthickness=0, height=250)
         self.canvas.pack(fill='x', expand=False, padx=10, pady=10)
+        self.chart = LineChart(self.canvas)
+        for metric, color in self.CHART_COLORS.items():
+            self.chart.add_series(metric, color)
         
         # Информационные метки
         info_frame = tk.Frame(right_panel, bg='#1e1e1e')
@@ -116,16 +135,11 @@ class PerformanceTab(tk.Frame):
         # Контейнер для деталей
         self.details_container = tk.Frame(self.details_frame, bg='#1e1e1e')
         self.details_container.pack(fill="both", expand=True, padx=5)
+        self.details_panel = DetailsPanel(self.details_header, self.details_container)
         
     def switch_metric(self, metric):
         self.current_metric = metric
-        colors = {
-            'cpu': '#3794ff',
-            'memory': '#ff4a4a',
-            'disk': '#4aff4a',
-            'network': '#ffd700', 
-            'gpu': '#00FFFF'
-        }
+        self.chart_metrics = [metric]
         titles = {
             'cpu': 'ЦП',
             'memory': 'Память',
@@ -134,22 +148,24 @@ class PerformanceTab(tk.Frame):
             'gpu': 'GPU'
         }
         self.chart_title.config(text=titles[metric])
-        self._current_color = colors[metric]
         self.update_chart()
         
         # Обновляем информацию в зависимости от выбранной метрики
-        if metric == 'memory':
-            self._update_memory_details(self._last_system_info if hasattr(self, '_last_system_info') else {})
-        elif metric == 'disk':
-            self._update_disk_details(self._last_system_info if hasattr(self, '_last_system_info') else {})
-        elif metric == 'network':
-            self._update_ethernet_details(self._last_system_info if hasattr(self, '_last_system_info') else {})
-        elif metric == 'gpu':
-            self._update_gpu_details(self._last_system_info if hasattr(self, '_last_system_info') else {})
-        else:
+        self._update_current_details(self._last_system_info if hasattr(self, '_last_system_info') else {})
+
+    def _update_current_details(self, system_info):
+        builders = {
+            'memory': self._update_memory_details,
+            'disk': self._update_disk_details,
+            'network': self._update_ethernet_details,
+            'gpu': self._update_gpu_details
+        }
+        builder = builders.get(self.current_metric)
+        if builder is not None:
+            builder(system_info)
+        elif hasattr(self, 'details_frame'):
             # Скрываем детали для CPU
-            if hasattr(self, 'details_frame'):
-                self.details_frame.place_forget()
+            self.details_frame.place_forget()
         
     def update_data(self, system_info):
         current_time = time.time()
@@ -161,8 +177,8 @@ class PerformanceTab(tk.Frame):
             self._last_system_info = system_info
             
             metrics_data = self.calculate_metrics(system_info)
-            for metric, value in metrics_data.items():   
-                self.values[metric].append(value)
+            if self._owns_history:
+                self.history.append_many(current_time, metrics_data)
             
             if self.current_metric in metrics_data:
                 self.update_chart()
@@ -185,30 +201,25 @@ class PerformanceTab(tk.Frame):
         
         return metrics
         
+    def toggle_overlay(self, metric):
+        """Добавляет метрику на график поверх выбранной или убирает её."""
+        if metric == self.current_metric:
+            return
+        if metric in self.chart_metrics:
+            self.chart_metrics.remove(metric)
+        else:
+            self.chart_metrics.append(metric)
+        self.update_chart()
+
     def update_chart(self):
-        if not hasattr(self, '_current_color'):
-            self._current_color = '#3794ff'
-            
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-        self.canvas.delete('all')
-        
-        # Сетка
-        for i in range(0, 101, 20):
-            y = height - (i/100 * (height - 20))
-            self.canvas.create_line(0, y, width, y, fill='#3c3c3c')
-            self.canvas.create_text(5, y, text=f"{i}%", fill='white', anchor='w')
-        
-        # График
-        values = list(self.values[self.current_metric])
-        if len(values) > 1:
-            points = []
-            for i, value in enumerate(values):
-                x = (i / (len(values)-1)) * (width - 20) + 10
-                y = height - (value/100 * (height - 20))
-                points.extend([x, y])
-            
-            self.canvas.create_line(points, fill=self._current_color, width=2, smooth=True)
+        now = time.time()
+        max_points = self.chart.plot_width()
+        for metric in self.CHART_COLORS:
+            if metric in self.chart_metrics:
+                window = self.history.query(metric, now - self.chart_seconds, now, max_points=max_points)
+                self.chart.set_data(metric, window.values())
+            else:
+                self.chart.clear(metric)
     
     def update_labels(self, system_info, metrics_data):
         cpu_percent = metrics_data.get('cpu', 0)
@@ -223,20 +234,14 @@ class PerformanceTab(tk.Frame):
         seconds = int(uptime % 60)
         self.info_labels["Время работы"].config(text=f"{hours}:{minutes:02d}:{seconds:02d}")
         
-        # Если текущая метрика - память, показываем детальную информацию
-        if self.current_metric == 'memory':
-            self._update_memory_details(system_info)
-        else:
-            # Если не память - скрываем детали
-            if hasattr(self, 'details_frame'):
-                self.details_frame.place_forget()
+        # Детали выбранной метрики: метки не пересоздаются, меняется только текст
+        self._update_current_details(system_info)
     
     def _update_memory_details(self, system_info):
         """Обновляет панель с детальной информацией о памяти"""
-        if not hasattr(self, 'system_monitor') or self.system_monitor is None:
-            return  
-    
-        memory_info = self.system_monitor._get_memory_info()
+        memory_info = system_info.get('memory_info')
+        if not memory_info:
+            return
         total_gb = memory_info['total'] / (1024**3)
         used_gb = memory_info['used'] / (1024**3)
         available_gb = memory_info['available'] / (1024**3)
@@ -258,10 +263,7 @@ class PerformanceTab(tk.Frame):
         self._update_details("Использование памяти", labels)
 
     def _update_disk_details(self, system_info):
-        if not hasattr(self, 'system_monitor') or self.system_monitor is None:
-            return  
-
-        disk_info = self.system_monitor.get_disk_info()
+        disk_info = system_info.get('disks')
         if not disk_info: 
             return
 
@@ -269,12 +271,18 @@ class PerformanceTab(tk.Frame):
         total_gb = disk_info['total_space'] / (1024**3)
         available_gb = disk_info['available_space'] / (1024**3)
         used_gb = total_gb - available_gb
+
+        # Счётчики ввода-вывода — того устройства, на котором раздел (sda для sda1), иначе первого
+        disk_io = system_info.get('disk_io') or ()
+        io = next((device for device in disk_io if disk_info['name'].startswith(device['name'])),
+                  disk_io[0] if disk_io else {})
+        active = io.get('active')
         
         labels = [
-            ("Активное время", "0%"),
+            ("Активное время", f"{active:.0f}%" if active is not None else "N/A"),
             ("Средняя скорость отклика", "0 мс"),
-            ("Скорость записи", "0 КБ/с"),
-            ("Скорость чтения", "0 КБ/с"),
+            ("Скорость записи", f"{io.get('write_speed_avg', 0)/1024:.1f} КБ/с"),
+            ("Скорость чтения", f"{io.get('read_speed_avg', 0)/1024:.1f} КБ/с"),
             ("Активное время записи", "0%"),
             ("Активное время чтения", "0%"),
             ("Размер раздела", f"{total_gb:.1f} ГБ"),
@@ -286,19 +294,17 @@ class PerformanceTab(tk.Frame):
         self._update_details(f"Диск ({disk_info['name']})", labels)
 
     def _update_ethernet_details(self, system_info):
-        if not hasattr(self, 'system_monitor') or self.system_monitor is None:
-            return
-
-        network_info = self.system_monitor.get_network_info()
-        if not network_info:  # Если данных нет
+        networks = system_info.get('networks')
+        if not networks:  # Если данных нет
             labels = [("Состояние", "Не подключено")]
         else:
-        # Предполагаем, что network_info - словарь с нужными полями
-        # Если это список, нужно обращаться по индексу или перебирать элементы
+            # Показываем первый интерфейс из снимка
+            network_info = networks[0]
+            link_speed = network_info.get('link_speed', 0)
             labels = [
-                ("Отправлено", f"{network_info.get('send_speed', 0)/1024:.1f} КБ/с"),
-                ("Получено", f"{network_info.get('recv_speed', 0)/1024:.1f} КБ/с"),
-                ("Скорость соединения", "1.0 Гбит/с"),
+                ("Отправлено", f"{network_info.get('send_speed_avg', 0)/1024:.1f} КБ/с"),
+                ("Получено", f"{network_info.get('recv_speed_avg', 0)/1024:.1f} КБ/с"),
+                ("Скорость соединения", f"{link_speed / 1e9:.1f} Гбит/с" if link_speed else "N/A"),
                 ("Состояние", "Подключено"),
                 ("IPv4-адрес", network_info.get('ipv4', 'N/A')),
                 ("Тип адаптера", "Ethernet"),
@@ -311,10 +317,7 @@ class PerformanceTab(tk.Frame):
         self._update_details("Ethernet", labels)
 
     def _update_gpu_details(self, system_info):
-        if not hasattr(self, 'system_monitor') or self.system_monitor is None:
-            return
-
-        gpu_info = self.system_monitor.get_gpu_info()
+        gpu_info = system_info.get('gpu')
         if not gpu_info:
             labels = [("Состояние", "GPU не обнаружен")]
         else:
@@ -332,25 +335,8 @@ class PerformanceTab(tk.Frame):
 
     def _update_details(self, header_text, labels):
         """Обновляет содержимое панели деталей"""
-        # Обновляем заголовок
-        self.details_header.config(text=header_text)
-        
-        # Очищаем старые метки
-        for widget in self.details_container.winfo_children():
-            widget.destroy()
-        
-        # Создаем новые метки
-        for i, (name, value) in enumerate(labels):
-            row = i // 2
-            col = i % 2
-            frame = tk.Frame(self.details_container, bg='#1e1e1e')
-            frame.grid(row=row, column=col, sticky='w', padx=10, pady=5)
-            
-            tk.Label(frame, text=name, bg='#1e1e1e', fg='#aaaaaa', anchor='w', width=25).pack(side='top', fill='x')
-            tk.Label(frame, text=value, bg='#1e1e1e', fg='white', anchor='w', width=25, 
-                    font=("Arial", 10, "bold")).pack(side='top', fill='x')
-        
-        self.details_frame.lift()
+        if self.details_panel.show(header_text, labels):
+            self.details_frame.lift()
 
     def dark_color(self, color):
         r = int(color[1:3], 16)
@@ -363,24 +349,138 @@ class PerformanceTab(tk.Frame):
         
         return f'#{r:02x}{g:02x}{b:02x}'
 
+class HotspotsTab(tk.Frame):
+    """Первые места по ЦП, памяти и диску и журнал всплесков из снимка (без всей таблицы процессов)."""
+    TOPS = (
+        ('cpu', "ЦП", lambda row: f"{row['cpu_usage']:.1f}%"),
+        ('memory', "Память", lambda row: f"{row['memory_mb']:.1f} MB"),
+        ('io', "Диск", lambda row: f"{row['disk_rate'] / 1024:.1f} MB/s"),
+    )
+    SPIKE_UNITS = {'cpu_usage': ("ЦП", "%", 1), 'disk_rate': ("Диск", " MB/s", 1024)}
+
+    def __init__(self, parent):
+        super().__init__(parent, bg="#2d2d2d")
+        self._hotspots = None
+        tops_frame = tk.Frame(self, bg="#2d2d2d")
+        tops_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+        self.top_trees = {}
+        for name, title, _ in self.TOPS:
+            frame = tk.LabelFrame(tops_frame, text=title, bg="#2d2d2d", fg="white")
+            frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+            tree = ttk.Treeview(frame, columns=("ID процесса", "Имя", "Значение"), show="headings", height=20)
+            for column, width in (("ID процесса", 80), ("Имя", 150), ("Значение", 90)):
+                tree.heading(column, text=column)
+                tree.column(column, width=width)
+            tree.pack(fill=tk.BOTH, expand=True)
+            self.top_trees[name] = tree
+
+        spikes_frame = tk.LabelFrame(self, text="Всплески", bg="#2d2d2d", fg="white")
+        spikes_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=(5, 10))
+        columns = ("Время", "ID процесса", "Имя", "Метрика", "Значение", "Среднее", "z")
+        self.spikes_tree = ttk.Treeview(spikes_frame, columns=columns, show="headings", height=8)
+        for column in columns:
+            self.spikes_tree.heading(column, text=column)
+            self.spikes_tree.column(column, width=150 if column == "Имя" else 80)
+        self.spikes_tree.pack(fill=tk.BOTH, expand=True)
+
+    @staticmethod
+    def _fill(tree, rows):
+        tree.delete(*tree.get_children())
+        for values in rows:
+            tree.insert("", tk.END, values=values)
+
+    def update_data(self, hotspots):
+        if hotspots is self._hotspots:
+            return
+        self._hotspots = hotspots
+        for name, _, format_value in self.TOPS:
+            self._fill(self.top_trees[name],
+                       [(row['pid'], row['name'], format_value(row)) for row in hotspots.get(name, ())])
+        spikes = []
+        for spike in hotspots.get('spikes', ()):
+            title, unit, scale = self.SPIKE_UNITS.get(spike['column'], (spike['column'], "", 1))
+            spikes.append((time.strftime("%H:%M:%S", time.localtime(spike['time'])), spike['pid'], spike['name'],
+                           title, f"{spike['value'] / scale:.1f}{unit}", f"{spike['mean'] / scale:.1f}{unit}",
+                           f"{spike['z']:.1f}"))
+        self._fill(self.spikes_tree, spikes)
+
+class HostsTab(tk.Frame):
+    """Обзор удалённых агентов: сводные метрики каждого хоста и трафик от него."""
+    COLUMNS = ("Хост", "Адрес", "Состояние", "ЦП", "Память", "Диск", "Сеть", "Процессы", "Трафик")
+    REFRESH_MS = 1000
+
+    def __init__(self, parent, aggregator):
+        super().__init__(parent, bg="#2d2d2d")
+        self.aggregator = aggregator
+        self.totals_label = tk.Label(self, bg="#2d2d2d", fg="white", anchor="w")
+        self.totals_label.pack(fill=tk.X, padx=15, pady=(10, 0))
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings")
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=160 if column in ("Хост", "Адрес", "Состояние") else 80)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self._refresh()
+
+    @staticmethod
+    def _format_row(host):
+        if host['connected']:
+            state = "подключён"
+        else:
+            state = f"нет связи: {host['error']}" if host['error'] else "подключение..."
+        return (host['name'], host['address'], state, f"{host['cpu']:.1f}%", f"{host['memory']:.1f}%",
+                f"{host['disk']:.1f}%", f"{host['network']:.1f}%", host['processes'],
+                f"{host['bandwidth'] / 1024:.1f} KB/s")
+
+    def _refresh(self):
+        hosts = self.aggregator.overview()
+        self.tree.delete(*self.tree.get_children())
+        for host in hosts:
+            self.tree.insert("", tk.END, values=self._format_row(host))
+        totals = self.aggregator.totals()
+        self.totals_label.config(text=(
+            f"Хостов: {totals['connected']}/{totals['hosts']}   ЦП: {totals['cpu']:.1f}%   "
+            f"Память: {totals['memory']:.1f}%   Процессов: {totals['processes']}   "
+            f"Трафик: {totals['bandwidth'] / 1024:.1f} KB/s"))
+        self.after(self.REFRESH_MS, self._refresh)
+
 class TaskManager:
-    def __init__(self, root):
+    # Источники, данные которых видны только на своей вкладке
+    TAB_SOURCES = {
+        'processes': {'processes'},
+        'performance': {'disks', 'disk_io', 'networks', 'gpu'},
+        'services': {'services'},
+        'hotspots': {'processes'},
+    }
+    # Столбцы таблицы процессов, по которым можно сортировать
+    SORT_COLUMNS = {
+        "ID процесса": 'pid',
+        "Имя": 'name',
+        "ЦП": 'cpu_usage',
+        "Память": 'memory_mb',
+        "Диск": 'disk_rate',
+    }
+
+    def __init__(self, root, system_monitor=None, aggregator=None):
         self.root = root
         self.root.title("Диспетчер задач")
         self.root.geometry("1000x700")
         self.root.configure(bg="#2d2d2d")
         self.is_dark_theme = True
 
-        self.system_monitor = SystemMonitor()
-        self._cpu_info = None
-        self._memory_info = None
-        self._process_info = None
+        self.system_monitor = system_monitor if system_monitor is not None else SystemMonitor()
+        # Агрегатор удалённых агентов (remote.RemoteAggregator): с ним появляется вкладка «Хосты»
+        self.aggregator = aggregator
+        self._snapshot = None
+        self._rendered_snapshot = None
         self._data_lock = threading.Lock()
-        self._process_selected = False
         
         self._setup_styles()
         self._create_interface()
         
+        self.root.bind('<Map>', self._on_map)
+        self.root.bind('<Unmap>', self._on_unmap)
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+        
         self.system_monitor.register_callback(self._update_data_buffer)
         self.system_monitor.start_monitoring(update_interval=2.0)
         self._schedule_gui_update()
@@ -412,17 +512,65 @@ class TaskManager:
         self.notebook.add(self.services_frame, text="Службы")
         self._setup_services_tab()
 
-    def _setup_processes_tab(self):
-        columns = ("ID процесса", "Имя", "ЦП", "Память", "Диск", "Сеть", "GPU", "Энерг-ие")
-        self.process_tree = ttk.Treeview(self.processes_frame, columns=columns, show="headings")
+    # Вкладка «Горячие точки»: первые места и всплески считает монитор
+        self.hotspots_tab = HotspotsTab(self.notebook)
+        self.notebook.add(self.hotspots_tab, text="Горячие точки")
 
+    # Вкладка «Хосты»: обзор удалённых агентов
+        if self.aggregator is not None:
+            self.hosts_tab = HostsTab(self.notebook, self.aggregator)
+            self.notebook.add(self.hosts_tab, text="Хосты")
+
+    def _setup_processes_tab(self):
+        columns = ("ID процесса", "Имя", "ЦП", "Память", "Диск", "Сеть", "GPU", "Энерг-ие", "Путь")
+
+        # Фильтр: подстрока имени, re:выражение, пороги вида cpu>5 mem>=100
+        filter_frame = tk.Frame(self.processes_frame, bg="#2d2d2d")
+        filter_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+        tk.Label(filter_frame, text="Фильтр:", bg="#2d2d2d", fg="white").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        self.filter_entry = tk.Entry(filter_frame, textvariable=self.filter_var, bg="#3c3c3c", fg="white",
+                                     insertbackground="white")
+        self.filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.filter_var.trace_add('write', lambda *args: self._apply_filter())
+
+        # Режим дерева: процессы под родителями, у родителей — суммы ЦП и памяти поддерева
+        self.tree_mode = tk.BooleanVar(value=False)
+        tk.Checkbutton(filter_frame, text="Дерево", variable=self.tree_mode, command=self._toggle_tree_mode,
+                       bg="#2d2d2d", fg="white", selectcolor="#3c3c3c",
+                       activebackground="#2d2d2d", activeforeground="white").pack(side=tk.RIGHT)
+
+        # Столбец пути: пути запрашиваются только для строк, которые видны в списке
+        self.show_paths = tk.BooleanVar(value=False)
+        tk.Checkbutton(filter_frame, text="Путь", variable=self.show_paths, command=self._toggle_path_column,
+                       bg="#2d2d2d", fg="white", selectcolor="#3c3c3c",
+                       activebackground="#2d2d2d", activeforeground="white").pack(side=tk.RIGHT)
+        self._paths_resolved = False
+        # Процесс, путь которого запрошен кнопкой и ещё разрешается в фоне: (pid, время запуска, имя)
+        self._path_request = None
+        self.system_monitor.paths.on_resolved = self._on_paths_resolved
+
+        # Сортировка и фильтр считаются по столбцам снимка, без обхода строк в Python
+        self.process_index = ProcessIndex()
+        # Связи родитель → дети обновляются только по изменившимся процессам
+        self.process_topology = ProcessTree()
+        self._processes = ProcessTable.empty()
+        # Номер публикации монитора, до которой доведён активный вид процессов
+        self._process_sequence = None
+        # В Treeview только видимые строки: десятки тысяч процессов не замедляют прокрутку
+        self.process_list = VirtualProcessList(self.processes_frame, columns, bg="#2d2d2d")
+        self.process_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.process_list.model.formatter = self._format_process_row
+        self.process_tree = self.process_list.tree
+        self.process_tree.column("Путь", width=300, anchor="w")
+        self.process_tree.configure(displaycolumns=columns[:-1])
         for col in columns:
-            self.process_tree.heading(col, text=col)
-            self.process_tree.column(col, width=80, anchor="center")
-        self.process_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            if col in self.SORT_COLUMNS:
+                self.process_tree.heading(col, command=lambda c=col: self._sort_by(c))
+        self._update_sort_headings()
         
-        self.process_tree.bind('<<TreeviewSelect>>', self._on_process_select)
         self.process_tree.bind('<Button-3>', self._on_right_click)
+        self.process_tree.bind('<Double-1>', self._on_double_click)
 
         btn_frame = tk.Frame(self.processes_frame, bg="#2d2d2d")
         btn_frame.pack(fill=tk.X, pady=10)
@@ -437,6 +585,39 @@ class TaskManager:
         )
         self.end_task_btn.pack(side=tk.LEFT, padx=10, ipadx=20, ipady=5)
 
+        self.end_tree_btn = tk.Button(
+            btn_frame,
+            text="Завершить дерево",
+            bg="#5c2d5c",
+            fg="white",
+            font=("Arial", 12, "bold"),
+            command=self._end_tree
+        )
+        self.end_tree_btn.pack(side=tk.LEFT, padx=10, ipady=5)
+
+        self.end_matching_btn = tk.Button(
+            btn_frame,
+            text="Завершить по фильтру",
+            bg="#5c2d5c",
+            fg="white",
+            font=("Arial", 12, "bold"),
+            command=self._end_matching
+        )
+        self.end_matching_btn.pack(side=tk.LEFT, padx=10, ipady=5)
+
+        # Мягкое завершение: SIGTERM, через 3 с — принудительное
+        self.graceful_kill = tk.BooleanVar(value=False)
+        tk.Checkbutton(btn_frame, text="Мягко", variable=self.graceful_kill,
+                       bg="#2d2d2d", fg="white", selectcolor="#3c3c3c",
+                       activebackground="#2d2d2d", activeforeground="white").pack(side=tk.LEFT, padx=5)
+
+        # Прогресс пакетного завершения: опрашивается таймером, GUI не ждёт
+        self.kill_progress = ttk.Progressbar(btn_frame, length=150, mode='determinate')
+        self.kill_progress.pack(side=tk.LEFT, padx=10)
+        self.kill_status = tk.Label(btn_frame, text="", bg="#2d2d2d", fg="white")
+        self.kill_status.pack(side=tk.LEFT)
+        self._kill_batch = None
+
         self.get_path_btn = tk.Button(
             btn_frame,
             text="Получить путь",
@@ -461,74 +642,172 @@ class TaskManager:
 
         self.services_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-    def _update_data_buffer(self, cpu_info, memory_info, process_info):
+    def _update_data_buffer(self, snapshot):
+        # Вызывается из потока мониторинга: только сохраняем снимок
         with self._data_lock:
-            self._cpu_info = cpu_info
-            self._memory_info = memory_info
-            self._process_info = process_info
+            self._snapshot = snapshot
 
     def _schedule_gui_update(self):
+        # Частота опроса определяется монитором: здесь лишь дешёвая проверка,
+        # пришёл ли новый снимок, поэтому снимки не дублируются и не теряются
         self._update_gui()
-        self.root.after(1500, self._schedule_gui_update)
+        self.root.after(100, self._schedule_gui_update)
+
+    def _on_map(self, event):
+        if event.widget is self.root:
+            self.system_monitor.set_minimized(False)
+
+    def _on_unmap(self, event):
+        if event.widget is self.root:
+            self.system_monitor.set_minimized(True)
+
+    def _on_tab_changed(self, event):
+        tabs = {
+            str(self.processes_frame): 'processes',
+            str(self.performance_tab): 'performance',
+            str(self.services_frame): 'services',
+            str(self.hotspots_tab): 'hotspots',
+        }
+        current = tabs.get(self.notebook.select())
+        hidden = set()
+        for tab, sources in self.TAB_SOURCES.items():
+            if tab != current:
+                hidden |= sources
+        # Источник может быть нужен нескольким вкладкам (процессы — и для «Горячих точек»)
+        hidden -= self.TAB_SOURCES.get(current, set())
+        self.system_monitor.set_hidden_sources(hidden)
 
     def _update_gui(self):
+        # GUI только отрисовывает готовый снимок и не обращается к DLL
+        if self._paths_resolved:
+            self._paths_resolved = False
+            self._show_processes()
+            self._show_requested_path()
         with self._data_lock:
-            if all(x is not None for x in (self._cpu_info, self._memory_info, self._process_info)):
-                self._update_processes(self._process_info)
-                self._update_performance()
-                self._update_services()
-
-    def _update_performance(self):
-        # Collect all data using system_monitor DLL
-        cpu_info = self.system_monitor._get_cpu_info()
-        memory_info = self.system_monitor._get_memory_info()
-        disk_info = self.system_monitor.get_disk_info()
-        gpu_info = self.system_monitor.get_gpu_info()
+            snapshot = self._snapshot
+        if snapshot is None or snapshot is self._rendered_snapshot:
+            return
+        previous = self._rendered_snapshot
+        self._rendered_snapshot = snapshot
+        # Пустая разница оставляет ту же таблицу: ни один процесс не вышел за пороги монитора
+        if previous is None or snapshot.processes is not previous.processes:
+            self._update_processes(snapshot)
+        self._update_performance(snapshot)
+        self.hotspots_tab.update_data(snapshot.hotspots)
+        if previous is None or snapshot.services != previous.services:
+            self._update_services(snapshot.services)
+
+    def _update_performance(self, snapshot):
+        cpu_info = snapshot.cpu
+        memory_info = snapshot.memory
+        disk_info = snapshot.disks
+        # Диск и сеть — те же проценты, что пишутся в историю графиков
+        metrics = snapshot.metrics()
         
         # Format the data for the performance tab
         system_info = {
-            'cpu_percent': cpu_info['usage'],
+            'cpu_percent': cpu_info.get('usage', 0.0),
             'memory': {
-                'total': memory_info['total'] / (1024 * 1024 * 1024),  
-                'available': memory_info['available'] / (1024 * 1024 * 1024)  
+                'total': memory_info.get('total', 0) / (1024 * 1024 * 1024),  
+                'available': memory_info.get('available', 0) / (1024 * 1024 * 1024)  
             },
-            'disk_usage': disk_info[0]['percent'] if disk_info and 'percent' in disk_info[0] else 
-                          (1 - disk_info[0]['available_space'] / disk_info[0]['total_space']) * 100 if disk_info else 0,
-            'network_usage': 0, 
-            'process_count': cpu_info['process_count'],
+            'disk_usage': metrics['disk'],
+            'network_usage': metrics['network'], 
+            'process_count': cpu_info.get('process_count', 0),
             'thread_count': 0,  
             
-            'uptime': cpu_info['work_time']
+            'uptime': cpu_info.get('work_time', 0),
+            'memory_info': memory_info,
+            'disks': disk_info,
+            'disk_io': snapshot.disk_io,
+            'networks': snapshot.networks,
+            'gpu': snapshot.gpu
         }
         
 
         self.performance_tab.update_data(system_info)
 
-    def _update_processes(self, processes):
-        if self._process_selected:
+    def _update_processes(self, snapshot):
+        # Выделение хранится по PID, прокрутка — смещением в списке
+        self._processes = snapshot.processes
+        view = self.process_topology if self.tree_mode.get() else self.process_index
+        delta = snapshot.process_delta
+        # Разница, продолжающая показанную публикацию, применяется без пересчёта всего снимка;
+        # пропущенный снимок (GUI рисует только последний) — полный пересчёт
+        if delta is not None and (delta.keyframe or delta.base == self._process_sequence):
+            view.apply_delta(delta)
+        else:
+            view.update(snapshot.processes)
+        self._process_sequence = delta.sequence if delta is not None else None
+        self._show_processes()
+
+    def _show_processes(self):
+        if self.tree_mode.get():
+            self.process_list.update_rows(self.process_topology)
+        else:
+            self.process_list.update_rows(self.process_index)
+
+    def _toggle_tree_mode(self):
+        # Неактивный вид не обновляется на тиках — догоняем его последним снимком
+        if self.tree_mode.get():
+            self.process_topology.update(self._processes)
+        else:
+            self.process_index.update(self._processes)
+        self._show_processes()
+
+    def _format_process_row(self, proc):
+        # Форматируются только видимые строки, поэтому и пути запрашиваются только для них
+        values = format_tree_row(proc) if self.tree_mode.get() else format_process_row(proc)
+        path = ""
+        if self.show_paths.get():
+            entry = self.system_monitor.paths.get(proc['pid'], proc['start_time'])
+            path = "…" if entry is None else ("" if entry['path'] == "NULL" else entry['path'])
+        return values + (path,)
+
+    def _toggle_path_column(self):
+        columns = self.process_tree['columns']
+        self.process_tree.configure(displaycolumns=columns if self.show_paths.get() else columns[:-1])
+        self._show_processes()
+
+    def _on_paths_resolved(self, keys):
+        # Вызывается из потока PathResolver: Tk трогаем только из _update_gui
+        self._paths_resolved = True
+
+    def _on_double_click(self, event):
+        selected = self.process_list.selected()
+        if self.tree_mode.get() and selected is not None:
+            self.process_topology.toggle(selected['pid'])
+            self._show_processes()
+
+    def _sort_by(self, column):
+        key = self.SORT_COLUMNS[column]
+        if key == self.process_index.sort_key:
+            self.process_index.set_sort(key, not self.process_index.descending)
+        else:
+            # Имя и PID удобнее по возрастанию, нагрузку — по убыванию
+            self.process_index.set_sort(key, key not in ('pid', 'name'))
+        self._update_sort_headings()
+        self._show_processes()
+
+    def _update_sort_headings(self):
+        for column, key in self.SORT_COLUMNS.items():
+            arrow = ""
+            if key == self.process_index.sort_key:
+                arrow = " ▼" if self.process_index.descending else " ▲"
+            self.process_tree.heading(column, text=column + arrow)
+
+    def _apply_filter(self):
+        try:
+            process_filter = ProcessFilter.parse(self.filter_var.get())
+        except ValueError:
+            self.filter_entry.config(bg="#8b2d2d")
             return
-            
-        selected_items = self.process_tree.selection()
-        selected_values = [self.process_tree.item(item)['values'][0] for item in selected_items]
-        self.process_tree.delete(*self.process_tree.get_children())
-        for proc in processes:
-            values = (
-                proc['pid'],
-                proc['name'],
-                f"{proc['cpu_usage']:.1f}%",
-                f"{proc['memory_mb']:.1f} MB",
-                f"{proc['read_kb'] / 1024:.1f} MB",
-                "N/A",
-                "N/A",
-                "Normal"
-            )
-            item = self.process_tree.insert("", tk.END, values=values)
-            if values[0] in selected_values:
-                self.process_tree.selection_add(item)
+        self.filter_entry.config(bg="#3c3c3c")
+        self.process_index.set_filter(process_filter)
+        self._show_processes()
 
-    def _update_services(self):
+    def _update_services(self, services):
         self.services_tree.delete(*self.services_tree.get_children())
-        services = self.system_monitor.get_services_info()
         for service in services:
             self.services_tree.insert("", tk.END, values=(
                 service['name'],
@@ -536,51 +815,101 @@ class TaskManager:
                 service['status']
             ))
 
-    def _on_process_select(self, event):
-        if self.process_tree.selection():
-            self._process_selected = True
-        else:
-            self._process_selected = False
-
     def _on_right_click(self, event):
-        self.process_tree.selection_remove(self.process_tree.selection())
-        self._process_selected = False
+        self.process_list.clear_selection()
 
     def _end_task(self):
-        selected = self.process_tree.selection()
-        if not selected:
+        selected = self.process_list.selected()
+        if selected is None:
+            messagebox.showwarning("Предупреждение", "Выберите процесс для завершения")
+            return
+        pid = selected['pid']
+        process_name = selected['name']
+        if messagebox.askyesno("Подтверждение", f"Вы уверены, что хотите завершить процесс {process_name} (PID: {pid})?"):
+            self._start_kill([pid], f"{process_name} (PID: {pid})")
+
+    def _end_tree(self):
+        selected = self.process_list.selected()
+        if selected is None:
             messagebox.showwarning("Предупреждение", "Выберите процесс для завершения")
             return
-        item_values = self.process_tree.item(selected[0])['values']
-        pid_str = item_values[0]
+        if not self.tree_mode.get():
+            self.process_topology.update(self._processes)
+        pids = self.process_topology.subtree_pids(selected['pid'])
+        if not pids:
+            return
+        if messagebox.askyesno("Подтверждение",
+                               f"Завершить {selected['name']} (PID: {selected['pid']}) и всех потомков "
+                               f"({len(pids) - 1})?"):
+            self._start_kill(pids, f"дерево {selected['name']}")
+
+    def _end_matching(self):
         try:
-            pid = int(pid_str)
-        except ValueError:
-            messagebox.showerror("Ошибка", f"Неверный формат PID: {pid_str}")
+            process_filter = ProcessFilter.parse(self.filter_var.get())
+        except ValueError as e:
+            messagebox.showerror("Ошибка", str(e))
             return
-        process_name = item_values[1]
-        if messagebox.askyesno("Подтверждение", f"Вы уверены, что хотите завершить процесс {process_name} (PID: {pid})?"):
-            if self.system_monitor.kill_process(pid):
-                messagebox.showinfo("Успех", f"Процесс {process_name} (PID: {pid}) успешно завершён.")
-                self._process_selected = False
+        if not process_filter:
+            messagebox.showwarning("Предупреждение", "Задайте фильтр процессов для завершения")
+            return
+        if self.tree_mode.get():
+            self.process_index.update(self._processes)
+        pids = self.process_index.pids()
+        if pids and messagebox.askyesno("Подтверждение",
+                                        f"Завершить процессы по фильтру «{self.filter_var.get()}» ({len(pids)})?"):
+            self._start_kill(pids, f"фильтр «{self.filter_var.get()}»")
+
+    def _start_kill(self, pids, description):
+        # Завершение идёт в пуле потоков монитора, прогресс опрашивается таймером
+        if self._kill_batch is not None and not self._kill_batch.finished():
+            messagebox.showwarning("Предупреждение", "Предыдущее завершение ещё не закончено")
+            return
+        self._kill_batch = self.system_monitor.process_control.kill(
+            pids, graceful=self.graceful_kill.get(), timeout=3.0)
+        self._kill_description = description
+        self.kill_progress.config(maximum=max(1, len(pids)), value=0)
+        self._poll_kill()
+
+    def _poll_kill(self):
+        batch = self._kill_batch
+        self.kill_progress.config(value=batch.done)
+        self.kill_status.config(text=f"{batch.done}/{batch.total}")
+        if not batch.finished():
+            self.root.after(100, self._poll_kill)
+            return
+        failed = batch.failed()
+        if batch.total == 1:
+            if failed:
+                messagebox.showerror("Ошибка", f"Не удалось завершить процесс {self._kill_description}: "
+                                               f"{failed[0].error}.")
             else:
-                messagebox.showerror("Ошибка", f"Не удалось завершить процесс {process_name} (PID: {pid}).")
-    
+                messagebox.showinfo("Успех", f"Процесс {self._kill_description} успешно завершён.")
+            self.kill_status.config(text="")
+        else:
+            self.kill_status.config(text=f"{self._kill_description}: завершено {batch.total - len(failed)}, "
+                                         f"ошибок {len(failed)}")
+
     def _get_path(self):
-        selected = self.process_tree.selection()
-        if not selected:
+        selected = self.process_list.selected()
+        if selected is None:
             messagebox.showwarning("Предупреждение", "Выберите процесс для получения пути")
             return
-        item_values = self.process_tree.item(selected[0])['values']
-        pid_str = item_values[0]
-        process_name = item_values[1]
-        try:
-            pid = int(pid_str)
-        except ValueError:
-            messagebox.showerror("Ошибка", f"Неверный формат PID: {pid_str}")
-            return
-        path = self.system_monitor.get_proc_path(pid)
-        messagebox.showinfo("Успех", f"Путь {process_name}: {path}")
+        # Промах кэша не блокирует Tk: путь разрешается в фоне, окно покажет _update_gui
+        self._path_request = (selected['pid'], selected['start_time'], selected['name'])
+        if not self._show_requested_path():
+            self.kill_status.config(text=f"Путь {selected['name']}: …")
+
+    def _show_requested_path(self) -> bool:
+        if self._path_request is None:
+            return False
+        pid, start_time, process_name = self._path_request
+        entry = self.system_monitor.paths.get(pid, start_time)
+        if entry is None:
+            return False
+        self._path_request = None
+        self.kill_status.config(text="")
+        messagebox.showinfo("Успех", f"Путь {process_name}: {entry['path']}")
+        return True
 
     def __del__(self):
         if hasattr(self, 'system_monitor'):
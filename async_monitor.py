@@ -0,0 +1,253 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from backend import MetricsBackend
+from snapshot import ProcessTable, SystemSnapshot
+from system_monitor import SystemMonitor
+
+
+class AsyncSystemMonitor:
+    """SystemMonitor для кода на asyncio.
+
+    Сбор идёт задачей цикла вместо потока монитора: блокирующие вызовы
+    уходят в свой пул не больше чем из `max_concurrency` потоков. Лишние
+    вызовы ждут очереди в цикле (asyncio.Semaphore), поэтому отменённый
+    вызов не остаётся в очереди пула. Бэкенд хранит состояние между
+    опросами (прошлые счётчики ЦП и процессов, общий буфер DLL), поэтому
+    его вызовы, как и в синхронном мониторе, идут по одному. Разовые
+    запросы отвечают из последнего снимка и не трогают бэкенд. Снимки
+    раздаются той же шиной `monitor.bus`: синхронные подписчики и GUI
+    работают как прежде.
+
+    `close()` (или выход из `async with`) останавливает сбор, завершает
+    потоки `stream()`, дожидается начатых вызовов бэкенда и закрывает пул,
+    так что после него не остаётся потоков монитора.
+    """
+
+    def __init__(self, monitor: Optional[SystemMonitor] = None, backend: MetricsBackend = None,
+                 max_concurrency: int = 4):
+        # Переданный монитор может работать и дальше; созданный здесь закрывается вместе с обёрткой
+        self._owns_monitor = monitor is None
+        self.monitor = monitor if monitor is not None else SystemMonitor(backend=backend)
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Вызовы бэкенда не пересекаются: ни в потоках пула, ни в фоновом потоке путей
+        self._backend_lock = threading.Lock()
+        self.monitor.paths.backend_lock = self._backend_lock
+        # Один такт сбора за раз: задача сбора и разовый запрос до первого снимка
+        self._collect_lock = asyncio.Lock()
+        # Вызовы, уже отданные пулу: close ждёт их, даже если ожидавший их код отменён
+        self._calls: Set[Future] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._streams: Set[asyncio.Event] = set()
+        self._closed = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _offload(self, function, *args):
+        """Вызывает блокирующую функцию в пуле монитора, не больше max_concurrency одновременно."""
+        if self._closed:
+            raise RuntimeError("monitor is closed")
+        async with self._semaphore:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="async-monitor")
+            call = self._executor.submit(function, *args)
+            self._calls.add(call)
+            call.add_done_callback(self._calls.discard)
+            return await asyncio.wrap_future(call)
+
+    def _exclusive(self, function, *args):
+        with self._backend_lock:
+            return function(*args)
+
+    async def _backend_call(self, function, *args):
+        """Как _offload, но вызов не пересекается с другими вызовами бэкенда."""
+        return await self._offload(self._exclusive, function, *args)
+
+    # ---------- Сбор ----------
+
+    async def start(self, update_interval: float = 2.0, intervals: Dict[str, float] = None):
+        """Запускает сбор в текущем цикле; параметры — как у SystemMonitor.start_monitoring."""
+        if self._task is not None:
+            return
+        monitor = self.monitor
+        monitor._set_intervals(update_interval, intervals)
+        await self._backend_call(monitor.backend.start)
+        monitor.paths.start()
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="async-monitor")
+
+    async def _run(self):
+        scheduler = self.monitor._scheduler
+        while True:
+            try:
+                await self.collect()
+            except Exception as e:
+                print(f"Error updating system data: {e}")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), scheduler.time_until_next())
+            except asyncio.TimeoutError:
+                pass
+
+    async def collect(self) -> Optional[SystemSnapshot]:
+        """Один такт: собирает источники, срок которых наступил, и публикует снимок (None — собирать нечего)."""
+        async with self._collect_lock:
+            monitor = self.monitor
+            scheduler = monitor._scheduler
+            now = time.monotonic()
+            due = scheduler.due(now)
+            if not due:
+                return None
+            try:
+                await self._backend_call(monitor.backend.prepare, [source.name for source in due])
+            except Exception as e:
+                # Источники соберутся по отдельности и сами сообщат об ошибке
+                print(f"Error preparing sources: {e}")
+            values = await asyncio.gather(*(self._backend_call(scheduler.run_source, source, now)
+                                            for source in due))
+            results = {source.name: value for source, value in zip(due, values)}
+            # Снимок собирается в пуле: разницы процессов и скорости считаются по всей таблице
+            return await self._offload(monitor._publish, results)
+
+    def set_minimized(self, minimized: bool):
+        self.monitor.set_minimized(minimized)
+        if self._wake is not None:
+            self._wake.set()
+
+    def set_hidden_sources(self, names):
+        self.monitor.set_hidden_sources(names)
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stream(self, maxsize: int = 1, update_interval: float = 2.0,
+                     intervals: Dict[str, float] = None) -> AsyncIterator[SystemSnapshot]:
+        """Снимки по мере сбора: `async for snapshot in monitor.stream()`.
+
+        Запускает сбор, если он ещё не идёт. Потребитель, не успевающий
+        читать, пропускает старые снимки: ждут не больше `maxsize`.
+        Поток заканчивается при close(). Подписка снимается, когда генератор
+        закрыт: сразу — через contextlib.aclosing или отмену потребителя,
+        иначе — когда цикл соберёт брошенный генератор.
+        """
+        if self._closed:
+            raise RuntimeError("monitor is closed")
+        await self.start(update_interval, intervals)
+        pending = deque(maxlen=max(1, maxsize))
+        ready = asyncio.Event()
+
+        def push(snapshot):
+            pending.append(snapshot)
+            ready.set()
+
+        subscription = self.monitor.bus.subscribe(push, 'asyncio', maxsize, asyncio.get_running_loop(),
+                                                  name="stream")
+        self._streams.add(ready)
+        try:
+            while True:
+                if pending:
+                    yield pending.popleft()
+                elif self._task is None:
+                    return
+                else:
+                    ready.clear()
+                    await ready.wait()
+        finally:
+            self._streams.discard(ready)
+            self.monitor.bus.unsubscribe(subscription)
+
+    async def stop(self):
+        """Останавливает сбор и завершает потоки stream(); пул остаётся для разовых запросов."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        for ready in self._streams:
+            ready.set()
+        monitor = self.monitor
+        await self._offload(monitor.paths.stop)
+        await self._drain()
+        await self._backend_call(monitor.backend.stop)
+
+    async def _drain(self):
+        # Отменённое ожидание не останавливает вызов, уже начатый в пуле
+        if self._calls:
+            await asyncio.wait([asyncio.wrap_future(call) for call in list(self._calls)])
+
+    async def close(self):
+        """Останавливает сбор, дожидается начатых вызовов бэкенда и закрывает пул."""
+        if self._closed:
+            return
+        try:
+            await self.stop()
+            if self._owns_monitor:
+                await self._offload(self.monitor.process_control.shutdown, True)
+        finally:
+            self._closed = True
+            await self._drain()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    # ---------- Разовые запросы ----------
+
+    def get_snapshot(self) -> Optional[SystemSnapshot]:
+        """Последний собранный снимок без ожидания."""
+        return self.monitor.get_snapshot()
+
+    async def _latest(self) -> SystemSnapshot:
+        """Последний снимок; пока его нет — собирает первый."""
+        if self._closed:
+            raise RuntimeError("monitor is closed")
+        snapshot = self.monitor.get_snapshot()
+        if snapshot is None:
+            await self.collect()
+            snapshot = self.monitor.get_snapshot()
+            if snapshot is None:
+                raise RuntimeError("no snapshot collected")
+        return snapshot
+
+    async def get_processes(self) -> ProcessTable:
+        """Опубликованная таблица процессов со скоростями."""
+        return (await self._latest()).processes
+
+    async def get_cpu_percent(self) -> float:
+        return (await self._latest()).cpu.get('usage', 0.0)
+
+    async def get_memory_percent(self) -> float:
+        memory = (await self._latest()).memory
+        return memory['used'] / memory['total'] * 100 if memory.get('total') else 0.0
+
+    async def get_disk_info(self) -> List[Dict]:
+        return list((await self._latest()).disks)
+
+    async def get_network_info(self) -> List[Dict]:
+        return list((await self._latest()).networks)
+
+    async def get_services_info(self) -> List[Dict]:
+        return list((await self._latest()).services)
+
+    async def get_gpu_info(self) -> Optional[Dict]:
+        return (await self._latest()).gpu
+
+    async def kill_process(self, pid: int) -> bool:
+        return await self._backend_call(self.monitor.kill_process, pid)
+
+    async def get_proc_path(self, pid: int) -> str:
+        # Запрос к бэкенду берёт блокировку сам, внутри PathResolver
+        return await self._offload(self.monitor.get_proc_path, pid)
@@ -0,0 +1,95 @@
+import os
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from snapshot import ProcessTable
+
+
+class MetricsBackend:
+    """Источник системных метрик для SystemMonitor.
+
+    Все методы синхронные и вызываются из фонового потока монитора.
+    Единицы совпадают с тем, что ожидает GUI: память и диски в байтах,
+    счётчики сети — накопленные байты с момента загрузки.
+    """
+    name = "base"
+
+    def start(self):
+        """Запускает фоновые сборщики бэкенда, если они есть."""
+
+    def stop(self):
+        """Останавливает фоновые сборщики бэкенда."""
+
+    def prepare(self, sources: Iterable[str]):
+        """Вызывается в начале такта с именами источников, которые сейчас будут собраны.
+
+        Бэкенд может собрать их данные одним обращением (см. DllBackend).
+        """
+
+    def get_cpu_info(self) -> Dict:
+        """brand, usage, frequency, core_count, work_time, process_count."""
+        raise NotImplementedError
+
+    def get_memory_info(self) -> Dict:
+        """total, used, available, speed, format."""
+        raise NotImplementedError
+
+    def get_processes(self) -> ProcessTable:
+        raise NotImplementedError
+
+    def get_disks(self) -> List[Dict]:
+        """name, total_space, available_space."""
+        raise NotImplementedError
+
+    def get_networks(self) -> List[Dict]:
+        """name, ipv4, send, recive — накопленные счётчики интерфейса; link_speed (бит/с), если известна."""
+        raise NotImplementedError
+
+    def get_disk_io(self) -> List[Dict]:
+        """name, read_bytes, written_bytes, busy_ms — накопленные счётчики дисков; пусто, если их нет."""
+        return []
+
+    def get_services(self) -> List[Dict]:
+        """process_id, name, status."""
+        raise NotImplementedError
+
+    def kill_process(self, pid: int) -> bool:
+        """Принудительное завершение (SIGKILL, TerminateProcess)."""
+        raise NotImplementedError
+
+    def terminate_process(self, pid: int) -> bool:
+        """Мягкое завершение (SIGTERM); если бэкенд его не умеет — принудительное."""
+        return self.kill_process(pid)
+
+    def is_running(self, pid: int) -> bool:
+        """Жив ли процесс; NotImplementedError, если бэкенд не может это проверить."""
+        raise NotImplementedError
+
+    def get_proc_path(self, pid: int) -> str:
+        """Путь к исполняемому файлу или "NULL", если его не узнать."""
+        raise NotImplementedError
+
+    def get_proc_cmdline(self, pid: int) -> str:
+        """Командная строка процесса; пустая, если бэкенд её не знает."""
+        return ""
+
+
+def create_backend(name: Optional[str] = None, dll_path: Optional[str] = None) -> MetricsBackend:
+    """Выбирает бэкенд: явно по имени, через TASKMNGR_BACKEND или по платформе.
+
+    На Linux используется чтение /proc, на остальных системах — DLL.
+    TASKMNGR_PROC_WORKERS и TASKMNGR_PROC_POOL (thread или process) задают
+    параллельное чтение /proc (см. ProcBackend).
+    """
+    name = name or os.environ.get("TASKMNGR_BACKEND")
+    if name is None:
+        name = "proc" if sys.platform.startswith("linux") and os.path.isdir("/proc") else "dll"
+
+    if name == "proc":
+        from proc_backend import ProcBackend
+        return ProcBackend(workers=int(os.environ.get("TASKMNGR_PROC_WORKERS", "1")),
+                           pool=os.environ.get("TASKMNGR_PROC_POOL", "thread"))
+    if name == "dll":
+        from dll_backend import DEFAULT_DLL_PATH, DllBackend
+        return DllBackend(dll_path or DEFAULT_DLL_PATH)
+    raise ValueError(f"Unknown metrics backend: {name}")
@@ -0,0 +1,206 @@
+import asyncio
+import inspect
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# Способы доставки: в потоке публикации, в своём потоке подписчика, в цикле asyncio
+DELIVERY_MODES = ('inline', 'thread', 'asyncio')
+
+
+class Subscription:
+    """Подписчик шины: очередь, способ доставки и счётчики.
+
+    Очередь ограничена `maxsize`: при переполнении выбрасывается самый старый
+    элемент (побеждает последний), поэтому медленный подписчик видит свежие
+    снимки, а не копит отставание. `dropped` — сколько элементов выброшено,
+    `lag` — задержка последней доставки от публикации в секундах,
+    `pending` — сколько элементов ждут доставки. Исключение подписчика
+    считается в `errors` и не мешает остальным.
+
+    inline — вызов прямо в потоке публикации (без очереди), thread — в своём
+    потоке подписчика, asyncio — в цикле `loop`; в последнем случае
+    подписчик может быть корутиной, и следующий элемент доставляется
+    после её завершения.
+    """
+
+    def __init__(self, callback: Callable, delivery: str = 'inline', maxsize: int = 1,
+                 loop: Optional[asyncio.AbstractEventLoop] = None, name: Optional[str] = None):
+        if delivery not in DELIVERY_MODES:
+            raise ValueError(f"unknown delivery mode: {delivery}")
+        if delivery == 'asyncio' and loop is None:
+            raise ValueError("asyncio delivery needs a loop")
+        self.callback = callback
+        self.delivery = delivery
+        self.maxsize = max(1, maxsize)
+        self.loop = loop
+        self.name = name or getattr(callback, '__qualname__', repr(callback))
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.closed = False
+        # (элемент, время публикации)
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._scheduled = False
+        self._thread = None
+        if delivery == 'thread':
+            self._thread = threading.Thread(target=self._run, name=f"bus:{self.name}", daemon=True)
+            self._thread.start()
+
+    def offer(self, item):
+        """Вызывается в потоке публикации."""
+        if self.closed:
+            return
+        self.published += 1
+        now = time.monotonic()
+        if self.delivery == 'inline':
+            self._deliver(item, now)
+            return
+        with self._condition:
+            if len(self._pending) >= self.maxsize:
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append((item, now))
+            if self.delivery == 'thread':
+                self._condition.notify()
+                return
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            self.loop.call_soon_threadsafe(self._start_drain)
+        except RuntimeError:
+            # Цикл уже закрыт — подписчик больше не получит элементов
+            self.closed = True
+
+    def _deliver(self, item, published_at: float):
+        try:
+            result = self.callback(item)
+        except Exception as e:
+            self._failed(e)
+            return None
+        self._delivered(published_at)
+        return result
+
+    def _delivered(self, published_at: float):
+        self.delivered += 1
+        self.lag = time.monotonic() - published_at
+        self.max_lag = max(self.max_lag, self.lag)
+
+    def _failed(self, error: Exception):
+        self.errors += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        print(f"Error in subscriber {self.name}: {error}")
+
+    def _take(self):
+        with self._condition:
+            if self._pending:
+                return self._pending.popleft()
+            self._scheduled = False
+            return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self.closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                item, published_at = self._pending.popleft()
+            self._deliver(item, published_at)
+
+    def _start_drain(self):
+        asyncio.ensure_future(self._drain())
+
+    async def _drain(self):
+        while True:
+            entry = self._take()
+            if entry is None:
+                return
+            item, published_at = entry
+            try:
+                result = self.callback(item)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self._failed(e)
+            else:
+                self._delivered(published_at)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Отписка: новые элементы не принимаются, поток подписчика доставляет очередь и завершается."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict:
+        return {
+            'name': self.name,
+            'delivery': self.delivery,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'pending': len(self._pending),
+            'lag': self.lag,
+            'max_lag': self.max_lag,
+        }
+
+
+class SnapshotBus:
+    """Раздача снимков подписчикам: публикация не ждёт подписчиков с очередью.
+
+    Публикующий поток (поток сбора монитора) только раскладывает элемент по
+    очередям; ошибка или медленная работа одного подписчика не задерживает
+    следующий снимок и не скрывает остальных подписчиков.
+    """
+
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable, delivery: str = 'inline', maxsize: int = 1,
+                  loop: Optional[asyncio.AbstractEventLoop] = None, name: Optional[str] = None) -> Subscription:
+        subscription = Subscription(callback, delivery, maxsize, loop, name)
+        with self._lock:
+            # Список заменяется целиком: publish обходит старый без блокировки
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, target) -> bool:
+        """target — подписка или функция, переданная в subscribe."""
+        with self._lock:
+            found = [subscription for subscription in self._subscriptions
+                     if subscription is target or subscription.callback == target]
+            if not found:
+                return False
+            self._subscriptions = [subscription for subscription in self._subscriptions
+                                   if subscription not in found]
+        for subscription in found:
+            subscription.close()
+        return True
+
+    def publish(self, item):
+        for subscription in self._subscriptions:
+            subscription.offer(item)
+
+    def subscriptions(self) -> List[Subscription]:
+        return list(self._subscriptions)
+
+    def stats(self) -> List[Dict]:
+        return [subscription.stats() for subscription in self._subscriptions]
+
+    def close(self):
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, []
+        for subscription in subscriptions:
+            subscription.close()
@@ -0,0 +1,136 @@
+from typing import Dict, List, Sequence
+
+GRID_COLOR = '#3c3c3c'
+LABEL_COLOR = 'white'
+
+
+def decimate(values: Sequence[float], width: int) -> List[float]:
+    """Прореживает ряд до `width` точек с учётом пикселей.
+
+    На каждую пару пикселей по горизонтали остаются минимум и максимум
+    попавших в неё значений (в порядке появления), поэтому пики не теряются.
+    """
+    count = len(values)
+    if count <= width or width < 2:
+        return list(values)
+    buckets = width // 2
+    result = []
+    for bucket in range(buckets):
+        start = bucket * count // buckets
+        end = (bucket + 1) * count // buckets
+        chunk = values[start:end]
+        low, high = min(chunk), max(chunk)
+        if chunk.index(low) <= chunk.index(high):
+            result.append(low)
+            result.append(high)
+        else:
+            result.append(high)
+            result.append(low)
+    return result
+
+
+def chart_coords(values: Sequence[float], width: int, height: int, y_max: float = 100.0,
+                 padding: int = 10, top: int = 20) -> List[float]:
+    """Плоский список x, y для canvas.coords (значения равномерно по ширине)."""
+    count = len(values)
+    if count < 2:
+        return []
+    x_scale = (width - 2 * padding) / (count - 1)
+    y_scale = (height - top) / y_max
+    coords = [0.0] * (2 * count)
+    coords[0::2] = [i * x_scale + padding for i in range(count)]
+    coords[1::2] = [height - min(max(value, 0.0), y_max) * y_scale for value in values]
+    return coords
+
+
+class LineChart:
+    """График на Canvas: сетка и линии создаются один раз, дальше меняются только координаты.
+
+    Ряды добавляются через `add_series`, данные — через `set_data`. При изменении
+    размера холста сетка и линии перестраиваются один раз после паузы `resize_delay` мс.
+    """
+
+    def __init__(self, canvas, y_max: float = 100.0, grid_step: int = 20,
+                 padding: int = 10, resize_delay: int = 100):
+        self.canvas = canvas
+        self.y_max = y_max
+        self.padding = padding
+        self.resize_delay = resize_delay
+        self._size = (0, 0)
+        self._resize_job = None
+        self._series: Dict[str, Dict] = {}
+        self._grid = []
+        for percent in range(0, int(y_max) + 1, grid_step):
+            line = canvas.create_line(0, 0, 0, 0, fill=GRID_COLOR)
+            text = canvas.create_text(5, 0, text=f"{percent}%", fill=LABEL_COLOR, anchor='w')
+            self._grid.append((percent, line, text))
+        canvas.bind('<Configure>', self._on_configure, add='+')
+        self._layout()
+
+    @property
+    def width(self) -> int:
+        return self._size[0]
+
+    def plot_width(self) -> int:
+        """Сколько точек имеет смысл запрашивать для линии — по пикселю на точку."""
+        return max(2, self._size[0] - 2 * self.padding)
+
+    def add_series(self, name: str, color: str, line_width: int = 2, smooth: bool = True):
+        if name in self._series:
+            return
+        item = self.canvas.create_line(0, 0, 0, 0, fill=color, width=line_width,
+                                       smooth=smooth, state='hidden')
+        self._series[name] = {'item': item, 'values': [], 'smooth': smooth, 'smoothed': smooth,
+                              'hidden': True}
+
+    def set_color(self, name: str, color: str):
+        self.canvas.itemconfigure(self._series[name]['item'], fill=color)
+
+    def set_data(self, name: str, values: Sequence[float]):
+        series = self._series[name]
+        series['values'] = values
+        self._draw(series)
+
+    def clear(self, name: str):
+        self.set_data(name, [])
+
+    def _draw(self, series: Dict):
+        canvas = self.canvas
+        item = series['item']
+        values = series['values']
+        points = decimate(values, self.plot_width())
+        coords = chart_coords(points, self._size[0], self._size[1], self.y_max, self.padding)
+        if not coords:
+            if not series['hidden']:
+                canvas.itemconfigure(item, state='hidden')
+                series['hidden'] = True
+            return
+        # Сглаживание прореженного ряда искажает пики и дорого стоит Tk
+        smoothed = series['smooth'] and len(points) == len(values)
+        if smoothed != series['smoothed'] or series['hidden']:
+            canvas.itemconfigure(item, smooth=smoothed, state='normal')
+            series['smoothed'] = smoothed
+            series['hidden'] = False
+        canvas.coords(item, coords)
+
+    def _layout(self):
+        canvas = self.canvas
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        self._size = (width, height)
+        for percent, line, text in self._grid:
+            y = height - (percent / self.y_max * (height - 20))
+            canvas.coords(line, 0, y, width, y)
+            canvas.coords(text, 5, y)
+        for series in self._series.values():
+            self._draw(series)
+
+    def _on_configure(self, event):
+        if (event.width, event.height) == self._size:
+            return
+        if self._resize_job is not None:
+            self.canvas.after_cancel(self._resize_job)
+        self._resize_job = self.canvas.after(self.resize_delay, self._resized)
+
+    def _resized(self):
+        self._resize_job = None
+        self._layout()
@@ -0,0 +1,67 @@
+import tkinter as tk
+from typing import Dict, List, Sequence, Tuple
+
+BG_COLOR = '#1e1e1e'
+
+
+class _Layout:
+    """Сетка меток для одного набора названий полей."""
+    __slots__ = ('frame', 'labels', 'texts')
+
+    def __init__(self, frame: tk.Frame, labels: List[tk.Label]):
+        self.frame = frame
+        self.labels = labels
+        self.texts = [None] * len(labels)
+
+
+class DetailsPanel:
+    """Панель деталей под графиком.
+
+    Сетка меток строится один раз на каждый набор полей (память, диск, сеть, GPU)
+    и потом только переключается; у меток значений вызывается `config(text=...)`
+    лишь когда текст изменился.
+    """
+
+    def __init__(self, header: tk.Label, container: tk.Frame, columns: int = 2):
+        self.header = header
+        self.container = container
+        self.columns = columns
+        self._layouts: Dict[Tuple[str, ...], _Layout] = {}
+        self._current = None
+        self._header_text = None
+        self.updates = 0
+
+    def _build(self, names: Tuple[str, ...]) -> _Layout:
+        frame = tk.Frame(self.container, bg=BG_COLOR)
+        labels = []
+        for i, name in enumerate(names):
+            cell = tk.Frame(frame, bg=BG_COLOR)
+            cell.grid(row=i // self.columns, column=i % self.columns, sticky='w', padx=10, pady=5)
+            tk.Label(cell, text=name, bg=BG_COLOR, fg='#aaaaaa', anchor='w', width=25).pack(side='top', fill='x')
+            value = tk.Label(cell, bg=BG_COLOR, fg='white', anchor='w', width=25, font=("Arial", 10, "bold"))
+            value.pack(side='top', fill='x')
+            labels.append(value)
+        layout = self._layouts[names] = _Layout(frame, labels)
+        return layout
+
+    def show(self, header_text: str, fields: Sequence[Tuple[str, str]]) -> bool:
+        """Показывает поля; возвращает True, если сменился набор полей."""
+        names = tuple(name for name, _ in fields)
+        layout = self._layouts.get(names) or self._build(names)
+        switched = layout is not self._current
+        if switched:
+            if self._current is not None:
+                self._current.frame.pack_forget()
+            layout.frame.pack(fill='both', expand=True)
+            self._current = layout
+
+        if header_text != self._header_text:
+            self.header.config(text=header_text)
+            self._header_text = header_text
+        texts = layout.texts
+        for i, (_, value) in enumerate(fields):
+            if texts[i] != value:
+                layout.labels[i].config(text=value)
+                texts[i] = value
+                self.updates += 1
+        return switched
@@ -1,13 +1,17 @@
-use sysinfo::{System, SystemExt, CpuExt, ProcessExt, DiskExt, NetworksExt};
+use sysinfo::{System, SystemExt, CpuExt, ProcessExt, DiskExt, NetworksExt, PidExt};
+use std::collections::HashMap;
 use std::ffi::CString;
 use std::os::raw::c_char;
-use std::sync::{Arc, Mutex, atomic::{AtomicBool, Ordering}};
+use std::sync::{Arc, Mutex, atomic::{AtomicBool, AtomicU64, Ordering}};
 use std::thread::{self, JoinHandle};
 use std::time::Duration;
 use lazy_static::lazy_static;
 use local_ipaddress;
 use sysinfo::NetworkExt;
 use std::process::Command;
+
+mod process_table;
+use process_table::ProcessRow;
 // Для NVML
 use nvml_wrapper::NVML;
 use nvml_wrapper::enum_wrappers::device::TemperatureSensor;
@@ -440,6 +444,8 @@ pub struct ProcessInfo {
     pub memory_mb: f64,        // используемая память (МБ)
     pub read_kb: f64,          // прочитано (КБ)
     pub written_kb: f64,       // записано (КБ)
+    pub ppid: u32,             // PID родителя (0 — нет)
+    pub start_time: u64,       // время запуска (секунды с начала эпохи)
 }
 
 #[repr(C)]
@@ -448,19 +454,8 @@ pub struct ProcessInfoArray {
     pub len: usize,
 }
 
-#[derive(Clone)]
-struct ProcessInfoInternal {
-    pub pid: String,
-    pub name: String,
-    pub cpu_usage: f32,
-    pub memory_mb: f64,
-    pub read_kb: f64,
-    pub written_kb: f64,
-}
-
 struct ProcessCollector {
     running: Arc<AtomicBool>,
-    info: Arc<Mutex<Vec<ProcessInfoInternal>>>,
     handle: Option<JoinHandle<()>>,
 }
 
@@ -468,34 +463,39 @@ lazy_static! {
     static ref PROCESS_COLLECTOR: Mutex<Option<ProcessCollector>> = Mutex::new(None);
 }
 
-fn create_process_info_internal(pid: &sysinfo::Pid, process: &sysinfo::Process) -> ProcessInfoInternal {
+// Интервал сборщика процессов, мс (set_process_collector_interval)
+static PROCESS_COLLECTOR_INTERVAL_MS: AtomicU64 = AtomicU64::new(1000);
+
+fn process_collector_interval() -> Duration {
+    Duration::from_millis(PROCESS_COLLECTOR_INTERVAL_MS.load(Ordering::Relaxed))
+}
+
+fn process_row<'a>(pid: &sysinfo::Pid, process: &'a sysinfo::Process, total_cores: f32) -> ProcessRow<'a> {
     let disk_usage = process.disk_usage();
-    let total_cores = SYS.lock().unwrap().cpus().len() as f32;
-    ProcessInfoInternal {
-        pid: pid.to_string(),
-        name: process.name().to_string(),
-        cpu_usage: process.cpu_usage() / total_cores,
+    ProcessRow {
+        pid: pid.as_u32() as i64,
+        ppid: process.parent().map(|parent| parent.as_u32() as i64).unwrap_or(0),
+        name: process.name(),
+        cpu_usage: (process.cpu_usage() / total_cores) as f64,
         memory_mb: process.memory() as f64 / (1024.0 * 1024.0),
         read_kb: disk_usage.total_read_bytes as f64 / 1024.0,
         written_kb: disk_usage.total_written_bytes as f64 / 1024.0,
+        start_time: process.start_time() as f64,
     }
 }
 
-fn process_collector_thread(running: Arc<AtomicBool>, info: Arc<Mutex<Vec<ProcessInfoInternal>>>) {
+fn process_collector_thread(running: Arc<AtomicBool>) {
     let mut sys = sysinfo::System::new_all();
     while running.load(Ordering::Relaxed) {
         sys.refresh_processes();
         sys.refresh_cpu();
-        let mut processes_vec = Vec::new();
-        for (pid, process) in sys.processes() {
-            processes_vec.push(create_process_info_internal(pid, process));
-        }
-        processes_vec.sort_by(|a, b| b.cpu_usage.partial_cmp(&a.cpu_usage).unwrap());
-        {
-            let mut locked = info.lock().unwrap();
-            *locked = processes_vec;
-        }
-        thread::sleep(Duration::from_secs(1));
+        let total_cores = sys.cpus().len().max(1) as f32;
+        let interval = process_collector_interval();
+        // Строки пишутся прямо в задний буфер таблицы, без промежуточного Vec
+        process_table::table().publish(
+            sys.processes().iter().map(|(pid, process)| process_row(pid, process, total_cores)), interval);
+        // stop_process_collector будит поток, не дожидаясь конца интервала
+        thread::park_timeout(interval);
     }
 }
 
@@ -506,45 +506,65 @@ pub extern "C" fn start_process_collector() -> bool {
         return false;
     }
     let running = Arc::new(AtomicBool::new(true));
-    let info = Arc::new(Mutex::new(Vec::new()));
     let running_clone = running.clone();
-    let info_clone = info.clone();
     let handle = thread::spawn(move || {
-        process_collector_thread(running_clone, info_clone);
+        process_collector_thread(running_clone);
     });
     *collector_opt = Some(ProcessCollector {
         running,
-        info,
         handle: Some(handle),
     });
     true
 }
 
+/// Интервал сборщика процессов в миллисекундах (не меньше 10); действует со следующего такта.
+#[no_mangle]
+pub extern "C" fn set_process_collector_interval(interval_ms: u64) -> bool {
+    if interval_ms < 10 {
+        return false;
+    }
+    PROCESS_COLLECTOR_INTERVAL_MS.store(interval_ms, Ordering::Relaxed);
+    if let Some(collector) = &*PROCESS_COLLECTOR.lock().unwrap() {
+        if let Some(handle) = &collector.handle {
+            handle.thread().unpark();
+        }
+    }
+    true
+}
+
+#[no_mangle]
+pub extern "C" fn get_process_collector_interval() -> u64 {
+    PROCESS_COLLECTOR_INTERVAL_MS.load(Ordering::Relaxed)
+}
+
+// Прежний интерфейс: копия таблицы сборщика со строками CString на каждую запись
 #[no_mangle]
 pub extern "C" fn get_process_info_array() -> ProcessInfoArray {
     let collector_opt = PROCESS_COLLECTOR.lock().unwrap();
-    if let Some(collector) = &*collector_opt {
-        let locked = collector.info.lock().unwrap();
-        let mut new_vec: Vec<ProcessInfo> = Vec::with_capacity(locked.len());
-        for proc in locked.iter() {
-            let pid_dup = CString::new(proc.pid.clone()).unwrap();
-            let name_dup = CString::new(proc.name.clone()).unwrap();
-            new_vec.push(ProcessInfo {
-                pid: pid_dup.into_raw(),
-                name: name_dup.into_raw(),
-                cpu_usage: proc.cpu_usage,
-                memory_mb: proc.memory_mb,
-                read_kb: proc.read_kb,
-                written_kb: proc.written_kb,
-            });
-        }
-        let len = new_vec.len();
-        let data_ptr = new_vec.as_mut_ptr();
-        std::mem::forget(new_vec);
-        ProcessInfoArray { data: data_ptr, len }
-    } else {
-        ProcessInfoArray { data: std::ptr::null_mut(), len: 0 }
+    let pinned = match (&*collector_opt, process_table::table().pin()) {
+        (Some(_), Some(pinned)) => pinned,
+        _ => return ProcessInfoArray { data: std::ptr::null_mut(), len: 0 },
+    };
+    let mut new_vec: Vec<ProcessInfo> = Vec::with_capacity(pinned.len());
+    for index in 0..pinned.len() {
+        let proc = pinned.row(index);
+        let pid_dup = CString::new(proc.pid.to_string()).unwrap();
+        let name_dup = CString::new(proc.name).unwrap_or_default();
+        new_vec.push(ProcessInfo {
+            pid: pid_dup.into_raw(),
+            name: name_dup.into_raw(),
+            cpu_usage: proc.cpu_usage as f32,
+            memory_mb: proc.memory_mb,
+            read_kb: proc.read_kb,
+            written_kb: proc.written_kb,
+            ppid: proc.ppid as u32,
+            start_time: proc.start_time as u64,
+        });
     }
+    let len = new_vec.len();
+    let data_ptr = new_vec.as_mut_ptr();
+    std::mem::forget(new_vec);
+    ProcessInfoArray { data: data_ptr, len }
 }
 
 #[no_mangle]
@@ -553,12 +573,11 @@ pub extern "C" fn stop_process_collector() -> bool {
     if let Some(mut collector) = collector_opt.take() {
         collector.running.store(false, Ordering::Relaxed);
         if let Some(handle) = collector.handle.take() {
+            handle.thread().unpark();
             handle.join().unwrap();
         }
-        {
-            let mut locked = collector.info.lock().unwrap();
-            locked.clear();
-        }
+        // Читатели увидят пустое поколение, а не устаревшие процессы
+        process_table::table().clear(process_collector_interval());
         true
     } else {
         false
@@ -581,6 +600,285 @@ pub extern "C" fn free_process_info_array(array: ProcessInfoArray) {
     }
 }
 
+// ---------- Снимок одним вызовом ----------
+//
+// get_system_snapshot заполняет буфер вызывающего всеми запрошенными
+// разделами после одного обновления под одной блокировкой SYS. Раскладка
+// буфера: SnapshotHeader, массивы SnapshotDisk, SnapshotNetwork,
+// SnapshotProcess и пул строк (UTF-8 без завершающего нуля); строки задаются
+// смещением от начала пула и длиной. Буфер принадлежит вызывающему и
+// переиспользуется между тактами, поэтому освобождать ничего не нужно.
+
+pub const SNAPSHOT_MAGIC: u32 = 0x5353_4D54; // "TMSS"
+pub const SNAPSHOT_VERSION: u32 = 1;
+
+pub const SECTION_CPU: u32 = 1;
+pub const SECTION_MEMORY: u32 = 2;
+pub const SECTION_DISKS: u32 = 4;
+pub const SECTION_NETWORKS: u32 = 8;
+pub const SECTION_PROCESSES: u32 = 16;
+
+pub const SNAPSHOT_OK: i32 = 0;
+pub const SNAPSHOT_TOO_SMALL: i32 = 1;  // в *written — нужный размер буфера
+pub const SNAPSHOT_BAD_ARGS: i32 = -1;
+
+#[repr(C)]
+#[derive(Clone, Copy, Default)]
+pub struct SnapshotString {
+    pub offset: u32,
+    pub len: u32,
+}
+
+// Поля расставлены без неявного выравнивания: структуры копируются в буфер побайтно
+#[repr(C)]
+#[derive(Default)]
+pub struct SnapshotHeader {
+    pub magic: u32,
+    pub version: u32,
+    pub sections: u32,          // разделы, которые есть в снимке (SECTION_*)
+    pub cpu_usage: f32,         // загрузка ЦП (в %)
+    pub size: u64,              // занятая часть буфера, байт
+    pub cpu_frequency: f64,     // частота (ГГц)
+    pub core_count: u64,        // количество физических ядер
+    pub work_time: u64,         // время работы (секунд)
+    pub process_count: u64,     // количество процессов
+    pub memory_total: u64,      // память, байт
+    pub memory_used: u64,
+    pub memory_available: u64,
+    pub memory_speed: u64,      // скорость памяти (МГц)
+    pub cpu_brand: SnapshotString,
+    pub memory_format: SnapshotString,
+    pub disks_offset: u32,
+    pub disks_len: u32,
+    pub networks_offset: u32,
+    pub networks_len: u32,
+    pub processes_offset: u32,
+    pub processes_len: u32,
+    pub strings_offset: u32,
+    pub strings_len: u32,
+}
+
+#[repr(C)]
+pub struct SnapshotDisk {
+    pub name: SnapshotString,
+    pub total_space: u64,       // байт
+    pub available_space: u64,   // байт
+}
+
+#[repr(C)]
+pub struct SnapshotNetwork {
+    pub name: SnapshotString,
+    pub ipv4: SnapshotString,
+    pub send: u64,              // накопленные байты
+    pub recive: u64,
+}
+
+// Типы полей совпадают со столбцами ProcessTable на стороне Python: столбцы режутся без преобразования
+#[repr(C)]
+pub struct SnapshotProcess {
+    pub pid: i64,
+    pub ppid: i64,              // PID родителя (0 — нет)
+    pub name: SnapshotString,
+    pub cpu_usage: f64,         // загрузка CPU (в %)
+    pub memory_mb: f64,         // используемая память (МБ)
+    pub read_kb: f64,           // прочитано (КБ)
+    pub written_kb: f64,        // записано (КБ)
+    pub start_time: f64,        // время запуска (секунды с начала эпохи)
+}
+
+#[derive(Default)]
+struct SnapshotScratch {
+    records: Vec<u8>,
+    strings: Vec<u8>,
+}
+
+lazy_static! {
+    // Рабочие буферы сборки снимка: ёмкость сохраняется между вызовами
+    static ref SNAPSHOT_SCRATCH: Mutex<SnapshotScratch> = Mutex::new(SnapshotScratch::default());
+}
+
+fn push_record<T>(out: &mut Vec<u8>, record: &T) {
+    let bytes = unsafe {
+        std::slice::from_raw_parts(record as *const T as *const u8, std::mem::size_of::<T>())
+    };
+    out.extend_from_slice(bytes);
+}
+
+fn push_string(strings: &mut Vec<u8>, value: &str) -> SnapshotString {
+    let offset = strings.len() as u32;
+    strings.extend_from_slice(value.as_bytes());
+    SnapshotString { offset, len: value.len() as u32 }
+}
+
+// Одинаковые имена процессов (десятки "chrome.exe") попадают в пул строк один раз
+fn push_process<'a>(records: &mut Vec<u8>, strings: &mut Vec<u8>, names: &mut HashMap<&'a str, SnapshotString>,
+                    pid: u32, name: &'a str, cpu_usage: f32, memory_mb: f64, read_kb: f64, written_kb: f64,
+                    ppid: u32, start_time: u64) {
+    let name = *names.entry(name).or_insert_with(|| push_string(strings, name));
+    push_record(records, &SnapshotProcess {
+        pid: pid as i64,
+        ppid: ppid as i64,
+        name,
+        cpu_usage: cpu_usage as f64,
+        memory_mb,
+        read_kb,
+        written_kb,
+        start_time: start_time as f64,
+    });
+}
+
+#[no_mangle]
+pub extern "C" fn get_system_snapshot(sections: u32, buffer: *mut u8, capacity: usize, written: *mut usize) -> i32 {
+    if written.is_null() || (buffer.is_null() && capacity != 0) {
+        return SNAPSHOT_BAD_ARGS;
+    }
+    let mut scratch = SNAPSHOT_SCRATCH.lock().unwrap();
+    let SnapshotScratch { records, strings } = &mut *scratch;
+    records.clear();
+    strings.clear();
+    let mut header = SnapshotHeader {
+        magic: SNAPSHOT_MAGIC,
+        version: SNAPSHOT_VERSION,
+        sections,
+        ..Default::default()
+    };
+
+    // Процессы обновляет фоновый сборщик; если он запущен, повторно их не обновляем
+    let collector = PROCESS_COLLECTOR.lock().unwrap();
+    let collected = collector.as_ref().and_then(|_| process_table::table().pin());
+    {
+        let mut sys = SYS.lock().unwrap();
+        if sections & SECTION_CPU != 0 {
+            sys.refresh_cpu();
+        }
+        if sections & SECTION_MEMORY != 0 {
+            sys.refresh_memory();
+        }
+        if sections & SECTION_DISKS != 0 {
+            if sys.disks().is_empty() {
+                sys.refresh_disks_list();
+            }
+            sys.refresh_disks();
+        }
+        if sections & SECTION_NETWORKS != 0 {
+            if sys.networks().iter().next().is_none() {
+                sys.refresh_networks_list();
+            }
+            sys.refresh_networks();
+        }
+        if collected.is_none() && sections & (SECTION_CPU | SECTION_PROCESSES) != 0 {
+            sys.refresh_processes();
+        }
+
+        if sections & SECTION_CPU != 0 {
+            let cpu = sys.cpus().first();
+            let brand = cpu.map(|cpu| cpu.brand().to_string()).unwrap_or_else(|| "Unknown".to_string());
+            header.cpu_brand = push_string(strings, &brand);
+            header.cpu_usage = cpu.map(|cpu| cpu.cpu_usage()).unwrap_or(0.0);
+            header.cpu_frequency = cpu.map(|cpu| cpu.frequency() as f64 / 1000.0).unwrap_or(0.0);
+            header.core_count = num_cpus::get_physical() as u64;
+            header.work_time = sys.uptime();
+            header.process_count = match &collected {
+                Some(pinned) => pinned.len() as u64,
+                None => sys.processes().len() as u64,
+            };
+        }
+        if sections & SECTION_MEMORY != 0 {
+            header.memory_total = sys.total_memory();
+            header.memory_used = sys.used_memory();
+            header.memory_available = sys.available_memory();
+            header.memory_speed = 2400;
+            header.memory_format = push_string(strings, get_modern_memory_format(Some(26), None));
+        }
+
+        header.disks_offset = records.len() as u32;
+        if sections & SECTION_DISKS != 0 {
+            for disk in sys.disks() {
+                let name = push_string(strings, &disk.name().to_string_lossy());
+                push_record(records, &SnapshotDisk {
+                    name,
+                    total_space: disk.total_space(),
+                    available_space: disk.available_space(),
+                });
+                header.disks_len += 1;
+            }
+        }
+
+        header.networks_offset = records.len() as u32;
+        if sections & SECTION_NETWORKS != 0 {
+            let local_ip = local_ipaddress::get().unwrap_or("0.0.0.0".to_string());
+            for (iface_name, network) in sys.networks() {
+                let name = push_string(strings, iface_name);
+                let ipv4 = push_string(strings, &local_ip);
+                push_record(records, &SnapshotNetwork {
+                    name,
+                    ipv4,
+                    send: network.total_transmitted(),
+                    recive: network.total_received(),
+                });
+                header.networks_len += 1;
+            }
+        }
+
+        header.processes_offset = records.len() as u32;
+        if sections & SECTION_PROCESSES != 0 {
+            let mut names = HashMap::new();
+            match &collected {
+                Some(pinned) => {
+                    for index in 0..pinned.len() {
+                        let proc = pinned.row(index);
+                        push_process(records, strings, &mut names, proc.pid as u32, proc.name, proc.cpu_usage as f32,
+                                     proc.memory_mb, proc.read_kb, proc.written_kb, proc.ppid as u32,
+                                     proc.start_time as u64);
+                    }
+                    header.processes_len = pinned.len() as u32;
+                }
+                None => {
+                    let total_cores = sys.cpus().len().max(1) as f32;
+                    for (pid, process) in sys.processes() {
+                        let disk_usage = process.disk_usage();
+                        push_process(records, strings, &mut names, pid.as_u32(), process.name(),
+                                     process.cpu_usage() / total_cores,
+                                     process.memory() as f64 / (1024.0 * 1024.0),
+                                     disk_usage.total_read_bytes as f64 / 1024.0,
+                                     disk_usage.total_written_bytes as f64 / 1024.0,
+                                     process.parent().map(|parent| parent.as_u32()).unwrap_or(0),
+                                     process.start_time());
+                        header.processes_len += 1;
+                    }
+                }
+            }
+        }
+    }
+    drop(collected);
+    drop(collector);
+
+    // Смещения разделов — от начала буфера, записи идут сразу за заголовком
+    let header_size = std::mem::size_of::<SnapshotHeader>() as u32;
+    header.disks_offset += header_size;
+    header.networks_offset += header_size;
+    header.processes_offset += header_size;
+    header.strings_offset = header_size + records.len() as u32;
+    header.strings_len = strings.len() as u32;
+    let size = header.strings_offset as usize + strings.len();
+    header.size = size as u64;
+    unsafe {
+        *written = size;
+    }
+    if size > capacity {
+        return SNAPSHOT_TOO_SMALL;
+    }
+    unsafe {
+        let out = std::slice::from_raw_parts_mut(buffer, size);
+        let header_bytes = std::slice::from_raw_parts(
+            &header as *const SnapshotHeader as *const u8, header_size as usize);
+        out[..header_size as usize].copy_from_slice(header_bytes);
+        out[header_size as usize..header.strings_offset as usize].copy_from_slice(records);
+        out[header.strings_offset as usize..].copy_from_slice(strings);
+    }
+    SNAPSHOT_OK
+}
+
 // ---------- Службы (Windows) ----------
 
 #[cfg(target_os = "windows")]
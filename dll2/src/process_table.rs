@@ -0,0 +1,496 @@
+// ---------- Таблица процессов фонового сборщика ----------
+//
+// Сборщик публикует процессы в двойной буфер столбцов: пишет в задний буфер,
+// пока читатели работают с передним, и одной атомарной записью делает его
+// передним. Каждая публикация получает номер поколения. PID хранятся числами,
+// имена — номерами в таблице строк: номер имени не меняется, пока таблица не
+// сброшена (сменилась names_epoch), поэтому читатель декодирует только новые
+// имена. Столбец changed хранит поколение, в котором строка последний раз
+// изменилась, — по нему get_process_changes отдаёт только изменённые строки.
+//
+// Читатель закрепляет передний буфер через acquire_process_table и получает
+// указатели на его столбцы без копирования; пока буфер закреплён, сборщик в
+// него не пишет. Закрепление нужно снимать release_process_table сразу после
+// чтения: сборщик ждёт его не дольше одного интервала и иначе пропускает такт.
+//
+// Модуль не зависит от sysinfo: его можно собрать отдельно
+// (rustc --cfg process_table_feed) и наполнять таблицу из тестов.
+
+use std::cell::UnsafeCell;
+use std::collections::{HashMap, VecDeque};
+use std::sync::atomic::{AtomicU64, AtomicUsize, Ordering};
+use std::sync::{Mutex, OnceLock};
+use std::thread;
+use std::time::{Duration, Instant};
+
+pub const TABLE_OK: i32 = 0;
+pub const TABLE_TOO_SMALL: i32 = 1;     // в ProcessChanges — нужные размеры массивов
+pub const TABLE_EMPTY: i32 = 2;         // сборщик ещё ничего не опубликовал
+pub const TABLE_BAD_ARGS: i32 = -1;
+
+// Таблица имён сбрасывается, когда разрастается сверх этих пределов
+const MAX_NAMES: usize = 1 << 16;
+const MAX_NAME_BYTES: usize = 8 << 20;
+// Сколько поколений помнит журнал удалённых процессов
+const REMOVED_GENERATIONS: u64 = 64;
+
+/// Строка, которую сборщик передаёт в publish.
+pub struct ProcessRow<'a> {
+    pub pid: i64,
+    pub ppid: i64,
+    pub name: &'a str,
+    pub cpu_usage: f64,
+    pub memory_mb: f64,
+    pub read_kb: f64,
+    pub written_kb: f64,
+    pub start_time: f64,
+}
+
+/// Закреплённый буфер: указатели действительны до release_process_table.
+#[repr(C)]
+pub struct ProcessTableView {
+    pub generation: u64,
+    pub len: u64,
+    pub pid: *const i64,
+    pub ppid: *const i64,
+    pub name: *const u32,           // номер имени в таблице строк
+    pub cpu_usage: *const f64,
+    pub memory_mb: *const f64,
+    pub read_kb: *const f64,
+    pub written_kb: *const f64,
+    pub start_time: *const f64,
+    pub changed: *const u64,        // поколение последнего изменения строки
+    pub names: *const u8,           // имена UTF-8 подряд, без завершающих нулей
+    pub name_offsets: *const u32,   // names_len + 1 смещений в names
+    pub names_len: u64,
+    pub names_epoch: u64,
+    pub slot: u64,                  // закреплённый буфер
+}
+
+/// Итог get_process_changes.
+#[repr(C)]
+#[derive(Default)]
+pub struct ProcessChanges {
+    pub generation: u64,            // поколение закреплённого буфера
+    pub full: u32,                  // 1 — since слишком старое, в rows все строки
+    pub rows_len: u32,              // номера изменённых и новых строк буфера
+    pub removed_len: u32,           // PID исчезнувших процессов
+    pub reserved: u32,
+}
+
+#[derive(Default)]
+struct Columns {
+    generation: u64,
+    pid: Vec<i64>,
+    ppid: Vec<i64>,
+    name: Vec<u32>,
+    cpu_usage: Vec<f64>,
+    memory_mb: Vec<f64>,
+    read_kb: Vec<f64>,
+    written_kb: Vec<f64>,
+    start_time: Vec<f64>,
+    changed: Vec<u64>,
+    // Копия общей таблицы имён: догоняется перед публикацией буфера
+    names: Vec<u8>,
+    name_offsets: Vec<u32>,
+    names_epoch: u64,
+    // PID → строка, чтобы следующая публикация нашла прошлые значения
+    rows: HashMap<i64, usize>,
+}
+
+impl Columns {
+    fn clear(&mut self) {
+        self.pid.clear();
+        self.ppid.clear();
+        self.name.clear();
+        self.cpu_usage.clear();
+        self.memory_mb.clear();
+        self.read_kb.clear();
+        self.written_kb.clear();
+        self.start_time.clear();
+        self.changed.clear();
+        self.rows.clear();
+    }
+
+    // Поколение изменения строки: прошлое, если процесс тот же и значения не сдвинулись
+    fn changed_since(&self, row: &ProcessRow, name: u32, generation: u64) -> u64 {
+        match self.rows.get(&row.pid) {
+            Some(&index) if self.start_time[index] == row.start_time
+                && self.name[index] == name
+                && self.ppid[index] == row.ppid
+                && self.cpu_usage[index] == row.cpu_usage
+                && self.memory_mb[index] == row.memory_mb
+                && self.read_kb[index] == row.read_kb
+                && self.written_kb[index] == row.written_kb => self.changed[index],
+            _ => generation,
+        }
+    }
+}
+
+#[derive(Default)]
+struct NameTable {
+    ids: HashMap<String, u32>,
+    names: Vec<u8>,
+    offsets: Vec<u32>,
+    epoch: u64,
+}
+
+impl NameTable {
+    fn intern(&mut self, name: &str) -> u32 {
+        if let Some(&id) = self.ids.get(name) {
+            return id;
+        }
+        if self.offsets.is_empty() {
+            self.offsets.push(0);
+        }
+        let id = self.ids.len() as u32;
+        self.names.extend_from_slice(name.as_bytes());
+        self.offsets.push(self.names.len() as u32);
+        self.ids.insert(name.to_string(), id);
+        id
+    }
+
+    fn reset_if_full(&mut self) {
+        if self.ids.len() >= MAX_NAMES || self.names.len() >= MAX_NAME_BYTES {
+            self.ids.clear();
+            self.names.clear();
+            self.offsets.clear();
+            self.epoch += 1;
+        }
+    }
+
+    // Добавляет в копию буфера только имена, появившиеся с прошлой синхронизации
+    fn sync(&self, columns: &mut Columns) {
+        if columns.names_epoch != self.epoch || columns.name_offsets.len() > self.offsets.len() {
+            columns.names.clear();
+            columns.name_offsets.clear();
+            columns.names_epoch = self.epoch;
+        }
+        let start = columns.names.len();
+        columns.names.extend_from_slice(&self.names[start..]);
+        let start = columns.name_offsets.len();
+        columns.name_offsets.extend_from_slice(&self.offsets[start..]);
+    }
+}
+
+struct Writer {
+    names: NameTable,
+    // (поколение, PID) исчезнувших процессов за последние REMOVED_GENERATIONS
+    removed: VecDeque<(u64, i64)>,
+    generation: u64,
+}
+
+pub struct ProcessTableBuffers {
+    buffers: [UnsafeCell<Columns>; 2],
+    readers: [AtomicUsize; 2],
+    front: AtomicUsize,
+    generation: AtomicU64,
+    writer: Mutex<Writer>,
+    removed: Mutex<VecDeque<(u64, i64)>>,
+}
+
+// Буфер меняет только писатель под writer и только пока у буфера нет читателей
+unsafe impl Sync for ProcessTableBuffers {}
+
+pub fn table() -> &'static ProcessTableBuffers {
+    static TABLE: OnceLock<ProcessTableBuffers> = OnceLock::new();
+    TABLE.get_or_init(|| ProcessTableBuffers {
+        buffers: [UnsafeCell::new(Columns::default()), UnsafeCell::new(Columns::default())],
+        readers: [AtomicUsize::new(0), AtomicUsize::new(0)],
+        front: AtomicUsize::new(0),
+        generation: AtomicU64::new(0),
+        writer: Mutex::new(Writer { names: NameTable::default(), removed: VecDeque::new(), generation: 0 }),
+        removed: Mutex::new(VecDeque::new()),
+    })
+}
+
+/// Закрепление переднего буфера внутри библиотеки; снимается при выходе из области видимости.
+pub struct PinnedColumns<'a> {
+    table: &'a ProcessTableBuffers,
+    slot: usize,
+}
+
+impl<'a> PinnedColumns<'a> {
+    pub fn len(&self) -> usize {
+        self.columns().pid.len()
+    }
+
+    pub fn generation(&self) -> u64 {
+        self.columns().generation
+    }
+
+    pub fn row(&self, index: usize) -> ProcessRow<'_> {
+        let columns = self.columns();
+        ProcessRow {
+            pid: columns.pid[index],
+            ppid: columns.ppid[index],
+            name: self.name(columns.name[index]),
+            cpu_usage: columns.cpu_usage[index],
+            memory_mb: columns.memory_mb[index],
+            read_kb: columns.read_kb[index],
+            written_kb: columns.written_kb[index],
+            start_time: columns.start_time[index],
+        }
+    }
+
+    fn name(&self, id: u32) -> &str {
+        let columns = self.columns();
+        let start = columns.name_offsets[id as usize] as usize;
+        let end = columns.name_offsets[id as usize + 1] as usize;
+        std::str::from_utf8(&columns.names[start..end]).unwrap_or("")
+    }
+
+    fn columns(&self) -> &Columns {
+        unsafe { &*self.table.buffers[self.slot].get() }
+    }
+}
+
+impl Drop for PinnedColumns<'_> {
+    fn drop(&mut self) {
+        self.table.readers[self.slot].fetch_sub(1, Ordering::SeqCst);
+    }
+}
+
+impl ProcessTableBuffers {
+    pub fn generation(&self) -> u64 {
+        self.generation.load(Ordering::SeqCst)
+    }
+
+    fn pin_slot(&self) -> usize {
+        loop {
+            let slot = self.front.load(Ordering::SeqCst);
+            self.readers[slot].fetch_add(1, Ordering::SeqCst);
+            // Буфер мог смениться между чтением front и закреплением
+            if self.front.load(Ordering::SeqCst) == slot {
+                return slot;
+            }
+            self.readers[slot].fetch_sub(1, Ordering::SeqCst);
+        }
+    }
+
+    /// Закрепляет передний буфер; None, если ещё ничего не опубликовано.
+    pub fn pin(&self) -> Option<PinnedColumns<'_>> {
+        if self.generation() == 0 {
+            return None;
+        }
+        Some(PinnedColumns { table: self, slot: self.pin_slot() })
+    }
+
+    /// Публикует новое поколение. Ждёт освобождения заднего буфера не дольше
+    /// `wait`; если читатель его так и не отпустил, такт пропускается (false).
+    pub fn publish<'a, I>(&self, rows: I, wait: Duration) -> bool
+    where
+        I: IntoIterator<Item = ProcessRow<'a>>,
+    {
+        let mut writer = self.writer.lock().unwrap();
+        let front = self.front.load(Ordering::SeqCst);
+        let back = 1 - front;
+        let deadline = Instant::now() + wait;
+        while self.readers[back].load(Ordering::SeqCst) != 0 {
+            if Instant::now() >= deadline {
+                return false;
+            }
+            thread::sleep(Duration::from_millis(1));
+        }
+        let generation = writer.generation + 1;
+        // Передний буфер только читается — как и читателями
+        let previous = unsafe { &*self.buffers[front].get() };
+        let columns = unsafe { &mut *self.buffers[back].get() };
+        columns.clear();
+        writer.names.reset_if_full();
+        let same_names = previous.names_epoch == writer.names.epoch;
+        for row in rows {
+            if columns.rows.contains_key(&row.pid) {
+                continue;
+            }
+            let name = writer.names.intern(row.name);
+            let changed = if same_names { previous.changed_since(&row, name, generation) } else { generation };
+            columns.rows.insert(row.pid, columns.pid.len());
+            columns.pid.push(row.pid);
+            columns.ppid.push(row.ppid);
+            columns.name.push(name);
+            columns.cpu_usage.push(row.cpu_usage);
+            columns.memory_mb.push(row.memory_mb);
+            columns.read_kb.push(row.read_kb);
+            columns.written_kb.push(row.written_kb);
+            columns.start_time.push(row.start_time);
+            columns.changed.push(changed);
+        }
+        writer.names.sync(columns);
+        columns.generation = generation;
+
+        // Процесс исчез или его PID занял другой процесс
+        let horizon = generation.saturating_sub(REMOVED_GENERATIONS);
+        for (index, pid) in previous.pid.iter().enumerate() {
+            let replaced = match columns.rows.get(pid) {
+                Some(&row) => columns.start_time[row] != previous.start_time[index],
+                None => true,
+            };
+            if replaced {
+                writer.removed.push_back((generation, *pid));
+            }
+        }
+        while writer.removed.front().map_or(false, |&(removed_at, _)| removed_at <= horizon) {
+            writer.removed.pop_front();
+        }
+        {
+            let mut removed = self.removed.lock().unwrap();
+            removed.clone_from(&writer.removed);
+        }
+        writer.generation = generation;
+        self.front.store(back, Ordering::SeqCst);
+        self.generation.store(generation, Ordering::SeqCst);
+        true
+    }
+
+    /// Опубликовать пустую таблицу (сборщик остановлен).
+    pub fn clear(&self, wait: Duration) -> bool {
+        self.publish(std::iter::empty(), wait)
+    }
+
+    fn removed_since(&self, since: u64, generation: u64, out: &mut Vec<i64>) -> bool {
+        let removed = self.removed.lock().unwrap();
+        // Журнал помнит поколения после horizon: с более старых since нужна полная таблица
+        let horizon = generation.saturating_sub(REMOVED_GENERATIONS);
+        if since < horizon {
+            return false;
+        }
+        out.extend(removed.iter()
+            .filter(|&&(removed_at, _)| removed_at > since && removed_at <= generation)
+            .map(|&(_, pid)| pid));
+        true
+    }
+}
+
+// ---------- FFI ----------
+
+#[no_mangle]
+pub extern "C" fn get_process_table_generation() -> u64 {
+    table().generation()
+}
+
+#[no_mangle]
+pub extern "C" fn acquire_process_table(view: *mut ProcessTableView) -> i32 {
+    if view.is_null() {
+        return TABLE_BAD_ARGS;
+    }
+    let table = table();
+    let pinned = match table.pin() {
+        Some(pinned) => pinned,
+        None => return TABLE_EMPTY,
+    };
+    let columns = pinned.columns();
+    unsafe {
+        *view = ProcessTableView {
+            generation: columns.generation,
+            len: columns.pid.len() as u64,
+            pid: columns.pid.as_ptr(),
+            ppid: columns.ppid.as_ptr(),
+            name: columns.name.as_ptr(),
+            cpu_usage: columns.cpu_usage.as_ptr(),
+            memory_mb: columns.memory_mb.as_ptr(),
+            read_kb: columns.read_kb.as_ptr(),
+            written_kb: columns.written_kb.as_ptr(),
+            start_time: columns.start_time.as_ptr(),
+            changed: columns.changed.as_ptr(),
+            names: columns.names.as_ptr(),
+            name_offsets: columns.name_offsets.as_ptr(),
+            names_len: columns.name_offsets.len().saturating_sub(1) as u64,
+            names_epoch: columns.names_epoch,
+            slot: pinned.slot as u64,
+        };
+    }
+    // Закрепление переходит к вызывающему до release_process_table
+    std::mem::forget(pinned);
+    TABLE_OK
+}
+
+#[no_mangle]
+pub extern "C" fn release_process_table(view: *const ProcessTableView) {
+    if view.is_null() {
+        return;
+    }
+    let slot = unsafe { (*view).slot } as usize;
+    if slot < 2 {
+        table().readers[slot].fetch_sub(1, Ordering::SeqCst);
+    }
+}
+
+/// Строки закреплённого `view`, изменившиеся после поколения `since`, и PID
+/// процессов, исчезнувших после него. since = 0 или поколение старше журнала
+/// удалений дают full = 1 и все строки.
+#[no_mangle]
+pub extern "C" fn get_process_changes(view: *const ProcessTableView, since: u64,
+                                      rows: *mut u32, rows_capacity: usize,
+                                      removed: *mut i64, removed_capacity: usize,
+                                      changes: *mut ProcessChanges) -> i32 {
+    if view.is_null() || changes.is_null() || (rows.is_null() && rows_capacity != 0)
+        || (removed.is_null() && removed_capacity != 0) {
+        return TABLE_BAD_ARGS;
+    }
+    let view = unsafe { &*view };
+    let table = table();
+    if view.slot >= 2 || table.readers[view.slot as usize].load(Ordering::SeqCst) == 0 {
+        return TABLE_BAD_ARGS;
+    }
+    let columns = unsafe { &*table.buffers[view.slot as usize].get() };
+    let mut removed_pids = Vec::new();
+    let full = since == 0 || !table.removed_since(since, columns.generation, &mut removed_pids);
+    let changed_rows: Vec<u32> = if full {
+        removed_pids.clear();
+        (0..columns.pid.len() as u32).collect()
+    } else {
+        columns.changed.iter().enumerate()
+            .filter(|&(_, &changed)| changed > since)
+            .map(|(index, _)| index as u32)
+            .collect()
+    };
+    unsafe {
+        *changes = ProcessChanges {
+            generation: columns.generation,
+            full: full as u32,
+            rows_len: changed_rows.len() as u32,
+            removed_len: removed_pids.len() as u32,
+            reserved: 0,
+        };
+    }
+    if changed_rows.len() > rows_capacity || removed_pids.len() > removed_capacity {
+        return TABLE_TOO_SMALL;
+    }
+    unsafe {
+        std::ptr::copy_nonoverlapping(changed_rows.as_ptr(), rows, changed_rows.len());
+        std::ptr::copy_nonoverlapping(removed_pids.as_ptr(), removed, removed_pids.len());
+    }
+    TABLE_OK
+}
+
+// Наполнение таблицы без сборщика — только для тестов (rustc --cfg process_table_feed)
+#[cfg(process_table_feed)]
+#[repr(C)]
+pub struct FeedRow {
+    pub pid: i64,
+    pub ppid: i64,
+    pub name: *const u8,
+    pub name_len: usize,
+    pub cpu_usage: f64,
+    pub memory_mb: f64,
+    pub read_kb: f64,
+    pub written_kb: f64,
+    pub start_time: f64,
+}
+
+#[cfg(process_table_feed)]
+#[no_mangle]
+pub extern "C" fn process_table_feed(rows: *const FeedRow, len: usize, wait_ms: u64) -> bool {
+    let rows = if len == 0 { &[][..] } else { unsafe { std::slice::from_raw_parts(rows, len) } };
+    table().publish(rows.iter().map(|row| ProcessRow {
+        pid: row.pid,
+        ppid: row.ppid,
+        name: unsafe { std::str::from_utf8_unchecked(std::slice::from_raw_parts(row.name, row.name_len)) },
+        cpu_usage: row.cpu_usage,
+        memory_mb: row.memory_mb,
+        read_kb: row.read_kb,
+        written_kb: row.written_kb,
+        start_time: row.start_time,
+    }), Duration::from_millis(wait_ms))
+}
@@ -0,0 +1,635 @@
+import ctypes
+from array import array
+from ctypes import c_char_p, c_float, c_double, c_uint64, c_int, c_int64, c_void_p, Structure, POINTER, c_size_t, c_uint32
+from typing import Iterable, List, Dict, Optional
+
+from backend import MetricsBackend
+from snapshot import PROCESS_COLUMNS, NameCache, ProcessTable, _struct_column
+
+DEFAULT_DLL_PATH = "dll2/target/release/sys_info_fn.dll"
+
+# Определения структур для FFI (как и ранее)
+class ProcessInfo(Structure):
+    _fields_ = [
+        ("pid", c_char_p),
+        ("name", c_char_p),
+        ("cpu_usage", c_float),
+        ("memory_mb", c_double),
+        ("read_kb", c_double),
+        ("written_kb", c_double),
+        ("ppid", c_uint32),
+        ("start_time", c_uint64),
+    ]
+
+class ProcessInfoArray(Structure):
+    _fields_ = [
+        ("data", POINTER(ProcessInfo)),
+        ("len", c_size_t),
+    ]
+
+class ServiceInfo(Structure):
+    _fields_ = [
+        ("process_id", c_uint32),
+        ("name", c_char_p),
+        ("status", c_char_p),
+    ]
+
+class ServiceInfoArray(Structure):
+    _fields_ = [
+        ("data", POINTER(ServiceInfo)),
+        ("len", c_size_t),
+    ]
+
+class CpuStaticInfo(Structure):
+    _fields_ = [
+        ("brand", c_char_p),
+        ("usage", c_float),
+        ("frequency", c_double),
+        ("core_count", c_size_t),
+        ("work_time", c_int64),
+        ("process", c_int64),
+    ]
+
+class MemoryStaticInfo(Structure):
+    _fields_ = [
+        ("total", c_uint64),
+        ("used", c_uint64),
+        ("available", c_uint64),
+        ("speed", c_uint64),
+        ("format", c_char_p),
+    ]
+
+class DiskStaticInfo(Structure):
+    _fields_ = [
+        ("name", c_char_p),
+        ("total_space", c_uint64),
+        ("available_space", c_uint64),
+    ]
+
+class DiskStaticInfoArray(Structure):
+    _fields_ = [
+        ("data", POINTER(DiskStaticInfo)),
+        ("len", c_size_t),
+    ]
+
+class NetworksStaticInfo(Structure):
+    _fields_ = [
+        ("name", c_char_p),
+        ("ipv4", c_char_p),
+        ("send", c_uint64),
+        ("recive", c_uint64),
+    ]
+
+class NetworksStaticInfoArray(Structure):
+    _fields_ = [
+        ("data", POINTER(NetworksStaticInfo)),
+        ("len", c_size_t),
+    ]
+
+# Снимок одним вызовом get_system_snapshot (см. dll2/src/lib.rs): заголовок,
+# массивы дисков, сетей и процессов и пул строк в буфере вызывающего
+SNAPSHOT_MAGIC = 0x53534D54
+SNAPSHOT_VERSION = 1
+SNAPSHOT_OK = 0
+SNAPSHOT_TOO_SMALL = 1
+# Источник монитора → раздел снимка
+SNAPSHOT_SECTIONS = {'cpu': 1, 'memory': 2, 'disks': 4, 'networks': 8, 'processes': 16}
+# Начальный размер буфера снимка; при нехватке он растёт с запасом
+SNAPSHOT_BUFFER_SIZE = 1 << 20
+
+class SnapshotString(Structure):
+    _fields_ = [
+        ("offset", c_uint32),
+        ("len", c_uint32),
+    ]
+
+class SnapshotHeader(Structure):
+    _fields_ = [
+        ("magic", c_uint32),
+        ("version", c_uint32),
+        ("sections", c_uint32),
+        ("cpu_usage", c_float),
+        ("size", c_uint64),
+        ("cpu_frequency", c_double),
+        ("core_count", c_uint64),
+        ("work_time", c_uint64),
+        ("process_count", c_uint64),
+        ("memory_total", c_uint64),
+        ("memory_used", c_uint64),
+        ("memory_available", c_uint64),
+        ("memory_speed", c_uint64),
+        ("cpu_brand", SnapshotString),
+        ("memory_format", SnapshotString),
+        ("disks_offset", c_uint32),
+        ("disks_len", c_uint32),
+        ("networks_offset", c_uint32),
+        ("networks_len", c_uint32),
+        ("processes_offset", c_uint32),
+        ("processes_len", c_uint32),
+        ("strings_offset", c_uint32),
+        ("strings_len", c_uint32),
+    ]
+
+class SnapshotDisk(Structure):
+    _fields_ = [
+        ("name", SnapshotString),
+        ("total_space", c_uint64),
+        ("available_space", c_uint64),
+    ]
+
+class SnapshotNetwork(Structure):
+    _fields_ = [
+        ("name", SnapshotString),
+        ("ipv4", SnapshotString),
+        ("send", c_uint64),
+        ("recive", c_uint64),
+    ]
+
+# Типы полей совпадают со столбцами ProcessTable: столбцы режутся без преобразования
+class SnapshotProcess(Structure):
+    _fields_ = [
+        ("pid", c_int64),
+        ("ppid", c_int64),
+        ("name", SnapshotString),
+        ("cpu_usage", c_double),
+        ("memory_mb", c_double),
+        ("read_kb", c_double),
+        ("written_kb", c_double),
+        ("start_time", c_double),
+    ]
+
+
+class SystemSnapshotBuffer:
+    """Буфер для get_system_snapshot, переиспользуемый между тактами.
+
+    `read(sections)` делает один вызов в библиотеку (одно обновление под
+    одной блокировкой) и возвращает заголовок; разделы разбираются методами
+    `cpu`, `memory`, `disks`, `networks` и `processes` до следующего `read`.
+    Если буфера не хватило, он увеличивается с запасом и вызов повторяется.
+    """
+
+    def __init__(self, function, size: int = SNAPSHOT_BUFFER_SIZE, names: Optional[NameCache] = None):
+        self.function = function
+        self.names = names if names is not None else NameCache()
+        self.calls = 0
+        self._buffer = ctypes.create_string_buffer(size)
+        self._written = c_size_t()
+        self._strings = b""
+        self.header: Optional[SnapshotHeader] = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def read(self, sections: int) -> SnapshotHeader:
+        while True:
+            self.calls += 1
+            result = self.function(sections, self._buffer, len(self._buffer), ctypes.byref(self._written))
+            if result != SNAPSHOT_TOO_SMALL:
+                break
+            self._buffer = ctypes.create_string_buffer(self._written.value + self._written.value // 4)
+        if result != SNAPSHOT_OK:
+            raise RuntimeError(f"get_system_snapshot failed: {result}")
+        header = SnapshotHeader.from_buffer_copy(self._buffer)
+        if header.magic != SNAPSHOT_MAGIC or header.version != SNAPSHOT_VERSION:
+            raise RuntimeError(f"unsupported snapshot format: {header.magic:#x} v{header.version}")
+        start = header.strings_offset
+        self._strings = self._buffer.raw[start:start + header.strings_len] if header.strings_len else b""
+        self.header = header
+        return header
+
+    def _text(self, value: SnapshotString) -> str:
+        return self._strings[value.offset:value.offset + value.len].decode('utf-8', 'replace')
+
+    def _records(self, struct_type, offset: int, length: int):
+        return (struct_type * length).from_buffer(self._buffer, offset)
+
+    def cpu(self) -> Dict:
+        header = self.header
+        return {
+            'brand': self._text(header.cpu_brand),
+            'usage': header.cpu_usage,
+            'frequency': header.cpu_frequency,
+            'core_count': header.core_count,
+            'work_time': header.work_time,
+            'process_count': header.process_count,
+        }
+
+    def memory(self) -> Dict:
+        header = self.header
+        return {
+            'total': header.memory_total,
+            'used': header.memory_used,
+            'available': header.memory_available,
+            'speed': header.memory_speed,
+            'format': self._text(header.memory_format) or "Unknown",
+        }
+
+    def disks(self) -> List[Dict]:
+        header = self.header
+        return [{'name': self._text(disk.name), 'total_space': disk.total_space,
+                 'available_space': disk.available_space}
+                for disk in self._records(SnapshotDisk, header.disks_offset, header.disks_len)]
+
+    def networks(self) -> List[Dict]:
+        header = self.header
+        return [{'name': self._text(network.name), 'ipv4': self._text(network.ipv4),
+                 'send': network.send, 'recive': network.recive}
+                for network in self._records(SnapshotNetwork, header.networks_offset, header.networks_len)]
+
+    def processes(self) -> ProcessTable:
+        """Столбцы режутся из раздела процессов срезами memoryview, имена — из пула строк через кэш."""
+        header = self.header
+        length = header.processes_len
+        if not length:
+            return ProcessTable.empty()
+        start = header.processes_offset
+        raw = memoryview(self._buffer).cast('B')[start:start + length * ctypes.sizeof(SnapshotProcess)]
+        # Имя — пара (смещение, длина), читаемая одним 64-битным ключом. Библиотека
+        # кладёт одинаковые имена в пул один раз, поэтому декодируется каждое различное имя
+        keys = _struct_column(raw, SnapshotProcess, 'name', 'Q')
+        strings, names = self._strings, self.names
+        decoded = {key: names.get(strings[key & 0xFFFFFFFF:(key & 0xFFFFFFFF) + (key >> 32)])
+                   for key in dict.fromkeys(keys)}
+        name = tuple(map(decoded.__getitem__, keys))
+        return ProcessTable(
+            _struct_column(raw, SnapshotProcess, 'pid', 'q'), name,
+            *(_struct_column(raw, SnapshotProcess, column, 'd') for column in PROCESS_COLUMNS),
+            ppid=_struct_column(raw, SnapshotProcess, 'ppid', 'q'),
+            start_time=_struct_column(raw, SnapshotProcess, 'start_time', 'd'),
+        )
+
+
+# Таблица процессов фонового сборщика (см. dll2/src/process_table.rs): двойной
+# буфер столбцов с номером поколения, закрепляемый без копирования в библиотеке
+TABLE_OK = 0
+TABLE_TOO_SMALL = 1
+TABLE_EMPTY = 2
+
+
+class ProcessTableView(Structure):
+    _fields_ = [
+        ("generation", c_uint64),
+        ("len", c_uint64),
+        ("pid", c_void_p),
+        ("ppid", c_void_p),
+        ("name", c_void_p),
+        ("cpu_usage", c_void_p),
+        ("memory_mb", c_void_p),
+        ("read_kb", c_void_p),
+        ("written_kb", c_void_p),
+        ("start_time", c_void_p),
+        ("changed", c_void_p),
+        ("names", c_void_p),
+        ("name_offsets", c_void_p),
+        ("names_len", c_uint64),
+        ("names_epoch", c_uint64),
+        ("slot", c_uint64),
+    ]
+
+
+class ProcessChanges(Structure):
+    _fields_ = [
+        ("generation", c_uint64),
+        ("full", c_uint32),
+        ("rows_len", c_uint32),
+        ("removed_len", c_uint32),
+        ("reserved", c_uint32),
+    ]
+
+
+def _view_column(pointer: Optional[int], length: int, fmt: str) -> memoryview:
+    """Столбец закреплённого буфера без копирования; действителен до release."""
+    if not length:
+        return memoryview(array(fmt))
+    size = length * array(fmt).itemsize
+    return memoryview((ctypes.c_char * size).from_address(pointer)).cast('B').cast(fmt)
+
+
+class CollectorTable:
+    """Чтение таблицы сборщика процессов из библиотеки.
+
+    `read()` закрепляет передний буфер, копирует столбцы (по одному memcpy
+    на столбец) и сразу снимает закрепление; если поколение не сменилось,
+    библиотека не закрепляется вовсе. Имена приходят номерами: таблица имён
+    копится здесь и догоняется только новыми именами, пока не сменилась
+    names_epoch. `changes(since)` отдаёт только строки, изменившиеся после
+    поколения `since`, и PID исчезнувших процессов.
+    """
+
+    def __init__(self, dll, names: Optional[NameCache] = None):
+        self.dll = dll
+        self.names = names if names is not None else NameCache()
+        self.generation = 0
+        self.acquired = 0
+        self._view = ProcessTableView()
+        self._changes = ProcessChanges()
+        self._rows = array('I')
+        self._removed = array('q')
+        self._names: List[str] = []
+        self._epoch = None
+        # Таблица последнего прочитанного поколения
+        self._latest: Optional[ProcessTable] = None
+
+    def _acquire(self) -> bool:
+        status = self.dll.acquire_process_table(ctypes.byref(self._view))
+        if status == TABLE_EMPTY:
+            return False
+        if status != TABLE_OK:
+            raise RuntimeError(f"acquire_process_table failed: {status}")
+        self.acquired += 1
+        return True
+
+    def _release(self):
+        self.dll.release_process_table(ctypes.byref(self._view))
+
+    def _sync_names(self):
+        view = self._view
+        if view.names_epoch != self._epoch:
+            self._names = []
+            self._epoch = view.names_epoch
+        known = len(self._names)
+        if view.names_len <= known:
+            return
+        offsets = _view_column(view.name_offsets, view.names_len + 1, 'I')
+        start = offsets[known]
+        blob = ctypes.string_at(view.names + start, offsets[-1] - start) if offsets[-1] > start else b""
+        get = self.names.get
+        self._names.extend(get(blob[begin - start:end - start])
+                           for begin, end in zip(offsets[known:-1], offsets[known + 1:]))
+
+    def _table(self, columns, rows=None) -> ProcessTable:
+        """Таблица из столбцов; `rows` — взять только эти строки."""
+        if rows is not None:
+            columns = [array(column.format, map(column.__getitem__, rows)) for column in columns]
+        pid, ppid, name, cpu_usage, memory_mb, read_kb, written_kb, start_time = columns
+        return ProcessTable(pid, tuple(map(self._names.__getitem__, name)), cpu_usage, memory_mb, read_kb,
+                            written_kb, ppid=ppid, start_time=start_time)
+
+    def _view_columns(self):
+        view = self._view
+        length = view.len
+        return (_view_column(view.pid, length, 'q'), _view_column(view.ppid, length, 'q'),
+                _view_column(view.name, length, 'I'),
+                *(_view_column(getattr(view, column), length, 'd') for column in PROCESS_COLUMNS),
+                _view_column(view.start_time, length, 'd'))
+
+    def read(self) -> Optional[ProcessTable]:
+        """Последнее поколение сборщика; None, если он ещё ничего не опубликовал.
+
+        Каждый вызов возвращает новый ProcessTable (монитор дописывает в него
+        скорости), но столбцы и имена одного поколения общие.
+        """
+        if self._latest is None or self.dll.get_process_table_generation() != self.generation:
+            if not self._acquire():
+                return None
+            try:
+                self._sync_names()
+                columns = self._view_columns()
+                self._latest = self._table(tuple(array(column.format, column.tobytes()) for column in columns))
+                self.generation = self._view.generation
+            finally:
+                self._release()
+        latest = self._latest
+        return ProcessTable(latest.pid, latest.name, latest.cpu_usage, latest.memory_mb, latest.read_kb,
+                            latest.written_kb, ppid=latest.ppid, start_time=latest.start_time)
+
+    def changes(self, since: int) -> Optional[Dict]:
+        """Изменения после поколения `since`: generation, full, table (изменённые и новые строки), removed.
+
+        full=True — `since` слишком старое (или 0), и в table все строки.
+        """
+        if not self._acquire():
+            return None
+        try:
+            while True:
+                status = self.dll.get_process_changes(
+                    ctypes.byref(self._view), since, self._rows.buffer_info()[0], len(self._rows),
+                    self._removed.buffer_info()[0], len(self._removed), ctypes.byref(self._changes))
+                if status != TABLE_TOO_SMALL:
+                    break
+                changes = self._changes
+                if changes.rows_len > len(self._rows):
+                    self._rows = array('I', bytes(4 * changes.rows_len))
+                if changes.removed_len > len(self._removed):
+                    self._removed = array('q', bytes(8 * changes.removed_len))
+            if status != TABLE_OK:
+                raise RuntimeError(f"get_process_changes failed: {status}")
+            changes = self._changes
+            self._sync_names()
+            rows = self._rows[:changes.rows_len]
+            return {
+                'generation': changes.generation,
+                'full': bool(changes.full),
+                'table': self._table(self._view_columns(), rows),
+                'removed': self._removed[:changes.removed_len],
+            }
+        finally:
+            self._release()
+
+
+class DllBackend(MetricsBackend):
+    """Бэкенд поверх Rust-библиотеки sys_info_fn через ctypes."""
+    name = "dll"
+
+    def __init__(self, dll_path: str = DEFAULT_DLL_PATH, collector_interval: float = 1.0):
+        try:
+            self.dll = ctypes.CDLL(dll_path)
+        except Exception as e:
+            print(f"Error loading DLL: {e}")
+            raise
+        self._name_cache = NameCache()
+        self.collector_interval = collector_interval
+        self._collecting = False
+        self._setup_dll_functions()
+        # Разделы последнего снимка, ещё не отданные монитору
+        self._prepared = set()
+
+    def _setup_dll_functions(self):
+        self.dll.get_cpu_static_info.restype = POINTER(CpuStaticInfo)
+        self.dll.get_memory_static_info.restype = MemoryStaticInfo
+        self.dll.get_process_info_array.restype = ProcessInfoArray
+        self.dll.get_disk_static_info_array.restype = DiskStaticInfoArray
+        self.dll.get_networks_static_info_array.restype = NetworksStaticInfoArray
+        self.dll.get_services_info_array.restype = ServiceInfoArray
+
+        self.dll.start_process_collector.restype = c_int
+        self.dll.stop_process_collector.restype = c_int
+        self.dll.kill_process.argtypes = [c_uint32]
+        self.dll.kill_process.restype = c_int
+        self.dll.get_proc_path.argtypes = [c_uint32]
+        # c_void_p, а не c_char_p: указатель нужен, чтобы вернуть строку в free_string
+        self.dll.get_proc_path.restype = c_void_p
+        self.dll.free_string.argtypes = [c_void_p]
+        self.dll.free_string.restype = None
+
+        # Библиотеки без get_system_snapshot опрашиваются по функции на метрику
+        self.snapshot = None
+        if hasattr(self.dll, 'get_system_snapshot'):
+            self.dll.get_system_snapshot.argtypes = [c_uint32, c_void_p, c_size_t, POINTER(c_size_t)]
+            self.dll.get_system_snapshot.restype = c_int
+            self.snapshot = SystemSnapshotBuffer(self.dll.get_system_snapshot, names=self._name_cache)
+
+        # Таблица сборщика читается без копий в библиотеке, если она это умеет
+        self.collector_table = None
+        if hasattr(self.dll, 'acquire_process_table'):
+            self.dll.set_process_collector_interval.argtypes = [c_uint64]
+            self.dll.set_process_collector_interval.restype = ctypes.c_bool
+            self.dll.get_process_table_generation.restype = c_uint64
+            self.dll.acquire_process_table.argtypes = [POINTER(ProcessTableView)]
+            self.dll.acquire_process_table.restype = c_int
+            self.dll.release_process_table.argtypes = [POINTER(ProcessTableView)]
+            self.dll.release_process_table.restype = None
+            self.dll.get_process_changes.argtypes = [POINTER(ProcessTableView), c_uint64, c_void_p, c_size_t,
+                                                     c_void_p, c_size_t, POINTER(ProcessChanges)]
+            self.dll.get_process_changes.restype = c_int
+            self.collector_table = CollectorTable(self.dll, self._name_cache)
+
+    def start(self):
+        self.set_collector_interval(self.collector_interval)
+        self.dll.start_process_collector()
+        self._collecting = True
+
+    def stop(self):
+        self._collecting = False
+        self.dll.stop_process_collector()
+
+    def set_collector_interval(self, seconds: float) -> bool:
+        """Интервал фонового сборщика процессов; False, если библиотека его не настраивает."""
+        self.collector_interval = seconds
+        if self.collector_table is None:
+            return False
+        return bool(self.dll.set_process_collector_interval(max(10, int(seconds * 1000))))
+
+    def _collected(self) -> Optional[ProcessTable]:
+        if self.collector_table is None or not self._collecting:
+            return None
+        return self.collector_table.read()
+
+    def get_process_changes(self, since: int) -> Optional[Dict]:
+        """Строки сборщика, изменившиеся после поколения `since` (см. CollectorTable.changes)."""
+        if self.collector_table is None or not self._collecting:
+            return None
+        return self.collector_table.changes(since)
+
+    def prepare(self, sources: Iterable[str]):
+        """Все разделы такта — одним вызовом get_system_snapshot."""
+        if self.snapshot is None:
+            return
+        sections = 0
+        for name in sources:
+            # Процессы запущенного сборщика берутся из его таблицы (см. get_processes)
+            if name == 'processes' and self.collector_table is not None and self._collecting:
+                continue
+            sections |= SNAPSHOT_SECTIONS.get(name, 0)
+        if sections:
+            self.snapshot.read(sections)
+            self._prepared = {name for name, flag in SNAPSHOT_SECTIONS.items() if sections & flag}
+
+    def _section(self, name: str) -> bool:
+        """Готовит раздел снимка: из общего вызова такта или отдельным вызовом."""
+        if self.snapshot is None:
+            return False
+        if name in self._prepared:
+            self._prepared.discard(name)
+        else:
+            self.snapshot.read(SNAPSHOT_SECTIONS[name])
+        return True
+
+    def get_cpu_info(self) -> Dict:
+        if self._section('cpu'):
+            return self.snapshot.cpu()
+        cpu_info_ptr = self.dll.get_cpu_static_info()
+        cpu_info = cpu_info_ptr.contents
+        info = {
+            'brand': cpu_info.brand.decode('utf-8'),
+            'usage': cpu_info.usage,
+            'frequency': cpu_info.frequency,
+            'core_count': cpu_info.core_count,
+            'work_time': cpu_info.work_time,
+            'process_count': cpu_info.process
+        }
+        self.dll.free_cpu_static_info(cpu_info_ptr)
+        return info
+
+    def get_memory_info(self) -> Dict:
+        if self._section('memory'):
+            return self.snapshot.memory()
+        memory_info = self.dll.get_memory_static_info()
+        info = {
+            'total': memory_info.total,
+            'used': memory_info.used,
+            'available': memory_info.available,
+            'speed': memory_info.speed,
+            'format': memory_info.format.decode('utf-8') if memory_info.format else "Unknown"
+        }
+        return info
+
+    def get_processes(self) -> ProcessTable:
+        table = self._collected()
+        if table is not None:
+            return table
+        if self._section('processes'):
+            return self.snapshot.processes()
+        # Массив из DLL копируется один раз и раскладывается по столбцам
+        process_array = self.dll.get_process_info_array()
+        try:
+            return ProcessTable.from_struct_array(process_array.data, process_array.len, self._name_cache)
+        finally:
+            self.dll.free_process_info_array(process_array)
+
+    def get_disks(self) -> List[Dict]:
+        if self._section('disks'):
+            return self.snapshot.disks()
+        disk_array = self.dll.get_disk_static_info_array()
+        disks = []
+        for i in range(disk_array.len):
+            disk = disk_array.data[i]
+            disks.append({
+                'name': disk.name.decode('utf-8'),
+                'total_space': disk.total_space,
+                'available_space': disk.available_space
+            })
+        self.dll.free_disk_static_info_array(disk_array)
+        return disks
+
+    def get_networks(self) -> List[Dict]:
+        if self._section('networks'):
+            return self.snapshot.networks()
+        network_array = self.dll.get_networks_static_info_array()
+        networks = []
+        for i in range(network_array.len):
+            network = network_array.data[i]
+            networks.append({
+                'name': network.name.decode('utf-8'),
+                'ipv4': network.ipv4.decode('utf-8') if network.ipv4 else "",
+                'send': network.send,
+                'recive': network.recive
+            })
+        self.dll.free_networks_static_info_array(network_array)
+        return networks
+
+    def get_services(self) -> List[Dict]:
+        services_array = self.dll.get_services_info_array()
+        services = []
+        for i in range(services_array.len):
+            service = services_array.data[i]
+            services.append({
+                'process_id': service.process_id,
+                'name': service.name.decode('utf-8') if service.name else "Unknown",
+                'status': service.status.decode('utf-8') if service.status else "Unknown"
+            })
+        self.dll.free_services_info_array(services_array)
+        return services
+
+    def kill_process(self, pid: int) -> bool:
+        result = self.dll.kill_process(pid)
+        return result == 0
+
+    def get_proc_path(self, pid: int) -> str:
+        path_ptr = self.dll.get_proc_path(pid)
+        if not path_ptr:
+            return "NULL"
+        try:
+            return ctypes.string_at(path_ptr).decode("utf-8", "replace")
+        finally:
+            self.dll.free_string(path_ptr)
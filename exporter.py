@@ -0,0 +1,273 @@
+import asyncio
+import json
+import math
+from typing import Callable, Dict, Optional, Tuple
+
+from snapshot import PROCESS_KEYS, SystemSnapshot
+
+# Снимок берётся у источника (обычно SystemMonitor.get_snapshot)
+SnapshotSource = Callable[[], Optional[SystemSnapshot]]
+
+JSON_TYPE = "application/json"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Предел заголовков запроса: экспортёр отдаёт только GET без тела
+MAX_HEADER_SIZE = 16384
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def render_system_json(snapshot: SystemSnapshot) -> bytes:
+    """Системный вид: сводные метрики в процентах, исходные значения источников и «горячие точки»."""
+    return _dumps({
+        'generation': snapshot.generation,
+        'timestamp': snapshot.timestamp,
+        'metrics': snapshot.metrics(),
+        'cpu': snapshot.cpu,
+        'memory': snapshot.memory,
+        'disks': snapshot.disks,
+        'disk_io': snapshot.disk_io,
+        'networks': snapshot.networks,
+        'gpu': snapshot.gpu,
+        'process_count': len(snapshot.processes),
+        'hotspots': snapshot.hotspots,
+    })
+
+
+def render_processes_json(snapshot: SystemSnapshot) -> bytes:
+    """Таблица процессов столбцами наружу: имена полей один раз, строки — массивами значений."""
+    processes = snapshot.processes
+    columns = [getattr(processes, key) for key in PROCESS_KEYS]
+    return _dumps({
+        'generation': snapshot.generation,
+        'timestamp': snapshot.timestamp,
+        'columns': PROCESS_KEYS,
+        'rows': list(zip(*columns)),
+    })
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _number(value) -> str:
+    if value is None:
+        return "NaN"
+    if isinstance(value, int):
+        return str(value)
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class _Exposition:
+    """Текст в формате Prometheus: у каждой метрики один блок HELP/TYPE и её выборки."""
+
+    def __init__(self):
+        self.lines = []
+
+    def metric(self, name: str, help_text: str, samples, kind: str = 'gauge'):
+        samples = list(samples)
+        if not samples:
+            return
+        self.lines.append(f"# HELP taskmanager_{name} {help_text}")
+        self.lines.append(f"# TYPE taskmanager_{name} {kind}")
+        for labels, value in samples:
+            if labels:
+                label_text = ",".join(f'{key}="{_escape_label(label)}"' for key, label in labels.items())
+                self.lines.append(f"taskmanager_{name}{{{label_text}}} {_number(value)}")
+            else:
+                self.lines.append(f"taskmanager_{name} {_number(value)}")
+
+    def render(self) -> bytes:
+        return ("\n".join(self.lines) + "\n").encode('utf-8')
+
+
+def render_prometheus(snapshot: SystemSnapshot) -> bytes:
+    """Системные метрики и первые места процессов (не вся таблица — иначе число рядов не ограничено)."""
+    out = _Exposition()
+    metrics = snapshot.metrics()
+    out.metric('snapshot_generation', "Номер снимка монитора.", [({}, snapshot.generation)], 'counter')
+    out.metric('snapshot_timestamp_seconds', "Время снимка, секунды эпохи.", [({}, snapshot.timestamp)])
+    out.metric('cpu_usage_percent', "Загрузка ЦП.", [({}, metrics['cpu'])])
+    out.metric('memory_usage_percent', "Занятая память.", [({}, metrics['memory'])])
+    out.metric('memory_total_bytes', "Всего памяти.",
+               [({}, snapshot.memory['total'])] if 'total' in snapshot.memory else [])
+    out.metric('memory_available_bytes', "Доступная память.",
+               [({}, snapshot.memory['available'])] if 'available' in snapshot.memory else [])
+    out.metric('processes', "Число процессов.", [({}, len(snapshot.processes))])
+    out.metric('disk_total_bytes', "Размер диска.",
+               (({'disk': disk['name']}, disk['total_space']) for disk in snapshot.disks))
+    out.metric('disk_available_bytes', "Свободно на диске.",
+               (({'disk': disk['name']}, disk['available_space']) for disk in snapshot.disks))
+    out.metric('disk_read_bytes_per_second', "Скорость чтения устройства.",
+               (({'device': disk['name']}, disk['read_speed']) for disk in snapshot.disk_io))
+    out.metric('disk_write_bytes_per_second', "Скорость записи устройства.",
+               (({'device': disk['name']}, disk['write_speed']) for disk in snapshot.disk_io))
+    out.metric('disk_active_percent', "Доля времени с запросами в работе.",
+               (({'device': disk['name']}, disk['active']) for disk in snapshot.disk_io
+                if disk.get('active') is not None))
+    out.metric('network_send_bytes_per_second', "Скорость передачи интерфейса.",
+               (({'interface': network['name']}, network['send_speed']) for network in snapshot.networks))
+    out.metric('network_receive_bytes_per_second', "Скорость приёма интерфейса.",
+               (({'interface': network['name']}, network['recv_speed']) for network in snapshot.networks))
+    if snapshot.gpu:
+        out.metric('gpu_load_percent', "Загрузка GPU.", [({'gpu': snapshot.gpu.get('name', '')}, metrics['gpu'])])
+    hotspots = snapshot.hotspots
+    out.metric('process_cpu_percent', "Загрузка ЦП процессом (первые места).",
+               (({'pid': row['pid'], 'name': row['name']}, row['cpu_usage']) for row in hotspots.get('cpu', ())))
+    out.metric('process_memory_megabytes', "Память процесса (первые места).",
+               (({'pid': row['pid'], 'name': row['name']}, row['memory_mb']) for row in hotspots.get('memory', ())))
+    out.metric('process_disk_kilobytes_per_second', "Ввод-вывод процесса (первые места).",
+               (({'pid': row['pid'], 'name': row['name']}, row['disk_rate']) for row in hotspots.get('io', ())))
+    return out.render()
+
+
+# Путь → (отрисовка, тип содержимого)
+VIEWS = {
+    '/api/system': (render_system_json, JSON_TYPE),
+    '/api/processes': (render_processes_json, JSON_TYPE),
+    '/metrics': (render_prometheus, PROMETHEUS_TYPE),
+}
+
+
+class ResponseCache:
+    """Сериализованные ответы по поколению снимка.
+
+    Каждый вид отрисовывается не больше одного раза на снимок, сколько бы
+    клиентов его ни запрашивало; `renders` считает отрисовки.
+    """
+
+    def __init__(self, source: SnapshotSource):
+        self.source = source
+        self.renders = 0
+        self._cache: Dict[str, Tuple[int, bytes]] = {}
+
+    def get(self, path: str) -> Optional[Tuple[int, bytes]]:
+        """(поколение, тело ответа) для пути из VIEWS или None, если снимка ещё нет."""
+        snapshot = self.source()
+        if snapshot is None:
+            return None
+        cached = self._cache.get(path)
+        if cached is None or cached[0] != snapshot.generation:
+            render, _ = VIEWS[path]
+            cached = self._cache[path] = (snapshot.generation, render(snapshot))
+            self.renders += 1
+        return cached
+
+
+def _response(status: str, content_type: str, body: bytes, keep_alive: bool, head: bool = False,
+              extra: Tuple[Tuple[str, str], ...] = ()) -> bytes:
+    lines = [f"HTTP/1.1 {status}", f"Content-Type: {content_type}", f"Content-Length: {len(body)}",
+             "Connection: keep-alive" if keep_alive else "Connection: close"]
+    lines.extend(f"{name}: {value}" for name, value in extra)
+    header = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+    return header if head else header + body
+
+
+class MetricsServer:
+    """Локальный HTTP-сервер на asyncio: JSON по /api/system и /api/processes, Prometheus по /metrics.
+
+    Соединения keep-alive; ETag — поколение снимка, поэтому клиент с
+    If-None-Match получает 304 без тела, пока снимок не сменится.
+    """
+
+    def __init__(self, source: SnapshotSource, host: str = "127.0.0.1", port: int = 9100):
+        self.host = host
+        self.port = port
+        self.cache = ResponseCache(source)
+        self.requests = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER_SIZE)
+        # При port=0 порт выбирает система
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def respond(self, method: str, target: str, headers: Dict[str, str], keep_alive: bool) -> bytes:
+        """Ответ на разобранный запрос (без сети, удобно для тестов)."""
+        self.requests += 1
+        path = target.split('?', 1)[0]
+        if path == '/':
+            path = '/api/system'
+        if path not in VIEWS:
+            return _response("404 Not Found", "text/plain", b"not found\n", keep_alive)
+        if method not in ('GET', 'HEAD'):
+            return _response("405 Method Not Allowed", "text/plain", b"method not allowed\n", keep_alive,
+                             extra=(("Allow", "GET, HEAD"),))
+        cached = self.cache.get(path)
+        if cached is None:
+            return _response("503 Service Unavailable", "text/plain", b"no snapshot yet\n", keep_alive,
+                             extra=(("Retry-After", "1"),))
+        generation, body = cached
+        etag = f'"{generation}"'
+        extra = (("ETag", etag), ("X-Snapshot-Generation", str(generation)), ("Cache-Control", "no-cache"))
+        if headers.get('if-none-match') == etag:
+            return _response("304 Not Modified", VIEWS[path][1], b"", keep_alive, head=True, extra=extra)
+        return _response("200 OK", VIEWS[path][1], body, keep_alive, head=method == 'HEAD', extra=extra)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    raw = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = raw.decode('latin-1').split("\r\n")
+                parts = lines[0].split()
+                if len(parts) != 3:
+                    writer.write(_response("400 Bad Request", "text/plain", b"bad request\n", False))
+                    break
+                method, target, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0) or 0)
+                if length:
+                    await reader.readexactly(length)
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                writer.write(self.respond(method, target, headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def run_headless(monitor, host: str = "127.0.0.1", port: int = 9100, update_interval: float = 2.0):
+    """Монитор без окна: сбор в фоне и экспорт последнего снимка по HTTP до Ctrl+C."""
+    server = MetricsServer(monitor.get_snapshot, host, port)
+
+    async def serve():
+        await server.start()
+        print(f"Serving metrics on http://{server.host}:{server.port}/ (/api/system, /api/processes, /metrics)")
+        await server.serve_forever()
+
+    monitor.start_monitoring(update_interval=update_interval)
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop_monitoring()
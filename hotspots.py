@@ -0,0 +1,178 @@
+import heapq
+import time
+from collections import deque
+from itertools import compress, islice, repeat
+from math import sqrt
+from operator import ge, not_
+from typing import Dict, List, Optional, Set, Tuple
+
+from snapshot import ProcessTable
+
+# Рейтинги «горячих точек»: название → столбец таблицы процессов
+TOP_COLUMNS = {'cpu': 'cpu_usage', 'memory': 'memory_mb', 'io': 'disk_rate'}
+# Поля строки рейтинга и всплеска
+HOTSPOT_KEYS = ('pid', 'name', 'cpu_usage', 'memory_mb', 'disk_rate')
+
+
+def _row(table: ProcessTable, index: int) -> Dict:
+    return {key: getattr(table, key)[index] for key in HOTSPOT_KEYS}
+
+
+class TopN:
+    """Первые `count` процессов по столбцу, без полной сортировки таблицы.
+
+    Порог — значение последнего места на прошлом снимке с запасом `SLACK`:
+    если на новом снимке не меньше `count` строк не ниже порога, истинные
+    первые места гарантированно среди них, и куча строится только по ним.
+    Иначе — по всей таблице. Нулевой порог (активных процессов меньше
+    `count`) заменяется отбором ненулевых строк, а недостающие места
+    занимают первые нулевые — значения столбца не бывают отрицательными.
+    При равных значениях раньше идёт строка, стоящая раньше в снимке.
+    """
+
+    SLACK = 0.9
+
+    def __init__(self, column: str, count: int = 20):
+        self.column = column
+        self.count = count
+        self._threshold: Optional[float] = None
+
+    def update(self, table: ProcessTable) -> List[int]:
+        """Номера строк `table` в порядке убывания значения."""
+        values = getattr(table, self.column)
+        rows = range(len(values))
+        top = None
+        if self._threshold is not None:
+            if self._threshold > 0:
+                candidates = list(compress(rows, map(ge, values, repeat(self._threshold))))
+            else:
+                candidates = list(compress(rows, values))
+                if len(candidates) < self.count:
+                    top = heapq.nlargest(self.count, candidates, key=values.__getitem__)
+                    top += islice(compress(rows, map(not_, values)), self.count - len(top))
+            if len(candidates) >= self.count:
+                rows = candidates
+        if top is None:
+            top = heapq.nlargest(self.count, rows, key=values.__getitem__)
+        # Запас на случай, если значения первых мест к следующему снимку немного упадут
+        self._threshold = values[top[-1]] * self.SLACK if len(top) == self.count else None
+        return top
+
+
+class SpikeDetector:
+    """Всплески столбца по процессам: отклонение от EWMA больше `z` стандартных отклонений.
+
+    Среднее и дисперсия хранятся только для процессов, у которых значение
+    недавно было ненулевым, — простаивающие (обычно большинство) не стоят
+    ничего: их среднее и дисперсия считаются нулевыми. Ненулевые строки
+    отбираются compress по столбцу, остальные отслеживаемые процессы
+    затухают к нулю и забываются. Новый процесс (его не было в прошлом
+    снимке) набирает `warmup` замеров, прежде чем может дать всплеск.
+
+    Коэффициент сглаживания зависит от интервала, как в rates.CounterRates.
+    Всплеском считается значение не меньше `min_value`, превышающее среднее
+    больше чем на z·max(σ, `noise`); о продолжающемся всплеске сообщается один раз.
+    """
+
+    def __init__(self, column: str, z: float = 4.0, noise: float = 1.0, min_value: float = 5.0,
+                 half_life: float = 30.0, warmup: int = 3):
+        self.column = column
+        self.z = z
+        self.noise = noise
+        self.min_value = min_value
+        self.half_life = half_life
+        self.warmup = warmup
+        # Ниже этого среднего и σ простаивающий процесс перестаёт отслеживаться
+        self._floor = noise * 0.01
+        self._table: Optional[ProcessTable] = None
+        self._timestamp = 0.0
+        # (pid, время запуска) → [среднее, дисперсия, число замеров]
+        self._state: Dict[Tuple[int, float], List] = {}
+        self._spiking: Set[Tuple[int, float]] = set()
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def update(self, table: ProcessTable, timestamp: float) -> List[Dict]:
+        """Учитывает снимок; возвращает новые всплески (строки процессов с value, mean, z)."""
+        values = getattr(table, self.column)
+        pids, starts = table.pid, table.start_time
+        previous = self._table
+        elapsed = timestamp - self._timestamp if previous is not None else 0.0
+        active = compress(range(len(values)), values)
+        if elapsed <= 0:
+            if previous is None:
+                self._state = {(pids[index], starts[index]): [values[index], 0.0, 1] for index in active}
+                self._table, self._timestamp = table, timestamp
+            return []
+
+        alpha = 1.0 - 0.5 ** (elapsed / self.half_life)
+        same = table.pid == previous.pid and table.start_time == previous.start_time
+        known = None
+        state, tracked, spikes, spiking = self._state, {}, [], set()
+        for index in active:
+            value = values[index]
+            key = (pids[index], starts[index])
+            entry = state.pop(key, None)
+            if entry is None:
+                if not same:
+                    if known is None:
+                        known = set(zip(previous.pid, previous.start_time))
+                    if key not in known:
+                        tracked[key] = [value, 0.0, 1]
+                        continue
+                # Процесс был в прошлом снимке и простаивал
+                entry = [0.0, 0.0, self.warmup]
+            mean, var, count = entry
+            diff = value - mean
+            if count >= self.warmup and value >= self.min_value and diff > self.z * self.noise:
+                sigma = max(sqrt(var), self.noise)
+                if diff > self.z * sigma:
+                    spiking.add(key)
+                    if key not in self._spiking:
+                        spike = _row(table, index)
+                        spike.update(column=self.column, value=value, mean=mean, z=diff / sigma)
+                        spikes.append(spike)
+            tracked[key] = [mean + alpha * diff, (1.0 - alpha) * (var + alpha * diff * diff), count + 1]
+
+        # Остальные отслеживаемые процессы сейчас простаивают или завершились
+        floor, floor_var = self._floor, self._floor ** 2
+        for key, (mean, var, count) in state.items():
+            var = (1.0 - alpha) * (var + alpha * mean * mean)
+            mean -= alpha * mean
+            if mean > floor or var > floor_var:
+                tracked[key] = [mean, var, count + 1]
+
+        self._state = tracked
+        self._spiking = spiking
+        self._table, self._timestamp = table, timestamp
+        return spikes
+
+
+class HotspotTracker:
+    """Первые места по ЦП, памяти и вводу-выводу и журнал всплесков.
+
+    Обновляется в потоке сбора на каждом снимке процессов; результат
+    `update` — небольшой словарь, который кладётся в снимок, чтобы вкладке
+    «Горячие точки» не нужна была вся таблица.
+    """
+
+    def __init__(self, count: int = 20, history: int = 50):
+        self.tops = {name: TopN(column, count) for name, column in TOP_COLUMNS.items()}
+        self.detectors = [
+            SpikeDetector('cpu_usage', noise=1.0, min_value=5.0),
+            # КБ/с: кратковременные чтения меньше мегабайта в секунду не интересны
+            SpikeDetector('disk_rate', noise=64.0, min_value=1024.0),
+        ]
+        self.spikes = deque(maxlen=history)
+
+    def update(self, table: ProcessTable, timestamp: float) -> Dict[str, List[Dict]]:
+        """timestamp — монотонное время снимка; у всплесков проставляется time.time()."""
+        hotspots = {name: [_row(table, index) for index in top.update(table)] for name, top in self.tops.items()}
+        now = time.time()
+        for detector in self.detectors:
+            for spike in detector.update(table, timestamp):
+                spike['time'] = now
+                self.spikes.appendleft(spike)
+        hotspots['spikes'] = list(self.spikes)
+        return hotspots
@@ -1,9 +1,45 @@
-import tkinter as tk
-from Frame import TaskManager
+import argparse
+from exporter import run_headless
+from recorder import RECORD_QUEUE, MetricsRecorder
+from remote import DEFAULT_AGENT_PORT, RemoteAggregator, parse_address, run_agent
+from system_monitor import SystemMonitor
 import sys
 import os
 
 def main():
+    parser = argparse.ArgumentParser(description="Task Manager")
+    parser.add_argument('--record', metavar='DIR', help="записывать снимки метрик в каталог DIR")
+    parser.add_argument('--headless', action='store_true',
+                        help="без окна: отдавать метрики по HTTP (JSON и Prometheus)")
+    parser.add_argument('--agent', action='store_true',
+                        help="без окна: раздавать снимки агрегатору по TCP (см. --agents)")
+    parser.add_argument('--agents', metavar='HOST:PORT,...',
+                        help="показать во вкладке «Хосты» агентов, запущенных с --agent")
+    parser.add_argument('--host', default="127.0.0.1", help="адрес сервера в режиме --headless или --agent")
+    parser.add_argument('--port', type=int, help="порт сервера (по умолчанию 9100 для --headless, "
+                                                 f"{DEFAULT_AGENT_PORT} для --agent)")
+    args = parser.parse_args()
+    if args.headless or args.agent:
+        monitor = SystemMonitor()
+        recorder = MetricsRecorder(args.record) if args.record else None
+        if recorder is not None:
+            monitor.register_callback(recorder.record, 'thread', RECORD_QUEUE)
+            print(f"Recording metrics to {args.record}")
+        try:
+            if args.agent:
+                run_agent(monitor, args.host, args.port or DEFAULT_AGENT_PORT)
+            else:
+                run_headless(monitor, args.host, args.port or 9100)
+        finally:
+            if recorder is not None:
+                monitor.unregister_callback(recorder.record)
+                recorder.close()
+        return
+    # Tk нужен только окну: на сервере без дисплея он не импортируется
+    import tkinter as tk
+    from Frame import TaskManager
+    recorder = None
+    aggregator = None
     try:
         print("Starting application...")
         print(f"Current directory: {os.getcwd()}")
@@ -12,7 +48,17 @@ def main():
         root = tk.Tk()
         print("Created Tk root window")
         
-        app = TaskManager(root)
+        monitor = SystemMonitor()
+        if args.record:
+            recorder = MetricsRecorder(args.record)
+            monitor.register_callback(recorder.record, 'thread', RECORD_QUEUE)
+            print(f"Recording metrics to {args.record}")
+
+        if args.agents:
+            aggregator = RemoteAggregator([parse_address(address) for address in args.agents.split(',')])
+            aggregator.start()
+
+        app = TaskManager(root, monitor, aggregator)
         print("Created TaskManager instance")
         
         root.mainloop()
@@ -21,6 +67,13 @@ def main():
         print(f"Error: {e}", file=sys.stderr)
         input("Press Enter to exit...")
         sys.exit(1)
+    finally:
+        if aggregator is not None:
+            aggregator.stop()
+        if recorder is not None:
+            monitor.stop_monitoring()
+            monitor.unregister_callback(recorder.record)
+            recorder.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
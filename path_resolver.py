@@ -0,0 +1,156 @@
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend import MetricsBackend
+
+# Ключ кэша: PID и время запуска — переиспользованный PID даёт другой ключ
+ProcessKey = Tuple[int, float]
+
+
+class PathResolver:
+    """Кэш путей и командных строк процессов с разрешением в фоне.
+
+    Записи хранятся по (pid, время запуска) и вытесняются по LRU, когда их
+    больше `capacity`. Промах в `get` не блокирует: ключ ставится в очередь,
+    и фоновый поток разрешает накопившиеся ключи пачкой, после чего вызывает
+    `on_resolved` со списком ключей (из своего потока). Если PID достался
+    новому процессу, старая запись удаляется при первом обращении по новому
+    ключу. `backend_lock`, если задан, держится на время каждого запроса к
+    бэкенду — так запросы путей не пересекаются со сбором метрик.
+    """
+
+    def __init__(self, backend: MetricsBackend, capacity: int = 4096, batch_size: int = 64,
+                 on_resolved: Optional[Callable[[List[ProcessKey]], None]] = None, backend_lock=None):
+        self.backend = backend
+        self.backend_lock = backend_lock
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.on_resolved = on_resolved
+        self._cache: "OrderedDict[ProcessKey, Dict[str, str]]" = OrderedDict()
+        self._keys_by_pid: Dict[int, ProcessKey] = {}
+        self._pending: "OrderedDict[ProcessKey, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+        self._running = False
+
+    # ---------- Кэш ----------
+
+    def _lookup(self, key: ProcessKey) -> Optional[Dict[str, str]]:
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            return entry
+        stale = self._keys_by_pid.get(key[0])
+        if stale is not None and stale != key:
+            # PID переиспользован: запись о прежнем процессе больше не нужна
+            self._cache.pop(stale, None)
+            self._pending.pop(stale, None)
+            del self._keys_by_pid[key[0]]
+        return None
+
+    def _store(self, key: ProcessKey, entry: Dict[str, str]):
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        self._keys_by_pid[key[0]] = key
+        while len(self._cache) > self.capacity:
+            old_key, _ = self._cache.popitem(last=False)
+            if self._keys_by_pid.get(old_key[0]) == old_key:
+                del self._keys_by_pid[old_key[0]]
+
+    def get(self, pid: int, start_time: float = 0.0) -> Optional[Dict[str, str]]:
+        """Путь и командная строка из кэша; при промахе ключ ставится в очередь и возвращается None."""
+        key = (pid, start_time)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None and key not in self._pending:
+                self._keys_by_pid[pid] = key
+                self._pending[key] = None
+                self._wake.notify()
+            return entry
+
+    def resolve(self, pid: int, start_time: float = 0.0) -> Dict[str, str]:
+        """Синхронно: из кэша или сразу через бэкенд (для одиночного запроса из GUI)."""
+        key = (pid, start_time)
+        with self._lock:
+            entry = self._lookup(key)
+        if entry is None:
+            entry = self._fetch(pid)
+            with self._lock:
+                self._store(key, entry)
+                self._pending.pop(key, None)
+        return entry
+
+    def _fetch(self, pid: int) -> Dict[str, str]:
+        with self.backend_lock or nullcontext():
+            return {'path': self.backend.get_proc_path(pid), 'cmdline': self.backend.get_proc_cmdline(pid)}
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    # ---------- Фоновое разрешение ----------
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _pop_batch(self) -> List[ProcessKey]:
+        # Вызывается под self._lock
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            batch.append(self._pending.popitem(last=False)[0])
+        return batch
+
+    def _take_batch(self) -> List[ProcessKey]:
+        with self._lock:
+            while self._running and not self._pending:
+                self._wake.wait()
+            return self._pop_batch()
+
+    def resolve_pending(self) -> List[ProcessKey]:
+        """Разрешает одну пачку из очереди в текущем потоке; возвращает разрешённые ключи."""
+        with self._lock:
+            batch = self._pop_batch()
+        return self._resolve_batch(batch)
+
+    def _resolve_batch(self, batch: List[ProcessKey]) -> List[ProcessKey]:
+        resolved = []
+        for key in batch:
+            try:
+                entry = self._fetch(key[0])
+            except Exception as e:
+                print(f"Error resolving path of {key[0]}: {e}")
+                continue
+            with self._lock:
+                # Пока шёл запрос, PID мог достаться другому процессу
+                if self._keys_by_pid.get(key[0]) == key:
+                    self._store(key, entry)
+                    resolved.append(key)
+        if resolved and self.on_resolved is not None:
+            self.on_resolved(resolved)
+        return resolved
+
+    def _loop(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            self._resolve_batch(batch)
+
+    def request(self, keys: Iterable[ProcessKey]):
+        """Ставит в очередь ключи, которых нет в кэше (например, все видимые строки)."""
+        for pid, start_time in keys:
+            self.get(pid, start_time)
@@ -0,0 +1,448 @@
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import time
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from backend import MetricsBackend
+from snapshot import NameCache, ProcessTable
+
+CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+# Пулы для чтения процессов: потоки или процессы (см. ProcBackend)
+POOL_KINDS = ('thread', 'process')
+# Меньше процессов читается без пула: раздача по работникам дороже самого чтения
+PARALLEL_MIN_PIDS = 512
+# Частей на работника: короткие части выравнивают нагрузку, когда работники неравны
+CHUNKS_PER_WORKER = 4
+
+
+def _read(path: str, size: int = 65536) -> bytes:
+    """Читает файл /proc через os.open/os.read/os.close — без буферизации и лишних fstat/lseek."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+
+def _read_all(path: str) -> bytes:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+
+
+def _parse_io(data: bytes):
+    read_bytes = written_bytes = 0
+    for line in data.splitlines():
+        if line.startswith(b'read_bytes:'):
+            read_bytes = int(line[11:])
+        elif line.startswith(b'write_bytes:'):
+            written_bytes = int(line[12:])
+    return read_bytes, written_bytes
+
+
+def _read_processes(proc_root: str, pids: Sequence[int], with_io: bool) -> List[Tuple]:
+    """Сырые данные процессов `pids` в том же порядке; завершившиеся пропускаются.
+
+    Кортеж: pid, имя (байты), ppid, utime+stime, starttime (такты), rss
+    (страницы), прочитано и записано байт. Функция уровня модуля, чтобы её
+    можно было отдать в пул процессов.
+    """
+    rows = []
+    for pid in pids:
+        directory = os.path.join(proc_root, str(pid))
+        try:
+            data = _read(os.path.join(directory, 'stat'), 4096)
+        except OSError:
+            continue  # процесс завершился между listdir и чтением
+        rparen = data.rfind(b')')
+        fields = data[rparen + 2:].split()
+        if len(fields) < 22:
+            continue
+        read_bytes = written_bytes = 0
+        if with_io:
+            try:
+                read_bytes, written_bytes = _parse_io(_read(os.path.join(directory, 'io'), 4096))
+            except OSError:
+                pass  # нет прав на чужой процесс
+        rows.append((pid, data[data.find(b'(') + 1:rparen], int(fields[1]), int(fields[11]) + int(fields[12]),
+                     int(fields[19]), int(fields[21]), read_bytes, written_bytes))
+    return rows
+
+
+class ProcBackend(MetricsBackend):
+    """Бэкенд для Linux на чистом Python поверх /proc.
+
+    За один проход по /proc на процесс читается один файл stat (и io, если
+    `with_io`), каждый — тремя системными вызовами. Загрузка ЦП процессов
+    считается по приросту utime+stime между вызовами `get_processes`.
+
+    При `workers` > 1 PID делятся на части и читаются пулом потоков
+    (`pool='thread'`) или процессов (`pool='process'`, без общего GIL).
+    Части склеиваются в порядке PID, поэтому таблица не зависит от числа
+    работников. Пул создаётся при первом чтении и закрывается в `stop`.
+    """
+    name = "proc"
+
+    def __init__(self, proc_root: str = "/proc", with_io: bool = True, sys_root: str = "/sys",
+                 workers: int = 1, pool: str = 'thread'):
+        if pool not in POOL_KINDS:
+            raise ValueError(f"unknown pool kind: {pool}")
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self.with_io = with_io
+        self.workers = max(1, workers)
+        self.pool = pool
+        self._executor: Optional[Executor] = None
+        self._name_cache = NameCache()
+        self._cpu_count = os.cpu_count() or 1
+        self._cpu_times = None
+        self._proc_times = {}
+        self._last_sample = None
+        self._static_cpu = None
+        self._boot_time = None
+        self._ipv4 = None
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.proc_root, *parts)
+
+    def _pids(self) -> List[str]:
+        return [entry for entry in os.listdir(self.proc_root) if entry.isdigit()]
+
+    # ---------- ЦП ----------
+
+    def _read_static_cpu(self) -> Dict:
+        brand, frequency, cores = "Unknown", 0.0, set()
+        physical_id = core_id = None
+        try:
+            lines = _read_all(self._path('cpuinfo')).decode('utf-8', 'replace').splitlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            key, _, value = line.partition(':')
+            key, value = key.strip(), value.strip()
+            if key == 'model name' and brand == "Unknown":
+                brand = value
+            elif key == 'cpu MHz' and not frequency:
+                frequency = float(value) / 1000.0
+            elif key == 'physical id':
+                physical_id = value
+            elif key == 'core id':
+                core_id = value
+            elif not key and core_id is not None:
+                cores.add((physical_id, core_id))
+                physical_id = core_id = None
+        if core_id is not None:
+            cores.add((physical_id, core_id))
+        return {'brand': brand, 'frequency': frequency, 'core_count': len(cores) or self._cpu_count}
+
+    def get_cpu_info(self) -> Dict:
+        if self._static_cpu is None:
+            self._static_cpu = self._read_static_cpu()
+
+        fields = [int(value) for value in _read(self._path('stat'), 4096).split(b'\n', 1)[0].split()[1:9]]
+        total = sum(fields)
+        idle = fields[3] + fields[4]
+        if self._cpu_times is None:
+            busy_delta, total_delta = total - idle, total
+        else:
+            busy_delta = (total - idle) - (self._cpu_times[1] - self._cpu_times[0])
+            total_delta = total - self._cpu_times[1]
+        self._cpu_times = (idle, total)
+        usage = busy_delta / total_delta * 100 if total_delta > 0 else 0.0
+
+        uptime = float(_read(self._path('uptime'), 256).split()[0])
+        return dict(
+            self._static_cpu,
+            usage=usage,
+            work_time=int(uptime),
+            process_count=len(self._pids())
+        )
+
+    # ---------- Память ----------
+
+    def get_memory_info(self) -> Dict:
+        values = {}
+        for line in _read_all(self._path('meminfo')).splitlines():
+            key, _, rest = line.partition(b':')
+            parts = rest.split()
+            if parts:
+                values[key] = int(parts[0]) * 1024
+        total = values.get(b'MemTotal', 0)
+        available = values.get(b'MemAvailable',
+                               values.get(b'MemFree', 0) + values.get(b'Buffers', 0) + values.get(b'Cached', 0))
+        return {
+            'total': total,
+            'used': total - available,
+            'available': available,
+            'speed': 0,
+            'format': "Unknown"
+        }
+
+    # ---------- Процессы ----------
+
+    def _read_boot_time(self) -> float:
+        """Время загрузки (btime из /proc/stat): starttime процесса отсчитывается от него."""
+        try:
+            for line in _read_all(self._path('stat')).splitlines():
+                if line.startswith(b'btime '):
+                    return float(line.split()[1])
+        except OSError:
+            pass
+        return 0.0
+
+    def get_processes(self) -> ProcessTable:
+        now = time.monotonic()
+        elapsed = now - self._last_sample if self._last_sample is not None else 0.0
+        scale = 100.0 / (elapsed * CLK_TCK * self._cpu_count) if elapsed > 0 else 0.0
+        previous = self._proc_times
+        current = {}
+        get_name = self._name_cache.get
+        if self._boot_time is None:
+            self._boot_time = self._read_boot_time()
+
+        pids, names, ppids = array('q'), [], array('q')
+        cpu_usage, memory_mb, read_kb, written_kb = array('d'), array('d'), array('d'), array('d')
+        start_times = array('d')
+        for pid, name, ppid, ticks, start_time, rss_pages, read_bytes, written_bytes in self._read_all_processes():
+            current[pid] = (start_time, ticks)
+            last = previous.get(pid)
+            pids.append(pid)
+            names.append(get_name(name))
+            cpu_usage.append((ticks - last[1]) * scale if last is not None and last[0] == start_time else 0.0)
+            memory_mb.append(rss_pages * PAGE_SIZE / (1024 * 1024))
+            read_kb.append(read_bytes / 1024)
+            written_kb.append(written_bytes / 1024)
+            ppids.append(ppid)
+            start_times.append(self._boot_time + start_time / CLK_TCK)
+
+        self._proc_times = current
+        self._last_sample = now
+        return ProcessTable(pids, tuple(names), cpu_usage, memory_mb, read_kb, written_kb, ppids, start_times)
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            if self.pool == 'process':
+                # forkserver: работники не наследуют потоки монитора и GUI, как при fork
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=context)
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="proc-reader")
+        return self._executor
+
+    def _read_all_processes(self) -> List[Tuple]:
+        """Данные всех процессов в порядке PID — одним проходом или частями через пул."""
+        pids = sorted(int(entry) for entry in self._pids())
+        if self.workers == 1 or len(pids) < PARALLEL_MIN_PIDS:
+            return _read_processes(self.proc_root, pids, self.with_io)
+        size = -(-len(pids) // (self.workers * CHUNKS_PER_WORKER))
+        chunks = [pids[start:start + size] for start in range(0, len(pids), size)]
+        executor = self._pool()
+        futures = [executor.submit(_read_processes, self.proc_root, chunk, self.with_io) for chunk in chunks]
+        rows, failed = [], False
+        # Части собираются в порядке отправки, а не завершения
+        for chunk, future in zip(chunks, futures):
+            try:
+                rows.extend(future.result())
+            except Exception as e:
+                # Сломанный пул (например, убитый работник) не должен терять процессы
+                print(f"Error reading processes in pool: {e}")
+                failed = True
+                rows.extend(_read_processes(self.proc_root, chunk, self.with_io))
+        if failed:
+            # Следующее чтение создаст пул заново
+            self.stop()
+        return rows
+
+    # ---------- Диски ----------
+
+    def get_disks(self) -> List[Dict]:
+        disks, seen = [], set()
+        try:
+            mounts = _read_all(self._path('mounts')).decode('utf-8', 'replace').splitlines()
+        except OSError:
+            return disks
+        for line in mounts:
+            parts = line.split()
+            if len(parts) < 2 or not parts[0].startswith('/dev/') or parts[0] in seen:
+                continue
+            seen.add(parts[0])
+            mount_point = parts[1].replace('\\040', ' ')
+            try:
+                stat = os.statvfs(mount_point)
+            except OSError:
+                continue
+            disks.append({
+                'name': os.path.basename(parts[0]),
+                'mount_point': mount_point,
+                'total_space': stat.f_blocks * stat.f_frsize,
+                'available_space': stat.f_bavail * stat.f_frsize
+            })
+        return disks
+
+    def get_disk_io(self) -> List[Dict]:
+        # Поля /proc/diskstats после имени: 2 — прочитано секторов, 6 — записано секторов,
+        # 9 — время, когда у устройства были запросы в работе (мс)
+        disks = {}
+        try:
+            lines = _read_all(self._path('diskstats')).splitlines()
+        except OSError:
+            return []
+        for line in lines:
+            parts = line.split()
+            if len(parts) < 14:
+                continue
+            name = parts[2].decode('utf-8', 'replace')
+            if name.startswith(('loop', 'ram')):
+                continue
+            fields = parts[3:]
+            disks[name] = {
+                'name': name,
+                'read_bytes': int(fields[2]) * 512,
+                'written_bytes': int(fields[6]) * 512,
+                'busy_ms': int(fields[9])
+            }
+        # Разделы (sda1, nvme0n1p1) дублируют счётчики своего диска
+        return [disk for name, disk in disks.items() if not self._is_partition(name)]
+
+    def _is_partition(self, name: str) -> bool:
+        """Раздел ли устройство: по имени не понять (md10 — диск, а не раздел md1), спрашиваем sysfs."""
+        # В sysfs '/' в именах устройств (cciss/c0d0) заменён на '!'
+        sys_name = name.replace('/', '!')
+        block = os.path.join(self.sys_root, 'class', 'block')
+        if os.path.isdir(block):
+            return os.path.exists(os.path.join(block, sys_name, 'partition'))
+        # Старый sysfs без class/block: целые диски перечислены в /sys/block
+        disks = os.path.join(self.sys_root, 'block')
+        if os.path.isdir(disks):
+            return not os.path.exists(os.path.join(disks, sys_name))
+        # sysfs нет — разделы не отличить, показываем все устройства
+        return False
+
+    # ---------- Сеть ----------
+
+    def _link_speed(self, name: str) -> int:
+        try:
+            speed = int(_read(os.path.join(self.sys_root, 'class', 'net', name, 'speed'), 64))
+        except (OSError, ValueError):
+            return 0
+        return speed * 1000000 if speed > 0 else 0
+
+    def _local_ipv4(self) -> str:
+        # Как local_ipaddress в DLL: connect на UDP-сокете не отправляет пакетов
+        if self._ipv4 is None:
+            try:
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                    sock.connect(("8.8.8.8", 80))
+                    self._ipv4 = sock.getsockname()[0]
+            except OSError:
+                self._ipv4 = "0.0.0.0"
+        return self._ipv4
+
+    def get_networks(self) -> List[Dict]:
+        networks = []
+        ipv4 = self._local_ipv4()
+        for line in _read_all(self._path('net', 'dev')).splitlines()[2:]:
+            name, _, rest = line.partition(b':')
+            fields = rest.split()
+            if len(fields) < 9:
+                continue
+            name = name.strip().decode('utf-8', 'replace')
+            networks.append({
+                'name': name,
+                'ipv4': ipv4,
+                'send': int(fields[8]),
+                'recive': int(fields[0]),
+                'link_speed': self._link_speed(name)
+            })
+        return networks
+
+    # ---------- Службы ----------
+
+    def get_services(self) -> List[Dict]:
+        try:
+            units = subprocess.run(
+                ['systemctl', 'list-units', '--type=service', '--all', '--no-legend', '--plain', '--no-pager'],
+                capture_output=True, text=True, timeout=10
+            ).stdout.splitlines()
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"Error listing services: {e}")
+            return []
+
+        services = {}
+        for line in units:
+            parts = line.split(None, 4)
+            if len(parts) >= 4:
+                services[parts[0]] = {'process_id': 0, 'name': parts[0], 'status': parts[3]}
+        if not services:
+            return []
+
+        # MainPID всех служб одним вызовом systemctl show
+        try:
+            shown = subprocess.run(
+                ['systemctl', 'show', '--property=Id,MainPID', '--no-pager', *services],
+                capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            shown = ""
+        for block in shown.split('\n\n'):
+            props = dict(line.split('=', 1) for line in block.splitlines() if '=' in line)
+            service = services.get(props.get('Id'))
+            if service is not None and props.get('MainPID', '').isdigit():
+                service['process_id'] = int(props['MainPID'])
+        return list(services.values())
+
+    # ---------- Управление процессами ----------
+
+    def kill_process(self, pid: int) -> bool:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            return False
+        return True
+
+    def terminate_process(self, pid: int) -> bool:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            return False
+        return True
+
+    def is_running(self, pid: int) -> bool:
+        # Завершившийся, но не собранный родителем процесс (зомби) уже не работает
+        try:
+            data = _read(self._path(str(pid), 'stat'), 4096)
+        except OSError:
+            return False
+        return data[data.rfind(b')') + 2:data.rfind(b')') + 3] not in (b'Z', b'X')
+
+    def get_proc_path(self, pid: int) -> str:
+        try:
+            return os.readlink(self._path(str(pid), 'exe'))
+        except OSError:
+            return "NULL"
+
+    def get_proc_cmdline(self, pid: int) -> str:
+        try:
+            data = _read_all(self._path(str(pid), 'cmdline'))
+        except OSError:
+            return ""
+        return data.rstrip(b'\0').replace(b'\0', b' ').decode('utf-8', 'replace')
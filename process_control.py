@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from backend import MetricsBackend
+from process_index import ProcessFilter, ProcessIndex
+from process_tree import ProcessTree
+from snapshot import ProcessTable
+
+# Процессы, которые пакетное завершение не трогает никогда
+PROTECTED_PIDS = frozenset({0, 1, os.getpid()})
+
+
+class KillResult:
+    """Итог завершения одного процесса.
+
+    method — чем процесс был завершён: 'term' (мягко), 'kill' (принудительно)
+    или None, если до сигнала дело не дошло.
+    """
+    __slots__ = ('pid', 'ok', 'method', 'error')
+
+    def __init__(self, pid: int, ok: bool, method: Optional[str] = None, error: str = ""):
+        self.pid = pid
+        self.ok = ok
+        self.method = method
+        self.error = error
+
+    def __repr__(self):
+        return f"KillResult(pid={self.pid}, ok={self.ok}, method={self.method!r}, error={self.error!r})"
+
+
+class KillBatch:
+    """Пакет завершения: прогресс и результаты по PID, заполняемые рабочими потоками.
+
+    GUI опрашивает `done`/`finished()` по таймеру и не блокируется на ожидании.
+    """
+
+    def __init__(self, pids: List[int]):
+        self.pids = pids
+        self.results: Dict[int, KillResult] = {}
+        self._futures = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        if not pids:
+            self._finished.set()
+
+    @property
+    def total(self) -> int:
+        return len(self.pids)
+
+    @property
+    def done(self) -> int:
+        return len(self.results)
+
+    def _add(self, result: KillResult):
+        with self._lock:
+            self.results[result.pid] = result
+            if len(self.results) == len(self.pids):
+                self._finished.set()
+
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def cancel(self):
+        """Снимает ещё не начатые задания и прерывает ожидание мягкого завершения."""
+        self._cancelled.set()
+        for future, pid in self._futures:
+            if future.cancel():
+                self._add(KillResult(pid, False, None, "cancelled"))
+
+    def succeeded(self) -> List[int]:
+        return [pid for pid, result in self.results.items() if result.ok]
+
+    def failed(self) -> List[KillResult]:
+        return [result for result in self.results.values() if not result.ok]
+
+
+class ProcessController:
+    """Пакетное завершение процессов в пуле рабочих потоков.
+
+    Каждый PID обрабатывается отдельно: при `graceful` сначала мягкое
+    завершение, затем ожидание до `timeout` секунд и принудительное, если
+    процесс ещё жив. Результат по каждому PID попадает в KillBatch и, если
+    задан, в `on_result` — он вызывается из рабочего потока.
+
+    Пул создаётся при первом завершении и закрывается `shutdown()`; после
+    него следующее завершение создаёт новый пул.
+    """
+
+    def __init__(self, backend: MetricsBackend, max_workers: int = 8, poll_interval: float = 0.05):
+        self.backend = backend
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Незаконченные пакеты: при закрытии пула их снятые задания получают результат
+        self._batches: List[KillBatch] = []
+        self._lock = threading.Lock()
+
+    def kill(self, pids: Iterable[int], graceful: bool = False, timeout: float = 3.0,
+             on_result: Optional[Callable[[KillResult], None]] = None) -> KillBatch:
+        """Завершает процессы из списка, не дожидаясь результата."""
+        batch = KillBatch(list(dict.fromkeys(pids)))
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="kill")
+            for pid in batch.pids:
+                future = self._executor.submit(self._run, batch, pid, graceful, timeout, on_result)
+                batch._futures.append((future, pid))
+            self._batches = [pending for pending in self._batches if not pending.finished()]
+            self._batches.append(batch)
+        return batch
+
+    def kill_tree(self, tree: ProcessTree, pid: int, **options) -> KillBatch:
+        """Завершает процесс и всех его потомков; все PID поддерева завершаются параллельно."""
+        return self.kill(tree.subtree_pids(pid), **options)
+
+    def kill_matching(self, table: ProcessTable, process_filter: ProcessFilter, **options) -> KillBatch:
+        """Завершает все процессы снимка, подходящие под фильтр (подстрока, re:..., пороги)."""
+        if not process_filter:
+            raise ValueError("Пустой фильтр подходит под все процессы")
+        index = ProcessIndex('pid', descending=False, process_filter=process_filter)
+        index.update(table)
+        return self.kill(index.pids(), **options)
+
+    def _run(self, batch: KillBatch, pid: int, graceful: bool, timeout: float, on_result):
+        try:
+            result = self._kill_one(batch, pid, graceful, timeout)
+        except Exception as e:
+            result = KillResult(pid, False, None, str(e))
+        batch._add(result)
+        if on_result is not None:
+            on_result(result)
+
+    def _is_running(self, pid: int) -> Optional[bool]:
+        try:
+            return self.backend.is_running(pid)
+        except NotImplementedError:
+            return None
+
+    def _kill_one(self, batch: KillBatch, pid: int, graceful: bool, timeout: float) -> KillResult:
+        if pid in PROTECTED_PIDS:
+            return KillResult(pid, False, None, "protected")
+        if batch._cancelled.is_set():
+            return KillResult(pid, False, None, "cancelled")
+
+        if graceful:
+            terminated = self.backend.terminate_process(pid)
+            running = self._is_running(pid)
+            if running is None:
+                # Проверить нельзя — доверяем ответу бэкенда
+                return KillResult(pid, terminated, 'term', "" if terminated else "terminate failed")
+            deadline = time.monotonic() + timeout
+            while running and time.monotonic() < deadline:
+                if batch._cancelled.wait(self.poll_interval):
+                    return KillResult(pid, False, 'term', "cancelled")
+                running = self._is_running(pid)
+            if not running:
+                if terminated:
+                    return KillResult(pid, True, 'term')
+                return KillResult(pid, False, None, "no such process")
+
+        if self.backend.kill_process(pid):
+            return KillResult(pid, True, 'kill')
+        if self._is_running(pid) is False:
+            return KillResult(pid, False, None, "no such process")
+        return KillResult(pid, False, 'kill', "kill failed")
+
+    def shutdown(self, wait: bool = False):
+        """Закрывает пул; задания, которые ещё не начаты, получают результат "cancelled"."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            batches, self._batches = self._batches, []
+            # Снятое задание иначе не дало бы результата, и wait() пакета не дождался бы конца
+            for batch in batches:
+                for future, pid in batch._futures:
+                    if future.cancel():
+                        batch._add(KillResult(pid, False, None, "cancelled"))
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,210 @@
+from array import array
+from itertools import compress, repeat
+from operator import add, and_, eq, gt, ne, not_, or_, sub
+from typing import List, Optional, Sequence, Tuple
+
+from snapshot import PROCESS_COLUMNS, RATE_COLUMNS, TOPOLOGY_COLUMNS, ProcessTable
+
+# Столбцы-массивы таблицы процессов; имена переносятся отдельно
+DELTA_COLUMNS = ('pid',) + PROCESS_COLUMNS + TOPOLOGY_COLUMNS + RATE_COLUMNS
+# Больше исчезнувших строк за раз — столбцы пересобираются маской, а не удалением по одной
+REMOVE_IN_PLACE = 32
+
+
+def take_rows(table: ProcessTable, rows: Sequence[int]) -> ProcessTable:
+    """Строки `rows` таблицы со всеми столбцами как новая таблица."""
+    def column(key):
+        values = getattr(table, key)
+        return array(values.typecode, map(values.__getitem__, rows))
+
+    return ProcessTable(column('pid'), tuple(map(table.name.__getitem__, rows)),
+                        *map(column, PROCESS_COLUMNS), ppid=column('ppid'), start_time=column('start_time'),
+                        rates=[column(key) for key in RATE_COLUMNS])
+
+
+class ProcessDelta:
+    """Разница таблицы процессов между двумя публикациями монитора.
+
+    `sequence` — номер публикации, `base` — номер той, к которой разница
+    применяется. Опорный кадр (`keyframe`) несёт всю таблицу в `added` и
+    применяется к чему угодно. `state` — таблица после применения: тому, кто
+    получает все публикации по порядку, применять разницу самому не нужно.
+    """
+    __slots__ = ('sequence', 'base', 'keyframe', 'added', 'changed', 'removed', 'state')
+
+    def __init__(self, sequence: int, base: int, keyframe: bool, added: ProcessTable,
+                 changed: ProcessTable, removed: array, state: Optional[ProcessTable] = None):
+        self.sequence = sequence
+        self.base = base
+        self.keyframe = keyframe
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+        self.state = state
+
+    def __bool__(self) -> bool:
+        return self.keyframe or bool(len(self.added) or len(self.changed) or len(self.removed))
+
+    def rows(self) -> int:
+        """Строк в разнице: новые, изменившиеся и исчезнувшие."""
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+    def nbytes(self) -> int:
+        """Байт в столбцах-массивах разницы (имена не считаются)."""
+        size = len(self.removed) * self.removed.itemsize
+        for table in (self.added, self.changed):
+            size += sum(getattr(table, key).itemsize for key in DELTA_COLUMNS) * len(table)
+        return size
+
+    def __repr__(self):
+        kind = "keyframe" if self.keyframe else f"base={self.base}"
+        return (f"ProcessDelta({self.sequence}, {kind}, added={len(self.added)}, "
+                f"changed={len(self.changed)}, removed={len(self.removed)})")
+
+
+def apply_delta(table: ProcessTable, delta: ProcessDelta) -> ProcessTable:
+    """Применяет разницу к таблице публикации `delta.base` и возвращает новую таблицу.
+
+    Изменившиеся строки заменяются на месте, исчезнувшие удаляются, новые
+    дописываются в конец. Исходная таблица не меняется: столбцы копируются
+    срезом целиком, построчно переносятся только строки разницы. Пустая
+    разница возвращает ту же таблицу. PID, которого нет в таблице, —
+    KeyError: разница применена не к своей базе.
+    """
+    if delta.keyframe:
+        return delta.added
+    if not delta:
+        return table
+    columns = {key: getattr(table, key)[:] for key in DELTA_COLUMNS}
+    names = list(table.name)
+    changed, removed = delta.changed, delta.removed
+    if len(changed) or len(removed):
+        positions = dict(zip(table.pid, range(len(table))))
+        rows = [positions[pid] for pid in changed.pid]
+        for key, values in columns.items():
+            for row, value in zip(rows, getattr(changed, key)):
+                values[row] = value
+        for row, name in zip(rows, changed.name):
+            names[row] = name
+        if len(removed) <= REMOVE_IN_PLACE:
+            for row in sorted(map(positions.__getitem__, removed), reverse=True):
+                for values in columns.values():
+                    del values[row]
+                del names[row]
+        elif len(removed):
+            keep = [True] * len(table)
+            for row in map(positions.__getitem__, removed):
+                keep[row] = False
+            columns = {key: array(values.typecode, compress(values, keep)) for key, values in columns.items()}
+            names = list(compress(names, keep))
+    added = delta.added
+    for key, values in columns.items():
+        values.extend(getattr(added, key))
+    names.extend(added.name)
+    return ProcessTable(columns['pid'], tuple(names), *(columns[key] for key in PROCESS_COLUMNS),
+                        ppid=columns['ppid'], start_time=columns['start_time'],
+                        rates=[columns[key] for key in RATE_COLUMNS])
+
+
+class ProcessChangeTracker:
+    """Публикует таблицу процессов разницами с порогами.
+
+    Строка считается изменившейся, если загрузка ЦП ушла от опубликованной
+    больше чем на `cpu` процентных пунктов, память — больше чем на
+    `memory_mb`, прочитанное и записанное вместе или скорость чтения, записи
+    либо диска — больше чем на `io_kb`, скорость роста памяти — больше чем
+    на `memory_mb`, либо ненулевая скорость стала нулём, либо сменились имя
+    или родитель. Остальные строки
+    остаются в опубликованном состоянии с прежними значениями: колебания
+    простаивающих процессов не рассылаются. Строки сопоставляются по PID и
+    времени запуска, как в process_rates: процесс с чужим PID — это
+    исчезнувшая и новая строка. Каждые `keyframe_interval` публикаций
+    уходит опорный кадр — таблица как есть, он же убирает накопившееся
+    отставание от порогов.
+    """
+
+    def __init__(self, cpu: float = 0.5, memory_mb: float = 1.0, io_kb: float = 64.0,
+                 keyframe_interval: int = 30):
+        self.cpu = cpu
+        self.memory_mb = memory_mb
+        self.io_kb = io_kb
+        self.keyframe_interval = keyframe_interval
+        self.sequence = 0
+        self._state: Optional[ProcessTable] = None
+        self._since_keyframe = 0
+
+    @property
+    def state(self) -> Optional[ProcessTable]:
+        """Опубликованная таблица — результат применения всех разниц."""
+        return self._state
+
+    def reset(self):
+        """Следующая публикация будет опорным кадром."""
+        self._state = None
+
+    def update(self, table: ProcessTable) -> ProcessDelta:
+        """Разница новой таблицы с опубликованной; опубликованной становится её `state`."""
+        previous = self._state
+        base = self.sequence
+        self.sequence += 1
+        if previous is None or self._since_keyframe + 1 >= self.keyframe_interval:
+            self._since_keyframe = 0
+            delta = ProcessDelta(self.sequence, base, True, table, ProcessTable.empty(), array('q'), table)
+        else:
+            self._since_keyframe += 1
+            removed, added, changed = self.changes(previous, table)
+            delta = ProcessDelta(self.sequence, base, False, take_rows(table, added),
+                                 take_rows(table, changed), removed)
+            delta.state = apply_delta(previous, delta)
+        self._state = delta.state
+        return delta
+
+    def changes(self, previous: ProcessTable, table: ProcessTable) -> Tuple[array, List[int], List[int]]:
+        """PID исчезнувших строк, номера новых строк и строк, вышедших за пороги."""
+        rows_all = range(len(table))
+        if table.pid == previous.pid and table.start_time == previous.start_time:
+            # Состав процессов не изменился — строки совпадают по позициям
+            matched = None
+
+            def before(key):
+                return getattr(previous, key)
+        else:
+            # Отсутствующие PID указывают на строку-заглушку в конце прошлых столбцов
+            missing = len(previous)
+            positions = dict(zip(previous.pid, range(missing)))
+            rows = array('q', map(positions.get, table.pid, repeat(missing)))
+            previous_start = previous.start_time + array('d', (-1.0,))
+            matched = list(map(eq, table.start_time, map(previous_start.__getitem__, rows)))
+
+            def before(key):
+                values = getattr(previous, key)
+                if isinstance(values, tuple):
+                    return map((values + ("",)).__getitem__, rows)
+                return map((values + array(values.typecode, (0,))).__getitem__, rows)
+
+        def moved(current, past, threshold):
+            return map(gt, map(abs, map(sub, current, past)), repeat(threshold))
+
+        masks = [
+            moved(table.cpu_usage, before('cpu_usage'), self.cpu),
+            moved(table.memory_mb, before('memory_mb'), self.memory_mb),
+            moved(map(add, table.read_kb, table.written_kb),
+                  map(add, before('read_kb'), before('written_kb')), self.io_kb),
+            map(ne, table.ppid, before('ppid')),
+            map(ne, table.name, before('name')),
+        ]
+        for key in RATE_COLUMNS:
+            current = getattr(table, key)
+            masks.append(moved(current, before(key), self.memory_mb if key == 'memory_rate' else self.io_kb))
+            # Скорость, упавшая до нуля, публикуется сразу: иначе остановившийся
+            # процесс показывал бы прежнюю скорость до опорного кадра
+            masks.append(map(and_, map(bool, before(key)), map(not_, current)))
+        mask = masks[0]
+        for other in masks[1:]:
+            mask = map(or_, mask, other)
+        if matched is None:
+            return array('q'), [], list(compress(rows_all, mask))
+        changed = list(compress(rows_all, map(and_, mask, matched)))
+        added = list(compress(rows_all, map(not_, matched)))
+        removed = array('q', sorted(set(previous.pid).difference(compress(table.pid, matched))))
+        return removed, added, changed
@@ -0,0 +1,228 @@
+import operator
+import re
+from itertools import compress, repeat
+from operator import and_
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from process_delta import ProcessDelta
+from snapshot import ProcessRow, ProcessTable
+
+ROW_COLUMNS = ('name', 'cpu_usage', 'memory_mb', 'read_kb', 'written_kb',
+               'read_rate', 'write_rate', 'disk_rate', 'memory_rate')
+SORT_KEYS = ('pid',) + ROW_COLUMNS
+
+# Короткие имена столбцов для фильтров вида "cpu>5"
+COLUMN_ALIASES = {
+    'pid': 'pid',
+    'cpu': 'cpu_usage',
+    'mem': 'memory_mb',
+    'memory': 'memory_mb',
+    'disk': 'disk_rate',
+    'read': 'read_kb',
+    'write': 'written_kb',
+    'growth': 'memory_rate',
+}
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '=': operator.eq,
+    '==': operator.eq,
+}
+THRESHOLD_RE = re.compile(r'^(\w+)\s*(>=|<=|==|>|<|=)\s*(-?\d+(?:\.\d+)?)%?$')
+
+
+class ProcessFilter:
+    """Фильтр процессов: подстрока или регулярное выражение по имени и пороги по столбцам."""
+
+    def __init__(self, text: str = "", pattern: Optional[str] = None, thresholds=()):
+        self.text = text.lower()
+        self.regex = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self.thresholds = [(column, OPERATORS[op], value) for column, op, value in thresholds]
+
+    @classmethod
+    def parse(cls, query: str) -> "ProcessFilter":
+        """Разбирает строку фильтра: "chrome cpu>5 mem>=100 re:^sys".
+
+        Слова вида `столбец оп число` — пороги, `re:...` или `/.../` — регулярное
+        выражение, остальные слова — подстрока имени. Ошибку в выражении или
+        неизвестный столбец сообщает через ValueError.
+        """
+        words, pattern, thresholds = [], None, []
+        for token in query.split():
+            match = THRESHOLD_RE.match(token)
+            if match:
+                column = COLUMN_ALIASES.get(match.group(1).lower())
+                if column is None:
+                    raise ValueError(f"Неизвестный столбец: {match.group(1)}")
+                thresholds.append((column, match.group(2), float(match.group(3))))
+            elif token.startswith('re:'):
+                pattern = token[3:]
+            elif len(token) > 2 and token.startswith('/') and token.endswith('/'):
+                pattern = token[1:-1]
+            else:
+                words.append(token)
+        try:
+            return cls(" ".join(words), pattern, thresholds)
+        except re.error as e:
+            raise ValueError(f"Ошибка в регулярном выражении: {e}") from e
+
+    def __bool__(self) -> bool:
+        return bool(self.text or self.regex or self.thresholds)
+
+    def matches_name(self, name: str) -> bool:
+        if self.text and self.text not in name.lower():
+            return False
+        return self.regex is None or self.regex.search(name) is not None
+
+    def matches(self, row) -> bool:
+        """Проверка строки-словаря (ProcessRow или dict) целиком."""
+        if not self.matches_name(row['name']):
+            return False
+        return all(compare(row[column], value) for column, compare, value in self.thresholds)
+
+    def threshold_columns(self, table: ProcessTable) -> List:
+        """Результаты порогов по всей таблице — итераторы bool, вычисляемые на C."""
+        return [map(compare, getattr(table, column), repeat(value))
+                for column, compare, value in self.thresholds]
+
+
+class ProcessIndex:
+    """Отсортированный и отфильтрованный вид таблицы процессов.
+
+    Хранит порядок номеров строк текущего снимка (ProcessTable). Порядок
+    пересчитывается на каждом снимке, но весь на C: сортируются номера строк
+    с ключом `столбец.__getitem__`, пороги фильтра считаются через map по
+    столбцам-массивам. Проверка имени подстрокой или выражением и приведение
+    имён к нижнему регистру кэшируются по имени, так что код на Python
+    выполняется только для имён, которых ещё не было. Как последовательность
+    отдаёт строки ProcessRow в порядке сортировки.
+    """
+
+    # Предел кэшей по именам, как у NameCache
+    NAME_CACHE_LIMIT = 16384
+
+    def __init__(self, sort_key: str = 'cpu_usage', descending: bool = True,
+                 process_filter: Optional[ProcessFilter] = None):
+        if sort_key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+        self.sort_key = sort_key
+        self.descending = descending
+        self.filter = process_filter if process_filter is not None else ProcessFilter()
+        self._table = ProcessTable.empty()
+        self._order: List[int] = []
+        self._ranks: Optional[Dict[int, int]] = None
+        self._name_matches: Dict[str, bool] = {}
+        self._lower_names: Dict[str, str] = {}
+
+    def _cached(self, cache: Dict[str, object], names, compute) -> Iterable:
+        """Значения compute(name) для всех имён; вычисляются только новые имена."""
+        missing = set(names).difference(cache)
+        if missing:
+            if len(cache) + len(missing) > self.NAME_CACHE_LIMIT:
+                cache.clear()
+                missing = set(names)
+            for name in missing:
+                cache[name] = compute(name)
+        return map(cache.__getitem__, names)
+
+    def _mask(self, table: ProcessTable) -> Optional[Iterable]:
+        masks = self.filter.threshold_columns(table)
+        if self.filter.text or self.filter.regex is not None:
+            masks.append(self._cached(self._name_matches, table.name, self.filter.matches_name))
+        if not masks:
+            return None
+        mask = masks[0]
+        for other in masks[1:]:
+            mask = map(and_, mask, other)
+        return mask
+
+    def _sort_column(self, table: ProcessTable) -> Sequence:
+        if self.sort_key == 'name':
+            return list(self._cached(self._lower_names, table.name, str.lower))
+        # Ключи из списка не упаковываются в float на каждом сравнении, как при чтении из массива
+        return getattr(table, self.sort_key).tolist()
+
+    def _recompute(self):
+        table = self._table
+        rows = range(len(table))
+        mask = self._mask(table)
+        # Без фильтра номера строк сортируются сразу, без промежуточного списка
+        if mask is not None:
+            rows = compress(rows, mask)
+        # Сортировка устойчивая: при равных значениях сохраняется порядок снимка
+        self._order = sorted(rows, key=self._sort_column(table).__getitem__, reverse=self.descending)
+        self._ranks = None
+
+    def update(self, table: ProcessTable) -> Dict[str, int]:
+        """Применяет новый снимок; возвращает число показанных и всех строк."""
+        self._table = ProcessTable.from_rows(table)
+        self._recompute()
+        return {'shown': len(self._order), 'total': len(self._table)}
+
+    def apply_delta(self, delta: ProcessDelta) -> Dict[str, int]:
+        """Применяет разницу монитора к виду, построенному по таблице публикации `delta.base`.
+
+        Прошлый порядок почти отсортирован, и сортировка (Timsort) доводит его
+        до нового за время, близкое к линейному; при равных значениях строки
+        остаются в прежнем порядке, новые встают после них. Пустая разница
+        ничего не пересчитывает. Опорный кадр и фильтр — полный пересчёт:
+        изменившаяся строка может войти в отфильтрованный вид или выйти из него.
+        """
+        if delta.keyframe or self.filter:
+            return self.update(delta.state)
+        if delta:
+            previous, table = self._table, delta.state
+            order = self._order
+            if len(delta.added) or len(delta.removed):
+                # Строки сдвинулись: прошлый порядок переводится на номера строк новой таблицы
+                pids = map(previous.pid.__getitem__, order)
+                if len(delta.removed):
+                    removed = set(delta.removed)
+                    pids = [pid for pid in pids if pid not in removed]
+                positions = dict(zip(table.pid, range(len(table))))
+                order = list(map(positions.__getitem__, pids))
+                order.extend(range(len(table) - len(delta.added), len(table)))
+            self._table = table
+            self._order = sorted(order, key=self._sort_column(table).__getitem__, reverse=self.descending)
+            self._ranks = None
+        return {'shown': len(self._order), 'total': len(self._table)}
+
+    def set_sort(self, sort_key: str, descending: Optional[bool] = None):
+        if sort_key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+        self.sort_key = sort_key
+        if descending is not None:
+            self.descending = descending
+        self._recompute()
+
+    def set_filter(self, process_filter: ProcessFilter):
+        self.filter = process_filter
+        self._name_matches = {}
+        self._recompute()
+
+    # ---------- Последовательность строк ----------
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, index: int) -> ProcessRow:
+        return ProcessRow(self._table, self._order[index])
+
+    def __iter__(self):
+        for row in self._order:
+            yield ProcessRow(self._table, row)
+
+    def index_of(self, pid: int) -> Optional[int]:
+        """Позиция процесса в отсортированном виде или None, если его нет или он отфильтрован."""
+        try:
+            row = self._table.index_of(pid)
+        except KeyError:
+            return None
+        if self._ranks is None:
+            self._ranks = dict(zip(self._order, range(len(self._order))))
+        return self._ranks.get(row)
+
+    def pids(self) -> List[int]:
+        return list(map(self._table.pid.__getitem__, self._order))
@@ -0,0 +1,101 @@
+from array import array
+from itertools import repeat
+from operator import add, eq, mul, sub
+from typing import Optional
+
+from snapshot import ProcessTable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ProcessRates:
+    """Скорости процессов между соседними снимками таблицы.
+
+    Накопленные счётчики (прочитано/записано КБ) и память текущего снимка
+    сопоставляются с прошлым снимком по PID и времени запуска: новый процесс
+    и процесс, получивший чужой PID, получают нулевые скорости. Результат
+    записывается в столбцы read_rate, write_rate, disk_rate (КБ/с) и
+    memory_rate (МБ/с, может быть отрицательной). Загрузка ЦП уже приходит из
+    бэкенда скоростью за интервал, поэтому здесь не пересчитывается.
+
+    С numpy столбцы сопоставляются через searchsorted по отсортированным PID,
+    без numpy — через map по массивам с индексом-заглушкой для новых PID.
+    """
+
+    def __init__(self, use_numpy: bool = True):
+        self.use_numpy = use_numpy and numpy is not None
+        self._previous: Optional[ProcessTable] = None
+        self._timestamp = 0.0
+
+    def update(self, table: ProcessTable, timestamp: float) -> ProcessTable:
+        """Заполняет столбцы скоростей `table` (до публикации снимка) и возвращает её."""
+        previous = self._previous
+        elapsed = timestamp - self._timestamp
+        if previous is not None and elapsed > 0 and len(table) and len(previous):
+            if self.use_numpy:
+                rates = self._numpy_rates(table, previous, elapsed)
+            else:
+                rates = self._python_rates(table, previous, elapsed)
+            table.read_rate, table.write_rate, table.disk_rate, table.memory_rate = rates
+        self._previous = table
+        self._timestamp = timestamp
+        return table
+
+    def _python_rates(self, table: ProcessTable, previous: ProcessTable, elapsed: float):
+        if table.pid == previous.pid and table.start_time == previous.start_time:
+            # Состав процессов не изменился — строки совпадают по позициям
+            def delta(current, before):
+                return array('d', map(mul, map(sub, current, before), repeat(1.0 / elapsed)))
+        else:
+            # Отсутствующие PID указывают на строку-заглушку в конце прошлых столбцов
+            missing = len(previous)
+            positions = dict(zip(previous.pid, range(missing)))
+            rows = array('q', map(positions.get, table.pid, repeat(missing)))
+            previous_start = previous.start_time + array('d', (-1.0,))
+            matched = map(eq, table.start_time, map(previous_start.__getitem__, rows))
+            weights = array('d', map(mul, matched, repeat(1.0 / elapsed)))
+            zero = array('d', (0.0,))
+
+            def delta(current, before):
+                before = before + zero
+                return array('d', map(mul, map(sub, current, map(before.__getitem__, rows)), weights))
+
+        def rate(current, before):
+            values = delta(current, before)
+            # Накопленный счётчик не убывает; отрицательная разница — сбой чтения
+            if values and min(values) < 0:
+                values = array('d', map(max, values, repeat(0.0)))
+            return values
+
+        read_rate = rate(table.read_kb, previous.read_kb)
+        write_rate = rate(table.written_kb, previous.written_kb)
+        memory_rate = delta(table.memory_mb, previous.memory_mb)
+        return read_rate, write_rate, array('d', map(add, read_rate, write_rate)), memory_rate
+
+    def _numpy_rates(self, table: ProcessTable, previous: ProcessTable, elapsed: float):
+        previous_pids = numpy.frombuffer(previous.pid, dtype=numpy.int64)
+        order = numpy.argsort(previous_pids, kind='stable')
+        sorted_pids = previous_pids[order]
+
+        pids = numpy.frombuffer(table.pid, dtype=numpy.int64)
+        slots = numpy.minimum(numpy.searchsorted(sorted_pids, pids), len(sorted_pids) - 1)
+        rows = order[slots]
+        matched = ((sorted_pids[slots] == pids)
+                   & (numpy.frombuffer(previous.start_time)[rows] == numpy.frombuffer(table.start_time)))
+        weights = matched / elapsed
+
+        def delta(current, before):
+            return numpy.frombuffer(current) - numpy.frombuffer(before)[rows]
+
+        def column(values):
+            result = array('d')
+            result.frombytes(values.tobytes())
+            return result
+
+        read_rate = numpy.maximum(delta(table.read_kb, previous.read_kb), 0.0) * weights
+        write_rate = numpy.maximum(delta(table.written_kb, previous.written_kb), 0.0) * weights
+        memory_rate = delta(table.memory_mb, previous.memory_mb) * weights
+        return column(read_rate), column(write_rate), column(read_rate + write_rate), column(memory_rate)
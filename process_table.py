@@ -0,0 +1,16 @@
+from typing import Dict, Tuple
+
+
+def format_process_row(proc: Dict) -> Tuple:
+    """Формирует значения ячеек строки процесса для таблицы."""
+    return (
+        proc['pid'],
+        proc['name'],
+        f"{proc['cpu_usage']:.1f}%",
+        f"{proc['memory_mb']:.1f} MB",
+        f"{proc['disk_rate'] / 1024:.1f} MB/s",
+        "N/A",
+        "N/A",
+        "Normal"
+    )
+
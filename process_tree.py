@@ -0,0 +1,270 @@
+from itertools import accumulate, compress
+from operator import ne, sub
+from typing import Dict, List, Optional, Set, Tuple
+
+from process_delta import ProcessDelta
+from snapshot import ProcessTable
+
+
+def format_tree_row(proc: Dict) -> Tuple:
+    """Значения ячеек строки в режиме дерева: отступ по глубине и суммы поддерева."""
+    if proc['has_children']:
+        marker = "▸ " if proc['collapsed'] else "▾ "
+    else:
+        marker = "  "
+    cpu = f"{proc['cpu_usage']:.1f}%"
+    memory = f"{proc['memory_mb']:.1f} MB"
+    if proc['has_children']:
+        cpu += f" (Σ {proc['subtree_cpu']:.1f}%)"
+        memory += f" (Σ {proc['subtree_memory']:.1f} MB)"
+    return (
+        proc['pid'],
+        "    " * proc['depth'] + marker + proc['name'],
+        cpu,
+        memory,
+        f"{proc['disk_rate'] / 1024:.1f} MB/s",
+        "N/A",
+        "N/A",
+        "Normal"
+    )
+
+
+class ProcessTree:
+    """Дерево процессов по PID родителя с суммами ЦП и памяти по поддеревьям.
+
+    Связи родитель → дети хранятся между снимками и правятся только для
+    появившихся, завершившихся и сменивших родителя процессов; PID,
+    переиспользованный другим процессом (другое время запуска), считается
+    новым процессом. Порядок обхода в глубину пересобирается лишь при
+    изменении связей. Поддерево занимает в этом порядке непрерывный отрезок,
+    поэтому суммы по всем поддеревьям считаются за один проход: префиксные
+    суммы столбца и разность на концах отрезков, без рекурсии и цикла в Python.
+
+    Как последовательность отдаёт видимые строки (потомки свёрнутых узлов
+    скрыты) словарями для `format_tree_row`.
+    """
+
+    def __init__(self):
+        self._table = ProcessTable.empty()
+        self._parent: Dict[int, int] = {}
+        self._start: Dict[int, float] = {}
+        self._children: Dict[int, Set[int]] = {}
+        self.collapsed: Set[int] = set()
+
+        # Порядок обхода в глубину и его производные, пересобираются при изменении связей
+        self._order: List[int] = []
+        self._depth: List[int] = []
+        self._sizes: List[int] = []
+        self._ends: List[int] = []
+        self._dirty = True
+
+        # Пересчитываются на каждом снимке
+        self._rows: List[int] = []
+        self._subtree_cpu: List[float] = []
+        self._subtree_memory: List[float] = []
+        self._visible: List[int] = []
+        self._visible_index: Optional[Dict[int, int]] = None
+
+    # ---------- Связи ----------
+
+    def _link(self, pid: int, ppid: int, start_time: float):
+        self._parent[pid] = ppid
+        self._start[pid] = start_time
+        if ppid != pid:
+            self._children.setdefault(ppid, set()).add(pid)
+
+    def _unlink(self, pid: int):
+        ppid = self._parent.pop(pid)
+        del self._start[pid]
+        siblings = self._children.get(ppid)
+        if siblings is not None:
+            siblings.discard(pid)
+            if not siblings:
+                del self._children[ppid]
+
+    def update(self, table: ProcessTable) -> Dict[str, int]:
+        """Применяет новый снимок; возвращает число появившихся, завершившихся и сменивших родителя."""
+        table = ProcessTable.from_rows(table)
+        previous, self._table = self._table, table
+        counters = {'added': 0, 'removed': 0, 'reparented': 0}
+        # Состав процессов и связи не изменились — строки стоят на тех же местах
+        if (not self._dirty and table.pid == previous.pid and table.ppid == previous.ppid
+                and table.start_time == previous.start_time):
+            self._aggregate()
+            return counters
+
+        pids = table.pid
+        rows = dict(zip(pids, range(len(pids))))
+        gone = self._parent.keys() - rows.keys()
+        for pid in gone:
+            self._unlink(pid)
+        self.collapsed.difference_update(gone)
+
+        # Новые и переиспользованные PID отличаются временем запуска (у новых его нет вовсе),
+        # сменившие родителя — PID родителя; сравнение идёт по столбцам без цикла в Python
+        restarted = set(compress(pids, map(ne, map(self._start.get, pids), table.start_time)))
+        reparented = set(compress(pids, map(ne, map(self._parent.get, pids), table.ppid))) - restarted
+        for pid in restarted | reparented:
+            row = rows[pid]
+            if pid in self._parent:
+                self._unlink(pid)
+            self._link(pid, table.ppid[row], table.start_time[row])
+        self.collapsed.difference_update(restarted)
+
+        if gone or restarted or reparented:
+            self._dirty = True
+        if self._dirty:
+            self._rebuild_order()
+        self._rows = list(map(rows.__getitem__, self._order))
+        self._aggregate()
+        counters.update(added=len(restarted), removed=len(gone), reparented=len(reparented))
+        return counters
+
+    def apply_delta(self, delta: ProcessDelta) -> Dict[str, int]:
+        """Применяет разницу монитора к дереву, построенному по таблице публикации `delta.base`.
+
+        Пустая разница ничего не пересчитывает. Если процессы не появлялись,
+        не завершались и не меняли родителя, строки стоят на прежних местах:
+        пересчитываются только суммы, без сравнения столбцов всей таблицы.
+        Иначе — обычный update по таблице после разницы.
+        """
+        counters = {'added': 0, 'removed': 0, 'reparented': 0}
+        if not delta.keyframe and not delta:
+            return counters
+        changed = delta.changed
+        if (delta.keyframe or self._dirty or len(delta.added) or len(delta.removed)
+                or any(map(ne, map(self._parent.get, changed.pid), changed.ppid))):
+            return self.update(delta.state)
+        self._table = delta.state
+        self._aggregate()
+        return counters
+
+    def _roots(self) -> Set[int]:
+        parent, start = self._parent, self._start
+        # Корень — процесс без живого родителя; родитель, запущенный позже потомка,
+        # не настоящий: его PID достался другому процессу
+        return {pid for pid, ppid in parent.items()
+                if ppid == pid or ppid not in parent or 0 < start[pid] < start[ppid]}
+
+    def _rebuild_order(self):
+        parent, children = self._parent, self._children
+        roots = self._roots()
+        order = []
+        stack = sorted(roots, reverse=True)
+        while True:
+            while stack:
+                pid = stack.pop()
+                order.append(pid)
+                kids = children.get(pid)
+                if kids:
+                    stack.extend(sorted(kids - roots, reverse=True))
+            if len(order) == len(parent):
+                break
+            # Узел, недостижимый от корней (цикл из переиспользованных PID), становится корнем
+            root = min(parent.keys() - set(order))
+            roots.add(root)
+            stack.append(root)
+
+        # Потомки стоят после предка: глубина — проходом с начала, размеры поддеревьев — с конца
+        position = dict(zip(order, range(len(order))))
+        up = [-1 if pid in roots else position[parent[pid]] for pid in order]
+        depth = [0] * len(order)
+        for index, parent_position in enumerate(up):
+            if parent_position >= 0:
+                depth[index] = depth[parent_position] + 1
+        sizes = [1] * len(order)
+        for index in range(len(order) - 1, 0, -1):
+            if up[index] >= 0:
+                sizes[up[index]] += sizes[index]
+        self._order, self._depth, self._sizes = order, depth, sizes
+        self._ends = list(map(sum, zip(range(len(order)), sizes)))
+        self._dirty = False
+
+    def _subtree_sums(self, column) -> List[float]:
+        prefix = list(accumulate(map(column.__getitem__, self._rows), initial=0.0))
+        return list(map(sub, map(prefix.__getitem__, self._ends), prefix))
+
+    def _aggregate(self):
+        self._subtree_cpu = self._subtree_sums(self._table.cpu_usage)
+        self._subtree_memory = self._subtree_sums(self._table.memory_mb)
+        self._update_visible()
+
+    def _update_visible(self):
+        if not self.collapsed:
+            self._visible = list(range(len(self._order)))
+        else:
+            visible, position, order, sizes = [], 0, self._order, self._sizes
+            while position < len(order):
+                visible.append(position)
+                position += sizes[position] if order[position] in self.collapsed else 1
+            self._visible = visible
+        self._visible_index = None
+
+    # ---------- Свёртывание ----------
+
+    def toggle(self, pid: int):
+        """Сворачивает или разворачивает поддерево процесса."""
+        if pid in self.collapsed:
+            self.collapsed.discard(pid)
+        else:
+            index = self.index_of(pid)
+            if index is None or self._sizes[self._visible[index]] == 1:
+                return
+            self.collapsed.add(pid)
+        self._update_visible()
+
+    def subtree(self, pid: int) -> Dict[str, float]:
+        """Суммы ЦП и памяти поддерева процесса (включая сам процесс)."""
+        position = self._order.index(pid)
+        return {'cpu_usage': self._subtree_cpu[position], 'memory_mb': self._subtree_memory[position],
+                'processes': self._sizes[position]}
+
+    def subtree_pids(self, pid: int) -> List[int]:
+        """PID процесса и всех его потомков, предки раньше потомков (пусто, если процесса нет)."""
+        try:
+            position = self._order.index(pid)
+        except ValueError:
+            return []
+        return self._order[position:self._ends[position]]
+
+    def children(self, pid: int) -> List[int]:
+        return sorted(self._children.get(pid, ()))
+
+    # ---------- Последовательность видимых строк ----------
+
+    def __len__(self) -> int:
+        return len(self._visible)
+
+    def __getitem__(self, index: int) -> Dict:
+        position = self._visible[index]
+        table, row, pid = self._table, self._rows[position], self._order[position]
+        return {
+            'pid': pid,
+            'name': table.name[row],
+            'cpu_usage': table.cpu_usage[row],
+            'memory_mb': table.memory_mb[row],
+            'read_kb': table.read_kb[row],
+            'written_kb': table.written_kb[row],
+            'disk_rate': table.disk_rate[row],
+            'memory_rate': table.memory_rate[row],
+            'ppid': table.ppid[row],
+            'start_time': table.start_time[row],
+            'depth': self._depth[position],
+            'has_children': self._sizes[position] > 1,
+            'collapsed': pid in self.collapsed,
+            'subtree_cpu': self._subtree_cpu[position],
+            'subtree_memory': self._subtree_memory[position],
+        }
+
+    def __iter__(self):
+        for index in range(len(self._visible)):
+            yield self[index]
+
+    def index_of(self, pid: int) -> Optional[int]:
+        if self._visible_index is None:
+            order = self._order
+            self._visible_index = {order[position]: index for index, position in enumerate(self._visible)}
+        return self._visible_index.get(pid)
+
+    def pids(self) -> List[int]:
+        return [self._order[position] for position in self._visible]
@@ -0,0 +1,92 @@
+from array import array
+from itertools import chain, repeat
+from operator import add, mul, sub
+from typing import Dict, List, Mapping, Optional, Sequence
+
+# Переполнение 32-битного счётчика: прежнее значение было в верхней половине диапазона
+COUNTER_32_LIMIT = 2 ** 32
+
+
+class CounterRates:
+    """Скорости накопленных счётчиков по устройствам (интерфейсам, дискам).
+
+    На каждом вызове `update` счётчики всех устройств раскладываются в один
+    плоский массив, и приращения, скорости и сглаженные (EWMA) значения
+    считаются через map по массивам — без цикла по устройствам и полям в
+    Python. Время замера передаётся вызывающим (time.monotonic() источника),
+    поэтому у каждого источника свой интервал.
+
+    Отрицательное приращение — переполнение 32-битного счётчика (прежнее
+    значение было между 2**31 и 2**32) или сброс (перезагрузка драйвера,
+    переподключение устройства); при сбросе скорость за интервал нулевая.
+    С wraps=False любое уменьшение считается сбросом — для сумм, которые
+    убывают сами по себе. Новое устройство получает скорость со второго
+    замера, пропавшее забывается.
+    """
+
+    def __init__(self, fields: Sequence[str], half_life: float = 5.0, wraps: bool = True):
+        self.fields = tuple(fields)
+        self.wraps = wraps
+        self._avg_fields = tuple(field + '_avg' for field in self.fields)
+        self.half_life = half_life
+        self._names: List[str] = []
+        self._offsets: Dict[str, int] = {}
+        self._values = array('d')
+        self._ewma = array('d')
+        self._timestamp: Optional[float] = None
+
+    def _align(self, names: List[str], current: array):
+        """Прежние значения и EWMA в порядке нового списка устройств; новым — текущие значения и нули."""
+        width = len(self.fields)
+        previous, ewma = array('d'), array('d')
+        for index, name in enumerate(names):
+            offset = self._offsets.get(name)
+            if offset is None:
+                previous.extend(current[index * width:(index + 1) * width])
+                ewma.extend(repeat(0.0, width))
+            else:
+                previous.extend(self._values[offset:offset + width])
+                ewma.extend(self._ewma[offset:offset + width])
+        return previous, ewma
+
+    def update(self, timestamp: float, counters: Mapping[str, Sequence[float]]) -> Dict[str, Dict[str, float]]:
+        """Принимает накопленные счётчики {устройство: значения полей}.
+
+        Возвращает {устройство: {поле: скорость в секунду, поле_avg: сглаженная скорость}}.
+        """
+        names = list(counters)
+        current = array('d', chain.from_iterable(counters.values()))
+        if names == self._names:
+            previous, ewma_previous = self._values, self._ewma
+        else:
+            previous, ewma_previous = self._align(names, current)
+
+        elapsed = timestamp - self._timestamp if self._timestamp is not None else 0.0
+        if elapsed > 0:
+            deltas = array('d', map(sub, current, previous))
+            if deltas and min(deltas) < 0:
+                for index, delta in enumerate(deltas):
+                    if delta < 0:
+                        wrapped = self.wraps and COUNTER_32_LIMIT // 2 <= previous[index] < COUNTER_32_LIMIT
+                        deltas[index] = delta + COUNTER_32_LIMIT if wrapped else 0.0
+            rates = array('d', map(mul, deltas, repeat(1.0 / elapsed)))
+            # Коэффициент зависит от интервала: при редком опросе старые значения забываются быстрее
+            alpha = 1.0 - 0.5 ** (elapsed / self.half_life)
+            ewma = array('d', map(add, ewma_previous, map(mul, map(sub, rates, ewma_previous), repeat(alpha))))
+        else:
+            rates = array('d', repeat(0.0, len(current)))
+            ewma = ewma_previous
+
+        width = len(self.fields)
+        self._names = names
+        self._offsets = {name: index * width for index, name in enumerate(names)}
+        self._values = current
+        self._ewma = ewma
+        self._timestamp = timestamp
+
+        result = {}
+        for name, offset in self._offsets.items():
+            sample = dict(zip(self.fields, rates[offset:offset + width]))
+            sample.update(zip(self._avg_fields, ewma[offset:offset + width]))
+            result[name] = sample
+        return result
@@ -0,0 +1,386 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence
+
+from process_delta import ProcessDelta, apply_delta
+from snapshot import PROCESS_COLUMNS, ProcessTable
+
+# Формат сегмента:
+#   заголовок SEGMENT, затем записи RECORD (тип, длина полезной нагрузки).
+#   NAME — новое имя процесса: id (uint32) + utf-8.
+#   SNAP — снимок: FRAME (время, число строк, системные метрики), затем
+#          столбцы фиксированной ширины: pid (int64), id имени (uint32,
+#          с выравниванием до 8 байт), cpu/память/чтение/запись (float64).
+#   DELT — разница с прошлой записью сегмента (см. process_delta): FRAME
+#          (число строк — после применения), DELTA_COUNTS, PID исчезнувших
+#          строк (int64), затем изменившиеся и новые строки в формате SNAP.
+# Все записи выровнены по 8 байт, поэтому столбцы читаются из mmap напрямую.
+SEGMENT = struct.Struct('<8sI4xd')
+RECORD = struct.Struct('<4sI')
+FRAME = struct.Struct('<dIIddddddd')
+DELTA_COUNTS = struct.Struct('<III4x')
+NAME_ID = struct.Struct('<I')
+SEGMENT_MAGIC = b'TMSEG001'
+SEGMENT_SUFFIX = '.seg'
+# Очередь снимков на запись у шины монитора: пережидает медленный диск, не теряя снимков
+RECORD_QUEUE = 64
+FRAME_METRICS = ('cpu', 'memory', 'disk', 'network', 'gpu', 'memory_total', 'memory_available')
+
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+
+class MetricsRecorder:
+    """Пишет снимки SystemMonitor в бинарные сегменты с ротацией.
+
+    Снимки копятся в памяти и сбрасываются на диск одним вызовом write раз
+    в `flush_interval` секунд или при накоплении `flush_bytes`. Новый сегмент
+    открывается раз в `rotate_seconds` или по достижении `max_segment_bytes`;
+    в каталоге остаются `keep_segments` последних сегментов.
+    Процессы пишутся разницами монитора (SystemSnapshot.process_delta):
+    полная таблица — только в опорном кадре, в начале сегмента и после
+    пропущенной разницы.
+    Используется как callback монитора: monitor.register_callback(recorder.record, 'thread', RECORD_QUEUE)
+    — запись на диск идёт в своём потоке и не задерживает сбор.
+    """
+
+    def __init__(self, directory: str, rotate_seconds: float = 3600, max_segment_bytes: int = 256 * 1024 * 1024,
+                 flush_interval: float = 10.0, flush_bytes: int = 4 * 1024 * 1024, keep_segments: int = 48):
+        self.directory = directory
+        self.rotate_seconds = rotate_seconds
+        self.max_segment_bytes = max_segment_bytes
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.keep_segments = keep_segments
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._segment_started = 0.0
+        self._segment_size = 0
+        self._buffer = bytearray()
+        self._last_flush = time.monotonic()
+        self._name_ids: Dict[str, int] = {}
+        # Номер разницы, после которой записана последняя таблица сегмента
+        self._sequence: Optional[int] = None
+        self._lock = threading.Lock()
+        self.segments: List[str] = []
+
+    def record(self, snapshot):
+        with self._lock:
+            if self._file is None or self._should_rotate(snapshot.timestamp):
+                self._rotate(snapshot.timestamp)
+            self._append_snapshot(snapshot)
+            if len(self._buffer) >= self.flush_bytes or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def _should_rotate(self, timestamp: float) -> bool:
+        return (timestamp - self._segment_started >= self.rotate_seconds
+                or self._segment_size + len(self._buffer) >= self.max_segment_bytes)
+
+    def _rotate(self, timestamp: float):
+        self._close()
+        name = time.strftime('metrics-%Y%m%d-%H%M%S', time.localtime(timestamp))
+        path = os.path.join(self.directory, name + SEGMENT_SUFFIX)
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{name}_{suffix}{SEGMENT_SUFFIX}")
+            suffix += 1
+        self._file = open(path, 'wb')
+        self.segments.append(path)
+        self._segment_started = timestamp
+        self._segment_size = 0
+        # Словарь имён свой у каждого сегмента, чтобы сегменты читались независимо
+        self._name_ids = {}
+        self._sequence = None
+        self._buffer += SEGMENT.pack(SEGMENT_MAGIC, 1, timestamp)
+        self._remove_old_segments()
+
+    def _remove_old_segments(self):
+        paths = sorted(name for name in os.listdir(self.directory) if name.endswith(SEGMENT_SUFFIX))
+        for name in paths[:max(0, len(paths) - self.keep_segments)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError as e:
+                print(f"Error removing segment {name}: {e}")
+
+    def _name_id(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._name_ids)
+            payload = NAME_ID.pack(name_id) + name.encode('utf-8')
+            pad = _padding(len(payload))
+            self._buffer += RECORD.pack(b'NAME', len(payload) + pad) + payload + bytes(pad)
+        return name_id
+
+    def _append_snapshot(self, snapshot):
+        delta = snapshot.process_delta
+        if delta is None:
+            self._append_frame(b'SNAP', snapshot, (snapshot.processes,))
+        elif delta.sequence == self._sequence:
+            # Процессы с прошлой записи не опрашивались
+            self._append_frame(b'DELT', snapshot, (), len(delta.state), array('q'))
+        elif delta.keyframe or delta.base != self._sequence:
+            self._append_frame(b'SNAP', snapshot, (delta.state,))
+        else:
+            self._append_frame(b'DELT', snapshot, (delta.changed, delta.added), len(delta.state), delta.removed)
+        self._sequence = delta.sequence if delta is not None else None
+
+    def _append_frame(self, kind: bytes, snapshot, tables: Sequence[ProcessTable],
+                      count: Optional[int] = None, removed: Optional[array] = None):
+        name_ids = array('I', [self._name_id(name) for table in tables for name in table.name])
+        rows = len(name_ids)
+        metrics = snapshot.metrics()
+        name_bytes = rows * name_ids.itemsize
+        payload_size = FRAME.size + rows * 8 + name_bytes + _padding(name_bytes) + rows * 8 * len(PROCESS_COLUMNS)
+        if removed is not None:
+            payload_size += DELTA_COUNTS.size + len(removed) * 8
+
+        buffer = self._buffer
+        buffer += RECORD.pack(kind, payload_size)
+        buffer += FRAME.pack(
+            snapshot.timestamp, rows if count is None else count, 0,
+            metrics['cpu'], metrics['memory'], metrics['disk'], metrics['network'], metrics['gpu'],
+            float(snapshot.memory.get('total', 0)), float(snapshot.memory.get('available', 0))
+        )
+        if removed is not None:
+            buffer += DELTA_COUNTS.pack(len(removed), len(tables[0]) if tables else 0, rows)
+            buffer += removed.tobytes()
+        for table in tables:
+            buffer += table.pid.tobytes()
+        buffer += name_ids.tobytes()
+        buffer += bytes(_padding(name_bytes))
+        for column in PROCESS_COLUMNS:
+            for table in tables:
+                buffer += getattr(table, column).tobytes()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _flush(self):
+        if self._file is not None and self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._segment_size += len(self._buffer)
+            self._buffer = bytearray()
+        self._last_flush = time.monotonic()
+
+    def _close(self):
+        if self._file is not None:
+            self._flush()
+            self._file.close()
+            self._file = None
+
+
+class RecordedFrame:
+    """Снимок, прочитанный из сегмента: метрики и таблица процессов."""
+    __slots__ = ('segment', 'index', 'offset', 'timestamp', 'count', 'metrics')
+
+    def __init__(self, segment, index: int, offset: int, timestamp: float, count: int, metrics: Dict[str, float]):
+        self.segment = segment
+        self.index = index
+        self.offset = offset
+        self.timestamp = timestamp
+        self.count = count
+        self.metrics = metrics
+
+    def processes(self) -> ProcessTable:
+        """Столбцы опорного снимка копируются из mmap одним memcpy на столбец, к ним применяются разницы."""
+        return self.segment.table(self.index)
+
+
+class Segment:
+    """Сегмент, открытый через mmap. При открытии читаются только заголовки записей."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._map) if self._map is not None else memoryview(b'')
+        self.names: List[str] = []
+        self.frames: List[RecordedFrame] = []
+        # Номера кадров SNAP: с них начинается применение разниц
+        self._keyframes: List[int] = []
+        # Последняя собранная таблица: воспроизведение по порядку применяет одну разницу на кадр
+        self._cached: Optional[int] = None
+        self._cached_table = ProcessTable.empty()
+        self._scan()
+
+    def _scan(self):
+        view = self._view
+        if len(view) < SEGMENT.size or bytes(view[:8]) != SEGMENT_MAGIC:
+            return
+        offset = SEGMENT.size
+        while offset + RECORD.size <= len(view):
+            kind, size = RECORD.unpack_from(view, offset)
+            start = offset + RECORD.size
+            if start + size > len(view):
+                break  # недописанный хвост после аварийного завершения
+            if kind == b'NAME':
+                (name_id,) = NAME_ID.unpack_from(view, start)
+                name = bytes(view[start + NAME_ID.size:start + size]).rstrip(b'\0').decode('utf-8', 'replace')
+                self.names[len(self.names):name_id + 1] = [""] * (name_id + 1 - len(self.names))
+                self.names[name_id] = name
+            elif kind in (b'SNAP', b'DELT'):
+                if kind == b'SNAP':
+                    self._keyframes.append(len(self.frames))
+                timestamp, count, _, *values = FRAME.unpack_from(view, start)
+                self.frames.append(RecordedFrame(self, len(self.frames), start + FRAME.size, timestamp, count,
+                                                 dict(zip(FRAME_METRICS, values))))
+            offset = start + size
+
+    def _column(self, typecode: str, offset: int, count: int) -> array:
+        column = array(typecode)
+        column.frombytes(self._view[offset:offset + count * column.itemsize])
+        return column
+
+    def processes(self, offset: int, count: int) -> ProcessTable:
+        pids = self._column('q', offset, count)
+        offset += count * 8
+        name_ids = self._column('I', offset, count)
+        offset += count * 4 + _padding(count * 4)
+        numeric = []
+        for _ in PROCESS_COLUMNS:
+            numeric.append(self._column('d', offset, count))
+            offset += count * 8
+        names = self.names
+        return ProcessTable(pids, tuple([names[i] for i in name_ids]), *numeric)
+
+    def delta(self, offset: int) -> ProcessDelta:
+        """Разница записи DELT; изменившиеся строки идут перед новыми."""
+        removed_count, changed_count, count = DELTA_COUNTS.unpack_from(self._view, offset)
+        offset += DELTA_COUNTS.size
+        removed = self._column('q', offset, removed_count)
+        rows = self.processes(offset + removed_count * 8, count)
+
+        def part(rows_slice):
+            return ProcessTable(rows.pid[rows_slice], rows.name[rows_slice],
+                                *(getattr(rows, column)[rows_slice] for column in PROCESS_COLUMNS))
+
+        return ProcessDelta(0, 0, False, part(slice(changed_count, None)), part(slice(None, changed_count)), removed)
+
+    def table(self, index: int) -> ProcessTable:
+        """Таблица процессов кадра `index`: опорный снимок и разницы после него."""
+        keyframe = self._keyframes[bisect_right(self._keyframes, index) - 1] if self._keyframes else -1
+        if self._cached is not None and keyframe <= self._cached <= index:
+            start, table = self._cached, self._cached_table
+        elif keyframe >= 0:
+            start, table = keyframe, self.processes(self.frames[keyframe].offset, self.frames[keyframe].count)
+        else:
+            start, table = -1, ProcessTable.empty()
+        for frame in self.frames[start + 1:index + 1]:
+            table = apply_delta(table, self.delta(frame.offset))
+        self._cached, self._cached_table = index, table
+        return table
+
+    def close(self):
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class Replay:
+    """Воспроизведение записи: все сегменты каталога, поиск снимка по времени."""
+
+    def __init__(self, directory: str):
+        paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                       if name.endswith(SEGMENT_SUFFIX))
+        self.segments = [Segment(path) for path in paths]
+        self.frames = sorted((frame for segment in self.segments for frame in segment.frames),
+                             key=lambda frame: frame.timestamp)
+        self._times = [frame.timestamp for frame in self.frames]
+
+    def at(self, timestamp: float) -> Optional[RecordedFrame]:
+        """Последний снимок не позже timestamp."""
+        index = bisect_right(self._times, timestamp) - 1
+        return self.frames[index] if index >= 0 else None
+
+    def between(self, start: float, end: float) -> List[RecordedFrame]:
+        return self.frames[bisect_right(self._times, start - 1e-9):bisect_right(self._times, end)]
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def close(self):
+        self.frames = []
+        for segment in self.segments:
+            segment.close()
+
+
+def _parse_time(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return time.mktime(time.strptime(value, '%Y-%m-%d %H:%M:%S'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Запись и воспроизведение метрик Task Manager")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help="записывать снимки в каталог")
+    record.add_argument('directory')
+    record.add_argument('--interval', type=float, default=1.0, help="интервал опроса процессов, с")
+    replay = commands.add_parser('replay', help="показать запись")
+    replay.add_argument('directory')
+    replay.add_argument('--at', help="время снимка: unix-время или 'ГГГГ-ММ-ДД чч:мм:сс'")
+    replay.add_argument('--top', type=int, default=10, help="сколько процессов показать")
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        from system_monitor import SystemMonitor
+        monitor = SystemMonitor()
+        recorder = MetricsRecorder(args.directory)
+        monitor.register_callback(recorder.record, 'thread', RECORD_QUEUE)
+        monitor.start_monitoring(update_interval=args.interval, intervals={'cpu': args.interval})
+        print(f"Запись в {args.directory}, Ctrl+C для остановки")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            monitor.stop_monitoring()
+            # Отписка дописывает снимки, оставшиеся в очереди записи
+            monitor.unregister_callback(recorder.record)
+            recorder.close()
+        return
+
+    if not os.path.isdir(args.directory):
+        print(f"Каталог {args.directory} не найден")
+        return
+    replay = Replay(args.directory)
+    if not len(replay):
+        print("Запись пуста")
+        return
+    first, last = replay.frames[0].timestamp, replay.frames[-1].timestamp
+    print(f"Снимков: {len(replay)}, с {time.ctime(first)} по {time.ctime(last)}")
+    if args.at:
+        frame = replay.at(_parse_time(args.at))
+        if frame is None:
+            print("Нет снимков до указанного времени")
+            return
+        print(f"{time.ctime(frame.timestamp)}: ЦП {frame.metrics['cpu']:.1f}%, "
+              f"память {frame.metrics['memory']:.1f}%, процессов {frame.count}")
+        processes = frame.processes()
+        order = sorted(range(len(processes)), key=processes.cpu_usage.__getitem__, reverse=True)
+        for index in order[:args.top]:
+            row = processes[index]
+            print(f"  {row['pid']:>8} {row['name']:<30} {row['cpu_usage']:6.1f}% {row['memory_mb']:10.1f} MB")
+    replay.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
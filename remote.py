@@ -0,0 +1,563 @@
+import asyncio
+import socket
+import struct
+import threading
+import time
+from array import array
+from collections import deque
+from itertools import compress, repeat
+from operator import and_, eq, ne, not_
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from snapshot import PROCESS_COLUMNS, RATE_COLUMNS, ProcessTable, SystemSnapshot
+
+# Поток агента — кадры HEADER (тип, длина полезной нагрузки, поколение снимка,
+# поколение, от которого считана разница, время снимка) и полезная нагрузка:
+#   HELO — имя хоста (utf-8), первый кадр соединения.
+#   KEYF — полный снимок: SYSTEM, KEYF_COUNTS, pid и ppid (uint32), время
+#          запуска (float64), id имён (uint32), различные имена через \0,
+#          столбцы WIRE_COLUMNS (float32).
+#   DELT — разница с предыдущим снимком: SYSTEM, DELT_COUNTS, PID исчезнувших
+#          строк, новые строки (как в KEYF, но имена — по одному на строку) и
+#          изменившиеся строки (pid и столбцы WIRE_COLUMNS).
+#   SYNC — от клиента, без нагрузки: прислать полный снимок.
+HEADER = struct.Struct('<4sIQQd')
+SYSTEM = struct.Struct('<7d')
+SYSTEM_FIELDS = ('cpu', 'memory', 'disk', 'network', 'gpu', 'memory_total', 'memory_available')
+KEYF_COUNTS = struct.Struct('<II')
+DELT_COUNTS = struct.Struct('<IIII')
+WIRE_COLUMNS = PROCESS_COLUMNS + RATE_COLUMNS
+DEFAULT_AGENT_PORT = 9200
+# Кадр больше этого считается повреждённым потоком
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+
+def frame(kind: bytes, generation: int, base: int, timestamp: float, payload: bytes = b"") -> bytes:
+    return HEADER.pack(kind, len(payload), generation, base, timestamp) + payload
+
+
+def _system(snapshot: SystemSnapshot) -> bytes:
+    metrics = snapshot.metrics()
+    return SYSTEM.pack(metrics['cpu'], metrics['memory'], metrics['disk'], metrics['network'], metrics['gpu'],
+                       float(snapshot.memory.get('total', 0)), float(snapshot.memory.get('available', 0)))
+
+
+def _select(column: array, typecode: str, rows: Optional[Sequence[int]]) -> bytes:
+    values = column if rows is None else map(column.__getitem__, rows)
+    return array(typecode, values).tobytes()
+
+
+def _encode_rows(table: ProcessTable, rows: Optional[Sequence[int]]) -> List[bytes]:
+    """pid, ppid, время запуска и столбцы строк `rows` (None — всех строк)."""
+    parts = [_select(table.pid, 'I', rows), _select(table.ppid, 'I', rows), _select(table.start_time, 'd', rows)]
+    parts.append(None)  # место для имён
+    parts.extend(_select(getattr(table, column), 'f', rows) for column in WIRE_COLUMNS)
+    return parts
+
+
+def encode_keyframe(snapshot: SystemSnapshot) -> bytes:
+    table = snapshot.processes
+    distinct = list(dict.fromkeys(table.name))
+    ids = {name: index for index, name in enumerate(distinct)}
+    names = "\0".join(distinct).encode('utf-8')
+    parts = _encode_rows(table, None)
+    parts[3] = array('I', map(ids.__getitem__, table.name)).tobytes() + names
+    return _system(snapshot) + KEYF_COUNTS.pack(len(table), len(names)) + b"".join(parts)
+
+
+def table_changes(previous: ProcessTable, current: ProcessTable) -> Tuple[array, List[int], List[int]]:
+    """PID исчезнувших строк, номера новых строк и строк с изменившимися столбцами WIRE_COLUMNS.
+
+    Строки сопоставляются по PID и времени запуска, как в process_rates:
+    процесс, получивший чужой PID, — это исчезнувшая и новая строка.
+    """
+    if previous is current:
+        return array('I'), [], []
+    rows_all = range(len(current))
+    # Строки сравниваются кортежами значений: два zip и одно сравнение вместо сравнения по столбцам
+    values = list(zip(*(getattr(current, column) for column in WIRE_COLUMNS)))
+    before = list(zip(*(getattr(previous, column) for column in WIRE_COLUMNS)))
+    if current.pid == previous.pid and current.start_time == previous.start_time:
+        return array('I'), [], list(compress(rows_all, map(ne, values, before)))
+
+    # Отсутствующие PID указывают на строку-заглушку в конце прошлых строк
+    missing = len(previous)
+    positions = dict(zip(previous.pid, range(missing)))
+    rows = array('q', map(positions.get, current.pid, repeat(missing)))
+    previous_start = previous.start_time + array('d', (-1.0,))
+    matched = list(map(eq, current.start_time, map(previous_start.__getitem__, rows)))
+    before.append(None)
+    differs = map(ne, values, map(before.__getitem__, rows))
+    changed = list(compress(rows_all, map(and_, differs, matched)))
+    added = list(compress(rows_all, map(not_, matched)))
+    removed = array('I', sorted(set(previous.pid).difference(compress(current.pid, matched))))
+    return removed, added, changed
+
+
+def encode_delta(previous: SystemSnapshot, snapshot: SystemSnapshot) -> bytes:
+    delta, before = snapshot.process_delta, previous.process_delta
+    if delta is not None and before is not None and not delta.keyframe and delta.base == before.sequence:
+        # Разница монитора продолжает прошлый снимок: строки берутся из неё, таблицы не сравниваются
+        removed, added, changed = array('I', delta.removed), delta.added, delta.changed
+        added_rows = changed_rows = None
+    else:
+        removed, added_rows, changed_rows = table_changes(previous.processes, snapshot.processes)
+        added = changed = snapshot.processes
+    added_names = added.name if added_rows is None else map(added.name.__getitem__, added_rows)
+    names = "\0".join(added_names).encode('utf-8')
+    parts = _encode_rows(added, added_rows)
+    parts[3] = names
+    changed_parts = [_select(changed.pid, 'I', changed_rows)]
+    changed_parts.extend(_select(getattr(changed, column), 'f', changed_rows) for column in WIRE_COLUMNS)
+    added_count = len(added) if added_rows is None else len(added_rows)
+    changed_count = len(changed) if changed_rows is None else len(changed_rows)
+    return (_system(snapshot) + DELT_COUNTS.pack(len(removed), added_count, changed_count, len(names))
+            + removed.tobytes() + b"".join(parts) + b"".join(changed_parts))
+
+
+class _Subscriber:
+    """Очередь кадров одного клиента агента.
+
+    `generation` — поколение последнего поставленного в очередь кадра. Кадр,
+    не продолжающий цепочку, и переполнение очереди (клиент не успевает
+    читать) заменяют всё неотправленное полным снимком: медленный клиент
+    пропускает промежуточные снимки, но не задерживает остальных и не
+    копит память.
+    """
+
+    def __init__(self, peer, max_pending: int):
+        self.peer = peer
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.wake = asyncio.Event()
+        self.closed = False
+        self.generation = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.keyframes = 0
+
+    def push(self, data: bytes):
+        self.pending.append(data)
+        self.wake.set()
+
+    def offer(self, generation: int, base: int, data: bytes, keyframe):
+        """data — кадр DELT от `base` к `generation`; keyframe() — полный снимок того же поколения."""
+        if generation <= self.generation:
+            return
+        if base != self.generation or len(self.pending) >= self.max_pending:
+            self.resync(generation, keyframe())
+        else:
+            self.push(data)
+            self.generation = generation
+
+    def resync(self, generation: int, data: bytes):
+        self.dropped += len(self.pending)
+        self.pending.clear()
+        self.keyframes += 1
+        self.push(data)
+        self.generation = generation
+
+    def stats(self) -> Dict:
+        return {'peer': self.peer, 'generation': self.generation, 'frames': self.frames_sent,
+                'bytes': self.bytes_sent, 'dropped': self.dropped, 'keyframes': self.keyframes,
+                'pending': len(self.pending)}
+
+
+class RemoteAgent:
+    """Агент для удалённого наблюдения: раздаёт снимки монитора по TCP.
+
+    Разница с прошлым снимком кодируется один раз (в потоке подписчика
+    шины монитора) и общая для всех клиентов; полный снимок кодируется по требованию (новый
+    клиент, SYNC, отставший клиент) и кэшируется по поколению. Каждые
+    `keyframe_interval` снимков всем уходит полный снимок, чтобы ошибка в
+    состоянии клиента не жила вечно.
+    """
+
+    def __init__(self, monitor=None, host: str = "127.0.0.1", port: int = DEFAULT_AGENT_PORT,
+                 keyframe_interval: int = 30, max_pending: int = 8, hostname: Optional[str] = None):
+        self.monitor = monitor
+        self.host = host
+        self.port = port
+        self.keyframe_interval = keyframe_interval
+        self.max_pending = max_pending
+        self.hostname = hostname or socket.gethostname()
+        self.encoded_bytes = 0
+        self._latest: Optional[SystemSnapshot] = None
+        self._since_keyframe = 0
+        self._keyframe_lock = threading.Lock()
+        self._keyframe_cache: Tuple[int, bytes] = (-1, b"")
+        self._subscribers = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+
+    def keyframe(self, snapshot: SystemSnapshot) -> bytes:
+        with self._keyframe_lock:
+            generation, data = self._keyframe_cache
+            if generation != snapshot.generation:
+                data = frame(b'KEYF', snapshot.generation, 0, snapshot.timestamp, encode_keyframe(snapshot))
+                self._keyframe_cache = (snapshot.generation, data)
+                self.encoded_bytes += len(data)
+            return data
+
+    def publish(self, snapshot: SystemSnapshot):
+        """Колбэк монитора: кодирует снимок и передаёт его циклу сервера."""
+        previous = self._latest
+        self._latest = snapshot
+        if previous is None or self._since_keyframe + 1 >= self.keyframe_interval:
+            self._since_keyframe = 0
+            base, data = 0, None
+        else:
+            self._since_keyframe += 1
+            base = previous.generation
+            data = frame(b'DELT', snapshot.generation, base, snapshot.timestamp, encode_delta(previous, snapshot))
+            self.encoded_bytes += len(data)
+        loop = self._loop
+        if loop is not None and self._subscribers:
+            loop.call_soon_threadsafe(self._dispatch, snapshot, base, data)
+
+    def _dispatch(self, snapshot: SystemSnapshot, base: int, data: Optional[bytes]):
+        def keyframe():
+            return self.keyframe(snapshot)
+        for subscriber in self._subscribers:
+            if data is None:
+                if snapshot.generation > subscriber.generation:
+                    subscriber.resync(snapshot.generation, keyframe())
+            else:
+                subscriber.offer(snapshot.generation, base, data, keyframe)
+
+    def stats(self) -> List[Dict]:
+        return [subscriber.stats() for subscriber in self._subscribers]
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # При port=0 порт выбирает система
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.monitor is not None:
+            # Кодирование разницы — в своём потоке подписчика, не в потоке сбора
+            self.monitor.register_callback(self.publish, 'thread')
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self.monitor is not None:
+            self.monitor.unregister_callback(self.publish)
+        if self._server is not None:
+            self._server.close()
+            for subscriber in self._subscribers:
+                subscriber.closed = True
+                subscriber.wake.set()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _requests(self, reader: asyncio.StreamReader, subscriber: _Subscriber):
+        try:
+            while True:
+                kind, size, _, _, _ = HEADER.unpack(await reader.readexactly(HEADER.size))
+                if size:
+                    await reader.readexactly(min(size, MAX_PAYLOAD))
+                latest = self._latest
+                if kind == b'SYNC' and latest is not None:
+                    subscriber.resync(latest.generation, self.keyframe(latest))
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        finally:
+            subscriber.closed = True
+            subscriber.wake.set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscriber = _Subscriber(writer.get_extra_info('peername'), self.max_pending)
+        subscriber.push(frame(b'HELO', 0, 0, time.time(), self.hostname.encode('utf-8')))
+        latest = self._latest
+        if latest is not None:
+            subscriber.resync(latest.generation, self.keyframe(latest))
+        self._subscribers.add(subscriber)
+        requests = asyncio.ensure_future(self._requests(reader, subscriber))
+        try:
+            while not subscriber.closed:
+                if not subscriber.pending:
+                    subscriber.wake.clear()
+                    await subscriber.wake.wait()
+                    continue
+                data = subscriber.pending.popleft()
+                writer.write(data)
+                # drain ждёт, пока клиент разберёт буфер; тем временем очередь копит кадры
+                await writer.drain()
+                subscriber.frames_sent += 1
+                subscriber.bytes_sent += len(data)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+            requests.cancel()
+            writer.close()
+
+
+def run_agent(monitor, host: str = "127.0.0.1", port: int = DEFAULT_AGENT_PORT, update_interval: float = 2.0):
+    """Монитор без окна: сбор в фоне и раздача снимков агентом до Ctrl+C."""
+    agent = RemoteAgent(monitor, host, port)
+
+    async def serve():
+        await agent.start()
+        print(f"Streaming snapshots on {agent.host}:{agent.port}")
+        await agent.serve_forever()
+
+    monitor.start_monitoring(update_interval=update_interval)
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop_monitoring()
+
+
+class _Reader:
+    """Последовательное чтение массивов из полезной нагрузки кадра."""
+
+    def __init__(self, payload: bytes):
+        self.view = memoryview(payload)
+        self.offset = 0
+
+    def struct(self, layout: struct.Struct):
+        values = layout.unpack_from(self.view, self.offset)
+        self.offset += layout.size
+        return values
+
+    def array(self, typecode: str, count: int) -> array:
+        values = array(typecode)
+        size = count * values.itemsize
+        values.frombytes(self.view[self.offset:self.offset + size])
+        self.offset += size
+        return values
+
+    def text(self, size: int) -> List[str]:
+        data = bytes(self.view[self.offset:self.offset + size])
+        self.offset += size
+        return data.decode('utf-8', 'replace').split("\0") if size else []
+
+
+class RemoteHost:
+    """Состояние одного агента у агрегатора: системные метрики и строки процессов по PID.
+
+    Кадры KEYF заменяют состояние целиком, кадры DELT применяются к нему, только
+    если продолжают цепочку поколений; иначе `apply` возвращает False и
+    агрегатор запрашивает полный снимок.
+    """
+
+    def __init__(self, address: Tuple[str, int]):
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        self.connected = False
+        self.connects = 0
+        self.error: Optional[str] = None
+        self.generation = 0
+        self.timestamp = 0.0
+        self.system: Dict[str, float] = {}
+        self.frames = 0
+        self.bytes_received = 0
+        self.awaiting_keyframe = True
+        self.sync_requested = False
+        # pid → [ppid, время запуска, имя, столбцы WIRE_COLUMNS...]
+        self._rows: Dict[int, list] = {}
+        self._traffic = deque()
+
+    def apply(self, kind: bytes, generation: int, base: int, timestamp: float, payload: bytes) -> bool:
+        self.frames += 1
+        if kind == b'HELO':
+            self.name = payload.decode('utf-8', 'replace') or self.name
+            return True
+        if kind == b'DELT' and (self.awaiting_keyframe or base != self.generation):
+            self.awaiting_keyframe = True
+            return False
+        reader = _Reader(payload)
+        self.system = dict(zip(SYSTEM_FIELDS, reader.struct(SYSTEM)))
+        if kind == b'KEYF':
+            count, names_size = reader.struct(KEYF_COUNTS)
+            pids, ppids, starts = reader.array('I', count), reader.array('I', count), reader.array('d', count)
+            name_ids = reader.array('I', count)
+            distinct = reader.text(names_size)
+            columns = [reader.array('f', count) for _ in WIRE_COLUMNS]
+            self._rows = dict(zip(pids, map(list, zip(ppids, starts, map(distinct.__getitem__, name_ids),
+                                                      *columns))))
+            self.awaiting_keyframe = self.sync_requested = False
+        elif kind == b'DELT':
+            removed, added, changed, names_size = reader.struct(DELT_COUNTS)
+            rows = self._rows
+            for pid in reader.array('I', removed):
+                rows.pop(pid, None)
+            pids, ppids, starts = reader.array('I', added), reader.array('I', added), reader.array('d', added)
+            names = reader.text(names_size)
+            columns = [reader.array('f', added) for _ in WIRE_COLUMNS]
+            rows.update(zip(pids, map(list, zip(ppids, starts, names, *columns))))
+            pids = reader.array('I', changed)
+            columns = [reader.array('f', changed) for _ in WIRE_COLUMNS]
+            for pid, values in zip(pids, zip(*columns)):
+                row = rows.get(pid)
+                if row is not None:
+                    row[3:] = values
+        else:
+            return True
+        self.generation = generation
+        self.timestamp = timestamp
+        return True
+
+    def count_traffic(self, size: int, now: Optional[float] = None):
+        self.bytes_received += size
+        self._traffic.append((time.monotonic() if now is None else now, size))
+
+    def bandwidth(self, window: float = 5.0, now: Optional[float] = None) -> float:
+        """Принятые байты в секунду за последние `window` секунд."""
+        now = time.monotonic() if now is None else now
+        traffic = self._traffic
+        while traffic and traffic[0][0] < now - window:
+            traffic.popleft()
+        return sum(size for _, size in traffic) / window
+
+    def processes(self) -> ProcessTable:
+        """Таблица процессов хоста (строится по запросу, например для вкладки процессов)."""
+        rows = self._rows
+        if not rows:
+            return ProcessTable.empty()
+        ppids, starts, names, *columns = zip(*rows.values())
+        rates = [array('d', column) for column in columns[len(PROCESS_COLUMNS):]]
+        return ProcessTable(array('q', rows), names, *(array('d', column) for column in columns[:len(PROCESS_COLUMNS)]),
+                            ppid=array('q', ppids), start_time=array('d', starts), rates=rates)
+
+    def overview(self) -> Dict:
+        return {
+            'name': self.name,
+            'address': f"{self.address[0]}:{self.address[1]}",
+            'connected': self.connected,
+            'error': self.error,
+            'generation': self.generation,
+            'timestamp': self.timestamp,
+            'cpu': self.system.get('cpu', 0.0),
+            'memory': self.system.get('memory', 0.0),
+            'disk': self.system.get('disk', 0.0),
+            'network': self.system.get('network', 0.0),
+            'processes': len(self._rows),
+            'bandwidth': self.bandwidth(),
+        }
+
+
+def parse_address(text: str, default_port: int = DEFAULT_AGENT_PORT) -> Tuple[str, int]:
+    host, sep, port = text.strip().rpartition(':')
+    if not sep:
+        return text.strip(), default_port
+    return host.strip('[]'), int(port)
+
+
+class RemoteAggregator:
+    """Подписка на N агентов: по одному постоянному соединению на агента.
+
+    Соединения обслуживаются в отдельном потоке с циклом asyncio. При обрыве
+    соединение восстанавливается с экспоненциальной задержкой; разрыв цепочки
+    разниц лечится запросом SYNC по тому же соединению. `overview` и
+    `totals` безопасно вызывать из GUI.
+    """
+
+    def __init__(self, addresses: Iterable[Tuple[str, int]], reconnect_delay: float = 0.5,
+                 max_reconnect_delay: float = 10.0, connect_timeout: float = 3.0):
+        self.hosts = [RemoteHost(address) for address in addresses]
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connect_timeout = connect_timeout
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            self._loop = loop
+            self._tasks = [loop.create_task(self._follow(host)) for host in self.hosts]
+            ready.set()
+            try:
+                loop.run_until_complete(asyncio.gather(*self._tasks, return_exceptions=True))
+            finally:
+                loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        for task in self._tasks:
+            self._loop.call_soon_threadsafe(task.cancel)
+        self._thread.join()
+        self._thread = None
+        self._loop = None
+
+    async def _follow(self, host: RemoteHost):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(*host.address),
+                                                        self.connect_timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                host.error = str(e) or type(e).__name__
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+            delay = self.reconnect_delay
+            with self._lock:
+                host.connected, host.error = True, None
+                host.awaiting_keyframe, host.sync_requested = True, False
+                host.connects += 1
+            try:
+                await self._read(host, reader, writer)
+            except (asyncio.IncompleteReadError, ConnectionError, OSError, ValueError, struct.error) as e:
+                host.error = str(e) or type(e).__name__
+            finally:
+                host.connected = False
+                writer.close()
+            await asyncio.sleep(delay)
+
+    async def _read(self, host: RemoteHost, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while True:
+            kind, size, generation, base, timestamp = HEADER.unpack(await reader.readexactly(HEADER.size))
+            if size > MAX_PAYLOAD:
+                raise ValueError(f"frame too large: {size}")
+            payload = await reader.readexactly(size)
+            with self._lock:
+                host.count_traffic(HEADER.size + size)
+                in_sync = host.apply(kind, generation, base, timestamp, payload)
+            if not in_sync and not host.sync_requested:
+                host.sync_requested = True
+                writer.write(frame(b'SYNC', 0, 0, 0.0))
+                await writer.drain()
+
+    def overview(self) -> List[Dict]:
+        with self._lock:
+            return [host.overview() for host in self.hosts]
+
+    def totals(self) -> Dict:
+        """Сводка по всем хостам: средние проценты по подключённым, сумма процессов и трафика."""
+        hosts = self.overview()
+        connected = [host for host in hosts if host['connected']]
+
+        def mean(key):
+            return sum(host[key] for host in connected) / len(connected) if connected else 0.0
+
+        return {
+            'hosts': len(hosts),
+            'connected': len(connected),
+            'cpu': mean('cpu'),
+            'memory': mean('memory'),
+            'disk': mean('disk'),
+            'network': mean('network'),
+            'processes': sum(host['processes'] for host in connected),
+            'bandwidth': sum(host['bandwidth'] for host in hosts),
+        }
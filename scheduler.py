@@ -0,0 +1,200 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Интервалы опроса источников по умолчанию, секунды
+DEFAULT_INTERVALS = {
+    'cpu': 1.0,
+    'memory': 1.0,
+    'processes': 2.0,
+    'networks': 5.0,
+    'gpu': 5.0,
+    'disks': 10.0,
+    'disk_io': 1.0,
+    'services': 30.0,
+}
+
+# Во сколько раз реже опрашиваются источники свёрнутого окна и скрытых вкладок
+MINIMIZED_FACTOR = 5.0
+HIDDEN_FACTOR = 4.0
+
+
+class SourceStats:
+    """Статистика времени сбора одного источника."""
+    __slots__ = ('runs', 'total_time', 'last_time', 'max_time', 'overruns', 'errors')
+
+    def __init__(self):
+        self.runs = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+        self.max_time = 0.0
+        self.overruns = 0
+        self.errors = 0
+
+    def add(self, elapsed: float, overrun: bool):
+        self.runs += 1
+        self.total_time += elapsed
+        self.last_time = elapsed
+        self.max_time = max(self.max_time, elapsed)
+        if overrun:
+            self.overruns += 1
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.runs if self.runs else 0.0
+
+
+class MetricSource:
+    """Источник метрики со своим интервалом и бюджетом времени на сбор.
+
+    Если сбор не укладывается в бюджет, интервал удваивается (но не больше
+    `max_interval`); при быстрых сборах он постепенно возвращается к базовому.
+    """
+
+    def __init__(self, name: str, collect: Callable, interval: float,
+                 budget: Optional[float] = None, max_interval: Optional[float] = None):
+        self.name = name
+        self.collect = collect
+        self.base_interval = interval
+        self.interval = interval
+        self.budget = budget if budget is not None else interval / 4
+        self.max_interval = max_interval if max_interval is not None else interval * 8
+        self.hidden = False
+        self.next_due = 0.0
+        self.stats = SourceStats()
+
+    def record(self, elapsed: float):
+        overrun = elapsed > self.budget
+        self.stats.add(elapsed, overrun)
+        if overrun:
+            self.interval = min(self.interval * 2, self.max_interval)
+        elif elapsed < self.budget / 2 and self.interval > self.base_interval:
+            self.interval = max(self.base_interval, self.interval / 1.5)
+
+
+class SamplingScheduler:
+    """Планировщик опроса источников метрик с раздельными интервалами.
+
+    `run_due` вызывается из потока монитора, выполняет источники, чей срок
+    наступил, и возвращает их результаты; `due` и `run_source` — то же по
+    шагам, для сбора источников параллельно (async_monitor). Методы управления видимостью
+    безопасно вызывать из потока GUI.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, MetricSource] = {}
+        self._lock = threading.Lock()
+        self._throttle = 1.0
+
+    def add_source(self, name: str, collect: Callable, interval: float,
+                   budget: Optional[float] = None, max_interval: Optional[float] = None) -> MetricSource:
+        source = MetricSource(name, collect, interval, budget, max_interval)
+        with self._lock:
+            self._sources[name] = source
+        return source
+
+    def set_interval(self, name: str, interval: float):
+        """Меняет базовый интервал источника."""
+        with self._lock:
+            source = self._sources[name]
+            source.max_interval = source.max_interval / source.base_interval * interval
+            source.base_interval = interval
+            source.interval = interval
+            source.budget = interval / 4
+
+    def _effective_interval(self, source: MetricSource) -> float:
+        interval = source.interval * self._throttle
+        if source.hidden:
+            interval *= HIDDEN_FACTOR
+        return interval
+
+    def due(self, now: Optional[float] = None) -> List[MetricSource]:
+        """Источники, срок которых наступил к `now`."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return [source for source in self._sources.values() if source.next_due <= now]
+
+    def run_source(self, source: MetricSource, now: float):
+        """Собирает один источник и назначает ему следующий срок; ошибку возвращает как результат.
+
+        Безопасно вызывать для разных источников из нескольких потоков.
+        """
+        start = time.perf_counter()
+        try:
+            result = source.collect()
+        except Exception as e:
+            source.stats.errors += 1
+            result = e
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            source.record(elapsed)
+            source.next_due = now + self._effective_interval(source)
+        return result
+
+    def run_due(self, now: Optional[float] = None, prepare: Optional[Callable] = None) -> Dict:
+        """Собирает все источники, срок которых наступил; ошибки попадают в результат как исключения.
+
+        prepare(имена) вызывается перед сбором с именами источников этого такта.
+        """
+        now = time.monotonic() if now is None else now
+        due = self.due(now)
+        if prepare is not None and due:
+            try:
+                prepare([source.name for source in due])
+            except Exception as e:
+                # Источники соберутся по отдельности и сами сообщат об ошибке
+                print(f"Error preparing sources: {e}")
+        return {source.name: self.run_source(source, now) for source in due}
+
+    def time_until_next(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self._sources:
+                return 1.0
+            return max(0.0, min(source.next_due for source in self._sources.values()) - now)
+
+    def set_throttle(self, factor: float):
+        """Замедляет все источники в `factor` раз (например, при свёрнутом окне)."""
+        with self._lock:
+            speeding_up = factor < self._throttle
+            self._throttle = factor
+            if speeding_up:
+                self._reschedule_locked()
+
+    def set_hidden(self, names: Iterable[str]):
+        """Помечает источники, данные которых сейчас не видны пользователю."""
+        names = set(names)
+        with self._lock:
+            shown = False
+            for source in self._sources.values():
+                hidden = source.name in names
+                shown = shown or (source.hidden and not hidden)
+                source.hidden = hidden
+            if shown:
+                self._reschedule_locked()
+
+    def _reschedule_locked(self):
+        # Источник, который стал виден, не должен ждать конца длинного интервала
+        now = time.monotonic()
+        for source in self._sources.values():
+            source.next_due = min(source.next_due, now + self._effective_interval(source))
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                name: {
+                    'runs': source.stats.runs,
+                    'last_ms': source.stats.last_time * 1000,
+                    'avg_ms': source.stats.average_time * 1000,
+                    'max_ms': source.stats.max_time * 1000,
+                    'overruns': source.stats.overruns,
+                    'errors': source.stats.errors,
+                    'interval': self._effective_interval(source),
+                    'base_interval': source.base_interval,
+                    'hidden': source.hidden,
+                }
+                for name, source in self._sources.items()
+            }
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sources
@@ -0,0 +1,256 @@
+import ctypes
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from process_delta import ProcessDelta
+
+# Числовые столбцы таблицы процессов (все хранятся как float64)
+PROCESS_COLUMNS = ('cpu_usage', 'memory_mb', 'read_kb', 'written_kb')
+# Связи процессов: PID родителя и время запуска (секунды эпохи, 0 — неизвестно)
+TOPOLOGY_COLUMNS = ('ppid', 'start_time')
+# Скорости между снимками (см. process_rates): ввод-вывод в КБ/с, рост памяти в МБ/с
+RATE_COLUMNS = ('read_rate', 'write_rate', 'disk_rate', 'memory_rate')
+PROCESS_KEYS = ('pid', 'name') + PROCESS_COLUMNS + TOPOLOGY_COLUMNS + RATE_COLUMNS
+
+# Скорость канала, если интерфейс её не сообщает (виртуальные, Wi-Fi), бит/с
+DEFAULT_LINK_SPEED = 1e9
+
+
+class NameCache:
+    """Кэш имён процессов: байты из FFI декодируются только при первой встрече.
+
+    Одинаковые имена (десятки "chrome.exe") разделяют один интернированный
+    объект str. Кэш сбрасывается целиком, если разрастается сверх `limit`.
+    """
+
+    def __init__(self, limit: int = 16384):
+        self.limit = limit
+        self._names: Dict[bytes, str] = {}
+
+    def get(self, raw: bytes) -> str:
+        name = self._names.get(raw)
+        if name is None:
+            if len(self._names) >= self.limit:
+                self._names.clear()
+            name = self._names[raw] = raw.decode('utf-8', 'replace')
+        return name
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+def _struct_column(raw: memoryview, struct_type, field_name: str, fmt: str) -> array:
+    """Вырезает один столбец из сырых байт массива структур одним срезом."""
+    descriptor = getattr(struct_type, field_name)
+    itemsize = descriptor.size
+    stride = ctypes.sizeof(struct_type)
+    view = raw.cast(fmt)
+    column = array(fmt)
+    column.frombytes(view[descriptor.offset // itemsize::stride // itemsize].tobytes())
+    return column
+
+
+def _string_column(data, length: int, struct_type, field_name: str) -> list:
+    """Читает столбец c_char_p срезом массива указателей поверх памяти FFI."""
+    descriptor = getattr(struct_type, field_name)
+    pointer_size = ctypes.sizeof(ctypes.c_char_p)
+    stride = ctypes.sizeof(struct_type) // pointer_size
+    pointers = (ctypes.c_char_p * (length * stride)).from_address(ctypes.addressof(data.contents))
+    return pointers[descriptor.offset // pointer_size::stride]
+
+
+class ProcessRow(Mapping):
+    """Строка таблицы процессов с интерфейсом словаря (proc['pid'], proc['name'], ...)."""
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        if key not in PROCESS_KEYS:
+            raise KeyError(key)
+        return getattr(self._table, key)[self._index]
+
+    def __iter__(self):
+        return iter(PROCESS_KEYS)
+
+    def __len__(self) -> int:
+        return len(PROCESS_KEYS)
+
+    def __repr__(self):
+        return f"ProcessRow({dict(self)!r})"
+
+
+class ProcessTable:
+    """Столбцовый снимок процессов.
+
+    PID хранятся в `array('q')`, загрузка ЦП, память и ввод-вывод — в
+    `array('d')`, имена — в кортеже интернированных строк. PID родителя,
+    время запуска и скорости необязательны: источники без них получают нули. Итерация и
+    индексация отдают `ProcessRow`, поэтому код, работавший со списком
+    словарей, продолжает работать без изменений.
+    """
+    __slots__ = ('pid', 'name') + PROCESS_COLUMNS + TOPOLOGY_COLUMNS + RATE_COLUMNS + ('_index',)
+
+    def __init__(self, pid: array, name: Tuple[str, ...], cpu_usage: array,
+                 memory_mb: array, read_kb: array, written_kb: array,
+                 ppid: Optional[array] = None, start_time: Optional[array] = None,
+                 rates: Optional[Tuple[array, ...]] = None):
+        self.pid = pid
+        self.name = name
+        self.cpu_usage = cpu_usage
+        self.memory_mb = memory_mb
+        self.read_kb = read_kb
+        self.written_kb = written_kb
+        self.ppid = ppid if ppid is not None else array('q', bytes(8 * len(pid)))
+        self.start_time = start_time if start_time is not None else array('d', bytes(8 * len(pid)))
+        if rates is None:
+            rates = [array('d', bytes(8 * len(pid))) for _ in RATE_COLUMNS]
+        self.read_rate, self.write_rate, self.disk_rate, self.memory_rate = rates
+        self._index = None
+
+    @classmethod
+    def empty(cls):
+        return cls(array('q'), (), array('d'), array('d'), array('d'), array('d'))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping]):
+        """Строит таблицу из последовательности словарей (для поддельных источников и тестов)."""
+        if isinstance(rows, cls):
+            return rows
+        rows = list(rows)
+        return cls(
+            array('q', [int(row['pid']) for row in rows]),
+            tuple(row['name'] for row in rows),
+            *(array('d', [float(row[key]) for row in rows]) for key in PROCESS_COLUMNS),
+            ppid=array('q', [int(row.get('ppid', 0)) for row in rows]),
+            start_time=array('d', [float(row.get('start_time', 0.0)) for row in rows]),
+            rates=[array('d', [float(row.get(key, 0.0)) for row in rows]) for key in RATE_COLUMNS]
+        )
+
+    @classmethod
+    def from_struct_array(cls, data, length: int, names: Optional[NameCache] = None):
+        """Копирует массив структур ProcessInfo из FFI одним блоком и режет его на столбцы.
+
+        Числовые поля извлекаются срезами memoryview без обхода структур в
+        Python; строки pid и name читаются срезом массива указателей, а
+        имена декодируются только если их ещё нет в кэше `names`.
+        """
+        if not data or length == 0:
+            return cls.empty()
+        names = names if names is not None else NameCache()
+        struct_type = data._type_
+        raw = memoryview(ctypes.string_at(data, length * ctypes.sizeof(struct_type)))
+
+        pid = array('q', map(int, _string_column(data, length, struct_type, 'pid')))
+        name = tuple(map(names.get, _string_column(data, length, struct_type, 'name')))
+
+        # cpu_usage в FFI — float32, приводим к float64 как остальные столбцы
+        cpu_usage = array('d', _struct_column(raw, struct_type, 'cpu_usage', 'f'))
+        ppid = start_time = None
+        if hasattr(struct_type, 'ppid'):
+            ppid = array('q', _struct_column(raw, struct_type, 'ppid', 'I'))
+            start_time = array('d', _struct_column(raw, struct_type, 'start_time', 'Q'))
+        return cls(
+            pid, name, cpu_usage,
+            _struct_column(raw, struct_type, 'memory_mb', 'd'),
+            _struct_column(raw, struct_type, 'read_kb', 'd'),
+            _struct_column(raw, struct_type, 'written_kb', 'd'),
+            ppid, start_time
+        )
+
+    def column(self, key: str) -> memoryview:
+        """Только читаемое представление числового столбца без копирования."""
+        return memoryview(getattr(self, key)).toreadonly()
+
+    def index_of(self, pid: int) -> int:
+        """Позиция строки по PID (индекс строится лениво при первом вызове)."""
+        if self._index is None:
+            self._index = {value: i for i, value in enumerate(self.pid)}
+        return self._index[pid]
+
+    def get(self, pid: int) -> Optional[ProcessRow]:
+        try:
+            return ProcessRow(self, self.index_of(pid))
+        except KeyError:
+            return None
+
+    def __len__(self) -> int:
+        return len(self.pid)
+
+    def __getitem__(self, index: int) -> ProcessRow:
+        if index < 0:
+            index += len(self.pid)
+        if not 0 <= index < len(self.pid):
+            raise IndexError(index)
+        return ProcessRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.pid)):
+            yield ProcessRow(self, index)
+
+    def __eq__(self, other):
+        if not isinstance(other, ProcessTable):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in PROCESS_KEYS)
+
+    def __repr__(self):
+        return f"ProcessTable({len(self)} processes)"
+
+
+def network_utilization(network: Dict) -> float:
+    """Загрузка интерфейса в процентах от скорости канала (приём и передача вместе)."""
+    link_speed = network.get('link_speed') or DEFAULT_LINK_SPEED
+    bits = (network.get('send_speed', 0.0) + network.get('recv_speed', 0.0)) * 8
+    return min(bits / link_speed * 100, 100.0)
+
+
+@dataclass(frozen=True)
+class SystemSnapshot:
+    """Неизменяемый снимок всех метрик системы за один цикл сбора.
+
+    Собирается фоновым потоком `SystemMonitor` и целиком передаётся в GUI,
+    которому остаётся только отрисовать его, не обращаясь к DLL.
+    """
+    timestamp: float
+    # Номер снимка у монитора: растёт на каждом сборе, по нему кэшируются ответы экспортёра
+    generation: int = 0
+    cpu: Dict = field(default_factory=dict)
+    memory: Dict = field(default_factory=dict)
+    # Опубликованная таблица: строка обновляется, когда выходит за пороги монитора
+    processes: ProcessTable = field(default_factory=ProcessTable.empty)
+    disks: Tuple[Dict, ...] = ()
+    disk_io: Tuple[Dict, ...] = ()
+    networks: Tuple[Dict, ...] = ()
+    services: Tuple[Dict, ...] = ()
+    gpu: Optional[Dict] = None
+    # Первые места и всплески процессов (см. hotspots.HotspotTracker)
+    hotspots: Dict = field(default_factory=dict)
+    # Разница, после которой получена `processes` (см. process_delta). Снимки без нового
+    # опроса процессов несут ту же разницу: подписчик отличает её по sequence
+    process_delta: Optional['ProcessDelta'] = None
+
+    def metrics(self) -> Dict[str, float]:
+        """Системные метрики снимка в процентах — то, что рисуют графики."""
+        total_memory = self.memory.get('total', 0)
+        memory = (total_memory - self.memory.get('available', 0)) / total_memory * 100 if total_memory else 0.0
+        # Диск — доля времени активности самого загруженного устройства, если она известна,
+        # иначе заполненность первого диска
+        active = [disk['active'] for disk in self.disk_io if disk.get('active') is not None]
+        disk = 0.0
+        if active:
+            disk = max(active)
+        elif self.disks and self.disks[0].get('total_space'):
+            disk = (1 - self.disks[0]['available_space'] / self.disks[0]['total_space']) * 100
+        return {
+            'cpu': self.cpu.get('usage', 0.0),
+            'memory': memory,
+            'disk': disk,
+            'network': max((network_utilization(network) for network in self.networks
+                            if network.get('name') != 'lo'), default=0.0),
+            'gpu': self.gpu.get('load', 0.0) if self.gpu else 0.0
+        }
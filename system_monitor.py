@@ -1,257 +1,271 @@
-import ctypes
-from ctypes import c_char_p, c_float, c_double, c_uint64, c_int, c_void_p, Structure, POINTER, c_size_t, c_uint32
-import os
-from typing import List, Dict
 import threading
 import time
+from typing import List, Dict, Optional
+from backend import MetricsBackend, create_backend
+from bus import SnapshotBus
+from dll_backend import (
+    DEFAULT_DLL_PATH, ProcessInfo, ProcessInfoArray, ServiceInfo, ServiceInfoArray, CpuStaticInfo,
+    MemoryStaticInfo, DiskStaticInfo, DiskStaticInfoArray, NetworksStaticInfo, NetworksStaticInfoArray
+)
+from hotspots import HotspotTracker
+from path_resolver import PathResolver
+from process_control import ProcessController
+from process_delta import ProcessChangeTracker
+from process_rates import ProcessRates
+from rates import CounterRates
+from scheduler import DEFAULT_INTERVALS, MINIMIZED_FACTOR, SamplingScheduler
+from snapshot import ProcessTable, SystemSnapshot
+from timeseries import TimeSeriesStore
 
-# Определения структур для FFI (как и ранее)
-class ProcessInfo(Structure):
-    _fields_ = [
-        ("pid", c_char_p),
-        ("name", c_char_p),
-        ("cpu_usage", c_float),
-        ("memory_mb", c_double),
-        ("read_kb", c_double),
-        ("written_kb", c_double),
-    ]
-
-class ProcessInfoArray(Structure):
-    _fields_ = [
-        ("data", POINTER(ProcessInfo)),
-        ("len", c_size_t),
-    ]
-
-class ServiceInfo(Structure):
-    _fields_ = [
-        ("process_id", c_uint32),
-        ("name", c_char_p),
-        ("status", c_char_p),
-    ]
-
-class ServiceInfoArray(Structure):
-    _fields_ = [
-        ("data", POINTER(ServiceInfo)),
-        ("len", c_size_t),
-    ]
-
-class CpuStaticInfo(Structure):
-    _fields_ = [
-        ("brand", c_char_p),
-        ("usage", c_float),
-        ("frequency", c_double),
-        ("core_count", c_size_t),
-        ("work_time", c_int),
-        ("process", c_int),
-    ]
-
-class MemoryStaticInfo(Structure):
-    _fields_ = [
-        ("total", c_uint64),
-        ("used", c_uint64),
-        ("available", c_uint64),
-        ("speed", c_uint64),
-        ("format", c_char_p),
-    ]
-
-class DiskStaticInfo(Structure):
-    _fields_ = [
-        ("name", c_char_p),
-        ("total_space", c_uint64),
-        ("available_space", c_uint64),
-    ]
-
-class DiskStaticInfoArray(Structure):
-    _fields_ = [
-        ("data", POINTER(DiskStaticInfo)),
-        ("len", c_size_t),
-    ]
-
-class NetworksStaticInfo(Structure):
-    _fields_ = [
-        ("name", c_char_p),
-        ("ipv4", c_char_p),
-        ("send", c_uint64),
-        ("recive", c_uint64),
-    ]
-
-class NetworksStaticInfoArray(Structure):
-    _fields_ = [
-        ("data", POINTER(NetworksStaticInfo)),
-        ("len", c_size_t),
-    ]
+try:
+    import GPUtil
+except ImportError:
+    GPUtil = None
 
 class SystemMonitor:
-    def __init__(self, dll_path: str = "dll2/target/release/sys_info_fn.dll"):
-        try:
-            self.dll = ctypes.CDLL(dll_path)
-        except Exception as e:
-            print(f"Error loading DLL: {e}")
-            raise
-        self._setup_dll_functions()
+    def __init__(self, dll_path: str = DEFAULT_DLL_PATH, backend: MetricsBackend = None):
+        # Бэкенд выбирается автоматически: /proc на Linux, DLL на Windows
+        self.backend = backend if backend is not None else create_backend(dll_path=dll_path)
         self._running = False
         self._update_thread = None
         self._stop_event = threading.Event()
-        self._callbacks = []
-        self._last_network_stats = {}
-        self._last_update_time = time.time()
-        
-    def _setup_dll_functions(self):
-        self.dll.get_cpu_static_info.restype = POINTER(CpuStaticInfo)
-        self.dll.get_memory_static_info.restype = MemoryStaticInfo
-        self.dll.get_process_info_array.restype = ProcessInfoArray
-        self.dll.get_disk_static_info_array.restype = DiskStaticInfoArray
-        self.dll.get_networks_static_info_array.restype = NetworksStaticInfoArray
-        self.dll.get_services_info_array.restype = ServiceInfoArray
-
-        self.dll.start_process_collector.restype = c_int
-        self.dll.stop_process_collector.restype = c_int
-        self.dll.kill_process.argtypes = [c_uint32]
-        self.dll.kill_process.restype = c_int
-        self.dll.get_proc_path.argtypes = [c_uint32]
-        self.dll.get_proc_path.restype = c_char_p
+        self._wake_event = threading.Event()
+        # Снимки раздаются подписчикам через шину: у каждого своя очередь и счётчики
+        self.bus = SnapshotBus()
+        self._snapshot = None
+        self._generation = 0
+        # Такт сбора идёт под блокировкой: первый снимок для разовых запросов не собирается дважды
+        self._collect_lock = threading.Lock()
+        self._latest = {}
+        # История метрик за сутки: копится в фоне независимо от GUI
+        self.history = TimeSeriesStore()
+        # Скорости считаются по накопленным счётчикам; у каждого источника свой интервал
+        self._network_rates = CounterRates(('send', 'recive'))
+        self._disk_rates = CounterRates(('read_bytes', 'written_bytes', 'busy_ms'))
+        # Сумма по процессам убывает, когда процессы завершаются, — это не переполнение
+        self._process_io_rates = CounterRates(('read_bytes', 'written_bytes', 'busy_ms'), wraps=False)
+        self._process_rates = ProcessRates()
+        # Первые места и всплески считаются здесь, а не в GUI
+        self.hotspots = HotspotTracker()
+        # Таблица процессов публикуется разницами: строки, вышедшие за пороги, и опорный кадр раз в N тактов
+        self.process_changes = ProcessChangeTracker()
+        self._scheduler = SamplingScheduler()
+        # Пакетное завершение процессов идёт в своём пуле потоков, не в GUI
+        self.process_control = ProcessController(self.backend)
+        # Пути процессов кэшируются по (pid, время запуска) и разрешаются в фоне
+        self.paths = PathResolver(self.backend)
+        self._setup_sources()
 
+    def _setup_sources(self):
+        # Каждый источник опрашивается со своим интервалом (см. scheduler.DEFAULT_INTERVALS)
+        collectors = {
+            'cpu': self._get_cpu_info,
+            'memory': self._get_memory_info,
+            'processes': self._get_process_info,
+            'networks': self._get_network_info,
+            'gpu': self._get_gpu_info,
+            'disks': self._get_disk_info,
+            'disk_io': self._get_disk_io_info,
+            'services': self._get_services_info,
+        }
+        for name, collect in collectors.items():
+            self._scheduler.add_source(name, collect, DEFAULT_INTERVALS[name])
         
-    def start_monitoring(self, update_interval: float = 2.0):
-        """Запускает мониторинг системы с минимальной нагрузкой."""
+    def start_monitoring(self, update_interval: float = 2.0, intervals: Dict[str, float] = None):
+        """Запускает мониторинг системы с минимальной нагрузкой.
+
+        update_interval — интервал опроса процессов, intervals — интервалы
+        остальных источников по имени (cpu, memory, disks, ...).
+        """
         if self._running:
             return
+        self._set_intervals(update_interval, intervals)
         self._running = True
         self._stop_event.clear()
-        self.dll.start_process_collector()
+        self.backend.start()
+        self.paths.start()
         
         def update_loop():
             while not self._stop_event.is_set():
-                start_time = time.time()
                 self._update_data()
-                elapsed = time.time() - start_time
-                wait_time = max(0, update_interval - elapsed)
-                self._stop_event.wait(wait_time)
+                self._wake_event.wait(self._scheduler.time_until_next())
+                self._wake_event.clear()
                 
         self._update_thread = threading.Thread(target=update_loop, daemon=True)
         self._update_thread.start()
         
+    def _set_intervals(self, update_interval: float, intervals: Dict[str, float] = None):
+        self._scheduler.set_interval('processes', update_interval)
+        for name, interval in (intervals or {}).items():
+            self._scheduler.set_interval(name, interval)
+
     def stop_monitoring(self):
         """Останавливает мониторинг системы."""
         self._running = False
         self._stop_event.set()
+        self._wake_event.set()
         if self._update_thread:
             self._update_thread.join()
-        self.dll.stop_process_collector()
+        self.paths.stop()
+        # Потоки завершения процессов не демоны: незаконченное мягкое завершение держало бы выход
+        self.process_control.shutdown(wait=False)
+        self.backend.stop()
         
     def _update_data(self):
         try:
-            cpu_info = self._get_cpu_info()
-            memory_info = self._get_memory_info()
-            process_info = self._get_process_info()
-            for callback in self._callbacks:
-                callback(cpu_info, memory_info, process_info)
+            with self._collect_lock:
+                self._publish(self._scheduler.run_due(prepare=self.backend.prepare))
         except Exception as e:
             print(f"Error updating system data: {e}")
+
+    def _publish(self, results: Dict) -> Optional[SystemSnapshot]:
+        """Сохраняет результаты источников, собирает снимок и раздаёт его подписчикам."""
+        if not results:
+            return None
+        for name, value in results.items():
+            if isinstance(value, Exception):
+                # Ошибка одного источника не должна срывать весь снимок
+                print(f"Error collecting {name} info: {value}")
+            else:
+                self._store(name, value)
+        snapshot = self._build_snapshot()
+        self._snapshot = snapshot
+        self._record_history(snapshot, results)
+        self.bus.publish(snapshot)
+        return snapshot
+
+    def _store(self, name: str, value):
+        if name == 'processes':
+            # Скорости ввода-вывода и роста памяти — по разнице с прошлым снимком процессов
+            timestamp = time.monotonic()
+            value = self._process_rates.update(ProcessTable.from_rows(value), timestamp)
+            self._latest['hotspots'] = self.hotspots.update(value, timestamp)
+            self._latest['process_delta'] = self.process_changes.update(value)
+        elif isinstance(value, list):
+            value = tuple(value)
+        self._latest[name] = value
+
+    def _build_snapshot(self) -> SystemSnapshot:
+        """Собирает неизменяемый снимок из последних значений всех источников."""
+        latest = self._latest
+        self._generation += 1
+        delta = latest.get('process_delta')
+        return SystemSnapshot(
+            timestamp=time.time(),
+            generation=self._generation,
+            cpu=latest.get('cpu', {}),
+            memory=latest.get('memory', {}),
+            processes=delta.state if delta is not None else ProcessTable.empty(),
+            disks=latest.get('disks', ()),
+            disk_io=latest.get('disk_io', ()),
+            networks=latest.get('networks', ()),
+            services=latest.get('services', ()),
+            gpu=latest.get('gpu'),
+            hotspots=latest.get('hotspots', {}),
+            process_delta=delta
+        )
+
+    def _record_history(self, snapshot: SystemSnapshot, updated):
+        if updated.keys() & {'cpu', 'memory', 'disks', 'disk_io', 'networks', 'gpu'}:
+            self.history.append_many(snapshot.timestamp, snapshot.metrics())
+        if 'processes' in updated:
+            self.history.record_processes(snapshot.timestamp, snapshot.processes)
+
+    def set_change_thresholds(self, cpu: float = None, memory_mb: float = None, io_kb: float = None,
+                              keyframe_interval: int = None):
+        """Пороги, при которых процесс попадает в разницу, и период опорного кадра (см. process_delta)."""
+        tracker = self.process_changes
+        for name, value in (('cpu', cpu), ('memory_mb', memory_mb), ('io_kb', io_kb),
+                            ('keyframe_interval', keyframe_interval)):
+            if value is not None:
+                setattr(tracker, name, value)
+
+    def set_minimized(self, minimized: bool):
+        """Окно свёрнуто — все источники опрашиваются реже."""
+        self._scheduler.set_throttle(MINIMIZED_FACTOR if minimized else 1.0)
+        self._wake_event.set()
+
+    def set_hidden_sources(self, names):
+        """Данные этих источников сейчас не видны (скрытая вкладка) — опрашиваем их реже."""
+        self._scheduler.set_hidden(names)
+        self._wake_event.set()
+
+    def get_source_stats(self) -> Dict[str, Dict]:
+        """Статистика по источникам: число запусков, время сбора, текущий интервал."""
+        return self._scheduler.stats()
+
+    def get_snapshot(self):
+        """Возвращает последний собранный снимок или None, если сбора ещё не было."""
+        return self._snapshot
             
-    def register_callback(self, callback):
-        self._callbacks.append(callback)
-        
+    def register_callback(self, callback, delivery: str = 'inline', maxsize: int = 1, loop=None):
+        """Подписывает callback на снимки (см. bus.Subscription: delivery — inline, thread или asyncio)."""
+        return self.bus.subscribe(callback, delivery, maxsize, loop)
+
     def unregister_callback(self, callback):
-        if callback in self._callbacks:
-            self._callbacks.remove(callback)
+        return self.bus.unsubscribe(callback)
+
+    def get_subscriber_stats(self) -> List[Dict]:
+        """Доставлено, выброшено, ошибки и задержка по каждому подписчику."""
+        return self.bus.stats()
             
     def _get_cpu_info(self) -> Dict:
-        cpu_info_ptr = self.dll.get_cpu_static_info()
-        cpu_info = cpu_info_ptr.contents
-        info = {
-            'brand': cpu_info.brand.decode('utf-8'),
-            'usage': cpu_info.usage,
-            'frequency': cpu_info.frequency,
-            'core_count': cpu_info.core_count,
-            'work_time': cpu_info.work_time,
-            'process_count': cpu_info.process
-        }
-        self.dll.free_cpu_static_info(cpu_info_ptr)
-        return info
+        return self.backend.get_cpu_info()
         
     def _get_memory_info(self) -> Dict:
-        memory_info = self.dll.get_memory_static_info()
-        info = {
-            'total': memory_info.total,
-            'used': memory_info.used,
-            'available': memory_info.available,
-            'speed': memory_info.speed,
-            'format': memory_info.format.decode('utf-8') if memory_info.format else "Unknown"
-        }
-        return info
+        return self.backend.get_memory_info()
         
-    def _get_process_info(self) -> List[Dict]:
-        process_array = self.dll.get_process_info_array()
-        processes = []
-        for i in range(process_array.len):
-            process = process_array.data[i]
-            processes.append({
-                'pid': process.pid.decode('utf-8'),
-                'name': process.name.decode('utf-8'),
-                'cpu_usage': process.cpu_usage,
-                'memory_mb': process.memory_mb,
-                'read_kb': process.read_kb,
-                'written_kb': process.written_kb
-            })
-        self.dll.free_process_info_array(process_array)
-        return processes
+    def _get_process_info(self) -> ProcessTable:
+        return self.backend.get_processes()
         
     def _get_disk_info(self) -> List[Dict]:
-        disk_array = self.dll.get_disk_static_info_array()
-        disks = []
-        for i in range(disk_array.len):
-            disk = disk_array.data[i]
-            disks.append({
-                'name': disk.name.decode('utf-8'),
-                'total_space': disk.total_space,
-                'available_space': disk.available_space
-            })
-        self.dll.free_disk_static_info_array(disk_array)
-        return disks
+        return self.backend.get_disks()
         
     def _get_network_info(self) -> List[Dict]:
-        network_array = self.dll.get_networks_static_info_array()
-        networks = []
-        current_time = time.time()
-        time_diff = current_time - self._last_update_time
-        if time_diff > 2.0:
-            self._last_network_stats = {}
-            time_diff = 1.0
-        
-        for i in range(network_array.len):
-            network = network_array.data[i]
-            name = network.name.decode('utf-8')
-            current_stats = {
-                'send': network.send,
-                'recive': network.recive,
-                'time': current_time
-            }
-            if name in self._last_network_stats:
-                last_stats = self._last_network_stats[name]
-                send_speed = (current_stats['send'] - last_stats['send']) / time_diff
-                recv_speed = (current_stats['recive'] - last_stats['recive']) / time_diff
-                if send_speed < 0 or send_speed > 1e9:
-                    send_speed = 0
-                if recv_speed < 0 or recv_speed > 1e9:
-                    recv_speed = 0
-            else:
-                send_speed = 0
-                recv_speed = 0
-                
-            networks.append({
-                'name': name,
-                'ipv4': network.ipv4.decode('utf-8') if network.ipv4 else "",
-                'send_speed': send_speed,
-                'recv_speed': recv_speed
+        networks = self.backend.get_networks()
+        rates = self._network_rates.update(
+            time.monotonic(), {network['name']: (network['send'], network['recive']) for network in networks})
+        return [{
+            'name': network['name'],
+            'ipv4': network['ipv4'],
+            'send_speed': rates[network['name']]['send'],
+            'recv_speed': rates[network['name']]['recive'],
+            'send_speed_avg': rates[network['name']]['send_avg'],
+            'recv_speed_avg': rates[network['name']]['recive_avg'],
+            'link_speed': network.get('link_speed', 0)
+        } for network in networks]
+
+    def _get_disk_io_info(self) -> List[Dict]:
+        disks = self.backend.get_disk_io()
+        engine = self._disk_rates
+        if not disks:
+            # Бэкенд без счётчиков дисков (DLL): суммарный ввод-вывод процессов
+            processes = self._latest.get('processes')
+            if processes is None:
+                return []
+            disks = [{'name': 'total', 'read_bytes': sum(processes.read_kb) * 1024,
+                      'written_bytes': sum(processes.written_kb) * 1024, 'busy_ms': 0}]
+            engine = self._process_io_rates
+        rates = engine.update(
+            time.monotonic(), {disk['name']: (disk['read_bytes'], disk['written_bytes'], disk['busy_ms'])
+                               for disk in disks})
+        result = []
+        for disk in disks:
+            rate = rates[disk['name']]
+            result.append({
+                'name': disk['name'],
+                'read_speed': rate['read_bytes'],
+                'write_speed': rate['written_bytes'],
+                'read_speed_avg': rate['read_bytes_avg'],
+                'write_speed_avg': rate['written_bytes_avg'],
+                # Доля времени с запросами в работе: мс занятости за секунду
+                'active': min(rate['busy_ms'] / 10.0, 100.0) if disk['busy_ms'] else None
             })
-            self._last_network_stats[name] = current_stats
-            
-        self._last_update_time = current_time
-        self.dll.free_networks_static_info_array(network_array)
-        return networks
+        return result
 
-    def get_gpu_info(self):
+    def _get_gpu_info(self):
+        if GPUtil is None:
+            return None
         try:
             gpus = GPUtil.getGPUs()
             if not gpus:
@@ -272,40 +286,51 @@ class SystemMonitor:
             print(f"Ошибка получения данных GPU: {e}")
             return None
 
+    def _get_services_info(self) -> List[Dict]:
+        return self.backend.get_services()
+
+    def _latest_snapshot(self) -> SystemSnapshot:
+        """Последний снимок; пока его нет — собирает первый в вызывающем потоке.
+
+        Разовые запросы не обращаются к бэкенду сами: он хранит прошлые
+        счётчики (ЦП, процессы, сеть) для потока сбора, и лишний опрос
+        между тактами сбивал бы скорости.
+        """
+        if self._snapshot is None:
+            self._update_data()
+            if self._snapshot is None:
+                raise RuntimeError("no snapshot collected")
+        return self._snapshot
+
+    def get_gpu_info(self) -> Optional[Dict]:
+        return self._latest_snapshot().gpu
+
     def get_disk_info(self) -> List[Dict]:
-        return self._get_disk_info()
+        return list(self._latest_snapshot().disks)
 
     def get_network_info(self) -> List[Dict]:
-        return self._get_network_info()
+        return list(self._latest_snapshot().networks)
 
     def get_cpu_percent(self) -> float:
-        return self._get_cpu_info()['usage']
+        return self._latest_snapshot().cpu.get('usage', 0.0)
 
     def get_memory_percent(self) -> float:
-        memory_info = self._get_memory_info()
-        return (memory_info['used'] / memory_info['total']) * 100
+        memory_info = self._latest_snapshot().memory
+        return memory_info['used'] / memory_info['total'] * 100 if memory_info.get('total') else 0.0
 
     def get_services_info(self) -> List[Dict]:
-        services_array = self.dll.get_services_info_array()
-        services = []
-        for i in range(services_array.len):
-            service = services_array.data[i]
-            services.append({
-                'process_id': service.process_id,
-                'name': service.name.decode('utf-8') if service.name else "Unknown",
-                'status': service.status.decode('utf-8') if service.status else "Unknown"
-            })
-        self.dll.free_services_info_array(services_array)
-        return services
+        return list(self._latest_snapshot().services)
 
     def kill_process(self, pid: int) -> bool:
-        result = self.dll.kill_process(pid)
-        return result == 0
+        return self.backend.kill_process(pid)
 
     def get_proc_path(self, pid: int) -> str:
-        path_ptr = self.dll.get_proc_path(pid)
-        path = path_ptr.decode("utf-8") if path_ptr is not None else "NULL"
-        return path
+        # Время запуска из последнего снимка отличает процесс от прежнего владельца PID
+        start_time = 0.0
+        row = self._snapshot.processes.get(pid) if self._snapshot is not None else None
+        if row is not None:
+            start_time = row['start_time']
+        return self.paths.resolve(pid, start_time)['path']
 
     def __del__(self):
         if hasattr(self, '_update_thread'):
@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dll_backend import DEFAULT_DLL_PATH, DllBackend
+from fake_proc import make_proc_tree
+from proc_backend import ProcBackend
+
+# Стоимость одного снимка (ЦП + память + процессы + сеть) в пересчёте на 1000
+# процессов для каждого доступного бэкенда.
+
+REPEATS = 10
+
+
+def snapshot_cost(backend):
+    backend.start()
+    try:
+        backend.get_processes()  # первый вызов только запоминает счётчики ЦП
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            backend.get_cpu_info()
+            backend.get_memory_info()
+            count = len(backend.get_processes())
+            backend.get_networks()
+        elapsed = (time.perf_counter() - start) / REPEATS * 1000
+    finally:
+        backend.stop()
+    return count, elapsed
+
+
+def report(label, backend):
+    count, elapsed = snapshot_cost(backend)
+    per_1k = elapsed / count * 1000 if count else 0.0
+    print(f"{label:<28} {count:>9} {elapsed:>11.2f} {per_1k:>14.2f}")
+
+
+print(f"{'бэкенд':<28} {'процессов':>9} {'снимок, мс':>11} {'на 1000, мс':>14}")
+
+if os.path.isdir('/proc/self'):
+    report("proc (/proc системы)", ProcBackend())
+    report("proc без io (/proc)", ProcBackend(with_io=False))
+
+with tempfile.TemporaryDirectory() as root:
+    make_proc_tree(root, count=1000)
+    report("proc (синтетика, 1000)", ProcBackend(root))
+
+try:
+    report("dll", DllBackend(DEFAULT_DLL_PATH))
+except OSError:
+    print(f"{'dll':<28} библиотека {DEFAULT_DLL_PATH} недоступна")
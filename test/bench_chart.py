@@ -0,0 +1,100 @@
+import os
+import random
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from chart import LineChart
+
+# Время перерисовки графика: delete('all') и создание сетки и линии заново
+# против обновления координат одной линии с прореживанием по пикселям.
+
+SIZES = (60, 3600, 86400)
+WIDTH, HEIGHT = 800, 250
+REPEATS = 20
+
+
+class FakeCanvas:
+    """Заглушка Canvas для запуска без дисплея: хранит только координаты элементов."""
+
+    def __init__(self):
+        self.items = {}
+
+    def _create(self, *coords, **options):
+        item = len(self.items) + 1
+        self.items[item] = list(coords[0] if len(coords) == 1 else coords)
+        return item
+
+    create_line = create_text = _create
+
+    def coords(self, item, *coords):
+        self.items[item] = list(coords[0] if len(coords) == 1 else coords)
+
+    def itemconfigure(self, item, **options):
+        pass
+
+    def delete(self, tag):
+        self.items.clear()
+
+    def bind(self, sequence, func, add=None):
+        pass
+
+    def winfo_width(self):
+        return WIDTH
+
+    def winfo_height(self):
+        return HEIGHT
+
+    def update_idletasks(self):
+        pass
+
+
+def redraw_all(canvas, values):
+    """Прежний PerformanceTab.update_chart."""
+    canvas.delete('all')
+    for i in range(0, 101, 20):
+        y = HEIGHT - (i / 100 * (HEIGHT - 20))
+        canvas.create_line(0, y, WIDTH, y, fill='#3c3c3c')
+        canvas.create_text(5, y, text=f"{i}%", fill='white', anchor='w')
+    points = []
+    for i, value in enumerate(values):
+        points.extend([(i / (len(values) - 1)) * (WIDTH - 20) + 10, HEIGHT - (value / 100 * (HEIGHT - 20))])
+    canvas.create_line(points, fill='#3794ff', width=2, smooth=True)
+
+
+def measure(canvas, draw):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        draw()
+        canvas.update_idletasks()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+try:
+    root = tk.Tk()
+    canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT)
+    canvas.pack()
+    root.update()
+    print("Canvas: настоящий Tk")
+except tk.TclError:
+    root = None
+    canvas = FakeCanvas()
+    print("Canvas: заглушка (нет дисплея)")
+
+chart = LineChart(canvas)
+chart.add_series('cpu', '#3794ff')
+
+print(f"{'точек':>8} {'delete(all), мс':>16} {'coords, мс':>12}")
+for size in SIZES:
+    values = [random.random() * 100 for _ in range(size)]
+    old_ms = measure(canvas, lambda: redraw_all(canvas, values))
+    canvas.delete('all')
+    chart = LineChart(canvas)
+    chart.add_series('cpu', '#3794ff')
+    new_ms = measure(canvas, lambda: chart.set_data('cpu', values))
+    print(f"{size:>8} {old_ms:>16.2f} {new_ms:>12.2f}")
+
+if root is not None:
+    root.destroy()
@@ -0,0 +1,77 @@
+import ctypes
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dll_backend import DllBackend
+from mock_dll import build_mock_library, collect_processes, set_process_count
+from snapshot import ProcessTable
+
+# Чтение процессов фонового сборщика: прежний get_process_info_array (копия
+# массива и CString на каждый PID и имя при каждом чтении) против закрепления
+# двойного буфера таблицы сборщика: новое поколение, то же поколение и только
+# изменённые строки (1% процессов) через get_process_changes. Таблица — настоящая
+# dll2/src/process_table.rs, собранная rustc, сборщик — поддельный.
+
+SIZES = (1000, 10000)
+REPEATS = 50
+
+
+def measure(action, publish=None):
+    """Среднее время `action` в мс; `publish` (такт сборщика) перед каждым вызовом не учитывается."""
+    total = 0.0
+    # Первый вызов — прогрев
+    for repeat in range(REPEATS + 1):
+        if publish is not None:
+            publish()
+        start = time.perf_counter()
+        action()
+        if repeat:
+            total += time.perf_counter() - start
+    return total / REPEATS * 1000
+
+
+directory = tempfile.mkdtemp()
+path = build_mock_library(directory, process_table=True)
+if path is None:
+    print("нет компилятора C или rustc: поддельную библиотеку не собрать")
+    sys.exit(0)
+mock = ctypes.CDLL(path)
+mock.mock_set_process_cpu.argtypes = [ctypes.c_size_t, ctypes.c_float]
+
+print(f"{'Процессов':>10} {'Массив с CString, мс':>21} {'Новое поколение, мс':>20} "
+      f"{'То же поколение, мс':>20} {'Изменения 1%, мс':>17}")
+for size in SIZES:
+    set_process_count(path, size)
+    backend = DllBackend(path, collector_interval=3600)
+    backend.start()
+    collect_processes(path)
+    seen = [backend.dll.get_process_table_generation()]
+
+    def legacy():
+        array = backend.dll.get_process_info_array()
+        try:
+            return ProcessTable.from_struct_array(array.data, array.len, backend._name_cache)
+        finally:
+            backend.dll.free_process_info_array(array)
+
+    def publish_changes():
+        for index in range(0, size, 100):
+            mock.mock_set_process_cpu(index, (seen[0] % 100) / 10.0 + index % 7)
+        collect_processes(path)
+
+    def changed_rows():
+        changes = backend.get_process_changes(seen[0])
+        seen[0] = changes['generation']
+        return changes
+
+    legacy_ms = measure(legacy)
+    new_ms = measure(backend.get_processes, lambda: collect_processes(path))
+    same_ms = measure(backend.get_processes)
+    changes_ms = measure(changed_rows, publish_changes)
+    backend.stop()
+    print(f"{size:>10} {legacy_ms:>21.2f} {new_ms:>20.2f} {same_ms:>20.3f} {changes_ms:>17.2f}")
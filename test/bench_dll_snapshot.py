@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dll_backend import DllBackend
+from mock_dll import build_mock_library, set_process_count
+
+# Такт монитора через DLL: прежний путь — отдельный вызов на каждую метрику
+# (cpu, memory, processes, networks, disks; каждый под своей блокировкой и со
+# своим обновлением, cpu ещё раз обновляет процессы) против одного вызова
+# get_system_snapshot в переиспользуемый буфер. Используется поддельная
+# библиотека mock_sys_info.c, поэтому сборка dll2 не нужна.
+
+SIZES = (1000, 10000)
+REPEATS = 50
+SOURCES = ('cpu', 'memory', 'processes', 'networks', 'disks')
+
+
+def tick(backend):
+    backend.prepare(SOURCES)
+    backend.get_cpu_info()
+    backend.get_memory_info()
+    backend.get_processes()
+    backend.get_networks()
+    backend.get_disks()
+
+
+def measure(backend):
+    tick(backend)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        tick(backend)
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+directory = tempfile.mkdtemp()
+path = build_mock_library(directory)
+if path is None:
+    print("нет компилятора C: поддельную библиотеку не собрать")
+    sys.exit(0)
+
+print(f"{'Процессов':>10} {'Вызовов по метрике, мс':>24} {'Один снимок, мс':>16} {'Ускорение':>10}")
+for size in SIZES:
+    set_process_count(path, size)
+    batched = DllBackend(path)
+    legacy = DllBackend(path)
+    legacy.snapshot = None
+    legacy_ms = measure(legacy)
+    batched_ms = measure(batched)
+    print(f"{size:>10} {legacy_ms:>24.2f} {batched_ms:>16.2f} {legacy_ms / batched_ms:>9.1f}x")
+print(f"вызовов в библиотеку за такт: {len(SOURCES) + 5} (с освобождением) против 1; "
+      f"буфер снимка: {len(batched.snapshot) // 1024} КБ, переиспользуется")
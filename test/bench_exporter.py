@@ -0,0 +1,106 @@
+import asyncio
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from dataclasses import replace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from exporter import MetricsServer
+from hotspots import HotspotTracker
+from snapshot import ProcessTable, SystemSnapshot
+
+# Нагрузочный тест экспортёра: сервер в своём потоке, клиенты по keep-alive
+# соединениям держат заданный темп запросов (по умолчанию 1000 в секунду)
+# вперемешку к /metrics, /api/system и /api/processes. Снимок сменяется раз
+# в секунду, как у монитора; число отрисовок показывает, что стоимость
+# ответа не растёт с числом клиентов.
+
+PROCESSES = 10000
+RATE = 1000
+SECONDS = 5
+CONNECTIONS = 20
+PATHS = ('/metrics', '/api/system', '/api/processes')
+
+
+def make_snapshot():
+    table = ProcessTable.from_rows([{'pid': pid, 'name': f"proc_{pid % 500}", 'cpu_usage': random.random() * 10,
+                                     'memory_mb': random.random() * 500, 'read_kb': 0.0, 'written_kb': 0.0,
+                                     'start_time': float(pid)} for pid in range(1, PROCESSES + 1)])
+    return SystemSnapshot(timestamp=time.time(), generation=1, cpu={'usage': 50.0},
+                          memory={'total': 16 << 30, 'available': 8 << 30}, processes=table,
+                          hotspots=HotspotTracker().update(table, 0.0))
+
+
+class Source:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __call__(self):
+        return self.snapshot
+
+
+def run_server(server, ready, stop):
+    async def serve():
+        await server.start()
+        ready.set()
+        while not stop.is_set():
+            await asyncio.sleep(0.05)
+        await server.close()
+    asyncio.run(serve())
+
+
+async def client(port, paths, interval, deadline, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    next_time = time.perf_counter()
+    while next_time < deadline:
+        path = random.choice(paths)
+        start = time.perf_counter()
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        header = await reader.readuntil(b"\r\n\r\n")
+        length = int(header.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        next_time += interval
+        await asyncio.sleep(max(0.0, next_time - time.perf_counter()))
+    writer.close()
+
+
+async def load(port, source):
+    latencies = []
+    deadline = time.perf_counter() + SECONDS
+
+    async def tick():
+        # Новый снимок раз в секунду
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(1.0)
+            source.snapshot = replace(source.snapshot, generation=source.snapshot.generation + 1)
+
+    start = time.perf_counter()
+    await asyncio.gather(tick(), *(client(port, PATHS, CONNECTIONS / RATE, deadline, latencies)
+                                   for _ in range(CONNECTIONS)))
+    return latencies, time.perf_counter() - start
+
+
+random.seed(1)
+source = Source(make_snapshot())
+server = MetricsServer(source, port=0)
+ready, stop = threading.Event(), threading.Event()
+thread = threading.Thread(target=run_server, args=(server, ready, stop), daemon=True)
+thread.start()
+ready.wait()
+
+latencies, elapsed = asyncio.run(load(server.port, source))
+stop.set()
+thread.join()
+
+latencies.sort()
+print(f"процессов: {PROCESSES}, соединений: {CONNECTIONS}, цель: {RATE} запросов/с")
+print(f"выполнено: {len(latencies)} запросов за {elapsed:.1f} с ({len(latencies) / elapsed:.0f} в секунду)")
+print(f"задержка, мс: медиана {statistics.median(latencies) * 1000:.2f}, "
+      f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f}, макс {latencies[-1] * 1000:.2f}")
+print(f"снимков: {source.snapshot.generation}, отрисовок: {server.cache.renders} "
+      f"(не больше {len(PATHS)} на снимок)")
@@ -0,0 +1,62 @@
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from hotspots import TOP_COLUMNS, HotspotTracker, TopN
+from snapshot import ProcessTable
+
+# Стоимость «горячих точек» на тике против полной сортировки таблицы по
+# трём столбцам. Как в живой системе, ЦП занимает ~10% процессов, диск —
+# ~3%, остальные простаивают; между тиками ~1% процессов сменяется.
+
+SIZES = (1000, 10000)
+TICKS = 20
+
+
+def make_ticks(size):
+    processes = {pid: (random.expovariate(1.0) if random.random() < 0.1 else 0.0, random.random() * 500,
+                       random.expovariate(0.01) if random.random() < 0.03 else 0.0)
+                 for pid in range(1, size + 1)}
+    next_pid, tables = size + 1, []
+    for _ in range(TICKS):
+        for pid in random.sample(sorted(processes), size // 100):
+            del processes[pid]
+        for pid in range(next_pid, next_pid + size // 100):
+            processes[pid] = (0.0, 10.0, 0.0)
+        next_pid += size // 100
+        processes = {pid: (cpu * random.uniform(0.8, 1.2), memory + random.random() - 0.5,
+                           disk * random.uniform(0.5, 1.5))
+                     for pid, (cpu, memory, disk) in processes.items()}
+        tables.append(ProcessTable.from_rows([
+            {'pid': pid, 'name': f"proc_{pid % 500}", 'cpu_usage': cpu, 'memory_mb': memory, 'read_kb': 0.0,
+             'written_kb': 0.0, 'start_time': float(pid), 'disk_rate': disk}
+            for pid, (cpu, memory, disk) in processes.items()]))
+    return tables
+
+
+def median_ms(action, tables):
+    times = []
+    for tick, table in enumerate(tables):
+        start = time.perf_counter()
+        action(table, float(tick))
+        times.append(time.perf_counter() - start)
+    return statistics.median(times[2:]) * 1000
+
+
+def full_sort(table, timestamp):
+    for column in TOP_COLUMNS.values():
+        sorted(range(len(table)), key=getattr(table, column).__getitem__, reverse=True)[:20]
+
+
+print(f"{'процессов':>10} {'полная сортировка, мс':>22} {'top-N, мс':>10} {'top-N + всплески, мс':>21}")
+for size in SIZES:
+    random.seed(size)
+    tables = make_ticks(size)
+    tops = [TopN(column) for column in TOP_COLUMNS.values()]
+    top_ms = median_ms(lambda table, timestamp: [top.update(table) for top in tops], tables)
+    tracker_ms = median_ms(HotspotTracker().update, tables)
+    print(f"{size:>10} {median_ms(full_sort, tables):>22.2f} {top_ms:>10.2f} {tracker_ms:>21.2f}")
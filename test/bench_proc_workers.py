@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fake_proc import make_proc_tree
+from proc_backend import ProcBackend
+
+# Чтение процессов ProcBackend от 1 до N работников (пул потоков и пул
+# процессов) на синтетическом дереве в формате /proc во временном каталоге.
+# Таблица при любом числе работников должна совпадать с последовательным чтением.
+# Ускорение ограничено числом ядер: на одном ядре пул только добавляет накладные расходы.
+
+COUNT = 10000
+WORKERS = (1, 2, 4, 8)
+REPEATS = 5
+
+
+def measure(backend):
+    try:
+        backend.get_processes()  # пул создаётся при первом чтении
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            table = backend.get_processes()
+        return table, (time.perf_counter() - start) / REPEATS * 1000
+    finally:
+        backend.stop()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        make_proc_tree(root, count=COUNT)
+        reference, serial_ms = measure(ProcBackend(root))
+        print(f"процессов: {COUNT}, ядер: {os.cpu_count()}")
+        print(f"{'пул':<8} {'работников':>10} {'чтение, мс':>11} {'ускорение':>10} {'совпадает':>10}")
+        print(f"{'-':<8} {1:>10} {serial_ms:>11.1f} {1.0:>9.1f}x {'да':>10}")
+        for pool in ('thread', 'process'):
+            for workers in WORKERS[1:]:
+                table, elapsed = measure(ProcBackend(root, workers=workers, pool=pool))
+                same = (table.pid == reference.pid and table.name == reference.name
+                        and table.read_kb == reference.read_kb)
+                print(f"{pool:<8} {workers:>10} {elapsed:>11.1f} {serial_ms / elapsed:>9.1f}x "
+                      f"{'да' if same else 'нет':>10}")
+
+
+# Пул процессов запускает работников заново: код бенчмарка — только в главном процессе
+if __name__ == '__main__':
+    main()
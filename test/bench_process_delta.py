@@ -0,0 +1,97 @@
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from process_delta import ProcessChangeTracker
+from process_index import ProcessIndex
+from recorder import MetricsRecorder
+from remote import encode_delta
+from snapshot import ProcessTable, SystemSnapshot
+
+# Такт процессов у подписчиков монитора — запись (recorder), разница для
+# удалённых клиентов (remote.encode_delta) и сортировка для списка
+# (ProcessIndex, с разницами — apply_delta): полные таблицы на каждом
+# такте против разниц с порогами (process_delta). Простаивающие процессы
+# колеблются ниже порогов, 2% процессов заняты. Байты — записанные на диск
+# и закодированные для сети за такт, память — пик выделенного за такт
+# (tracemalloc).
+
+SIZES = (1000, 10000)
+TICKS = 30
+BUSY = 0.02
+
+
+def make_tables(size):
+    processes = {pid: [random.random(), 50.0 + random.random() * 100, 0.0] for pid in range(1, size + 1)}
+    busy = random.sample(sorted(processes), int(size * BUSY))
+    tables = []
+    for _ in range(TICKS):
+        for values in processes.values():
+            values[0] = max(0.0, values[0] + random.uniform(-0.2, 0.2))
+            values[1] += random.uniform(-0.3, 0.3)
+        for pid in busy:
+            values = processes[pid]
+            values[0] = random.random() * 50
+            values[1] += 5.0
+            values[2] += 500.0
+        tables.append(ProcessTable.from_rows([
+            {'pid': pid, 'name': f"proc_{pid % 500}", 'cpu_usage': cpu, 'memory_mb': memory,
+             'read_kb': read, 'written_kb': 0.0, 'start_time': float(pid)}
+            for pid, (cpu, memory, read) in processes.items()]))
+    return tables
+
+
+def run(tables, make_tracker, traced):
+    """Среднее по тактам (первый — опорный кадр — не считается): мс и байт или пик памяти."""
+    tracker = make_tracker()
+    results = []
+    index = ProcessIndex()
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = MetricsRecorder(directory, flush_interval=0)
+        previous = None
+        for tick, table in enumerate(tables):
+            if traced:
+                tracemalloc.start()
+            start = time.perf_counter()
+            written = recorder._segment_size
+            if tracker is None:
+                snapshot = SystemSnapshot(timestamp=float(tick), generation=tick, processes=table)
+            else:
+                delta = tracker.update(table)
+                snapshot = SystemSnapshot(timestamp=float(tick), generation=tick, processes=delta.state,
+                                          process_delta=delta)
+            recorder.record(snapshot)
+            encoded = len(encode_delta(previous, snapshot)) if previous is not None else 0
+            if tracker is None:
+                index.update(snapshot.processes)
+            else:
+                index.apply_delta(delta)
+            elapsed = time.perf_counter() - start
+            if traced:
+                result = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            else:
+                result = (elapsed, recorder._segment_size - written + encoded)
+            previous = snapshot
+            if tick:
+                results.append(result)
+        recorder.close()
+    if traced:
+        return statistics.mean(results) / 1024
+    return statistics.mean(r[0] for r in results) * 1000, statistics.mean(r[1] for r in results) / 1024
+
+
+print(f"{'Процессов':>10} {'Режим':>8} {'Такт, мс':>9} {'КБ за такт':>11} {'Пик памяти, КБ':>15}")
+for size in SIZES:
+    tables = make_tables(size)
+    for mode, make_tracker in (("полные", lambda: None),
+                               ("разницы", lambda: ProcessChangeTracker(keyframe_interval=TICKS))):
+        elapsed, kilobytes = run(tables, make_tracker, False)
+        peak = run(tables, make_tracker, True)
+        print(f"{size:>10} {mode:>8} {elapsed:>9.2f} {kilobytes:>11.1f} {peak:>15.0f}")
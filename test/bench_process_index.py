@@ -0,0 +1,75 @@
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from process_index import ProcessFilter, ProcessIndex
+from snapshot import ProcessTable
+
+# Стоимость сортировки и фильтрации на тике: sorted() по списку словарей
+# против ProcessIndex по столбцам ProcessTable. На каждом тике ~1% процессов завершается
+# и столько же появляется; загрузка ЦП меняется у 3% процессов (обычный узел,
+# большинство процессов простаивает) или у 20% (нагруженный узел). Память и
+# имена меняются только у новых процессов.
+
+SIZES = (1000, 10000, 20000)
+TICKS = 20
+ACTIVE = (("3%", 0.03), ("20%", 0.2))
+
+
+def make_rows(count, start_pid=1):
+    return [{'pid': pid, 'name': f"proc_{pid % 500}", 'cpu_usage': 0.0,
+             'memory_mb': random.random() * 500, 'read_kb': 0.0, 'written_kb': 0.0}
+            for pid in range(start_pid, start_pid + count)]
+
+
+def make_ticks(size, active):
+    rows = make_rows(size)
+    next_pid = size + 1
+    ticks = []
+    for _ in range(TICKS + 1):
+        churn = max(1, size // 100)
+        rows = [dict(row) for row in rows[churn:]]
+        for row in rows:
+            row['cpu_usage'] = 0.0
+        for row in rows[:int(len(rows) * active)]:
+            row['cpu_usage'] = random.random() * 10
+        rows += make_rows(churn, next_pid)
+        next_pid += churn
+        ticks.append((rows, ProcessTable.from_rows(rows)))
+    return ticks
+
+
+def naive(rows, process_filter, sort_key):
+    matched = [row for row in rows if process_filter.matches(row)] if process_filter else rows
+    return sorted(matched, key=lambda row: row[sort_key], reverse=True)
+
+
+def median_ms(action, items):
+    """Медиана времени на тик — устойчивее к шуму планировщика, чем среднее."""
+    times = []
+    for item in items:
+        start = time.perf_counter()
+        action(item)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+print(f"{'процессов':>10} {'активных':>9} {'сортировка':>11} {'фильтр':>8} {'sorted(), мс':>13} {'индекс, мс':>11}")
+for size in SIZES:
+    for active_label, active in ACTIVE:
+        random.seed(size)
+        ticks = make_ticks(size, active)
+        for sort_key in ('cpu_usage', 'memory_mb', 'name'):
+            for label, query in (("нет", ""), ("cpu>5", "cpu>5")):
+                process_filter = ProcessFilter.parse(query)
+                naive_ms = median_ms(lambda rows: naive(rows, process_filter, sort_key),
+                                     [rows for rows, _ in ticks[1:]])
+
+                index = ProcessIndex(sort_key, descending=True, process_filter=process_filter)
+                index.update(ticks[0][1])
+                index_ms = median_ms(index.update, [table for _, table in ticks[1:]])
+                print(f"{size:>10} {active_label:>9} {sort_key:>11} {label:>8} {naive_ms:>13.2f} {index_ms:>11.2f}")
@@ -0,0 +1,60 @@
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from process_rates import ProcessRates, numpy
+from snapshot import ProcessTable
+
+# Стоимость расчёта скоростей процессов на тике (цель — меньше 5 мс на 10k):
+# между тиками ~2% процессов завершается и столько же появляется; для
+# сравнения — тики без смены состава.
+
+SIZES = (1000, 10000, 50000)
+TICKS = 10
+
+
+def make_table(processes):
+    return ProcessTable.from_rows([{'pid': pid, 'name': f"proc_{pid % 500}", 'cpu_usage': 0.0,
+                                    'memory_mb': memory, 'read_kb': read, 'written_kb': written,
+                                    'start_time': float(pid)}
+                                   for pid, (read, written, memory) in processes.items()])
+
+
+def make_ticks(size, churn):
+    processes = {pid: (0.0, 0.0, 100.0) for pid in range(1, size + 1)}
+    next_pid, tables = size + 1, []
+    for _ in range(TICKS):
+        if churn:
+            for pid in random.sample(sorted(processes), size // 50):
+                del processes[pid]
+            for pid in range(next_pid, next_pid + size // 50):
+                processes[pid] = (0.0, 0.0, 100.0)
+            next_pid += size // 50
+        processes = {pid: (read + random.random() * 100, written + random.random() * 10,
+                           memory + random.random() - 0.5)
+                     for pid, (read, written, memory) in processes.items()}
+        tables.append(make_table(processes))
+    return tables
+
+
+def median_ms(rates, tables):
+    times = []
+    for tick, table in enumerate(tables):
+        start = time.perf_counter()
+        rates.update(table, float(tick))
+        times.append(time.perf_counter() - start)
+    return statistics.median(times[1:]) * 1000
+
+
+print(f"{'процессов':>10} {'без numpy, мс':>14} {'numpy, мс':>10} {'без numpy, состав тот же, мс':>29}")
+for size in SIZES:
+    random.seed(size)
+    tables = make_ticks(size, churn=True)
+    python_ms = median_ms(ProcessRates(use_numpy=False), tables)
+    numpy_ms = f"{median_ms(ProcessRates(), tables):.2f}" if numpy is not None else "—"
+    stable_ms = median_ms(ProcessRates(use_numpy=False), make_ticks(size, churn=False))
+    print(f"{size:>10} {python_ms:>14.2f} {numpy_ms:>10} {stable_ms:>29.2f}")
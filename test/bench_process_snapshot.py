@@ -0,0 +1,73 @@
+import ctypes
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from snapshot import NameCache, ProcessTable
+from system_monitor import ProcessInfo
+
+# Разбор ProcessInfoArray: прежний путь "словарь на процесс" против
+# столбцового ProcessTable. Массив структур собирается прямо в Python,
+# поэтому DLL для запуска не нужна.
+
+SIZES = (1000, 10000)
+REPEATS = 20
+
+
+def make_struct_array(count):
+    data = (ProcessInfo * count)()
+    for i in range(count):
+        data[i].pid = str(1000 + i).encode()
+        data[i].name = f"worker_{i % 50}.exe".encode()
+        data[i].cpu_usage = i % 100 / 10
+        data[i].memory_mb = i * 1.5
+        data[i].read_kb = i * 4.0
+        data[i].written_kb = i * 2.0
+    return ctypes.cast(data, ctypes.POINTER(ProcessInfo)), data
+
+
+def dict_path(data, length):
+    processes = []
+    for i in range(length):
+        process = data[i]
+        processes.append({
+            'pid': process.pid.decode('utf-8'),
+            'name': process.name.decode('utf-8'),
+            'cpu_usage': process.cpu_usage,
+            'memory_mb': process.memory_mb,
+            'read_kb': process.read_kb,
+            'written_kb': process.written_kb
+        })
+    return processes
+
+
+def measure(func):
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = func()
+    elapsed = (time.perf_counter() - start) / REPEATS * 1000
+
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, current / 1024, peak / 1024
+
+
+print(f"{'процессов':>10} {'способ':>12} {'время, мс':>10} {'удержано, КБ':>13} {'пик, КБ':>9}")
+for size in SIZES:
+    data, keep_alive = make_struct_array(size)
+    names = NameCache()
+    ProcessTable.from_struct_array(data, size, names)  # прогрев кэша имён, как на втором тике
+    for label, func in (
+        ('dict', lambda: dict_path(data, size)),
+        ('столбцы', lambda: ProcessTable.from_struct_array(data, size, names)),
+    ):
+        elapsed, retained, peak = measure(func)
+        print(f"{size:>10} {label:>12} {elapsed:>10.2f} {retained:>13.1f} {peak:>9.1f}")
@@ -0,0 +1,165 @@
+import os
+import random
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from process_index import ProcessIndex
+from process_table import format_process_row
+from snapshot import ProcessTable
+from virtual_list import VirtualListModel, VirtualProcessList
+
+# Время одного обновления таблицы процессов: полная перестройка Treeview
+# против виртуального списка над ProcessIndex, как в Frame (индекс по PID
+# обновляется снимком, отрисовываются только видимые строки). На каждом
+# тике ~2% процессов завершается, столько же появляется, у ~20% меняется
+# загрузка ЦП.
+
+SIZES = (100, 1000, 10000)
+TICKS = 10
+COLUMNS = ("ID процесса", "Имя", "ЦП", "Память", "Диск", "Сеть", "GPU", "Энерг-ие")
+
+
+class FakeTree:
+    """Заглушка Treeview для запуска без дисплея: считает только вызовы."""
+
+    def __init__(self):
+        self.items = {}
+        self._selection = ()
+
+    def insert(self, parent, index, iid=None, values=()):
+        iid = iid if iid is not None else str(len(self.items))
+        self.items[iid] = values
+        return iid
+
+    def item(self, iid, values=()):
+        self.items[iid] = values
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.items.pop(iid, None)
+
+    def get_children(self):
+        return tuple(self.items)
+
+    def selection(self):
+        return self._selection
+
+    def selection_set(self, items):
+        self._selection = tuple(items)
+
+
+class FakeScrollbar:
+    def set(self, first, last):
+        pass
+
+
+class FakeList:
+    """Заглушка VirtualProcessList без дисплея: та же отрисовка окна в заглушку Treeview."""
+
+    update_rows = VirtualProcessList.update_rows
+    refresh = VirtualProcessList.refresh
+    _resize_slots = VirtualProcessList._resize_slots
+
+    def __init__(self):
+        self.model = VirtualListModel(visible=30)
+        self.tree = FakeTree()
+        self.scrollbar = FakeScrollbar()
+        self._slots, self._slot_values, self._slot_pids = [], [], []
+
+    def destroy(self):
+        pass
+
+
+def make_processes(count, start_pid=1):
+    return [{
+        'pid': pid,
+        'name': f"proc_{pid}.exe",
+        'cpu_usage': random.random() * 10,
+        'memory_mb': random.random() * 500,
+        'read_kb': random.random() * 10000,
+        'written_kb': 0.0,
+    } for pid in range(start_pid, start_pid + count)]
+
+
+def next_tick(processes, next_pid):
+    churn = max(1, len(processes) // 50)
+    survivors = processes[churn:]
+    for proc in random.sample(survivors, len(survivors) // 5):
+        proc['cpu_usage'] = random.random() * 10
+    return survivors + make_processes(churn, next_pid), next_pid + churn
+
+
+def full_rebuild(tree, table):
+    tree.delete(*tree.get_children())
+    for proc in table:
+        tree.insert("", tk.END, values=format_process_row(proc))
+
+
+def make_tree(root):
+    if root is None:
+        return FakeTree()
+    tree = ttk.Treeview(root, columns=COLUMNS, show="headings")
+    tree.pack()
+    return tree
+
+
+def make_list(root):
+    if root is None:
+        return FakeList()
+    widget = VirtualProcessList(root, COLUMNS)
+    widget.pack(fill=tk.BOTH, expand=True)
+    widget.model.set_visible(30)
+    return widget
+
+
+def run(root, size, virtual):
+    random.seed(size)
+    processes = make_processes(size)
+    next_pid = size + 1
+    tables = [ProcessTable.from_rows(processes)]
+    for _ in range(TICKS):
+        processes, next_pid = next_tick(processes, next_pid)
+        tables.append(ProcessTable.from_rows(processes))
+
+    index = ProcessIndex()
+    widget = make_list(root) if virtual else make_tree(root)
+
+    def update(table):
+        if virtual:
+            index.update(table)
+            widget.update_rows(index)
+        else:
+            full_rebuild(widget, table)
+
+    update(tables[0])
+    elapsed = 0.0
+    for table in tables[1:]:
+        start = time.perf_counter()
+        update(table)
+        if root is not None:
+            root.update_idletasks()
+        elapsed += time.perf_counter() - start
+    if root is not None:
+        widget.destroy()
+    return elapsed / TICKS * 1000
+
+
+try:
+    root = tk.Tk()
+    print("Treeview: настоящий Tk")
+except tk.TclError:
+    root = None
+    print("Treeview: заглушка (нет дисплея)")
+
+print(f"{'процессов':>10} {'перестройка, мс':>16} {'виртуальный список, мс':>23}")
+for size in SIZES:
+    rebuild_ms = run(root, size, virtual=False)
+    virtual_ms = run(root, size, virtual=True)
+    print(f"{size:>10} {rebuild_ms:>16.2f} {virtual_ms:>23.2f}")
+
+if root is not None:
+    root.destroy()
@@ -0,0 +1,66 @@
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from process_tree import ProcessTree
+from snapshot import ProcessTable
+
+# Стоимость обновления дерева процессов на тике: без изменения состава
+# (меняются только ЦП и память), при 1% завершившихся и новых процессов и
+# построение с нуля.
+
+SIZES = (1000, 5000, 20000)
+TICKS = 10
+
+
+def make_table(links):
+    return ProcessTable.from_rows([{'pid': pid, 'name': f"proc_{pid % 500}", 'cpu_usage': random.random() * 10,
+                                    'memory_mb': random.random() * 500, 'read_kb': 0.0, 'written_kb': 0.0,
+                                    'ppid': ppid, 'start_time': float(pid)}
+                                   for pid, ppid in links.items()])
+
+
+def churn(links, next_pid, count):
+    for pid in random.sample(sorted(links)[1:], count):
+        del links[pid]
+    # Сироты переходят к init
+    links = {pid: ppid if ppid in links else 1 for pid, ppid in links.items()}
+    for pid in range(next_pid, next_pid + count):
+        links[pid] = random.choice(sorted(links)[:len(links) // 10 + 1])
+    return links
+
+
+def median_ms(action, items):
+    times = []
+    for item in items:
+        start = time.perf_counter()
+        action(item)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+print(f"{'процессов':>10} {'без изменений, мс':>18} {'1% смена, мс':>13} {'с нуля, мс':>11}")
+for size in SIZES:
+    random.seed(size)
+    links = {1: 0}
+    for pid in range(2, size + 1):
+        links[pid] = random.randrange(1, pid)
+    stable = [make_table(links) for _ in range(TICKS)]
+
+    churned, next_pid = [], size + 1
+    for _ in range(TICKS):
+        links = churn(links, next_pid, max(1, size // 100))
+        next_pid += max(1, size // 100)
+        churned.append(make_table(links))
+
+    tree = ProcessTree()
+    tree.update(stable[0])
+    stable_ms = median_ms(tree.update, stable[1:])
+    tree.update(churned[0])
+    churn_ms = median_ms(tree.update, churned[1:])
+    fresh_ms = median_ms(lambda table: ProcessTree().update(table), churned[:3])
+    print(f"{size:>10} {stable_ms:>18.2f} {churn_ms:>13.2f} {fresh_ms:>11.2f}")
@@ -0,0 +1,57 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from recorder import MetricsRecorder, Replay
+from snapshot import ProcessTable, SystemSnapshot
+
+# Стоимость записи снимка с 2000 процессов (цель — меньше 1% ЦП при записи
+# раз в секунду, т.е. < 10 мс на снимок) и скорость перемотки по записи.
+
+PROCESSES = 2000
+FRAMES = 3600
+
+
+def make_snapshot(timestamp, rows):
+    for row in random.sample(rows, 50):
+        row['cpu_usage'] = random.random() * 20
+    return SystemSnapshot(timestamp=timestamp, cpu={'usage': random.random() * 100},
+                          memory={'total': 16 << 30, 'available': 8 << 30},
+                          processes=ProcessTable.from_rows(rows))
+
+
+rows = [{'pid': pid, 'name': f"process-{pid % 300}", 'cpu_usage': 0.0, 'memory_mb': 50.0,
+         'read_kb': 0.0, 'written_kb': 0.0} for pid in range(1, PROCESSES + 1)]
+snapshots = [make_snapshot(float(t), rows) for t in range(100)]
+
+with tempfile.TemporaryDirectory() as directory:
+    recorder = MetricsRecorder(directory)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for t in range(FRAMES):
+        snapshot = snapshots[t % len(snapshots)]
+        recorder.record(SystemSnapshot(timestamp=float(t), cpu=snapshot.cpu, memory=snapshot.memory,
+                                       processes=snapshot.processes))
+    recorder.close()
+    cpu = (time.process_time() - cpu_start) / FRAMES
+    wall = (time.perf_counter() - wall_start) / FRAMES
+    size = sum(os.path.getsize(path) for path in recorder.segments)
+    print(f"запись: {wall * 1000:.2f} мс на снимок ({cpu * 100:.2f}% ЦП при 1 Гц), "
+          f"{size / FRAMES / 1024:.0f} КБ на снимок, {size / FRAMES * 86400 / 1024 ** 3:.1f} ГБ в сутки")
+
+    start = time.perf_counter()
+    replay = Replay(directory)
+    print(f"открытие записи: {len(replay)} снимков за {(time.perf_counter() - start) * 1000:.1f} мс")
+
+    repeats = 1000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        frame = replay.at(random.uniform(0, FRAMES))
+        processes = frame.processes()
+    elapsed = (time.perf_counter() - start) / repeats * 1000
+    print(f"перемотка: {elapsed:.3f} мс на снимок из {len(processes)} процессов")
+    replay.close()
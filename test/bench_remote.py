@@ -0,0 +1,103 @@
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from remote import RemoteAgent, RemoteAggregator, encode_delta, encode_keyframe
+from snapshot import ProcessTable, SystemSnapshot
+
+# Несколько агентов на loopback и агрегатор: каждый агент публикует снимки
+# с темпом TICKS в секунду, на каждом снимке у CHANGED доли процессов меняются
+# значения, несколько процессов завершаются и запускаются. Печатается трафик
+# на хост в секунду (измеренный агрегатором) и размер полного снимка и разницы.
+
+AGENTS = 4
+PROCESSES = 2000
+TICKS = 10
+SECONDS = 5
+CHANGED = 0.05
+CHURN = 5
+
+
+class Host:
+    """Синтетический хост: строки процессов и их изменение от снимка к снимку."""
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.next_pid = PROCESSES + 1
+        self.rows = [self.row(pid) for pid in range(1, PROCESSES + 1)]
+        self.generation = 0
+
+    def row(self, pid):
+        return {'pid': pid, 'name': f"proc_{pid % 300}", 'cpu_usage': 0.0, 'memory_mb': self.random.random() * 500,
+                'read_kb': 0.0, 'written_kb': 0.0, 'start_time': float(pid)}
+
+    def tick(self):
+        for row in self.random.sample(self.rows, int(len(self.rows) * CHANGED)):
+            row['cpu_usage'] = self.random.random() * 10
+            row['read_kb'] += self.random.random() * 100
+        for _ in range(CHURN):
+            self.rows.pop(self.random.randrange(len(self.rows)))
+            self.rows.append(self.row(self.next_pid))
+            self.next_pid += 1
+        self.generation += 1
+        return SystemSnapshot(timestamp=time.time(), generation=self.generation, cpu={'usage': 50.0},
+                              memory={'total': 16 << 30, 'available': 8 << 30},
+                              processes=ProcessTable.from_rows(self.rows))
+
+
+random.seed(1)
+hosts = [Host(seed) for seed in range(AGENTS)]
+agents = [RemoteAgent(port=0, hostname=f"host{index}") for index in range(AGENTS)]
+loop = asyncio.new_event_loop()
+thread = threading.Thread(target=loop.run_forever, daemon=True)
+thread.start()
+for agent in agents:
+    asyncio.run_coroutine_threadsafe(agent.start(), loop).result()
+
+aggregator = RemoteAggregator([("127.0.0.1", agent.port) for agent in agents])
+aggregator.start()
+while not all(host['connected'] for host in aggregator.overview()):
+    time.sleep(0.01)
+
+encode_time = 0.0
+sizes = {'keyframe': [], 'delta': []}
+previous = [None] * AGENTS
+start = time.perf_counter()
+for tick in range(TICKS * SECONDS):
+    for index, (host, agent) in enumerate(zip(hosts, agents)):
+        snapshot = host.tick()
+        began = time.perf_counter()
+        agent.publish(snapshot)
+        encode_time += time.perf_counter() - began
+        if previous[index] is not None and index == 0:
+            sizes['delta'].append(len(encode_delta(previous[index], snapshot)))
+            sizes['keyframe'].append(len(encode_keyframe(snapshot)))
+        previous[index] = snapshot
+    time.sleep(max(0.0, start + (tick + 1) / TICKS - time.perf_counter()))
+
+while any(host['generation'] < TICKS * SECONDS for host in aggregator.overview()):
+    time.sleep(0.01)
+overview = aggregator.overview()
+received = [host.bytes_received for host in aggregator.hosts]
+elapsed = time.perf_counter() - start
+aggregator.stop()
+for agent in agents:
+    asyncio.run_coroutine_threadsafe(agent.close(), loop).result()
+loop.call_soon_threadsafe(loop.stop)
+thread.join()
+
+print(f"агентов: {AGENTS}, процессов: {PROCESSES}, снимков в секунду: {TICKS}, "
+      f"меняется: {CHANGED:.0%}, запусков на снимок: {CHURN}")
+print(f"{'Хост':<8} {'Снимков':>8} {'Процессов':>10} {'КБ/с':>8} {'Всего КБ':>9}")
+for host, total in zip(overview, received):
+    print(f"{host['name']:<8} {host['generation']:>8} {host['processes']:>10} "
+          f"{total / elapsed / 1024:>8.1f} {total / 1024:>9.1f}")
+keyframe = sum(sizes['keyframe']) / len(sizes['keyframe'])
+delta = sum(sizes['delta']) / len(sizes['delta'])
+print(f"полный снимок: {keyframe / 1024:.1f} КБ, разница: {delta / 1024:.1f} КБ ({delta / keyframe:.1%})")
+print(f"кодирование: {encode_time / (TICKS * SECONDS * AGENTS) * 1000:.2f} мс на снимок")
@@ -0,0 +1,62 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from snapshot import ProcessTable
+from timeseries import TimeSeriesStore
+
+# Объём памяти хранилища истории за сутки (5 системных метрик + топ-20
+# процессов при 1000 процессов) и скорость записи/чтения окон.
+
+METRICS = ('cpu', 'memory', 'disk', 'network', 'gpu')
+DAY = 24 * 3600
+
+
+
+def make_processes():
+    return ProcessTable.from_rows([{'pid': pid, 'name': 'p', 'cpu_usage': random.random() * 10,
+                                    'memory_mb': 100.0, 'read_kb': 0.0, 'written_kb': 0.0}
+                                   for pid in range(1000)])
+
+
+def fill(store, processes):
+    """Сутки истории: метрики раз в секунду, снимок процессов раз в минуту."""
+    start = time.perf_counter()
+    for t in range(DAY):
+        for name in METRICS:
+            store.append(name, float(t), random.random() * 100)
+    append_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for t in range(0, DAY, 60):
+        processes.cpu_usage[random.randrange(1000)] = random.random() * 50
+        store.record_processes(float(t), processes)
+    return append_time, time.perf_counter() - start
+
+
+store = TimeSeriesStore()
+append_time, process_time = fill(store, make_processes())
+print(f"запись: {DAY * len(METRICS) / append_time:,.0f} точек/с; "
+      f"топ-20 процессов: {process_time / (DAY // 60) * 1e6:.0f} мкс на снимок")
+
+tracemalloc.start()
+measured = TimeSeriesStore()
+fill(measured, make_processes())
+current, peak = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+print(f"буферы рядов: {measured.nbytes() / 1024:.0f} КБ, "
+      f"всего выделено Python: {current / 1024:.0f} КБ (пик {peak / 1024:.0f} КБ)")
+del measured
+
+for label, seconds in (("60 с", 60), ("1 ч", 3600), ("6 ч", 6 * 3600), ("24 ч", DAY)):
+    repeats = 2000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        window = store.query('cpu', DAY - seconds, DAY, max_points=1000)
+        views = window.views('avg')
+    elapsed = (time.perf_counter() - start) / repeats * 1e6
+    print(f"окно {label:>5}: шаг {window.resolution:>4} с, {len(window):>5} точек, {elapsed:.1f} мкс на запрос")
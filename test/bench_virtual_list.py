@@ -0,0 +1,96 @@
+import os
+import random
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from snapshot import ProcessTable
+from virtual_list import VirtualListModel
+
+# Задержка прокрутки и применения нового снимка в виртуальном списке
+# процессов: должна оставаться постоянной при росте числа строк.
+
+SIZES = (1000, 10000, 50000)
+STEPS = 200
+COLUMNS = ("ID процесса", "Имя", "ЦП", "Память", "Диск", "Сеть", "GPU", "Энерг-ие")
+
+
+def make_table(count):
+    return ProcessTable.from_rows([{
+        'pid': pid,
+        'name': f"proc_{pid}",
+        'cpu_usage': random.random() * 10,
+        'memory_mb': random.random() * 500,
+        'read_kb': random.random() * 10000,
+        'written_kb': 0.0,
+    } for pid in range(1, count + 1)])
+
+
+class FakeList:
+    """Заглушка виджета без дисплея: модель и копирование окна в "строки"."""
+
+    def __init__(self):
+        self.model = VirtualListModel(visible=30)
+        self.shown = []
+
+    def refresh(self):
+        self.shown = list(self.model.window())
+
+    def update_rows(self, rows):
+        self.model.set_rows(rows)
+        self.refresh()
+
+
+def make_list(root):
+    if root is None:
+        return FakeList()
+    from virtual_list import VirtualProcessList
+    widget = VirtualProcessList(root, COLUMNS)
+    widget.pack(fill=tk.BOTH, expand=True)
+    widget.model.set_visible(30)
+    return widget
+
+
+def measure(root, widget, action):
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        action()
+        if root is not None:
+            root.update_idletasks()
+    return (time.perf_counter() - start) / STEPS * 1000
+
+
+try:
+    root = tk.Tk()
+    print("Список: настоящий Tk")
+except tk.TclError:
+    root = None
+    print("Список: заглушка (нет дисплея)")
+
+print(f"{'строк':>8} {'прокрутка, мс':>14} {'переход, мс':>12} {'новый снимок, мс':>17}")
+for size in SIZES:
+    tables = [make_table(size) for _ in range(2)]
+    widget = make_list(root)
+    widget.update_rows(tables[0])
+    widget.model.select(size // 2)
+
+    def scroll():
+        widget.model.scroll(1)
+        widget.refresh()
+
+    def jump():
+        widget.model.moveto(random.random())
+        widget.refresh()
+
+    ticks = iter(range(10 ** 9))
+    scroll_ms = measure(root, widget, scroll)
+    jump_ms = measure(root, widget, jump)
+    update_ms = measure(root, widget, lambda: widget.update_rows(tables[next(ticks) % 2]))
+    print(f"{size:>8} {scroll_ms:>14.3f} {jump_ms:>12.3f} {update_ms:>17.3f}")
+    if root is not None:
+        widget.destroy()
+
+if root is not None:
+    root.destroy()
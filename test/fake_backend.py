@@ -0,0 +1,81 @@
+import threading
+import time
+
+from backend import MetricsBackend
+from snapshot import ProcessTable
+
+
+def make_rows(count, first_pid=1):
+    return [{'pid': pid, 'name': f"proc{pid}", 'cpu_usage': 1.0, 'memory_mb': 10.0,
+             'read_kb': 0.0, 'written_kb': 0.0} for pid in range(first_pid, first_pid + count)]
+
+
+class FakeBackend(MetricsBackend):
+    """Поддельный бэкенд для тестов: фиксированные данные и настраиваемая задержка вызовов."""
+    name = "fake"
+
+    def __init__(self, processes=None, delay=0.0, ignore_term=()):
+        self.delay = delay
+        self.rows = list(processes) if processes is not None else make_rows(3)
+        self.killed = []
+        self.terminated = []
+        # PID, которые не реагируют на мягкое завершение
+        self.ignore_term = set(ignore_term)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _wait(self):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+
+    def get_cpu_info(self):
+        self._wait()
+        return {'brand': 'Fake CPU', 'usage': 12.5, 'frequency': 3.0,
+                'core_count': 4, 'work_time': 3600, 'process_count': len(self.rows)}
+
+    def get_memory_info(self):
+        self._wait()
+        return {'total': 16 * 1024 ** 3, 'used': 8 * 1024 ** 3, 'available': 8 * 1024 ** 3,
+                'speed': 2400, 'format': 'DDR4'}
+
+    def get_processes(self):
+        self._wait()
+        return ProcessTable.from_rows(self.rows)
+
+    def get_disks(self):
+        self._wait()
+        return [{'name': 'C:', 'total_space': 100 * 1024 ** 3, 'available_space': 50 * 1024 ** 3}]
+
+    def get_networks(self):
+        self._wait()
+        return [{'name': 'eth0', 'ipv4': '127.0.0.1', 'send': 0, 'recive': 0}]
+
+    def get_services(self):
+        self._wait()
+        return [{'process_id': 1, 'name': 'svc', 'status': 'OK'}]
+
+    def kill_process(self, pid):
+        self._wait()
+        with self._lock:
+            alive = self.is_running(pid)
+            self.rows = [row for row in self.rows if row['pid'] != pid]
+            if alive:
+                self.killed.append(pid)
+        return alive
+
+    def terminate_process(self, pid):
+        self._wait()
+        with self._lock:
+            alive = self.is_running(pid)
+            if alive and pid not in self.ignore_term:
+                self.rows = [row for row in self.rows if row['pid'] != pid]
+                self.terminated.append(pid)
+        return alive
+
+    def is_running(self, pid):
+        return any(row['pid'] == pid for row in self.rows)
+
+    def get_proc_path(self, pid):
+        self._wait()
+        return f"/usr/bin/proc{pid}"
@@ -0,0 +1,46 @@
+import os
+
+# Генератор синтетического дерева в формате /proc для тестов и бенчмарков
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def stat_line(pid, name, utime=0, stime=0, ppid=1, start_time=100, rss_pages=256):
+    fields = ['S', ppid] + [0] * 9 + [utime, stime] + [0] * 6 + [start_time, 0, rss_pages] + [0] * 30
+    return f"{pid} ({name}) " + " ".join(str(field) for field in fields) + "\n"
+
+
+def io_text(read_bytes=0, write_bytes=0):
+    return (f"rchar: 0\nwchar: 0\nsyscr: 0\nsyscw: 0\n"
+            f"read_bytes: {read_bytes}\nwrite_bytes: {write_bytes}\ncancelled_write_bytes: 0\n")
+
+
+def make_process(root, pid, name, **stat):
+    read_bytes = stat.pop('read_bytes', 0)
+    write_bytes = stat.pop('write_bytes', 0)
+    write(os.path.join(root, str(pid), 'stat'), stat_line(pid, name, **stat))
+    write(os.path.join(root, str(pid), 'io'), io_text(read_bytes, write_bytes))
+
+
+def make_proc_tree(root, count=0, first_pid=1000):
+    write(os.path.join(root, 'stat'), "cpu  100 0 100 800 0 0 0 0 0 0\ncpu0 100 0 100 800 0 0 0 0 0 0\n"
+                                       "btime 1700000000\n")
+    write(os.path.join(root, 'uptime'), "3600.50 7000.00\n")
+    write(os.path.join(root, 'cpuinfo'),
+          "processor\t: 0\nmodel name\t: Fake CPU\ncpu MHz\t\t: 2400.000\nphysical id\t: 0\ncore id\t\t: 0\n\n"
+          "processor\t: 1\nmodel name\t: Fake CPU\ncpu MHz\t\t: 2400.000\nphysical id\t: 0\ncore id\t\t: 1\n\n")
+    write(os.path.join(root, 'meminfo'),
+          "MemTotal:       16384000 kB\nMemFree:         1024000 kB\nMemAvailable:    8192000 kB\n")
+    write(os.path.join(root, 'net', 'dev'),
+          "Inter-|   Receive                                                |  Transmit\n"
+          " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+          "    lo:    1000      10    0    0    0     0          0         0     2000      20    0    0    0     0       0          0\n"
+          "  eth0:  500000     400    0    0    0     0          0         0   300000     300    0    0    0     0       0          0\n")
+    write(os.path.join(root, 'mounts'), "")
+    for pid in range(first_pid, first_pid + count):
+        make_process(root, pid, f"worker_{pid % 50}", utime=pid % 100, rss_pages=pid % 1000)
+    return root
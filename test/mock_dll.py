@@ -0,0 +1,49 @@
+import ctypes
+import os
+import shutil
+import subprocess
+from typing import Optional
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_sys_info.c')
+PROCESS_TABLE_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dll2', 'src',
+                                    'process_table.rs')
+
+
+def build_mock_library(directory: str, process_table: bool = False) -> Optional[str]:
+    """Собирает поддельную sys_info_fn (mock_sys_info.c) в `directory`; None, если нет компилятора C.
+
+    process_table=True подключает настоящую таблицу сборщика из dll2
+    (нужен rustc; без него тоже None).
+    """
+    compiler = shutil.which('cc') or shutil.which('gcc') or shutil.which('clang')
+    if compiler is None:
+        return None
+    command = [compiler, '-O2', '-shared', '-fPIC']
+    if process_table:
+        rustc = shutil.which('rustc')
+        if rustc is None:
+            return None
+        subprocess.run([rustc, '--edition', '2021', '--crate-type', 'cdylib', '-O', '--cfg', 'process_table_feed',
+                        '-o', os.path.join(directory, 'libprocess_table.so'), PROCESS_TABLE_SOURCE], check=True)
+        command += ['-DMOCK_PROCESS_TABLE', '-L', directory, f'-Wl,-rpath,{directory}']
+    path = os.path.join(directory, 'libsys_info_fn_mock.so')
+    subprocess.run(command + ['-o', path, SOURCE, '-lpthread'] + (['-lprocess_table'] if process_table else []),
+                   check=True)
+    return path
+
+
+def set_process_count(path: str, count: int):
+    library = ctypes.CDLL(path)
+    library.mock_set_process_count.argtypes = [ctypes.c_size_t]
+    library.mock_set_process_count(count)
+
+
+def set_process_cpu(path: str, index: int, cpu_usage: float):
+    library = ctypes.CDLL(path)
+    library.mock_set_process_cpu.argtypes = [ctypes.c_size_t, ctypes.c_float]
+    library.mock_set_process_cpu(index, cpu_usage)
+
+
+def collect_processes(path: str) -> bool:
+    """Одна публикация сборщика поддельной библиотеки (только с process_table)."""
+    return bool(ctypes.CDLL(path).mock_collect_processes())
@@ -0,0 +1,401 @@
+/*
+ * Поддельная библиотека sys_info_fn для тестов и бенчмарков на Linux.
+ *
+ * Повторяет C-интерфейс dll2/src/lib.rs: прежние функции по метрике
+ * (каждая берёт общую блокировку и «обновляет» свои данные, как SYS в
+ * Rust) и get_system_snapshot с той же раскладкой буфера. Обновление
+ * процессов стоит обхода всех процессов — как refresh_processes.
+ * Число процессов задаётся mock_set_process_count.
+ *
+ * С -DMOCK_PROCESS_TABLE сборщик процессов публикует их в настоящую таблицу
+ * dll2/src/process_table.rs (собранную с --cfg process_table_feed) через
+ * process_table_feed: раз в интервал и по mock_collect_processes.
+ */
+#include <pthread.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+typedef struct { char *pid; char *name; float cpu_usage; double memory_mb; double read_kb; double written_kb;
+                 uint32_t ppid; uint64_t start_time; } ProcessInfo;
+typedef struct { ProcessInfo *data; size_t len; } ProcessInfoArray;
+typedef struct { char *brand; float usage; double frequency; size_t core_count; int64_t work_time;
+                 int64_t process; } CpuStaticInfo;
+typedef struct { uint64_t total; uint64_t used; uint64_t available; uint64_t speed; char *format; } MemoryStaticInfo;
+typedef struct { char *name; uint64_t total_space; uint64_t available_space; } DiskStaticInfo;
+typedef struct { DiskStaticInfo *data; size_t len; } DiskStaticInfoArray;
+typedef struct { char *name; char *ipv4; uint64_t send; uint64_t recive; } NetworksStaticInfo;
+typedef struct { NetworksStaticInfo *data; size_t len; } NetworksStaticInfoArray;
+typedef struct { uint32_t process_id; char *name; char *status; } ServiceInfo;
+typedef struct { ServiceInfo *data; size_t len; } ServiceInfoArray;
+
+#define SNAPSHOT_MAGIC 0x53534D54u
+#define SNAPSHOT_VERSION 1u
+#define SECTION_CPU 1u
+#define SECTION_MEMORY 2u
+#define SECTION_DISKS 4u
+#define SECTION_NETWORKS 8u
+#define SECTION_PROCESSES 16u
+
+typedef struct { uint32_t offset; uint32_t len; } SnapshotString;
+typedef struct {
+    uint32_t magic, version, sections; float cpu_usage; uint64_t size;
+    double cpu_frequency; uint64_t core_count, work_time, process_count;
+    uint64_t memory_total, memory_used, memory_available, memory_speed;
+    SnapshotString cpu_brand, memory_format;
+    uint32_t disks_offset, disks_len, networks_offset, networks_len;
+    uint32_t processes_offset, processes_len, strings_offset, strings_len;
+} SnapshotHeader;
+typedef struct { SnapshotString name; uint64_t total_space, available_space; } SnapshotDisk;
+typedef struct { SnapshotString name, ipv4; uint64_t send, recive; } SnapshotNetwork;
+typedef struct { int64_t pid, ppid; SnapshotString name; double cpu_usage, memory_mb, read_kb, written_kb,
+                 start_time; } SnapshotProcess;
+
+typedef struct { uint32_t pid, ppid; char name[32]; float cpu_usage; double memory_mb, read_kb, written_kb;
+                 uint64_t start_time; } MockProcess;
+
+static pthread_mutex_t sys_lock = PTHREAD_MUTEX_INITIALIZER;
+static MockProcess *processes = NULL;
+static size_t process_count = 0;
+static uint64_t ticks = 0;
+static const char *disk_names[] = {"C:", "D:"};
+static const char *network_names[] = {"eth0", "wlan0"};
+
+void mock_set_process_count(size_t count) {
+    pthread_mutex_lock(&sys_lock);
+    processes = realloc(processes, count * sizeof(MockProcess));
+    for (size_t i = 0; i < count; i++) {
+        MockProcess *p = &processes[i];
+        p->pid = (uint32_t)(1000 + i);
+        p->ppid = i ? 1000 : 0;
+        snprintf(p->name, sizeof(p->name), "worker_%zu.exe", i % 50);
+        p->cpu_usage = (float)(i % 100) / 10.0f;
+        p->memory_mb = (double)i * 1.5;
+        p->read_kb = p->written_kb = 0.0;
+        p->start_time = 1700000000u + i;
+    }
+    process_count = count;
+    pthread_mutex_unlock(&sys_lock);
+}
+
+/* Аналог refresh_processes: проход по всем процессам под блокировкой */
+static void refresh_processes(void) {
+    ticks++;
+    for (size_t i = 0; i < process_count; i++) {
+        processes[i].read_kb += (double)((i + ticks) % 7);
+        processes[i].written_kb += (double)((i * ticks) % 5);
+    }
+}
+
+static char *copy_string(const char *value) { return strdup(value); }
+
+CpuStaticInfo *get_cpu_static_info(void) {
+    pthread_mutex_lock(&sys_lock);
+    refresh_processes();
+    CpuStaticInfo *info = malloc(sizeof(CpuStaticInfo));
+    info->brand = copy_string("Mock CPU");
+    info->usage = 25.0f;
+    info->frequency = 3.2;
+    info->core_count = 8;
+    info->work_time = 3600;
+    info->process = (int64_t)process_count;
+    pthread_mutex_unlock(&sys_lock);
+    return info;
+}
+
+void free_cpu_static_info(CpuStaticInfo *info) {
+    if (!info) return;
+    free(info->brand);
+    free(info);
+}
+
+MemoryStaticInfo get_memory_static_info(void) {
+    pthread_mutex_lock(&sys_lock);
+    MemoryStaticInfo info = {16ull << 30, 6ull << 30, 10ull << 30, 2400, copy_string("DDR4")};
+    pthread_mutex_unlock(&sys_lock);
+    return info;
+}
+
+DiskStaticInfoArray get_disk_static_info_array(void) {
+    pthread_mutex_lock(&sys_lock);
+    DiskStaticInfoArray array = {malloc(2 * sizeof(DiskStaticInfo)), 2};
+    for (size_t i = 0; i < 2; i++) {
+        array.data[i].name = copy_string(disk_names[i]);
+        array.data[i].total_space = 500ull << 30;
+        array.data[i].available_space = (200ull + i) << 30;
+    }
+    pthread_mutex_unlock(&sys_lock);
+    return array;
+}
+
+void free_disk_static_info_array(DiskStaticInfoArray array) {
+    for (size_t i = 0; i < array.len; i++) free(array.data[i].name);
+    free(array.data);
+}
+
+NetworksStaticInfoArray get_networks_static_info_array(void) {
+    pthread_mutex_lock(&sys_lock);
+    NetworksStaticInfoArray array = {malloc(2 * sizeof(NetworksStaticInfo)), 2};
+    for (size_t i = 0; i < 2; i++) {
+        array.data[i].name = copy_string(network_names[i]);
+        array.data[i].ipv4 = copy_string("192.168.0.2");
+        array.data[i].send = ticks * 1000 * (i + 1);
+        array.data[i].recive = ticks * 2000 * (i + 1);
+    }
+    pthread_mutex_unlock(&sys_lock);
+    return array;
+}
+
+void free_networks_static_info_array(NetworksStaticInfoArray array) {
+    for (size_t i = 0; i < array.len; i++) {
+        free(array.data[i].name);
+        free(array.data[i].ipv4);
+    }
+    free(array.data);
+}
+
+#ifdef MOCK_PROCESS_TABLE
+#include <stdbool.h>
+#include <time.h>
+
+typedef struct { int64_t pid, ppid; const char *name; size_t name_len; double cpu_usage, memory_mb, read_kb,
+                 written_kb, start_time; } FeedRow;
+bool process_table_feed(const FeedRow *rows, size_t len, uint64_t wait_ms);
+
+static pthread_mutex_t collector_lock = PTHREAD_MUTEX_INITIALIZER;
+static pthread_cond_t collector_wake = PTHREAD_COND_INITIALIZER;
+static pthread_t collector_thread;
+static int collector_running = 0;
+static uint64_t collector_interval_ms = 1000;
+static FeedRow *feed_rows = NULL;
+
+/* Одна публикация сборщика; значения меняются только через mock_set_* */
+int mock_collect_processes(void) {
+    pthread_mutex_lock(&sys_lock);
+    feed_rows = realloc(feed_rows, (process_count ? process_count : 1) * sizeof(FeedRow));
+    for (size_t i = 0; i < process_count; i++) {
+        MockProcess *p = &processes[i];
+        feed_rows[i] = (FeedRow){p->pid, p->ppid, p->name, strlen(p->name), p->cpu_usage, p->memory_mb,
+                                 p->read_kb, p->written_kb, (double)p->start_time};
+    }
+    bool published = process_table_feed(feed_rows, process_count, collector_interval_ms);
+    pthread_mutex_unlock(&sys_lock);
+    return published;
+}
+
+void mock_set_process_cpu(size_t index, float cpu_usage) {
+    pthread_mutex_lock(&sys_lock);
+    if (index < process_count) processes[index].cpu_usage = cpu_usage;
+    pthread_mutex_unlock(&sys_lock);
+}
+
+static void *collector_main(void *arg) {
+    (void)arg;
+    pthread_mutex_lock(&collector_lock);
+    while (collector_running) {
+        pthread_mutex_unlock(&collector_lock);
+        mock_collect_processes();
+        pthread_mutex_lock(&collector_lock);
+        struct timespec deadline;
+        clock_gettime(CLOCK_REALTIME, &deadline);
+        deadline.tv_sec += (time_t)(collector_interval_ms / 1000);
+        deadline.tv_nsec += (long)(collector_interval_ms % 1000) * 1000000L;
+        if (deadline.tv_nsec >= 1000000000L) {
+            deadline.tv_sec++;
+            deadline.tv_nsec -= 1000000000L;
+        }
+        if (collector_running) pthread_cond_timedwait(&collector_wake, &collector_lock, &deadline);
+    }
+    pthread_mutex_unlock(&collector_lock);
+    return NULL;
+}
+
+bool set_process_collector_interval(uint64_t interval_ms) {
+    if (interval_ms < 10) return false;
+    pthread_mutex_lock(&collector_lock);
+    collector_interval_ms = interval_ms;
+    pthread_cond_signal(&collector_wake);
+    pthread_mutex_unlock(&collector_lock);
+    return true;
+}
+
+uint64_t get_process_collector_interval(void) { return collector_interval_ms; }
+
+int start_process_collector(void) {
+    pthread_mutex_lock(&collector_lock);
+    if (collector_running) {
+        pthread_mutex_unlock(&collector_lock);
+        return 0;
+    }
+    collector_running = 1;
+    pthread_create(&collector_thread, NULL, collector_main, NULL);
+    pthread_mutex_unlock(&collector_lock);
+    return 1;
+}
+
+int stop_process_collector(void) {
+    pthread_mutex_lock(&collector_lock);
+    if (!collector_running) {
+        pthread_mutex_unlock(&collector_lock);
+        return 0;
+    }
+    collector_running = 0;
+    pthread_cond_signal(&collector_wake);
+    pthread_mutex_unlock(&collector_lock);
+    pthread_join(collector_thread, NULL);
+    process_table_feed(NULL, 0, collector_interval_ms);
+    return 1;
+}
+#else
+int start_process_collector(void) { return 1; }
+int stop_process_collector(void) { return 1; }
+#endif
+
+ProcessInfoArray get_process_info_array(void) {
+    pthread_mutex_lock(&sys_lock);
+    refresh_processes();
+    ProcessInfoArray array = {malloc(process_count * sizeof(ProcessInfo)), process_count};
+    char pid[16];
+    for (size_t i = 0; i < process_count; i++) {
+        MockProcess *p = &processes[i];
+        snprintf(pid, sizeof(pid), "%u", p->pid);
+        array.data[i] = (ProcessInfo){copy_string(pid), copy_string(p->name), p->cpu_usage, p->memory_mb,
+                                      p->read_kb, p->written_kb, p->ppid, p->start_time};
+    }
+    pthread_mutex_unlock(&sys_lock);
+    return array;
+}
+
+void free_process_info_array(ProcessInfoArray array) {
+    for (size_t i = 0; i < array.len; i++) {
+        free(array.data[i].pid);
+        free(array.data[i].name);
+    }
+    free(array.data);
+}
+
+ServiceInfoArray get_services_info_array(void) { return (ServiceInfoArray){NULL, 0}; }
+void free_services_info_array(ServiceInfoArray array) { (void)array; }
+int kill_process(uint32_t pid) { (void)pid; return 0; }
+void free_string(char *s) { free(s); }
+const char *get_proc_path(uint32_t pid) { (void)pid; return copy_string("/mock/bin/worker"); }
+
+/* Рабочие буферы сборки снимка, ёмкость сохраняется между вызовами */
+static char *scratch_records = NULL, *scratch_strings = NULL;
+static size_t records_capacity = 0, strings_capacity = 0;
+
+static void reserve(char **buffer, size_t *capacity, size_t needed) {
+    if (needed > *capacity) {
+        *capacity = needed * 2;
+        *buffer = realloc(*buffer, *capacity);
+    }
+}
+
+static SnapshotString push_string(size_t *used, const char *value) {
+    size_t len = strlen(value);
+    reserve(&scratch_strings, &strings_capacity, *used + len);
+    memcpy(scratch_strings + *used, value, len);
+    SnapshotString result = {(uint32_t)*used, (uint32_t)len};
+    *used += len;
+    return result;
+}
+
+static void push_record(size_t *used, const void *record, size_t size) {
+    reserve(&scratch_records, &records_capacity, *used + size);
+    memcpy(scratch_records + *used, record, size);
+    *used += size;
+}
+
+/* Одинаковые имена процессов попадают в пул строк один раз, как в lib.rs */
+#define NAME_SLOTS 4096
+static const char *name_keys[NAME_SLOTS];
+static SnapshotString name_values[NAME_SLOTS];
+
+static SnapshotString push_name(size_t *used, const char *name) {
+    uint32_t hash = 2166136261u;
+    for (const char *c = name; *c; c++) hash = (hash ^ (uint8_t)*c) * 16777619u;
+    for (uint32_t slot = hash % NAME_SLOTS;; slot = (slot + 1) % NAME_SLOTS) {
+        if (!name_keys[slot]) {
+            name_keys[slot] = name;
+            name_values[slot] = push_string(used, name);
+            return name_values[slot];
+        }
+        if (strcmp(name_keys[slot], name) == 0) return name_values[slot];
+    }
+}
+
+int get_system_snapshot(uint32_t sections, char *buffer, size_t capacity, size_t *written) {
+    if (!written || (!buffer && capacity)) return -1;
+    pthread_mutex_lock(&sys_lock);
+    size_t records = 0, strings = 0;
+    SnapshotHeader header;
+    memset(&header, 0, sizeof(header));
+    header.magic = SNAPSHOT_MAGIC;
+    header.version = SNAPSHOT_VERSION;
+    header.sections = sections;
+    if (sections & (SECTION_CPU | SECTION_PROCESSES)) refresh_processes();
+    if (sections & SECTION_CPU) {
+        header.cpu_brand = push_string(&strings, "Mock CPU");
+        header.cpu_usage = 25.0f;
+        header.cpu_frequency = 3.2;
+        header.core_count = 8;
+        header.work_time = 3600;
+        header.process_count = process_count;
+    }
+    if (sections & SECTION_MEMORY) {
+        header.memory_total = 16ull << 30;
+        header.memory_used = 6ull << 30;
+        header.memory_available = 10ull << 30;
+        header.memory_speed = 2400;
+        header.memory_format = push_string(&strings, "DDR4");
+    }
+    header.disks_offset = (uint32_t)records;
+    if (sections & SECTION_DISKS) {
+        for (size_t i = 0; i < 2; i++) {
+            SnapshotDisk disk = {push_string(&strings, disk_names[i]), 500ull << 30, (200ull + i) << 30};
+            push_record(&records, &disk, sizeof(disk));
+        }
+        header.disks_len = 2;
+    }
+    header.networks_offset = (uint32_t)records;
+    if (sections & SECTION_NETWORKS) {
+        for (size_t i = 0; i < 2; i++) {
+            SnapshotString name = push_string(&strings, network_names[i]);
+            SnapshotNetwork network = {name, push_string(&strings, "192.168.0.2"), ticks * 1000 * (i + 1),
+                                       ticks * 2000 * (i + 1)};
+            push_record(&records, &network, sizeof(network));
+        }
+        header.networks_len = 2;
+    }
+    header.processes_offset = (uint32_t)records;
+    if (sections & SECTION_PROCESSES) {
+        memset(name_keys, 0, sizeof(name_keys));
+        for (size_t i = 0; i < process_count; i++) {
+            MockProcess *p = &processes[i];
+            SnapshotProcess record = {p->pid, p->ppid, push_name(&strings, p->name), p->cpu_usage,
+                                      p->memory_mb, p->read_kb, p->written_kb, (double)p->start_time};
+            push_record(&records, &record, sizeof(record));
+        }
+        header.processes_len = (uint32_t)process_count;
+    }
+
+    uint32_t header_size = sizeof(SnapshotHeader);
+    header.disks_offset += header_size;
+    header.networks_offset += header_size;
+    header.processes_offset += header_size;
+    header.strings_offset = header_size + (uint32_t)records;
+    header.strings_len = (uint32_t)strings;
+    size_t size = header.strings_offset + strings;
+    header.size = size;
+    *written = size;
+    int result = 1;
+    if (size <= capacity) {
+        memcpy(buffer, &header, header_size);
+        memcpy(buffer + header_size, scratch_records, records);
+        memcpy(buffer + header.strings_offset, scratch_strings, strings);
+        result = 0;
+    }
+    pthread_mutex_unlock(&sys_lock);
+    return result;
+}
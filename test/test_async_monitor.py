@@ -0,0 +1,142 @@
+import asyncio
+import threading
+from contextlib import aclosing
+
+import pytest
+
+from async_monitor import AsyncSystemMonitor
+from fake_backend import FakeBackend
+from fake_proc import make_proc_tree
+from proc_backend import ProcBackend
+
+
+class CountingBackend(FakeBackend):
+    """Поддельный бэкенд, считающий одновременные вызовы."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.active = 0
+        self.max_active = 0
+        self._count_lock = threading.Lock()
+
+    def _wait(self):
+        with self._count_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            super()._wait()
+        finally:
+            with self._count_lock:
+                self.active -= 1
+
+
+def test_stream_yields_snapshots_and_leaves_no_threads():
+    before = set(threading.enumerate())
+
+    async def scenario():
+        async with AsyncSystemMonitor(backend=FakeBackend()) as monitor:
+            snapshots = []
+            async with aclosing(monitor.stream(update_interval=0.05, intervals={'cpu': 0.05})) as stream:
+                async for snapshot in stream:
+                    snapshots.append(snapshot)
+                    if len(snapshots) == 3:
+                        break
+            assert monitor.monitor.get_subscriber_stats() == []
+            return snapshots
+
+    snapshots = asyncio.run(scenario())
+    assert [s.generation for s in snapshots] == sorted({s.generation for s in snapshots})
+    assert snapshots[0].cpu['usage'] == 12.5 and len(snapshots[0].processes) == 3
+    assert set(threading.enumerate()) <= before
+
+
+def test_one_shot_getters_answer_from_snapshot_and_backend_calls_do_not_overlap():
+    backend = CountingBackend(delay=0.02)
+
+    async def scenario():
+        async with AsyncSystemMonitor(backend=backend, max_concurrency=4) as monitor:
+            # До первого снимка запросы ждут один общий такт сбора
+            results = await asyncio.gather(*(monitor.get_cpu_percent() for _ in range(6)), monitor.get_processes())
+            assert monitor.get_snapshot().generation == 1
+            assert results[6] is monitor.get_snapshot().processes
+            # Сбор, снятие процесса, путь к файлу и фоновый поток путей идут одновременно,
+            # но бэкенд вызывается по одному
+            await monitor.start(update_interval=0.02, intervals={'cpu': 0.02, 'processes': 0.02})
+            monitor.monitor.paths.request((pid, 0.0) for pid in (1, 3))
+            killed, path, _ = await asyncio.gather(monitor.kill_process(2), monitor.get_proc_path(2),
+                                                   asyncio.sleep(0.2))
+            assert killed and backend.killed == [2] and path
+            assert monitor.monitor.paths.get(3)['path'] == "/usr/bin/proc3"
+            return results
+
+    results = asyncio.run(scenario())
+    assert results[:6] == [12.5] * 6 and len(results[6]) == 3
+    assert backend.max_active == 1
+
+
+def test_getters_leave_stateful_backend_to_collection(tmp_path):
+    backend = ProcBackend(make_proc_tree(str(tmp_path / 'proc'), count=5), sys_root=str(tmp_path / 'sys'))
+
+    async def scenario():
+        async with AsyncSystemMonitor(backend=backend) as monitor:
+            snapshot = await monitor.collect()
+            state = (backend._cpu_times, backend._last_sample, backend._proc_times)
+            processes = await monitor.get_processes()
+            usage = await asyncio.gather(*(monitor.get_cpu_percent() for _ in range(4)))
+            await monitor.get_network_info()
+            # Прошлые счётчики бэкенда — те, что оставил сбор
+            assert all(now is before for now, before in
+                       zip((backend._cpu_times, backend._last_sample, backend._proc_times), state))
+            assert processes is snapshot.processes and len(processes) == 5
+            assert usage == [snapshot.cpu['usage']] * 4
+
+    asyncio.run(scenario())
+
+
+def test_close_ends_streams_and_waits_for_running_calls():
+    backend = CountingBackend(delay=0.2)
+    before = set(threading.enumerate())
+
+    async def scenario():
+        monitor = AsyncSystemMonitor(backend=backend)
+
+        async def consume():
+            async for _ in monitor.stream(update_interval=0.05):
+                pass
+
+        consumer = asyncio.create_task(consume())
+        # Сбор стоит в медленном вызове бэкенда, разовый запрос отменяется на полпути
+        await asyncio.sleep(0.1)
+        request = asyncio.create_task(monitor.get_cpu_percent())
+        await asyncio.sleep(0.05)
+        request.cancel()
+        await monitor.close()
+        assert backend.active == 0
+        # Поток stream() закончился сам, без отмены потребителя
+        await asyncio.wait_for(consumer, 1)
+        assert request.cancelled() and not monitor.running
+        with pytest.raises(RuntimeError):
+            await monitor.get_cpu_percent()
+
+    asyncio.run(scenario())
+    assert set(threading.enumerate()) <= before
+
+
+def test_cancelled_consumer_unsubscribes():
+    async def scenario():
+        async with AsyncSystemMonitor(backend=FakeBackend()) as monitor:
+            async def consume():
+                async for _ in monitor.stream(update_interval=0.05):
+                    pass
+
+            consumer = asyncio.create_task(consume())
+            while not monitor.monitor.get_subscriber_stats():
+                await asyncio.sleep(0.01)
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+            assert monitor.monitor.get_subscriber_stats() == []
+            # Сбор продолжается без потребителей, снимки по-прежнему доступны сразу
+            snapshot = await monitor.collect() or monitor.get_snapshot()
+            assert snapshot is not None and monitor.running
+
+    asyncio.run(scenario())
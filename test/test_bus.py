@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+from bus import SnapshotBus
+from fake_backend import FakeBackend
+from system_monitor import SystemMonitor
+
+
+def test_slow_thread_subscriber_keeps_latest_and_does_not_block():
+    bus = SnapshotBus()
+    release = threading.Event()
+    received = []
+
+    def slow(item):
+        release.wait()
+        received.append(item)
+
+    fast = []
+    slow_subscription = bus.subscribe(slow, delivery='thread', maxsize=1)
+    bus.subscribe(fast.append)
+    started = time.perf_counter()
+    for item in range(100):
+        bus.publish(item)
+    assert time.perf_counter() - started < 0.5
+    assert fast == list(range(100))
+
+    release.set()
+    bus.unsubscribe(slow)
+    # Первый элемент ушёл в доставку сразу, из остальных остался только последний
+    assert received[-1] == 99 and len(received) <= 2
+    stats = slow_subscription.stats()
+    assert stats['published'] == 100 and stats['delivered'] == len(received)
+    assert stats['dropped'] == 100 - len(received) and stats['pending'] == 0
+    assert not slow_subscription._thread.is_alive()
+
+
+def test_failing_subscriber_does_not_hide_others():
+    bus = SnapshotBus()
+    received = []
+    failing = bus.subscribe(lambda item: 1 / 0, name="broken")
+    bus.subscribe(received.append)
+    bus.publish("snapshot")
+    assert received == ["snapshot"]
+    assert failing.stats()['errors'] == 1 and "ZeroDivisionError" in failing.stats()['last_error']
+
+
+def test_asyncio_delivery_awaits_coroutines_in_order():
+    async def scenario():
+        bus = SnapshotBus()
+        received = []
+
+        async def consume(item):
+            await asyncio.sleep(0)
+            received.append(item)
+
+        subscription = bus.subscribe(consume, delivery='asyncio', maxsize=4, loop=asyncio.get_running_loop())
+        publisher = threading.Thread(target=lambda: [bus.publish(item) for item in range(3)])
+        publisher.start()
+        publisher.join()
+        while subscription.stats()['delivered'] < 3:
+            await asyncio.sleep(0.01)
+        return received, subscription.stats()
+
+    received, stats = asyncio.run(scenario())
+    assert received == [0, 1, 2] and stats['dropped'] == 0 and stats['lag'] >= 0
+
+
+def test_monitor_callbacks_are_bus_subscriptions():
+    monitor = SystemMonitor(backend=FakeBackend())
+    snapshots = []
+    monitor.register_callback(snapshots.append, delivery='thread', maxsize=8)
+    monitor.start_monitoring(update_interval=0.05)
+    time.sleep(0.2)
+    monitor.stop_monitoring()
+    assert monitor.unregister_callback(snapshots.append)
+    assert not monitor.unregister_callback(snapshots.append)
+    assert snapshots and snapshots[-1] is monitor.get_snapshot()
+    assert monitor.get_subscriber_stats() == []
@@ -0,0 +1,102 @@
+from chart import LineChart, chart_coords, decimate
+
+
+class RecordingCanvas:
+    """Canvas без Tk: запоминает создания элементов и изменения координат."""
+
+    def __init__(self, width=220, height=120):
+        self.width, self.height = width, height
+        self.created = 0
+        self.coords_calls = {}
+        self.options = {}
+        self.bindings = {}
+        self.pending = {}
+
+    def _create(self, *coords, **options):
+        self.created += 1
+        self.options[self.created] = dict(options)
+        return self.created
+
+    create_line = create_text = _create
+
+    def coords(self, item, *coords):
+        self.coords_calls[item] = list(coords[0] if len(coords) == 1 else coords)
+
+    def itemconfigure(self, item, **options):
+        self.options[item].update(options)
+
+    def bind(self, sequence, func, add=None):
+        self.bindings[sequence] = func
+
+    def after(self, delay, func):
+        job = len(self.pending) + 1
+        self.pending[job] = func
+        return job
+
+    def after_cancel(self, job):
+        self.pending.pop(job, None)
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+
+class Event:
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+
+
+def test_decimate_keeps_peaks_within_pixel_budget():
+    values = [0.0] * 10000
+    values[1234] = 99.0
+    values[8765] = -5.0
+
+    points = decimate(values, 200)
+    assert len(points) <= 200
+    assert max(points) == 99.0 and min(points) == -5.0
+    assert decimate([1.0, 2.0, 3.0], 200) == [1.0, 2.0, 3.0]
+
+
+def test_chart_coords_spread_values_across_width():
+    coords = chart_coords([0.0, 50.0, 100.0], width=120, height=120, padding=10, top=20)
+    assert coords == [10.0, 120.0, 60.0, 70.0, 110.0, 20.0]
+    assert chart_coords([1.0], 120, 120) == []
+
+
+def test_chart_updates_existing_items_only():
+    canvas = RecordingCanvas()
+    chart = LineChart(canvas)
+    chart.add_series('cpu', 'blue')
+    chart.add_series('memory', 'red')
+    created = canvas.created
+
+    for step in range(5):
+        chart.set_data('cpu', [float(step + i) for i in range(50)])
+        chart.set_data('memory', [float(i) for i in range(100000)])
+    assert canvas.created == created
+
+    cpu, memory = created - 1, created
+    assert canvas.options[cpu]['state'] == 'normal' and canvas.options[cpu]['smooth'] is True
+    assert canvas.options[memory]['smooth'] is False
+    assert len(canvas.coords_calls[memory]) <= 2 * chart.plot_width()
+
+    chart.clear('memory')
+    assert canvas.options[memory]['state'] == 'hidden'
+
+
+def test_resize_is_debounced():
+    canvas = RecordingCanvas(width=220)
+    chart = LineChart(canvas)
+    chart.add_series('cpu', 'blue')
+    chart.set_data('cpu', [10.0, 20.0])
+
+    canvas.width = 420
+    for width in (300, 360, 420):
+        canvas.bindings['<Configure>'](Event(width, canvas.height))
+    assert len(canvas.pending) == 1 and chart.width == 220
+
+    canvas.pending.popitem()[1]()
+    assert chart.width == 420
+    assert canvas.coords_calls[canvas.created][-2] == 410.0
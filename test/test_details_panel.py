@@ -0,0 +1,35 @@
+import tkinter as tk
+
+import pytest
+
+from details_panel import DetailsPanel
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("нет дисплея для Tk")
+    yield root
+    root.destroy()
+
+
+def test_panel_reuses_labels_and_updates_only_changed_values(root):
+    header = tk.Label(root)
+    container = tk.Frame(root)
+    panel = DetailsPanel(header, container)
+
+    assert panel.show("Память", [("Доступно", "1.0 ГБ"), ("Выделено", "3/4 ГБ")])
+    children = container.winfo_children()
+    assert panel.updates == 2
+
+    assert not panel.show("Память", [("Доступно", "1.5 ГБ"), ("Выделено", "3/4 ГБ")])
+    assert panel.updates == 3
+    assert container.winfo_children() == children
+
+    # Другая раскладка строится один раз, возврат к памяти её не пересоздаёт
+    assert panel.show("Диск (sda)", [("Свободно места", "10 ГБ")])
+    assert panel.show("Память", [("Доступно", "1.5 ГБ"), ("Выделено", "3/4 ГБ")])
+    assert len(container.winfo_children()) == 2
+    assert header.cget('text') == "Память"
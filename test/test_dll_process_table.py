@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from dll_backend import DllBackend
+from mock_dll import build_mock_library, collect_processes, set_process_count, set_process_cpu
+
+
+@pytest.fixture(scope='module')
+def library(tmp_path_factory):
+    path = build_mock_library(str(tmp_path_factory.mktemp('mock_table')), process_table=True)
+    if path is None:
+        pytest.skip("no C compiler or rustc")
+    return path
+
+
+@pytest.fixture
+def backend(library):
+    set_process_count(library, 200)
+    backend = DllBackend(library, collector_interval=60)
+    before = backend.dll.get_process_table_generation()
+    backend.start()
+    # Сборщик публикует первое поколение сразу после запуска
+    deadline = time.monotonic() + 5
+    while backend.dll.get_process_table_generation() == before:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    yield backend
+    backend.stop()
+
+
+def test_reader_copies_only_new_generations(backend, library):
+    table = backend.get_processes()
+    assert len(table) == 200 and table.pid[0] == 1000 and table.name[3] == "worker_3.exe"
+    assert table.start_time[5] == 1700000005 and table.ppid[1] == 1000
+    acquired = backend.collector_table.acquired
+    again = backend.get_processes()
+    # Поколение не сменилось: библиотека не закрепляется, столбцы общие, объект таблицы новый
+    assert backend.collector_table.acquired == acquired
+    assert again is not table and again.pid is table.pid and again == table
+
+    generation = backend.collector_table.generation
+    set_process_cpu(library, 7, 55.0)
+    assert collect_processes(library)
+    table = backend.get_processes()
+    assert backend.collector_table.generation == generation + 1
+    assert table.cpu_usage[7] == 55.0
+    # Имена приходят номерами: новых имён нет — таблица имён не растёт
+    assert len(backend.collector_table._names) == 50
+
+
+def test_changes_since_generation(backend, library):
+    backend.get_processes()
+    since = backend.collector_table.generation
+    # Пересоздание списка с прежними значениями не меняет строк 0..197
+    set_process_count(library, 198)
+    set_process_cpu(library, 3, 42.0)
+    set_process_cpu(library, 150, 17.0)
+    assert collect_processes(library)
+
+    changes = backend.get_process_changes(since)
+    assert not changes['full'] and changes['generation'] == since + 1
+    assert list(changes['table'].pid) == [1003, 1150] and list(changes['table'].cpu_usage) == [42.0, 17.0]
+    assert changes['table'].name == ("worker_3.exe", "worker_0.exe")
+    assert sorted(changes['removed']) == [1198, 1199]
+
+    unchanged = backend.get_process_changes(changes['generation'])
+    assert len(unchanged['table']) == 0 and len(unchanged['removed']) == 0
+    full = backend.get_process_changes(0)
+    assert full['full'] and len(full['table']) == 198
+
+
+def test_collector_skips_tick_while_reader_pins_buffer(backend, library):
+    table = backend.collector_table
+    assert table._acquire()
+    try:
+        generation = table._view.generation
+        # Сборщик будится новым интервалом: первая публикация занимает свободный
+        # буфер, следующие ждут закреплённый не дольше интервала и пропускаются
+        backend.set_collector_interval(0.05)
+        time.sleep(0.3)
+        assert not collect_processes(library)
+        assert backend.dll.get_process_table_generation() == generation + 1
+        assert table._view.generation == generation
+    finally:
+        backend.set_collector_interval(60)
+        table._release()
+    assert collect_processes(library)
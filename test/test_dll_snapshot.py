@@ -0,0 +1,61 @@
+import pytest
+
+from dll_backend import DllBackend, SystemSnapshotBuffer
+from mock_dll import build_mock_library, set_process_count
+
+
+@pytest.fixture(scope='module')
+def library(tmp_path_factory):
+    path = build_mock_library(str(tmp_path_factory.mktemp('mock_dll')))
+    if path is None:
+        pytest.skip("no C compiler")
+    return path
+
+
+def legacy(backend):
+    snapshot, backend.snapshot = backend.snapshot, None
+    try:
+        return (backend.get_cpu_info(), backend.get_memory_info(), backend.get_disks(), backend.get_networks(),
+                backend.get_processes())
+    finally:
+        backend.snapshot = snapshot
+
+
+def test_snapshot_matches_per_metric_calls(library):
+    set_process_count(library, 300)
+    backend = DllBackend(library)
+    cpu, memory, disks, networks, processes = legacy(backend)
+    assert backend.get_cpu_info() == cpu
+    assert backend.get_memory_info() == memory
+    assert backend.get_disks() == disks
+    table = backend.get_processes()
+    assert table.pid == processes.pid and table.name == processes.name and table.ppid == processes.ppid
+    assert table.cpu_usage == processes.cpu_usage and table.start_time == processes.start_time
+    # Счётчики ввода-вывода растут с каждым обновлением процессов
+    assert all(after >= before for after, before in zip(table.read_kb, processes.read_kb))
+    assert [network['name'] for network in backend.get_networks()] == [network['name'] for network in networks]
+
+
+def test_prepare_collects_tick_with_one_call(library):
+    set_process_count(library, 50)
+    backend = DllBackend(library)
+    backend.prepare(['cpu', 'memory', 'processes', 'networks', 'disk_io'])
+    assert backend.snapshot.calls == 1
+    assert backend.get_cpu_info()['process_count'] == 50
+    assert len(backend.get_processes()) == 50
+    backend.get_memory_info()
+    backend.get_networks()
+    assert backend.snapshot.calls == 1
+    # Раздел не из этого такта запрашивается отдельным вызовом
+    assert len(backend.get_disks()) == 2 and backend.snapshot.calls == 2
+
+
+def test_buffer_grows_once_and_is_reused(library):
+    set_process_count(library, 2000)
+    backend = DllBackend(library)
+    backend.snapshot = SystemSnapshotBuffer(backend.dll.get_system_snapshot, size=256)
+    assert len(backend.get_processes()) == 2000
+    assert backend.snapshot.calls == 2 and len(backend.snapshot) > 2000 * 64
+    size = len(backend.snapshot)
+    backend.get_processes()
+    assert backend.snapshot.calls == 3 and len(backend.snapshot) == size
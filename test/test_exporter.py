@@ -0,0 +1,81 @@
+import asyncio
+import json
+from dataclasses import replace
+
+from exporter import MetricsServer, render_prometheus
+from fake_backend import make_rows
+from snapshot import ProcessTable, SystemSnapshot
+
+
+def make_snapshot(generation=1):
+    return SystemSnapshot(
+        timestamp=1700000000.0, generation=generation, cpu={'usage': 12.5}, memory={'total': 100, 'available': 40},
+        processes=ProcessTable.from_rows(make_rows(3)),
+        networks=({'name': 'eth0', 'send_speed': 10.0, 'recv_speed': 20.0, 'link_speed': 0},),
+        hotspots={'cpu': [{'pid': 7, 'name': 'say "hi"\\', 'cpu_usage': 50.0, 'memory_mb': 1.0, 'disk_rate': 0.0}]})
+
+
+class Source:
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot
+
+    def __call__(self):
+        return self.snapshot
+
+
+def body_of(response):
+    header, _, body = response.partition(b"\r\n\r\n")
+    return header.decode('latin-1').split("\r\n"), body
+
+
+def test_views_are_rendered_once_per_generation():
+    source = Source()
+    server = MetricsServer(source, port=0)
+    head, _ = body_of(server.respond('GET', '/metrics', {}, True))
+    assert head[0] == "HTTP/1.1 503 Service Unavailable"
+
+    source.snapshot = make_snapshot(1)
+    for _ in range(100):
+        head, body = body_of(server.respond('GET', '/api/processes', {}, True))
+    assert head[0] == "HTTP/1.1 200 OK" and 'ETag: "1"' in head
+    data = json.loads(body)
+    assert data['rows'][0][:2] == [1, "proc1"] and len(data['rows']) == 3
+    assert server.cache.renders == 1
+
+    source.snapshot = replace(source.snapshot, generation=2)
+    assert json.loads(body_of(server.respond('GET', '/', {}, True))[1])['generation'] == 2
+    assert body_of(server.respond('GET', '/api/system', {'if-none-match': '"2"'}, True))[0][0] == \
+        "HTTP/1.1 304 Not Modified"
+    assert body_of(server.respond('GET', '/nope', {}, True))[0][0] == "HTTP/1.1 404 Not Found"
+    assert body_of(server.respond('POST', '/metrics', {}, True))[0][0] == "HTTP/1.1 405 Method Not Allowed"
+    assert server.cache.renders == 2
+
+
+def test_prometheus_exposition():
+    text = render_prometheus(make_snapshot(5)).decode('utf-8')
+    assert "# TYPE taskmanager_cpu_usage_percent gauge\ntaskmanager_cpu_usage_percent 12.5\n" in text
+    assert "taskmanager_snapshot_generation 5\n" in text
+    assert 'taskmanager_network_receive_bytes_per_second{interface="eth0"} 20.0' in text
+    assert 'taskmanager_process_cpu_percent{pid="7",name="say \\"hi\\"\\\\"} 50.0' in text
+    # Метрики без данных (диски, GPU) не выводятся вовсе
+    assert "disk_total_bytes" not in text and "gpu" not in text
+
+
+def test_keep_alive_over_socket():
+    async def scenario():
+        server = MetricsServer(Source(make_snapshot(3)), port=0)
+        await server.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        bodies = []
+        for path in ('/metrics', '/api/system'):
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            header = await reader.readuntil(b"\r\n\r\n")
+            length = int(header.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+            bodies.append(await reader.readexactly(length))
+        writer.close()
+        await server.close()
+        return bodies
+
+    metrics, system = asyncio.run(scenario())
+    assert metrics.startswith(b"# HELP taskmanager_snapshot_generation")
+    assert json.loads(system)['cpu'] == {'usage': 12.5}
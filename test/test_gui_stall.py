@@ -0,0 +1,44 @@
+import time
+import tkinter as tk
+
+import pytest
+
+from fake_backend import FakeBackend
+from system_monitor import SystemMonitor
+
+# Каждый источник метрик "висит" дольше, чем допустимый простой цикла Tk
+SLOW_CALL = 0.2
+MAX_STALL = 0.1
+
+
+def test_slow_backend_does_not_stall_event_loop():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("нет дисплея для Tk")
+
+    from Frame import TaskManager
+
+    monitor = SystemMonitor(backend=FakeBackend(delay=SLOW_CALL))
+    app = TaskManager(root, monitor)
+
+    gaps = []
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+        root.after(10, tick)
+
+    root.after(10, tick)
+    root.after(4000, root.quit)
+    root.mainloop()
+
+    monitor.stop_monitoring()
+    rendered = app._rendered_snapshot
+    root.destroy()
+
+    assert rendered is not None, "снимок так и не был отрисован"
+    assert len(rendered.processes) == 3
+    assert max(gaps) < MAX_STALL, f"максимальный простой цикла Tk {max(gaps) * 1000:.0f} мс"
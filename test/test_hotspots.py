@@ -0,0 +1,67 @@
+import random
+
+from hotspots import HotspotTracker, SpikeDetector, TopN
+from snapshot import ProcessTable
+
+
+def make_table(rows):
+    return ProcessTable.from_rows([{'pid': pid, 'name': f"proc{pid}", 'cpu_usage': cpu, 'memory_mb': 10.0,
+                                    'read_kb': 0.0, 'written_kb': 0.0, 'start_time': start}
+                                   for pid, start, cpu in rows])
+
+
+def test_top_n_matches_full_sort():
+    random.seed(1)
+    top = TopN('cpu_usage', count=10)
+    for tick in range(20):
+        # Часть значений совпадает, чтобы проверить порядок при равенстве.
+        # Часть снимков почти без активных процессов — порог падает до нуля
+        active = 500 if tick % 3 else 5
+        table = make_table([(pid, 0.0, float(random.randrange(50)) if pid < active else 0.0) for pid in range(500)])
+        expected = sorted(range(len(table)), key=table.cpu_usage.__getitem__, reverse=True)[:10]
+        assert top.update(table) == expected
+
+
+def test_spike_is_reported_once_after_warmup():
+    detector = SpikeDetector('cpu_usage', z=4.0, noise=1.0, min_value=5.0, warmup=3)
+    for tick in range(5):
+        assert detector.update(make_table([(10, 1.0, 1.0), (20, 2.0, 2.0)]), float(tick)) == []
+
+    spikes = detector.update(make_table([(10, 1.0, 60.0), (20, 2.0, 2.0)]), 5.0)
+    assert [(spike['pid'], spike['value'], spike['mean']) for spike in spikes] == [(10, 60.0, 1.0)]
+    assert spikes[0]['z'] > 4.0
+    # Всплеск продолжается — повторно не сообщается
+    assert detector.update(make_table([(10, 1.0, 65.0), (20, 2.0, 2.0)]), 6.0) == []
+
+
+def test_idle_processes_are_forgotten():
+    detector = SpikeDetector('cpu_usage', half_life=1.0)
+    detector.update(make_table([(10, 1.0, 50.0), (20, 2.0, 0.0)]), 0.0)
+    assert len(detector) == 1
+    for tick in range(1, 30):
+        detector.update(make_table([(10, 1.0, 0.0), (20, 2.0, 0.0)]), float(tick))
+    assert len(detector) == 0
+
+    # Простаивавший процесс, которого уже нет в состоянии, сравнивается с нулевым средним
+    spikes = detector.update(make_table([(10, 1.0, 0.0), (20, 2.0, 40.0)]), 30.0)
+    assert [(spike['pid'], spike['mean']) for spike in spikes] == [(20, 0.0)]
+
+
+def test_reused_pid_starts_new_statistics():
+    detector = SpikeDetector('cpu_usage', warmup=3)
+    for tick in range(5):
+        detector.update(make_table([(10, 1.0, 1.0), (20, 2.0, 1.0)]), float(tick))
+
+    # PID 20 достался новому процессу, PID 30 появился: у них ещё нет истории
+    table = make_table([(30, 7.0, 90.0), (20, 8.0, 90.0), (10, 1.0, 90.0)])
+    assert [spike['pid'] for spike in detector.update(table, 5.0)] == [10]
+
+
+def test_tracker_snapshot_shape():
+    tracker = HotspotTracker(count=2)
+    tracker.update(make_table([(pid, 0.0, 1.0) for pid in range(1, 6)]), 0.0)
+    hotspots = tracker.update(make_table([(pid, 0.0, float(pid)) for pid in range(1, 6)]), 1.0)
+
+    assert set(hotspots) == {'cpu', 'memory', 'io', 'spikes'}
+    assert [row['pid'] for row in hotspots['cpu']] == [5, 4]
+    assert hotspots['cpu'][0] == {'pid': 5, 'name': "proc5", 'cpu_usage': 5.0, 'memory_mb': 10.0, 'disk_rate': 0.0}
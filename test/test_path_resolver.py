@@ -0,0 +1,83 @@
+import threading
+
+from fake_backend import FakeBackend
+from path_resolver import PathResolver
+
+
+class PathBackend(FakeBackend):
+    """Бэкенд с изменяемыми путями и счётчиком запросов."""
+
+    def __init__(self):
+        super().__init__()
+        self.paths = {}
+        self.requests = []
+
+    def get_proc_path(self, pid):
+        self.requests.append(pid)
+        return self.paths.get(pid, "NULL")
+
+    def get_proc_cmdline(self, pid):
+        return self.paths.get(pid, "") + " --flag"
+
+
+def test_miss_is_queued_and_resolved_in_batch():
+    backend = PathBackend()
+    backend.paths = {1: "/sbin/init", 2: "/usr/bin/bash"}
+    resolver = PathResolver(backend)
+
+    assert resolver.get(1, 10.0) is None
+    assert resolver.get(2, 20.0) is None
+    assert resolver.get(1, 10.0) is None  # уже в очереди — второй раз не ставится
+    assert resolver.resolve_pending() == [(1, 10.0), (2, 20.0)]
+    assert resolver.get(2, 20.0) == {'path': "/usr/bin/bash", 'cmdline': "/usr/bin/bash --flag"}
+    assert backend.requests == [1, 2]
+
+
+def test_cache_is_invalidated_when_pid_is_reused():
+    backend = PathBackend()
+    backend.paths = {42: "/usr/bin/old"}
+    resolver = PathResolver(backend)
+    assert resolver.resolve(42, 100.0)['path'] == "/usr/bin/old"
+
+    # PID 42 достался новому процессу: другой путь и другое время запуска
+    backend.paths = {42: "/usr/bin/new"}
+    assert resolver.resolve(42, 100.0)['path'] == "/usr/bin/old"
+    assert resolver.get(42, 500.0) is None
+    assert len(resolver) == 0
+    resolver.resolve_pending()
+    assert resolver.get(42, 500.0)['path'] == "/usr/bin/new"
+    assert backend.requests == [42, 42]
+
+
+def test_lru_eviction():
+    backend = PathBackend()
+    resolver = PathResolver(backend, capacity=3)
+    for pid in (1, 2, 3):
+        resolver.resolve(pid, 0.0)
+    resolver.resolve(1, 0.0)  # 1 становится самым свежим
+    resolver.resolve(4, 0.0)
+
+    assert len(resolver) == 3
+    assert resolver.get(2, 0.0) is None
+    assert resolver.get(1, 0.0) is not None
+
+
+def test_background_thread_notifies():
+    backend = PathBackend()
+    backend.paths = {pid: f"/bin/p{pid}" for pid in range(100)}
+    done = threading.Event()
+    resolved = []
+
+    def on_resolved(keys):
+        resolved.extend(keys)
+        if len(resolved) == 100:
+            done.set()
+
+    resolver = PathResolver(backend, batch_size=16, on_resolved=on_resolved)
+    resolver.start()
+    try:
+        resolver.request((pid, 0.0) for pid in range(100))
+        assert done.wait(5)
+    finally:
+        resolver.stop()
+    assert resolver.get(99, 0.0)['path'] == "/bin/p99"
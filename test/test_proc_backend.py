@@ -0,0 +1,145 @@
+import os
+
+import pytest
+
+from fake_proc import make_proc_tree, make_process, write
+from proc_backend import CLK_TCK, PAGE_SIZE, PARALLEL_MIN_PIDS, ProcBackend
+
+
+def test_system_info(tmp_path):
+    backend = ProcBackend(make_proc_tree(str(tmp_path)))
+
+    cpu = backend.get_cpu_info()
+    assert cpu['brand'] == "Fake CPU"
+    assert cpu['core_count'] == 2
+    assert cpu['frequency'] == 2.4
+    assert cpu['work_time'] == 3600
+    assert cpu['usage'] == 20.0
+
+    memory = backend.get_memory_info()
+    assert memory['total'] == 16384000 * 1024
+    assert memory['available'] == 8192000 * 1024
+    assert memory['used'] == memory['total'] - memory['available']
+
+    networks = {network['name']: network for network in backend.get_networks()}
+    assert networks['eth0']['recive'] == 500000
+    assert networks['eth0']['send'] == 300000
+
+
+def test_cpu_usage_is_delta_between_calls(tmp_path):
+    root = make_proc_tree(str(tmp_path))
+    backend = ProcBackend(root)
+    backend.get_cpu_info()
+    write(os.path.join(root, 'stat'), "cpu  150 0 150 900 0 0 0 0 0 0\n")
+
+    assert backend.get_cpu_info()['usage'] == 50.0
+
+
+def test_processes(tmp_path):
+    root = make_proc_tree(str(tmp_path))
+    make_process(root, 42, "my (odd) name", utime=10, stime=5, ppid=7, start_time=250, rss_pages=512,
+                 read_bytes=4096)
+    backend = ProcBackend(root)
+
+    table = backend.get_processes()
+    row = table.get(42)
+    assert row['name'] == "my (odd) name"
+    assert row['ppid'] == 7
+    assert row['start_time'] == 1700000000 + 250 / CLK_TCK
+    assert row['memory_mb'] == 512 * PAGE_SIZE / (1024 * 1024)
+    assert row['read_kb'] == 4.0
+    assert row['cpu_usage'] == 0.0
+
+    make_process(root, 42, "my (odd) name", utime=10 + 50, stime=5, ppid=7, start_time=250, rss_pages=512)
+    backend._last_sample -= 1.0
+    assert backend.get_processes().get(42)['cpu_usage'] > 0
+
+
+def test_vanished_process_is_skipped(tmp_path):
+    root = make_proc_tree(str(tmp_path), count=3)
+    os.remove(os.path.join(root, '1001', 'stat'))
+
+    table = ProcBackend(root).get_processes()
+    assert sorted(table.pid) == [1000, 1002]
+
+
+DISKS = ('sda', 'sda1', 'nvme0n1', 'nvme0n1p1', 'nvme0n10', 'dm-1', 'dm-10', 'md1', 'md10', 'sr0')
+PARTITIONS = ('sda1', 'nvme0n1p1')
+
+
+def write_diskstats(root):
+    lines = ["   7       0 loop0 10 0 80 0 0 0 0 0 0 5 5 0 0 0 0\n"]
+    for minor, name in enumerate(DISKS):
+        lines.append(f"   8 {minor:7} {name} 100 0 {2000 + minor} 50 30 0 600 40 0 {700 + minor} 90 0 0 0 0\n")
+    write(os.path.join(root, 'diskstats'), "".join(lines))
+
+
+def test_disk_io_and_link_speed(tmp_path):
+    root = make_proc_tree(str(tmp_path / 'proc'))
+    write_diskstats(root)
+    sys_root = str(tmp_path / 'sys')
+    write(os.path.join(sys_root, 'class', 'net', 'eth0', 'speed'), "1000\n")
+    write(os.path.join(sys_root, 'class', 'net', 'lo', 'speed'), "-1\n")
+    for name in DISKS:
+        write(os.path.join(sys_root, 'class', 'block', name, 'dev'), "8:0\n")
+    for name in PARTITIONS:
+        write(os.path.join(sys_root, 'class', 'block', name, 'partition'), "1\n")
+    backend = ProcBackend(root, sys_root=sys_root)
+
+    disks = backend.get_disk_io()
+    assert [disk['name'] for disk in disks] == [name for name in DISKS if name not in PARTITIONS]
+    assert disks[0] == {'name': 'sda', 'read_bytes': 2000 * 512, 'written_bytes': 600 * 512, 'busy_ms': 700}
+    networks = {network['name']: network for network in backend.get_networks()}
+    assert networks['eth0']['link_speed'] == 1000000000
+    assert networks['lo']['link_speed'] == 0
+
+
+def test_partitions_without_class_block(tmp_path):
+    root = make_proc_tree(str(tmp_path / 'proc'))
+    write_diskstats(root)
+    sys_root = str(tmp_path / 'sys')
+    for name in DISKS:
+        if name not in PARTITIONS:
+            os.makedirs(os.path.join(sys_root, 'block', name))
+
+    names = [disk['name'] for disk in ProcBackend(root, sys_root=sys_root).get_disk_io()]
+    assert names == [name for name in DISKS if name not in PARTITIONS]
+
+
+def table_rows(table):
+    return list(zip(table.pid, table.name, table.ppid, table.memory_mb, table.read_kb, table.start_time))
+
+
+@pytest.mark.parametrize('pool', ['thread', 'process'])
+def test_parallel_read_matches_serial_order(tmp_path, pool):
+    root = make_proc_tree(str(tmp_path), count=PARALLEL_MIN_PIDS + 300)
+    make_process(root, 7, "init", read_bytes=2048)
+    serial = ProcBackend(root).get_processes()
+    backend = ProcBackend(root, workers=3, pool=pool)
+    try:
+        parallel = backend.get_processes()
+    finally:
+        backend.stop()
+    assert table_rows(parallel) == table_rows(serial)
+    assert list(parallel.pid) == sorted(parallel.pid) and parallel.get(7)['read_kb'] == 2.0
+
+
+def test_parallel_read_skips_vanished_processes(tmp_path):
+    root = make_proc_tree(str(tmp_path), count=PARALLEL_MIN_PIDS + 100)
+    # Каталог остался в listdir, а stat уже не читается; у другого процесса пропал только io
+    os.remove(os.path.join(root, '1010', 'stat'))
+    os.remove(os.path.join(root, '1020', 'io'))
+    write(os.path.join(root, '1030', 'stat'), "1030 (half")
+    backend = ProcBackend(root, workers=4)
+    try:
+        table = backend.get_processes()
+    finally:
+        backend.stop()
+    assert len(table) == PARALLEL_MIN_PIDS + 98
+    assert table.get(1010) is None and table.get(1030) is None and table.get(1020)['read_kb'] == 0.0
+    assert backend._executor is None
+
+
+def test_unknown_pool_kind(tmp_path):
+    with pytest.raises(ValueError):
+        ProcBackend(str(tmp_path), pool='fiber')
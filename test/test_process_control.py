@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from fake_backend import FakeBackend, make_rows
+from process_control import ProcessController
+from process_index import ProcessFilter
+from process_tree import ProcessTree
+from snapshot import ProcessTable
+from system_monitor import SystemMonitor
+
+
+def test_batch_kill_reports_each_pid():
+    backend = FakeBackend(make_rows(200, first_pid=100))
+    controller = ProcessController(backend, max_workers=4)
+
+    batch = controller.kill(list(range(100, 300)) + [5000, 1])
+    assert batch.wait(5)
+    assert batch.done == batch.total == 202
+    assert sorted(backend.killed) == list(range(100, 300))
+    assert {result.pid: result.error for result in batch.failed()} == {5000: "no such process", 1: "protected"}
+    controller.shutdown()
+
+
+def test_graceful_kill_escalates_after_timeout():
+    backend = FakeBackend(make_rows(3, first_pid=10), ignore_term={12})
+    controller = ProcessController(backend, poll_interval=0.01)
+
+    batch = controller.kill([10, 11, 12], graceful=True, timeout=0.1)
+    assert batch.wait(5)
+    assert {pid: result.method for pid, result in batch.results.items()} == {10: 'term', 11: 'term', 12: 'kill'}
+    assert sorted(backend.terminated) == [10, 11]
+    assert backend.killed == [12]
+    controller.shutdown()
+
+
+def test_kill_tree_and_matching():
+    rows = [{'pid': pid, 'name': name, 'cpu_usage': cpu, 'memory_mb': 1.0, 'read_kb': 0.0,
+             'written_kb': 0.0, 'ppid': ppid, 'start_time': float(pid)}
+            for pid, ppid, name, cpu in ((10, 1, "bash", 0.0), (11, 10, "worker", 50.0), (12, 11, "worker", 40.0),
+                                         (13, 10, "sleep", 0.0), (20, 1, "sshd", 0.0))]
+    table = ProcessTable.from_rows(rows)
+    tree = ProcessTree()
+    tree.update(table)
+    controller = ProcessController(FakeBackend(rows))
+
+    batch = controller.kill_tree(tree, 11)
+    assert batch.wait(5) and sorted(batch.succeeded()) == [11, 12]
+
+    batch = controller.kill_matching(table, ProcessFilter.parse("worker cpu>45"))
+    assert batch.pids == [11]
+    with pytest.raises(ValueError):
+        controller.kill_matching(table, ProcessFilter.parse(""))
+    controller.shutdown()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="нужен Linux и /proc")
+def test_real_children_on_linux():
+    from proc_backend import ProcBackend
+
+    ignore_term = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print(flush=True); time.sleep(60)"
+    polite = [subprocess.Popen(["sleep", "60"]) for _ in range(5)]
+    stubborn = subprocess.Popen([sys.executable, "-c", ignore_term], stdout=subprocess.PIPE)
+    stubborn.stdout.readline()  # обработчик SIGTERM уже установлен
+    children = polite + [stubborn]
+    controller = ProcessController(ProcBackend(), poll_interval=0.02)
+    try:
+        start = time.monotonic()
+        batch = controller.kill([child.pid for child in children], graceful=True, timeout=0.5)
+        assert time.monotonic() - start < 0.5  # вызов не ждёт завершения
+        assert batch.wait(10)
+
+        assert all(result.ok for result in batch.results.values())
+        assert {batch.results[child.pid].method for child in polite} == {'term'}
+        assert batch.results[stubborn.pid].method == 'kill'
+        for child in children:
+            assert child.wait(5) is not None
+    finally:
+        for child in children:
+            if child.poll() is None:
+                child.kill()
+        controller.shutdown()
+    assert os.getpid() not in batch.results
+
+
+def test_stop_monitoring_shuts_down_kill_pool():
+    backend = FakeBackend(make_rows(2, first_pid=2000), ignore_term={2000})
+    monitor = SystemMonitor(backend=backend)
+    # Один рабочий поток ждёт мягкого завершения 2000, 2001 стоит в очереди, когда пул закрывается
+    controller = monitor.process_control = ProcessController(backend, max_workers=1, poll_interval=0.01)
+    monitor.start_monitoring(update_interval=0.05)
+    batch = controller.kill([2000, 2001], graceful=True, timeout=0.5)
+    threads = list(controller._executor._threads)
+    monitor.stop_monitoring()
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+    assert batch.wait(5) and batch.results[2001].error == "cancelled"
+
+    # После нового запуска завершение снова работает — в новом пуле
+    monitor.start_monitoring(update_interval=0.05)
+    assert controller.kill([2001]).wait(5) and backend.killed == [2000, 2001]
+    monitor.stop_monitoring()
@@ -0,0 +1,111 @@
+import random
+
+from fake_backend import FakeBackend, make_rows
+from process_delta import ProcessChangeTracker, apply_delta
+from process_rates import ProcessRates
+from snapshot import ProcessTable
+from system_monitor import SystemMonitor
+
+
+def make_table(rows):
+    return ProcessTable.from_rows([{'pid': pid, 'name': f"proc{pid}", 'cpu_usage': cpu, 'memory_mb': memory,
+                                    'read_kb': 0.0, 'written_kb': 0.0, 'start_time': start}
+                                   for pid, start, cpu, memory in rows])
+
+
+def test_rows_are_published_only_beyond_thresholds():
+    tracker = ProcessChangeTracker(cpu=1.0, memory_mb=5.0, keyframe_interval=100)
+    first = tracker.update(make_table([(10, 1.0, 2.0, 100.0), (20, 2.0, 0.0, 50.0), (30, 3.0, 0.0, 8.0)]))
+    assert first.keyframe and first.sequence == 1 and len(first.state) == 3
+
+    # Колебания ниже порогов: разница пустая, опубликованная таблица — тот же объект
+    idle = tracker.update(make_table([(10, 1.0, 2.5, 103.0), (20, 2.0, 0.2, 50.0), (30, 3.0, 0.0, 9.0)]))
+    assert not idle and idle.base == 1 and idle.state is first.state
+
+    # 10 вышел за порог ЦП, 20 завершился, PID 30 достался новому процессу, 40 появился
+    delta = tracker.update(make_table([(40, 9.0, 0.0, 1.0), (30, 8.0, 0.0, 4.0), (10, 1.0, 9.0, 104.0)]))
+    assert list(delta.changed.pid) == [10] and list(delta.changed.cpu_usage) == [9.0]
+    assert list(delta.added.pid) == [40, 30] and sorted(delta.removed) == [20, 30]
+    state = delta.state
+    assert sorted(state.pid) == [10, 30, 40]
+    assert state.get(30)['start_time'] == 8.0 and state.get(10)['memory_mb'] == 104.0
+
+    # Память ушла на 6 МБ от опубликованных 104, а не от прошлого опроса
+    delta = tracker.update(make_table([(40, 9.0, 0.0, 1.0), (30, 8.0, 0.0, 4.0), (10, 1.0, 9.0, 110.0)]))
+    assert list(delta.changed.pid) == [10] and not delta.added and not delta.removed
+
+
+def test_keyframe_every_interval_resets_drift():
+    tracker = ProcessChangeTracker(cpu=5.0, keyframe_interval=3)
+    deltas = [tracker.update(make_table([(1, 1.0, 0.1 * tick, 10.0)])) for tick in range(7)]
+    assert [delta.keyframe for delta in deltas] == [True, False, False, True, False, False, True]
+    assert deltas[2].state.cpu_usage[0] == 0.0 and deltas[3].state.cpu_usage[0] == 0.1 * 3
+
+    tracker.reset()
+    assert tracker.update(make_table([(1, 1.0, 0.0, 10.0)])).keyframe
+
+
+def test_stopped_rates_are_published_before_keyframe():
+    tracker = ProcessChangeTracker(keyframe_interval=100)
+    rates = ProcessRates(use_numpy=False)
+    published = []
+    # Память растёт на 2 МБ за такт и перестаёт, процесс читает по 30 КБ/с — ниже порога io_kb — и перестаёт
+    for tick, (memory, read) in enumerate([(100.0, 0.0), (102.0, 30.0), (104.0, 60.0), (106.0, 90.0),
+                                           (106.0, 90.0), (106.0, 90.0)]):
+        table = ProcessTable.from_rows([{'pid': 1, 'name': "proc1", 'cpu_usage': 1.0, 'memory_mb': memory,
+                                         'read_kb': read, 'written_kb': 0.0, 'start_time': 1.0}])
+        state = tracker.update(rates.update(table, float(tick))).state
+        published.append((state.memory_rate[0], state.disk_rate[0]))
+    assert published[3] == (2.0, 30.0)
+    assert published[4] == published[5] == (0.0, 0.0)
+
+
+def test_applying_deltas_reproduces_published_state():
+    random.seed(7)
+    tracker = ProcessChangeTracker(cpu=0.5, memory_mb=1.0, io_kb=16.0, keyframe_interval=1000)
+    processes = {pid: [float(pid), 1.0, 10.0, 0.0] for pid in range(1, 301)}
+    next_pid = 301
+    applied = None
+    for tick in range(40):
+        for pid in random.sample(sorted(processes), 2 if tick % 10 else 40):
+            del processes[pid]
+        for _ in range(random.randrange(6)):
+            processes[next_pid] = [float(next_pid), 1.0, 10.0, 0.0]
+            next_pid += 1
+        for values in processes.values():
+            values[1] = max(0.0, values[1] + random.uniform(-1.0, 1.0))
+            values[2] += random.uniform(-0.5, 1.0)
+            values[3] += random.choice((0.0, 0.0, 40.0))
+        table = ProcessTable.from_rows([{'pid': pid, 'name': f"proc{pid}", 'cpu_usage': cpu, 'memory_mb': memory,
+                                         'read_kb': read, 'written_kb': 0.0, 'start_time': start}
+                                        for pid, (start, cpu, memory, read) in processes.items()])
+        delta = tracker.update(table)
+        applied = delta.added if applied is None else apply_delta(applied, delta)
+        assert applied == delta.state
+        assert sorted(applied.pid) == sorted(processes)
+        # Опубликованное значение не дальше порога от настоящего
+        for row in table:
+            published = applied.get(row['pid'])
+            assert abs(published['cpu_usage'] - row['cpu_usage']) <= 0.5
+            assert abs(published['read_kb'] - row['read_kb']) <= 16.0
+
+
+def test_monitor_publishes_delta_with_snapshot():
+    backend = FakeBackend(processes=make_rows(4))
+    monitor = SystemMonitor(backend=backend)
+    monitor.set_change_thresholds(cpu=2.0, keyframe_interval=10)
+    monitor._store('processes', backend.get_processes())
+    first = monitor._build_snapshot()
+    assert first.process_delta.keyframe and first.processes is first.process_delta.state
+
+    backend.rows[1] = dict(backend.rows[1], cpu_usage=1.5)
+    backend.rows[2] = dict(backend.rows[2], cpu_usage=30.0)
+    monitor._store('processes', backend.get_processes())
+    second = monitor._build_snapshot()
+    delta = second.process_delta
+    assert delta.base == first.process_delta.sequence and list(delta.changed.pid) == [3]
+    assert list(second.processes.cpu_usage) == [1.0, 1.0, 30.0, 1.0]
+
+    # Снимок без опроса процессов несёт ту же разницу
+    monitor._store('cpu', backend.get_cpu_info())
+    assert monitor._build_snapshot().process_delta is delta
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from process_delta import ProcessChangeTracker
+from process_index import ProcessFilter, ProcessIndex
+from snapshot import ProcessTable
+
+
+def make_table(rows):
+    return ProcessTable.from_rows([{'pid': pid, 'name': name, 'cpu_usage': cpu, 'memory_mb': memory,
+                                    'read_kb': 0.0, 'written_kb': 0.0} for pid, name, cpu, memory in rows])
+
+
+def expected_pids(table, key, descending, predicate=lambda row: True):
+    rows = [row for row in table if predicate(row)]
+    value = (lambda row: row[key].lower()) if key == 'name' else (lambda row: row[key])
+    ordered = sorted(rows, key=lambda row: (value(row), row['pid']), reverse=descending)
+    return [row['pid'] for row in ordered]
+
+
+def test_index_matches_full_sort_under_churn():
+    random.seed(7)
+    rows = {pid: [f"proc{pid % 37}", random.random() * 10, random.random() * 100] for pid in range(1, 500)}
+    index = ProcessIndex('cpu_usage', descending=True)
+    index.update(make_table([(pid, *values) for pid, values in rows.items()]))
+    next_pid = 500
+    for _ in range(30):
+        for pid in random.sample(sorted(rows), 10):
+            del rows[pid]
+        for _ in range(10):
+            rows[next_pid] = [f"proc{next_pid % 37}", random.random() * 10, random.random() * 100]
+            next_pid += 1
+        for pid in random.sample(sorted(rows), 50):
+            rows[pid][1] = random.random() * 10
+        table = make_table([(pid, *values) for pid, values in rows.items()])
+
+        assert index.update(table) == {'shown': len(rows), 'total': len(rows)}
+        assert index.pids() == expected_pids(table, 'cpu_usage', True)
+
+    for key, descending in (('name', False), ('memory_mb', True), ('pid', False)):
+        index.set_sort(key, descending)
+        assert index.pids() == expected_pids(table, key, descending)
+        assert [row['pid'] for row in index] == index.pids()
+
+
+def test_applying_monitor_deltas_matches_full_sort():
+    random.seed(11)
+    tracker = ProcessChangeTracker(cpu=0.5, memory_mb=1.0, keyframe_interval=10)
+    rows = {pid: [f"proc{pid % 37}", random.random() * 10, random.random() * 100] for pid in range(1, 500)}
+    next_pid = 500
+    for key in ('cpu_usage', 'memory_mb'):
+        index = ProcessIndex(key, descending=True)
+        tracker.reset()
+        for tick in range(25):
+            # Через такт состав не меняется: строки разницы заменяются на месте
+            if tick % 2:
+                for pid in random.sample(sorted(rows), 5):
+                    del rows[pid]
+                for _ in range(5):
+                    rows[next_pid] = [f"proc{next_pid % 37}", random.random() * 10, random.random() * 100]
+                    next_pid += 1
+            # Каждый пятый такт никто не выходит за пороги — разница пустая
+            if tick % 5 != 4:
+                for pid in random.sample(sorted(rows), 30):
+                    rows[pid][1], rows[pid][2] = random.random() * 10, random.random() * 100
+            delta = tracker.update(make_table([(pid, *values) for pid, values in rows.items()]))
+            assert index.apply_delta(delta) == {'shown': len(rows), 'total': len(rows)}
+            assert index.pids() == expected_pids(delta.state, key, True)
+            assert index.index_of(index.pids()[3]) == 3
+
+
+def test_filter_by_substring_regex_and_threshold():
+    table = make_table([(1, "systemd", 0.5, 10.0), (2, "chrome", 12.0, 900.0),
+                        (3, "chrome-helper", 3.0, 200.0), (4, "sshd", 7.0, 5.0)])
+    index = ProcessIndex('pid', descending=False)
+    index.update(table)
+
+    index.set_filter(ProcessFilter.parse("chrome"))
+    assert index.pids() == [2, 3]
+    index.set_filter(ProcessFilter.parse("cpu>5%"))
+    assert index.pids() == [2, 4]
+    index.set_filter(ProcessFilter.parse("re:^s.*d$ mem<=10"))
+    assert index.pids() == [1, 4]
+
+    # Процесс перестал проходить порог — пропадает из вида на следующем снимке
+    index.set_filter(ProcessFilter.parse("cpu>5"))
+    index.update(make_table([(1, "systemd", 0.5, 10.0), (2, "chrome", 1.0, 900.0),
+                             (3, "chrome-helper", 3.0, 200.0), (4, "sshd", 7.0, 5.0)]))
+    assert index.pids() == [4]
+    assert index.index_of(4) == 0 and index.index_of(2) is None
+
+
+def test_invalid_filters_raise_value_error():
+    with pytest.raises(ValueError):
+        ProcessFilter.parse("re:(")
+    with pytest.raises(ValueError):
+        ProcessFilter.parse("threads>5")
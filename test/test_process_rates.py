@@ -0,0 +1,36 @@
+import pytest
+
+from process_rates import ProcessRates, numpy
+from snapshot import ProcessTable
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(numpy is None, reason="numpy не установлен"))]
+
+
+def make_table(rows):
+    return ProcessTable.from_rows([{'pid': pid, 'name': f"proc{pid}", 'cpu_usage': 0.0, 'memory_mb': memory,
+                                    'read_kb': read, 'written_kb': written, 'start_time': start}
+                                   for pid, start, read, written, memory in rows])
+
+
+@pytest.mark.parametrize('use_numpy', BACKENDS)
+def test_rates_between_snapshots(use_numpy):
+    rates = ProcessRates(use_numpy=use_numpy)
+    first = rates.update(make_table([(10, 1.0, 100.0, 0.0, 50.0), (20, 2.0, 0.0, 0.0, 10.0),
+                                     (30, 3.0, 500.0, 0.0, 5.0)]), 0.0)
+    assert list(first.disk_rate) == [0.0, 0.0, 0.0]
+
+    # 20 завершился, 30 достался новому процессу, 40 появился; порядок строк другой
+    second = rates.update(make_table([(40, 9.0, 700.0, 0.0, 1.0), (30, 8.0, 900.0, 0.0, 5.0),
+                                      (10, 1.0, 300.0, 40.0, 30.0)]), 2.0)
+    row = second.get(10)
+    assert (row['read_rate'], row['write_rate'], row['disk_rate'], row['memory_rate']) == (100.0, 20.0, 120.0, -10.0)
+    assert dict(second.get(30))['disk_rate'] == 0.0
+    assert dict(second.get(40))['disk_rate'] == 0.0
+
+
+@pytest.mark.parametrize('use_numpy', BACKENDS)
+def test_counter_decrease_is_not_negative_rate(use_numpy):
+    rates = ProcessRates(use_numpy=use_numpy)
+    rates.update(make_table([(10, 1.0, 100.0, 100.0, 0.0)]), 0.0)
+    table = rates.update(make_table([(10, 1.0, 50.0, 150.0, 0.0)]), 1.0)
+    assert (table.read_rate[0], table.write_rate[0]) == (0.0, 50.0)
@@ -0,0 +1,133 @@
+import random
+
+from process_delta import ProcessChangeTracker
+from process_tree import ProcessTree, format_tree_row
+from snapshot import ProcessTable
+
+
+def make_table(rows):
+    return ProcessTable.from_rows([{'pid': pid, 'name': f"proc{pid}", 'cpu_usage': cpu, 'memory_mb': memory,
+                                    'read_kb': 0.0, 'written_kb': 0.0, 'ppid': ppid, 'start_time': start}
+                                   for pid, ppid, cpu, memory, start in rows])
+
+
+# 1 ─┬─ 10 ─┬─ 11
+#    │      └─ 12 ── 13
+#    └─ 20
+ROWS = [(1, 0, 1.0, 10.0, 100.0), (10, 1, 2.0, 20.0, 110.0), (11, 10, 3.0, 30.0, 120.0),
+        (12, 10, 4.0, 40.0, 130.0), (13, 12, 5.0, 50.0, 140.0), (20, 1, 6.0, 60.0, 150.0)]
+
+
+def test_preorder_depth_and_subtree_sums():
+    tree = ProcessTree()
+    assert tree.update(make_table(ROWS)) == {'added': 6, 'removed': 0, 'reparented': 0}
+
+    assert tree.pids() == [1, 10, 11, 12, 13, 20]
+    assert [row['depth'] for row in tree] == [0, 1, 2, 2, 3, 1]
+    assert tree.subtree(10) == {'cpu_usage': 14.0, 'memory_mb': 140.0, 'processes': 4}
+    assert tree.subtree(1)['cpu_usage'] == 21.0
+    assert format_tree_row(tree[1])[1:4] == ("    ▾ proc10", "2.0% (Σ 14.0%)", "20.0 MB (Σ 140.0 MB)")
+    assert format_tree_row(tree[2])[1] == "          proc11"
+
+
+def test_collapse_hides_descendants():
+    tree = ProcessTree()
+    tree.update(make_table(ROWS))
+
+    tree.toggle(10)
+    assert tree.pids() == [1, 10, 20]
+    assert tree.index_of(20) == 2 and tree.index_of(13) is None
+    assert format_tree_row(tree[1])[1].strip().startswith("▸")
+
+    # Свёрнутый процесс завершился — свёртка не переходит на новый процесс с тем же PID
+    tree.update(make_table([row for row in ROWS if row[0] != 10]))
+    assert 10 not in tree.collapsed
+    tree.toggle(10)
+    assert not tree.collapsed
+    # Дети завершившегося процесса становятся корнями
+    assert tree.pids() == [1, 20, 11, 12, 13]
+
+
+def test_pid_reuse_and_orphans():
+    tree = ProcessTree()
+    tree.update(make_table(ROWS))
+
+    # PID 12 завершился и сразу достался новому процессу без детей: 13 остался сиротой
+    # с PID родителя, который теперь принадлежит более молодому процессу
+    rows = [row for row in ROWS if row[0] != 12] + [(12, 1, 0.5, 5.0, 500.0)]
+    assert tree.update(make_table(rows)) == {'added': 1, 'removed': 0, 'reparented': 0}
+    assert tree.pids() == [1, 10, 11, 12, 20, 13]
+    assert tree.subtree(10)['processes'] == 2
+    assert tree[5]['depth'] == 0
+
+
+def test_incremental_updates_match_fresh_tree():
+    random.seed(3)
+    rows = {1: (0, 100.0)}
+    next_pid, clock = 2, 100.0
+    tree = ProcessTree()
+    for _ in range(40):
+        for pid in random.sample(sorted(rows), min(len(rows) - 1, 5)):
+            if pid != 1:
+                del rows[pid]
+        for _ in range(10):
+            clock += 1
+            rows[next_pid] = (random.choice(sorted(rows)), clock)
+            next_pid += 1
+        # Сироты переходят к init, как в Linux
+        rows = {pid: (ppid if ppid in rows else 1, start) if pid != 1 else (ppid, start)
+                for pid, (ppid, start) in rows.items()}
+        table = make_table([(pid, ppid, random.random(), random.random() * 100, start)
+                            for pid, (ppid, start) in rows.items()])
+
+        tree.update(table)
+        fresh = ProcessTree()
+        fresh.update(table)
+        assert tree.pids() == fresh.pids()
+        assert list(tree) == list(fresh)
+        assert abs(tree.subtree(1)['cpu_usage'] - sum(table.cpu_usage)) < 1e-9
+
+
+def test_applying_monitor_deltas_matches_fresh_tree():
+    random.seed(5)
+    tracker = ProcessChangeTracker(cpu=0.1, keyframe_interval=8)
+    rows = {1: [0, 100.0, 1.0]}
+    rows.update({pid: [1 if pid < 10 else pid // 10, float(pid), random.random()] for pid in range(2, 100)})
+    next_pid = 100
+    tree = ProcessTree()
+    for tick in range(20):
+        # Через такт состав не меняется; изредка процесс меняет родителя
+        if tick % 2:
+            for pid in random.sample(sorted(set(rows) - {1}), 3):
+                del rows[pid]
+            rows[next_pid] = [random.choice(sorted(rows)), float(next_pid), random.random()]
+            next_pid += 1
+            rows = {pid: [ppid if ppid in rows else 1, start, cpu] for pid, (ppid, start, cpu) in rows.items()}
+        elif tick % 4 == 2:
+            rows[random.choice(sorted(set(rows) - {1}))][0] = 1
+        for pid in random.sample(sorted(rows), 10):
+            rows[pid][2] = random.random()
+        delta = tracker.update(make_table([(pid, ppid, cpu, 1.0, start) for pid, (ppid, start, cpu) in rows.items()]))
+
+        tree.apply_delta(delta)
+        fresh = ProcessTree()
+        fresh.update(delta.state)
+        assert tree.pids() == fresh.pids()
+        assert list(tree) == list(fresh)
+
+
+def test_parent_cycle_without_start_times():
+    # Без времени запуска переиспользованные PID могут замкнуть цикл — дерево не зацикливается
+    tree = ProcessTree()
+    tree.update(make_table([(5, 6, 1.0, 1.0, 0.0), (6, 5, 2.0, 2.0, 0.0), (7, 6, 3.0, 3.0, 0.0)]))
+    assert tree.pids() == [5, 6, 7]
+    assert tree.subtree(5)['cpu_usage'] == 6.0
+
+
+def test_subtree_pids_in_preorder():
+    tree = ProcessTree()
+    tree.update(make_table(ROWS))
+
+    assert tree.subtree_pids(10) == [10, 11, 12, 13]
+    assert tree.subtree_pids(20) == [20]
+    assert tree.subtree_pids(99) == []
@@ -0,0 +1,63 @@
+import pytest
+
+from rates import COUNTER_32_LIMIT, CounterRates
+from snapshot import SystemSnapshot
+
+
+def test_rates_per_second():
+    rates = CounterRates(('send', 'recive'))
+    assert rates.update(10.0, {'eth0': (1000, 500)})['eth0']['send'] == 0.0
+
+    sample = rates.update(12.0, {'eth0': (5000, 2500)})['eth0']
+    assert sample['send'] == 2000.0
+    assert sample['recive'] == 1000.0
+
+
+def test_wrap_and_reset():
+    rates = CounterRates(('bytes',))
+    rates.update(0.0, {'a': (COUNTER_32_LIMIT - 100,), 'b': (5000,)})
+
+    sample = rates.update(1.0, {'a': (50,), 'b': (10,)})
+    assert sample['a']['bytes'] == 150.0  # 32-битный счётчик переполнился
+    assert sample['b']['bytes'] == 0.0    # сброс — скорость за интервал неизвестна
+    assert rates.update(2.0, {'a': (150,), 'b': (110,)})['b']['bytes'] == 100.0
+
+    no_wrap = CounterRates(('bytes',), wraps=False)
+    no_wrap.update(0.0, {'total': (COUNTER_32_LIMIT - 100,)})
+    assert no_wrap.update(1.0, {'total': (50,)})['total']['bytes'] == 0.0
+
+
+def test_hotplug_keeps_other_devices():
+    rates = CounterRates(('bytes',))
+    rates.update(0.0, {'eth0': (0,), 'wlan0': (0,)})
+    rates.update(1.0, {'eth0': (100,), 'wlan0': (100,)})
+
+    sample = rates.update(2.0, {'usb0': (7777,), 'eth0': (300,)})
+    assert set(sample) == {'usb0', 'eth0'}
+    assert sample['usb0']['bytes'] == 0.0
+    assert sample['eth0']['bytes'] == 200.0
+
+
+def test_ewma_depends_on_interval():
+    fast, slow = CounterRates(('bytes',), half_life=2.0), CounterRates(('bytes',), half_life=2.0)
+    fast.update(0.0, {'d': (0,)})
+    slow.update(0.0, {'d': (0,)})
+
+    # Один интервал в период полураспада — сглаженное значение проходит половину пути
+    assert fast.update(2.0, {'d': (2000,)})['d']['bytes_avg'] == pytest.approx(500.0)
+    # Одинаковая скорость, но интервал вчетверо короче — сдвиг меньше
+    assert slow.update(0.5, {'d': (500,)})['d']['bytes_avg'] == pytest.approx(1000 * (1 - 0.5 ** 0.25))
+
+
+def test_snapshot_metrics_use_rates():
+    snapshot = SystemSnapshot(
+        timestamp=0.0,
+        disks=({'name': 'sda1', 'total_space': 100, 'available_space': 75},),
+        networks=({'name': 'lo', 'send_speed': 1e9, 'recv_speed': 1e9, 'link_speed': 0},
+                  {'name': 'eth0', 'send_speed': 1.25e6, 'recv_speed': 0.0, 'link_speed': 100000000}))
+    metrics = snapshot.metrics()
+    assert metrics['disk'] == 25.0  # счётчиков активности нет — заполненность
+    assert metrics['network'] == pytest.approx(10.0)
+
+    busy = SystemSnapshot(timestamp=0.0, disk_io=({'name': 'sda', 'active': 40.0}, {'name': 'sdb', 'active': None}))
+    assert busy.metrics()['disk'] == 40.0
@@ -0,0 +1,108 @@
+import os
+from dataclasses import replace
+
+from fake_backend import make_rows
+from process_delta import ProcessChangeTracker
+from recorder import MetricsRecorder, Replay
+from snapshot import ProcessTable, SystemSnapshot
+
+
+def make_snapshot(timestamp, rows):
+    return SystemSnapshot(timestamp=timestamp, cpu={'usage': timestamp % 100},
+                          memory={'total': 1000, 'available': 250},
+                          processes=ProcessTable.from_rows(rows))
+
+
+def test_replay_returns_recorded_snapshots(tmp_path):
+    recorder = MetricsRecorder(str(tmp_path), flush_interval=3600)
+    snapshots = [make_snapshot(1000.0 + t, make_rows(5 + t)) for t in range(10)]
+    for snapshot in snapshots:
+        recorder.record(snapshot)
+    recorder.close()
+
+    replay = Replay(str(tmp_path))
+    assert len(replay) == 10
+    frame = replay.at(1004.5)
+    assert frame.timestamp == 1004.0
+    assert frame.metrics['cpu'] == 4.0 and frame.metrics['memory'] == 75.0
+    assert frame.processes() == snapshots[4].processes
+    assert [f.timestamp for f in replay.between(1002.0, 1004.0)] == [1002.0, 1003.0, 1004.0]
+    assert replay.at(999.0) is None
+    replay.close()
+
+
+def test_segments_rotate_and_keep_their_own_names(tmp_path):
+    recorder = MetricsRecorder(str(tmp_path), rotate_seconds=5)
+    for t in range(12):
+        recorder.record(make_snapshot(2000.0 + t, make_rows(3, first_pid=t)))
+    recorder.close()
+
+    assert len(recorder.segments) == 3
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in recorder.segments)
+    replay = Replay(str(tmp_path))
+    assert len(replay) == 12
+    processes = replay.at(2011.0).processes()
+    assert list(processes.pid) == [11, 12, 13]
+    assert list(processes.name) == ["proc11", "proc12", "proc13"]
+    replay.close()
+
+
+def test_truncated_tail_is_ignored(tmp_path):
+    recorder = MetricsRecorder(str(tmp_path))
+    for t in range(3):
+        recorder.record(make_snapshot(3000.0 + t, make_rows(4)))
+    recorder.close()
+    path = recorder.segments[0]
+    os.truncate(path, os.path.getsize(path) - 10)
+
+    replay = Replay(str(tmp_path))
+    assert [frame.timestamp for frame in replay.frames] == [3000.0, 3001.0]
+    replay.close()
+
+
+def test_old_segments_are_removed(tmp_path):
+    recorder = MetricsRecorder(str(tmp_path), rotate_seconds=1, keep_segments=2)
+    for t in range(5):
+        recorder.record(make_snapshot(4000.0 + t, make_rows(2)))
+    recorder.close()
+
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in recorder.segments[-2:])
+
+
+def test_deltas_are_recorded_between_keyframes(tmp_path):
+    recorder = MetricsRecorder(str(tmp_path), rotate_seconds=8, flush_interval=3600)
+    tracker = ProcessChangeTracker(cpu=0.5, keyframe_interval=5)
+    rows = make_rows(50)
+    snapshots = []
+    for t in range(20):
+        rows[t] = dict(rows[t], cpu_usage=10.0 + t)
+        if t == 6:
+            rows = rows[2:] + make_rows(3, first_pid=100)
+        delta = tracker.update(ProcessTable.from_rows(rows))
+        snapshot = SystemSnapshot(timestamp=5000.0 + t, cpu={'usage': 1.0}, processes=delta.state,
+                                  process_delta=delta)
+        snapshots.append(snapshot)
+        # Снимок 12 не дошёл до записи: следующий пишется полной таблицей
+        if t != 12:
+            recorder.record(snapshot)
+        # Снимок без нового опроса процессов
+        if t == 3:
+            recorder.record(SystemSnapshot(timestamp=5003.5, processes=delta.state, process_delta=delta))
+    recorder.close()
+
+    replay = Replay(str(tmp_path))
+    assert len(replay) == 20
+    for snapshot in snapshots[::-1]:
+        if snapshot.timestamp != 5012.0:
+            assert replay.at(snapshot.timestamp).processes() == snapshot.processes
+    assert replay.at(5003.5).processes() == snapshots[3].processes
+    assert replay.at(5009.0).count == len(snapshots[9].processes)
+    replay.close()
+
+    # Те же снимки полными таблицами
+    full = MetricsRecorder(str(tmp_path / 'full'), rotate_seconds=8, flush_interval=3600)
+    for snapshot in snapshots:
+        full.record(replace(snapshot, process_delta=None))
+    full.close()
+    size = sum(os.path.getsize(path) for path in recorder.segments)
+    assert size * 2 < sum(os.path.getsize(path) for path in full.segments)
@@ -0,0 +1,89 @@
+import time
+
+from fake_backend import FakeBackend
+from fake_proc import make_proc_tree
+from proc_backend import ProcBackend
+from scheduler import HIDDEN_FACTOR, SamplingScheduler
+from system_monitor import SystemMonitor
+
+
+def test_sources_run_on_their_own_intervals():
+    scheduler = SamplingScheduler()
+    scheduler.add_source('fast', lambda: 'f', interval=1.0)
+    scheduler.add_source('slow', lambda: 's', interval=10.0)
+
+    assert scheduler.run_due(now=100.0) == {'fast': 'f', 'slow': 's'}
+    assert scheduler.run_due(now=101.0) == {'fast': 'f'}
+    assert scheduler.run_due(now=101.5) == {}
+    assert scheduler.run_due(now=110.0) == {'fast': 'f', 'slow': 's'}
+    assert scheduler.stats()['fast']['runs'] == 3
+
+
+def test_interval_backs_off_on_overrun_and_recovers():
+    delay = [0.02]
+    scheduler = SamplingScheduler()
+    scheduler.add_source('slow', lambda: time.sleep(delay[0]), interval=1.0, budget=0.01)
+
+    scheduler.run_due(now=0.0)
+    scheduler.run_due(now=10.0)
+    stats = scheduler.stats()['slow']
+    assert stats['overruns'] == 2
+    assert stats['interval'] == 4.0
+
+    delay[0] = 0.0
+    scheduler.run_due(now=20.0)
+    assert scheduler.stats()['slow']['interval'] < 4.0
+
+
+def test_hidden_and_minimized_sources_are_polled_less_often():
+    scheduler = SamplingScheduler()
+    scheduler.add_source('services', lambda: [], interval=1.0)
+    scheduler.set_hidden(['services'])
+    assert scheduler.stats()['services']['interval'] == HIDDEN_FACTOR
+
+    scheduler.set_hidden([])
+    scheduler.set_throttle(3.0)
+    assert scheduler.stats()['services']['interval'] == 3.0
+
+
+def test_errors_are_counted_per_source():
+    scheduler = SamplingScheduler()
+    scheduler.add_source('broken', lambda: 1 / 0, interval=1.0)
+
+    result = scheduler.run_due(now=0.0)
+    assert isinstance(result['broken'], ZeroDivisionError)
+    assert scheduler.stats()['broken']['errors'] == 1
+
+
+def test_monitor_merges_sources_into_snapshots():
+    monitor = SystemMonitor(backend=FakeBackend())
+    snapshots = []
+    monitor.register_callback(snapshots.append)
+    monitor.start_monitoring(update_interval=0.05, intervals={'cpu': 0.05, 'services': 60.0})
+    time.sleep(0.3)
+    monitor.stop_monitoring()
+
+    stats = monitor.get_source_stats()
+    assert stats['cpu']['runs'] > 2
+    assert stats['services']['runs'] == 1
+    assert len(snapshots) >= stats['cpu']['runs']
+    assert snapshots[-1].services == snapshots[0].services
+    assert len(snapshots[-1].processes) == 3
+
+
+def test_one_shot_getters_answer_from_snapshot(tmp_path):
+    backend = ProcBackend(make_proc_tree(str(tmp_path / 'proc'), count=5), sys_root=str(tmp_path / 'sys'))
+    monitor = SystemMonitor(backend=backend)
+    # До первого снимка запрос собирает его сам
+    usage = monitor.get_cpu_percent()
+    snapshot = monitor.get_snapshot()
+    assert snapshot is not None and usage == snapshot.cpu['usage']
+
+    state = (backend._cpu_times, backend._last_sample, backend._proc_times, monitor._network_rates._timestamp)
+    networks = monitor.get_network_info()
+    assert monitor.get_memory_percent() == snapshot.memory['used'] / snapshot.memory['total'] * 100
+    monitor.get_disk_info(), monitor.get_services_info(), monitor.get_cpu_percent()
+    # Прошлые счётчики бэкенда и скорости сети — те, что оставил сбор
+    assert all(now is before for now, before in zip(
+        (backend._cpu_times, backend._last_sample, backend._proc_times, monitor._network_rates._timestamp), state))
+    assert networks == list(snapshot.networks) and monitor.get_snapshot() is snapshot
@@ -0,0 +1,67 @@
+import ctypes
+
+from snapshot import RATE_COLUMNS, NameCache, ProcessTable
+from system_monitor import ProcessInfo
+
+
+def make_struct_array(rows):
+    data = (ProcessInfo * len(rows))()
+    for item, row in zip(data, rows):
+        item.pid = row['pid'].encode()
+        item.name = row['name'].encode()
+        item.cpu_usage = row['cpu_usage']
+        item.memory_mb = row['memory_mb']
+        item.read_kb = row['read_kb']
+        item.written_kb = row['written_kb']
+        item.ppid = row['ppid']
+        item.start_time = int(row['start_time'])
+    return ctypes.cast(data, ctypes.POINTER(ProcessInfo)), data
+
+
+ROWS = [
+    {'pid': '4', 'name': 'System', 'cpu_usage': 0.5, 'memory_mb': 12.0, 'read_kb': 1.0, 'written_kb': 2.0,
+     'ppid': 0, 'start_time': 1700000000.0},
+    {'pid': '1200', 'name': 'chrome.exe', 'cpu_usage': 7.25, 'memory_mb': 300.5, 'read_kb': 10.0, 'written_kb': 0.0,
+     'ppid': 4, 'start_time': 1700000100.0},
+    {'pid': '1201', 'name': 'chrome.exe', 'cpu_usage': 1.0, 'memory_mb': 80.0, 'read_kb': 0.0, 'written_kb': 5.0,
+     'ppid': 1200, 'start_time': 1700000101.0},
+]
+
+
+def test_struct_array_matches_dict_rows():
+    pointer, keep_alive = make_struct_array(ROWS)
+    table = ProcessTable.from_struct_array(pointer, len(ROWS))
+
+    assert len(table) == 3
+    assert list(table.pid) == [4, 1200, 1201]
+    # Скорости считаются между снимками; в одиночном снимке они нулевые
+    rates = dict.fromkeys(RATE_COLUMNS, 0.0)
+    assert [dict(row) for row in table] == [dict(row, pid=int(row['pid']), **rates) for row in ROWS]
+    assert table == ProcessTable.from_rows(ROWS)
+
+
+def test_names_are_decoded_once_and_shared():
+    pointer, keep_alive = make_struct_array(ROWS)
+    names = NameCache()
+    first = ProcessTable.from_struct_array(pointer, len(ROWS), names)
+    second = ProcessTable.from_struct_array(pointer, len(ROWS), names)
+
+    assert len(names) == 2
+    assert first.name[1] is first.name[2]
+    assert second.name[1] is first.name[1]
+
+
+def test_row_lookup_by_pid():
+    table = ProcessTable.from_rows(ROWS)
+
+    assert table.get(1200)['memory_mb'] == 300.5
+    assert table.get(99) is None
+    assert table[-1]['pid'] == 1201
+    assert table.column('cpu_usage').readonly
+
+
+def test_empty_array():
+    table = ProcessTable.from_struct_array(ctypes.POINTER(ProcessInfo)(), 0)
+
+    assert len(table) == 0
+    assert list(table) == []
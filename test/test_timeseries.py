@@ -0,0 +1,64 @@
+from snapshot import ProcessTable
+from timeseries import RollupTier, Series, TimeSeriesStore
+
+
+def test_tier_rolls_up_min_avg_max():
+    tier = RollupTier(resolution=10, capacity=4)
+    for t, value in ((100, 1.0), (103, 5.0), (109, 3.0), (110, 7.0)):
+        tier.add(t, value)
+
+    rows = [(tier.time[i], tier.min[i], tier.avg[i], tier.max[i])
+            for a, b in tier.segments(0, 1e12) for i in range(a, b)]
+    assert rows == [(100.0, 1.0, 3.0, 5.0)]
+
+
+def test_ring_wraps_and_queries_span_the_seam():
+    tier = RollupTier(resolution=1, capacity=5)
+    for t in range(12):
+        tier.add(t, float(t))
+
+    assert tier.count == 5
+    assert tier.oldest() == 6.0 and tier.newest() == 10.0
+    segments = tier.segments(8, 11)
+    assert len(segments) == 2
+    assert [tier.avg[i] for a, b in segments for i in range(a, b)] == [8.0, 9.0, 10.0]
+
+
+def test_series_picks_finest_tier_covering_window():
+    series = Series(((1, 60), (10, 60)))
+    for t in range(300):
+        series.append(float(t), float(t % 7))
+
+    recent = series.query(250, 290)
+    assert recent.resolution == 1
+    assert len(recent) == 40
+
+    old = series.query(0, 290)
+    assert old.resolution == 10
+    assert old.times()[0] == 0.0
+
+    coarse = series.query(250, 290, max_points=10)
+    assert coarse.resolution == 10
+
+
+def test_window_views_do_not_copy():
+    series = Series(((1, 10),))
+    for t in range(5):
+        series.append(float(t), float(t))
+
+    views = series.query(0, 10).views('avg')
+    assert all(isinstance(view, memoryview) and view.readonly for view in views)
+    assert [value for view in views for value in view] == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_process_history_is_bounded():
+    store = TimeSeriesStore(process_tiers=((1, 10),), max_process_series=4)
+    for tick in range(5):
+        rows = [{'pid': pid, 'name': 'p', 'cpu_usage': float(pid + tick), 'memory_mb': 1.0,
+                 'read_kb': 0.0, 'written_kb': 0.0} for pid in range(tick, tick + 10)]
+        store.record_processes(float(tick), ProcessTable.from_rows(rows), top_n=2)
+
+    keys = store.process_keys()
+    assert len(keys) == 4
+    assert {pid for pid, column in keys} == {12, 13}
+    assert store.nbytes() == 4 * 4 * 8 * 10
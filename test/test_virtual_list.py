@@ -0,0 +1,52 @@
+from fake_backend import make_rows
+from snapshot import ProcessTable
+from virtual_list import VirtualListModel
+
+
+def make_model(count, visible=10):
+    model = VirtualListModel(visible=visible, overscan=5)
+    model.set_rows(ProcessTable.from_rows(make_rows(count)))
+    return model
+
+
+def test_window_covers_only_visible_rows():
+    model = make_model(50000)
+    model.scroll_to(25000)
+
+    window = model.window()
+    assert [pid for pid, _ in window] == list(range(25001, 25011))
+    assert window[0][1][1] == "proc25001"
+    assert len(model._cache) == 20
+
+    model.scroll(10 ** 6)
+    assert model.offset == 50000 - 10
+    model.moveto(0.5)
+    assert model.offset == 25000
+    assert model.fractions() == (0.5, 25010 / 50000)
+
+
+def test_selection_follows_pid_across_snapshots():
+    model = make_model(100)
+    model.select(42)
+
+    # Процессы перед выделенным завершились — строка сдвинулась, PID тот же
+    model.set_rows(ProcessTable.from_rows(make_rows(80, first_pid=21)))
+    assert model.selected_row()['pid'] == 42
+    model.move_selection(1)
+    assert model.selected_pid == 43
+
+    model.set_rows(ProcessTable.from_rows(make_rows(10, first_pid=500)))
+    assert model.selected_row() is None
+
+
+def test_keyboard_navigation_scrolls_to_selection():
+    model = make_model(1000)
+    model.select_index(0)
+    model.move_selection(25)
+    assert model.selected_pid == 26
+    assert model.offset <= 25 < model.offset + model.visible
+
+    model.select_index(999)
+    assert model.offset == 990
+    model.move_selection(-model.visible)
+    assert model.selected_pid == 990
@@ -0,0 +1,230 @@
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Уровни агрегации: (шаг в секундах, число точек). 1 с — последний час,
+# 10 с — 6 часов, 1 мин и 10 мин — сутки.
+DEFAULT_TIERS = ((1, 3600), (10, 2160), (60, 1440), (600, 144))
+# Для процессов секундный уровень не нужен — историю топ-N держим компактнее
+PROCESS_TIERS = ((10, 360), (60, 1440), (600, 144))
+
+COLUMNS = ('time', 'min', 'avg', 'max')
+
+
+class RollupTier:
+    """Кольцевой буфер агрегатов min/avg/max с фиксированным шагом.
+
+    Все столбцы — заранее выделенные `array('d')`, поэтому память не растёт.
+    Текущий (незакрытый) интервал копится в полях `_bucket_*` и попадает в
+    кольцо, когда приходит отсчёт из следующего интервала.
+    """
+    __slots__ = ('resolution', 'capacity', 'time', 'min', 'avg', 'max', 'head', 'count',
+                 '_bucket', '_bucket_min', '_bucket_max', '_bucket_sum', '_bucket_count')
+
+    def __init__(self, resolution: float, capacity: int):
+        self.resolution = resolution
+        self.capacity = capacity
+        for column in COLUMNS:
+            setattr(self, column, array('d', bytes(8 * capacity)))
+        self.head = 0
+        self.count = 0
+        self._bucket = None
+        self._bucket_min = self._bucket_max = self._bucket_sum = 0.0
+        self._bucket_count = 0
+
+    def add(self, timestamp: float, value: float):
+        bucket = timestamp - timestamp % self.resolution
+        if self._bucket is not None and bucket == self._bucket:
+            if value < self._bucket_min:
+                self._bucket_min = value
+            if value > self._bucket_max:
+                self._bucket_max = value
+            self._bucket_sum += value
+            self._bucket_count += 1
+            return
+        if self._bucket is not None and bucket < self._bucket:
+            return  # отсчёт из прошлого (часы перевели назад) — пропускаем
+        if self._bucket is not None:
+            self._flush()
+        self._bucket = bucket
+        self._bucket_min = self._bucket_max = self._bucket_sum = value
+        self._bucket_count = 1
+
+    def _flush(self):
+        i = self.head
+        self.time[i] = self._bucket
+        self.min[i] = self._bucket_min
+        self.max[i] = self._bucket_max
+        self.avg[i] = self._bucket_sum / self._bucket_count
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def _physical(self, logical: int) -> int:
+        return (self.head - self.count + logical) % self.capacity
+
+    def oldest(self) -> Optional[float]:
+        return self.time[self._physical(0)] if self.count else None
+
+    def newest(self) -> Optional[float]:
+        return self.time[self._physical(self.count - 1)] if self.count else None
+
+    def _bisect(self, timestamp: float) -> int:
+        """Логический индекс первой точки с временем >= timestamp."""
+        # Кольцо упорядочено по времени начиная с самой старой точки:
+        # ищем в двух отсортированных половинах без копирования
+        start = self._physical(0)
+        first = self.capacity - start if start + self.count > self.capacity else self.count
+        position = bisect_left(self.time, timestamp, start, start + first) - start
+        if position < first:
+            return position
+        return first + bisect_left(self.time, timestamp, 0, self.count - first)
+
+    def segments(self, start: float, end: float) -> List[Tuple[int, int]]:
+        """Физические диапазоны [a, b) точек с start <= time < end (не больше двух)."""
+        lo, hi = self._bisect(start), self._bisect(end)
+        if lo >= hi:
+            return []
+        a, b = self._physical(lo), self._physical(hi - 1) + 1
+        if a < b:
+            return [(a, b)]
+        return [(a, self.capacity), (0, b)]
+
+    def nbytes(self) -> int:
+        return sum(getattr(self, column).itemsize * self.capacity for column in COLUMNS)
+
+
+class Window:
+    """Окно выборки из уровня агрегации: срезы памяти кольца без копирования."""
+    __slots__ = ('tier', 'segments')
+
+    def __init__(self, tier: Optional[RollupTier], segments: List[Tuple[int, int]]):
+        self.tier = tier
+        self.segments = segments
+
+    @property
+    def resolution(self) -> float:
+        return self.tier.resolution if self.tier is not None else 0.0
+
+    def views(self, column: str = 'avg') -> List[memoryview]:
+        data = memoryview(getattr(self.tier, column)).toreadonly()
+        return [data[a:b] for a, b in self.segments]
+
+    def column(self, column: str = 'avg') -> List[float]:
+        """Копирует только запрошенный столбец окна в список."""
+        values = []
+        for view in self.views(column):
+            values.extend(view)
+        return values
+
+    def values(self) -> List[float]:
+        return self.column('avg')
+
+    def times(self) -> List[float]:
+        return self.column('time')
+
+    def __len__(self) -> int:
+        return sum(b - a for a, b in self.segments)
+
+
+class Series:
+    """Одна метрика, записываемая сразу во все уровни агрегации."""
+    __slots__ = ('tiers',)
+
+    def __init__(self, tiers: Iterable[Tuple[float, int]] = DEFAULT_TIERS):
+        self.tiers = [RollupTier(resolution, capacity) for resolution, capacity in tiers]
+
+    def append(self, timestamp: float, value: float):
+        for tier in self.tiers:
+            tier.add(timestamp, value)
+
+    def query(self, start: float, end: float, max_points: Optional[int] = None) -> Window:
+        """Выбирает самый подробный уровень, который покрывает начало окна
+        и (если задано) укладывается в max_points точек."""
+        tiers = [tier for tier in self.tiers if tier.count]
+        if not tiers:
+            return Window(None, [])
+        fitting = [tier for tier in tiers
+                   if max_points is None or (end - start) / tier.resolution <= max_points] or tiers[-1:]
+        for tier in fitting:
+            if tier.oldest() <= start:
+                return Window(tier, tier.segments(start, end))
+        # Окно старше всей истории: берём уровень с самыми давними данными
+        tier = min(fitting, key=RollupTier.oldest)
+        return Window(tier, tier.segments(start, end))
+
+    def nbytes(self) -> int:
+        return sum(tier.nbytes() for tier in self.tiers)
+
+
+class TimeSeriesStore:
+    """Хранилище истории метрик в ограниченной памяти.
+
+    Системные метрики живут всё время работы, а ряды процессов (топ-N по
+    загрузке ЦП) вытесняются, когда их больше `max_process_series`:
+    первым уходит ряд, который дольше всех не обновлялся.
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS, process_tiers=PROCESS_TIERS, max_process_series: int = 100):
+        self.tiers = tiers
+        self.process_tiers = process_tiers
+        self.max_process_series = max_process_series
+        self._series: Dict[str, Series] = {}
+        self._process_series: "OrderedDict[Tuple, Series]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def append(self, name: str, timestamp: float, value: float):
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = Series(self.tiers)
+            series.append(timestamp, value)
+
+    def append_many(self, timestamp: float, values: Dict[str, float]):
+        for name, value in values.items():
+            self.append(name, timestamp, value)
+
+    def record_processes(self, timestamp: float, processes, top_n: int = 20,
+                         columns: Tuple[str, ...] = ('cpu_usage', 'memory_mb')):
+        """Записывает историю топ-N процессов по загрузке ЦП."""
+        cpu = processes.cpu_usage
+        top = heapq.nlargest(top_n, range(len(cpu)), key=cpu.__getitem__)
+        with self._lock:
+            for index in top:
+                pid = processes.pid[index]
+                for column in columns:
+                    key = (pid, column)
+                    series = self._process_series.get(key)
+                    if series is None:
+                        series = self._process_series[key] = Series(self.process_tiers)
+                    else:
+                        self._process_series.move_to_end(key)
+                    series.append(timestamp, getattr(processes, column)[index])
+            while len(self._process_series) > self.max_process_series:
+                self._process_series.popitem(last=False)
+
+    def query(self, name: str, start: float, end: float, max_points: Optional[int] = None) -> Window:
+        with self._lock:
+            series = self._series.get(name)
+            return series.query(start, end, max_points) if series is not None else Window(None, [])
+
+    def query_process(self, pid: int, column: str, start: float, end: float,
+                      max_points: Optional[int] = None) -> Window:
+        with self._lock:
+            series = self._process_series.get((pid, column))
+            return series.query(start, end, max_points) if series is not None else Window(None, [])
+
+    def names(self) -> List[str]:
+        return list(self._series)
+
+    def process_keys(self) -> List[Tuple]:
+        return list(self._process_series)
+
+    def nbytes(self) -> int:
+        """Объём памяти, занятый буферами всех рядов."""
+        with self._lock:
+            return (sum(series.nbytes() for series in self._series.values())
+                    + sum(series.nbytes() for series in self._process_series.values()))
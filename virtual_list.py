@@ -0,0 +1,247 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from process_table import format_process_row
+from snapshot import ProcessTable
+
+DEFAULT_ROW_HEIGHT = 20
+
+
+class VirtualListModel:
+    """Окно прокрутки над списком строк любого размера.
+
+    Хранит только ссылку на строки (например, ProcessTable снимка), смещение
+    и выделенный PID. Отформатированные значения есть лишь у видимых строк
+    и `overscan` строк вокруг них, поэтому стоимость прокрутки и обновления
+    не зависит от общего числа строк.
+    """
+
+    def __init__(self, visible: int = 20, overscan: int = 10,
+                 formatter: Callable[[Dict], Tuple] = format_process_row):
+        self.visible = max(1, visible)
+        self.overscan = overscan
+        self.formatter = formatter
+        self.rows: Sequence = ()
+        self.offset = 0
+        self.selected_pid = None
+        self._cache: Dict[int, Tuple] = {}
+        self._pid_index: Optional[Dict[int, int]] = None
+
+    # ---------- Данные ----------
+
+    def set_rows(self, rows: Sequence):
+        """Новый снимок строк: смещение сохраняется, выделение остаётся за PID."""
+        self.rows = rows
+        self._cache = {}
+        self._pid_index = None
+        self.offset = self._clamp(self.offset)
+
+    def set_visible(self, visible: int):
+        self.visible = max(1, visible)
+        self.offset = self._clamp(self.offset)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def index_of(self, pid) -> Optional[int]:
+        if isinstance(self.rows, ProcessTable):
+            try:
+                return self.rows.index_of(pid)
+            except KeyError:
+                return None
+        if hasattr(self.rows, 'index_of'):
+            return self.rows.index_of(pid)
+        if self._pid_index is None:
+            self._pid_index = {row['pid']: i for i, row in enumerate(self.rows)}
+        return self._pid_index.get(pid)
+
+    def values(self, index: int) -> Tuple:
+        values = self._cache.get(index)
+        if values is None:
+            values = self._cache[index] = self.formatter(self.rows[index])
+        return values
+
+    def window(self) -> List[Tuple[int, Tuple]]:
+        """(pid, значения) для видимых строк; соседние строки форматируются заранее."""
+        end = min(len(self.rows), self.offset + self.visible)
+        lo = max(0, self.offset - self.overscan)
+        hi = min(len(self.rows), end + self.overscan)
+        # Кэш держим только в пределах окна с запасом, чтобы он не рос при прокрутке
+        if len(self._cache) > 4 * (self.visible + 2 * self.overscan):
+            self._cache = {i: v for i, v in self._cache.items() if lo <= i < hi}
+        for index in range(lo, hi):
+            self.values(index)
+        return [(self.rows[index]['pid'], self._cache[index]) for index in range(self.offset, end)]
+
+    # ---------- Прокрутка ----------
+
+    def _clamp(self, offset: int) -> int:
+        return max(0, min(offset, len(self.rows) - self.visible))
+
+    def scroll_to(self, offset: int):
+        self.offset = self._clamp(offset)
+
+    def scroll(self, delta: int):
+        self.scroll_to(self.offset + delta)
+
+    def moveto(self, fraction: float):
+        self.scroll_to(int(fraction * len(self.rows)))
+
+    def fractions(self) -> Tuple[float, float]:
+        total = len(self.rows)
+        if not total:
+            return 0.0, 1.0
+        return self.offset / total, min(1.0, (self.offset + self.visible) / total)
+
+    def ensure_visible(self, index: int):
+        if index < self.offset:
+            self.scroll_to(index)
+        elif index >= self.offset + self.visible:
+            self.scroll_to(index - self.visible + 1)
+
+    # ---------- Выделение ----------
+
+    def select(self, pid):
+        self.selected_pid = pid
+
+    def move_selection(self, delta: int):
+        """Сдвигает выделение на delta строк (клавиши ↑/↓/PgUp/PgDn) и прокручивает к нему."""
+        if not len(self.rows):
+            return
+        index = self.index_of(self.selected_pid) if self.selected_pid is not None else None
+        if index is None:
+            index = self.offset if delta >= 0 else min(len(self.rows), self.offset + self.visible) - 1
+        else:
+            index = max(0, min(len(self.rows) - 1, index + delta))
+        self.selected_pid = self.rows[index]['pid']
+        self.ensure_visible(index)
+
+    def select_index(self, index: int):
+        if 0 <= index < len(self.rows):
+            self.selected_pid = self.rows[index]['pid']
+            self.ensure_visible(index)
+
+    def selected_row(self):
+        """Строка выделенного процесса или None, если процесс исчез из снимка."""
+        if self.selected_pid is None:
+            return None
+        index = self.index_of(self.selected_pid)
+        return self.rows[index] if index is not None else None
+
+
+class VirtualProcessList(tk.Frame):
+    """Таблица процессов, в которой Treeview содержит только видимые строки.
+
+    Элементы Treeview создаются по числу помещающихся строк и переиспользуются:
+    при прокрутке и новом снимке меняются их значения. Полоса прокрутки и
+    клавиатура управляют смещением модели.
+    """
+
+    def __init__(self, parent, columns: Sequence[str], model: Optional[VirtualListModel] = None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.model = model if model is not None else VirtualListModel()
+        self.tree = ttk.Treeview(self, columns=tuple(columns), show="headings", selectmode="browse")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=80, anchor="center")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self._slots: List[str] = []
+        self._slot_values: List[Optional[Tuple]] = []
+        self._slot_pids: List = []
+        self._row_height = int(ttk.Style().lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT)
+
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self._scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self._scroll(3))
+        for key, action in (('<Up>', lambda: self.model.move_selection(-1)),
+                            ('<Down>', lambda: self.model.move_selection(1)),
+                            ('<Prior>', lambda: self.model.move_selection(-self.model.visible)),
+                            ('<Next>', lambda: self.model.move_selection(self.model.visible)),
+                            ('<Home>', lambda: self.model.select_index(0)),
+                            ('<End>', lambda: self.model.select_index(len(self.model) - 1))):
+            self.tree.bind(key, lambda e, action=action: self._on_key(action))
+
+    # ---------- Данные ----------
+
+    def update_rows(self, rows: Sequence):
+        self.model.set_rows(rows)
+        self.refresh()
+
+    def selected(self):
+        """Строка выделенного процесса (Mapping с pid, name, ...) или None."""
+        return self.model.selected_row()
+
+    def clear_selection(self):
+        self.model.select(None)
+        self.refresh()
+
+    # ---------- Отрисовка ----------
+
+    def _resize_slots(self, count: int):
+        while len(self._slots) < count:
+            self._slots.append(self.tree.insert("", tk.END, values=()))
+            self._slot_values.append(None)
+            self._slot_pids.append(None)
+        if len(self._slots) > count:
+            self.tree.delete(*self._slots[count:])
+            del self._slots[count:], self._slot_values[count:], self._slot_pids[count:]
+
+    def refresh(self):
+        window = self.model.window()
+        self._resize_slots(len(window))
+        selected_slot = None
+        for slot, (pid, values) in enumerate(window):
+            if self._slot_values[slot] != values:
+                self.tree.item(self._slots[slot], values=values)
+                self._slot_values[slot] = values
+            self._slot_pids[slot] = pid
+            if pid == self.model.selected_pid:
+                selected_slot = self._slots[slot]
+
+        current = self.tree.selection()
+        wanted = (selected_slot,) if selected_slot is not None else ()
+        if current != wanted:
+            self.tree.selection_set(wanted)
+        self.scrollbar.set(*self.model.fractions())
+
+    # ---------- События ----------
+
+    def _on_configure(self, event):
+        # Строка заголовка занимает примерно одну строку таблицы
+        visible = max(1, event.height // self._row_height - 1)
+        if visible != self.model.visible:
+            self.model.set_visible(visible)
+            self.refresh()
+
+    def _on_select(self, event):
+        # Пустое выделение бывает, когда выбранный процесс ушёл за край окна, —
+        # PID в модели при этом сохраняется
+        selection = self.tree.selection()
+        if selection and selection[0] in self._slots:
+            self.model.select(self._slot_pids[self._slots.index(selection[0])])
+
+    def _scroll(self, delta: int):
+        self.model.scroll(delta)
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        self._scroll(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, command, *args):
+        if command == 'moveto':
+            self.model.moveto(float(args[0]))
+        elif command == 'scroll':
+            step = self.model.visible if args[1] == 'pages' else 1
+            self.model.scroll(int(args[0]) * step)
+        self.refresh()
+
+    def _on_key(self, action):
+        action()
+        self.refresh()
+        return "break"